@@ -26,6 +26,7 @@ from twisted.python import log
 from buildbot import util
 from buildbot.process.properties import Properties
 from buildbot.util import datetime2epoch
+from buildbot.util import lru
 
 if TYPE_CHECKING:
     from buildbot.db.changes import ChangeModel
@@ -53,7 +54,7 @@ class Change:
 
         @returns: L{Change} via Deferred
         """
-        cache = master.caches.get_cache("Changes", cls._make_ch)
+        cache = master.caches.get_cache("Changes", cls._make_ch, size_fn=cls._approximate_size)
         return cache.get(chdict.changeid, chdict=chdict, master=master)
 
     @classmethod
@@ -80,6 +81,14 @@ class Change:
 
         return defer.succeed(change)
 
+    @staticmethod
+    def _approximate_size(change: Change) -> int:
+        # the properties are the only object of a change which is not a plain value
+        return lru.approximate_size({
+            **vars(change),
+            'properties': change.properties.properties,
+        })
+
     def __init__(
         self,
         who: str | None,
@@ -18,6 +18,7 @@ from __future__ import annotations
 import contextlib
 import os
 import re
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import ClassVar
@@ -56,6 +57,21 @@ class GitError(Exception):
     """Raised when git exits with code 128."""
 
 
+@dataclass
+class _CommitInfo:
+    timestamp: int | None
+    author: str
+    committer: str
+    files: list[str]
+    comments: str
+
+
+# Fields of a commit as extracted by _get_commits_info, each one preceded by a NUL byte, which
+# can't appear in any of them.  The file list printed by --name-only follows the last NUL.
+_COMMIT_INFO_FORMAT = '%x00'.join(['', '%H', '%ct', '%aN <%aE>', '%cN <%cE>', '%s%n%b', ''])
+_COMMIT_INFO_FIELDS = 6
+
+
 class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
     """This source will poll a remote git repo for changes and submit
     them to the change master."""
@@ -77,6 +93,9 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
         "_git_auth",
     )
 
+    # maximum number of revisions whose details are extracted by a single git command
+    _COMMIT_INFO_BATCH_SIZE = 200
+
     def __init__(self, repourl: str, **kwargs: Any) -> None:
         self._git_auth = GitServiceAuth(self)
 
@@ -498,6 +517,9 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
         # unix timestamp
         args = ['--no-walk', r'--format=%ct', rev, '--']
         git_output = yield self._dovccmd('log', args, path=self.workdir)
+        return self._parse_commit_timestamp(git_output)
+
+    def _parse_commit_timestamp(self, git_output: str) -> int | None:
         if self.usetimestamps:
             try:
                 stamp = int(git_output)
@@ -509,11 +531,7 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
             return stamp
         return None
 
-    @defer.inlineCallbacks
-    def _get_commit_files(self, rev: str) -> InlineCallbacksType[list[str]]:
-        args = ['--name-only', '--no-walk', r'--format=%n', '-m', '--first-parent', rev, '--']
-        git_output = yield self._dovccmd('log', args, path=self.workdir)
-
+    def _parse_commit_files(self, git_output: str) -> list[str]:
         def decode_file(file: str) -> str:
             # git use octal char sequences in quotes when non ASCII
             match = re.match('^"(.*)"$', file)
@@ -523,8 +541,13 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
                 )
             return bytes2unicode(file, encoding=self.encoding)
 
-        fileList = [decode_file(file) for file in [s for s in git_output.splitlines() if len(s)]]
-        return fileList
+        return [decode_file(file) for file in [s for s in git_output.splitlines() if len(s)]]
+
+    @defer.inlineCallbacks
+    def _get_commit_files(self, rev: str) -> InlineCallbacksType[list[str]]:
+        args = ['--name-only', '--no-walk', r'--format=%n', '-m', '--first-parent', rev, '--']
+        git_output = yield self._dovccmd('log', args, path=self.workdir)
+        return self._parse_commit_files(git_output)
 
     @defer.inlineCallbacks
     def _get_commit_author(self, rev: str) -> InlineCallbacksType[str]:
@@ -542,6 +565,51 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
             raise OSError('could not get commit committer for rev')
         return res
 
+    @async_to_deferred
+    async def _get_commits_info(self, revs: list[str]) -> dict[str, _CommitInfo]:
+        """
+        Extract the same details as the _get_commit_* methods for many commits at once, using a
+        single git invocation per batch of _COMMIT_INFO_BATCH_SIZE revisions.
+        """
+        infos: dict[str, _CommitInfo] = {}
+        for i in range(0, len(revs), self._COMMIT_INFO_BATCH_SIZE):
+            batch = revs[i : i + self._COMMIT_INFO_BATCH_SIZE]
+            args = [
+                '--name-only',
+                '--no-walk',
+                f'--format={_COMMIT_INFO_FORMAT}',
+                '-m',
+                '--first-parent',
+                *batch,
+                '--',
+            ]
+            git_output: str = await self._dovccmd('log', args, path=self.workdir)
+
+            fields = git_output.split('\0')
+            # the output starts with the separator of the first field
+            if (len(fields) - 1) % _COMMIT_INFO_FIELDS != 0:
+                raise OSError(f'could not parse commit details for revs {batch}')
+            for j in range(1, len(fields), _COMMIT_INFO_FIELDS):
+                rev, timestamp, author, committer, comments, files = fields[
+                    j : j + _COMMIT_INFO_FIELDS
+                ]
+                if not author.strip():
+                    raise OSError('could not get commit author for rev')
+                if not committer.strip():
+                    raise OSError('could not get commit committer for rev')
+                infos[rev] = _CommitInfo(
+                    timestamp=self._parse_commit_timestamp(timestamp.strip()),
+                    author=author.strip(),
+                    committer=committer.strip(),
+                    files=self._parse_commit_files(files),
+                    comments=comments.strip(),
+                )
+
+            missing = [rev for rev in batch if rev not in infos]
+            if missing:
+                raise OSError(f'could not get commit details for revs {missing}')
+        return infos
+
     def _get_commit_parent_hashes(self, rev: str) -> defer.Deferred[str]:
         args = ['--no-walk', r'--format=%P', rev, '--']
         d = self._dovccmd('log', args, path=self.workdir)
@@ -609,37 +677,23 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
             if last_commit is not None:
                 last_commit_id = last_commit['commitid']
 
-        for rev in revList:
-            dl: defer.Deferred[Any] = defer.DeferredList(
-                [
-                    self._get_commit_timestamp(rev),
-                    self._get_commit_author(rev),
-                    self._get_commit_committer(rev),
-                    self._get_commit_files(rev),
-                    self._get_commit_comments(rev),
-                ],
-                consumeErrors=True,
-            )
-
-            results = yield dl
-
-            # check for failures
-            failures = [r[1] for r in results if not r[0]]
-            if failures:
-                for failure in failures:
-                    log.err(failure, f"while processing changes for {rev} {branch}")
-                # just fail on the first error; they're probably all related!
-                failures[0].raiseException()
+        try:
+            commit_infos = yield self._get_commits_info(revList)
+        except Exception:
+            log.err(None, f"while processing changes for {revList} {branch}")
+            raise
 
-            timestamp, author, committer, files, comments = [r[1] for r in results]
+        commits = []
+        for rev in revList:
+            info = commit_infos[rev]
 
             yield self.master.data.updates.addChange(
-                author=author,
-                committer=committer,
+                author=info.author,
+                committer=info.committer,
                 revision=bytes2unicode(rev, encoding=self.encoding),
-                files=files,
-                comments=comments,
-                when_timestamp=timestamp,
+                files=info.files,
+                comments=info.comments,
+                when_timestamp=info.timestamp,
                 branch=bytes2unicode(self._removeHeads(branch)),
                 project=self.project,
                 repository=bytes2unicode(self.repourl, encoding=self.encoding),
@@ -648,15 +702,22 @@ class GitPoller(base.ReconfigurablePollingChangeSource, StateMixin, GitMixin):
             )
 
             if self._codebase_id is not None:
-                last_commit_id = yield self.master.data.updates.add_commit(
-                    codebaseid=self._codebase_id,
-                    author=author,
-                    committer=committer,
-                    comments=comments,
-                    when_timestamp=timestamp,
-                    revision=bytes2unicode(rev, encoding=self.encoding),
-                    parent_commitid=last_commit_id,
-                )
+                commits.append({
+                    'author': info.author,
+                    'committer': info.committer,
+                    'comments': info.comments,
+                    'when_timestamp': info.timestamp,
+                    'revision': bytes2unicode(rev, encoding=self.encoding),
+                })
+
+        if self._codebase_id is not None and commits:
+            # the commits form a linear history, insert them all in a single transaction
+            commit_ids = yield self.master.data.updates.add_commits(
+                codebaseid=self._codebase_id,
+                commits=commits,
+                parent_commitid=last_commit_id,
+            )
+            last_commit_id = commit_ids[-1]
 
         if self._codebase_id is not None and last_commit_id is not None:
             yield self.master.data.updates.update_branch(
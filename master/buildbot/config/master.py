@@ -201,6 +201,7 @@ class MasterConfig(util.ComparableMixin):
         self.collapseRequests = None
         self.codebaseGenerator = None
         self.prioritizeBuilders = None
+        self.builderDistributionConcurrency = 1
         self.select_next_worker = None
         self.multiMaster = False
         self.manhole = None
@@ -217,6 +218,7 @@ class MasterConfig(util.ComparableMixin):
         self.mq = {"type": 'simple'}
         self.metrics = None
         self.caches = {"Builds": 15, "Changes": 10}
+        self.cachesMaxBytes: int | None = None
         self.schedulers = {}
         self.secretsProviders = []
         self.builders = []
@@ -242,8 +244,10 @@ class MasterConfig(util.ComparableMixin):
         "buildbotNetUsageData",
         "buildbotURL",
         "buildCacheSize",
+        "builderDistributionConcurrency",
         "builders",
         "caches",
+        "cachesMaxBytes",
         "change_source",
         "codebaseGenerator",
         "codebases",
@@ -490,6 +494,12 @@ class MasterConfig(util.ComparableMixin):
         else:
             self.prioritizeBuilders = prioritizeBuilders
 
+        concurrency = config_dict.get('builderDistributionConcurrency', 1)
+        if not isinstance(concurrency, int) or concurrency < 1:
+            error("builderDistributionConcurrency must be a positive integer")
+        else:
+            self.builderDistributionConcurrency = concurrency
+
         select_next_worker = config_dict.get("select_next_worker")
         if select_next_worker is not None and not callable(select_next_worker):
             error("select_next_worker must be a callable")
@@ -606,13 +616,35 @@ class MasterConfig(util.ComparableMixin):
                 error("c['caches'] must be a dictionary")
             else:
                 for name, value in caches.items():
-                    if not isinstance(value, int):
+                    if isinstance(value, dict):
+                        unknown = set(value) - {'size', 'max_bytes', 'ttl'}
+                        if unknown:
+                            error(f"unknown keys {sorted(unknown)} for cache '{name}'")
+                            return
+                        size = value.get('size', 1)
+                        max_bytes = value.get('max_bytes', 1)
+                        ttl = value.get('ttl', 1)
+                    else:
+                        size = value
+                        max_bytes = ttl = 1
+                    if not isinstance(size, int) or not isinstance(max_bytes, int):
                         error(f"value for cache size '{name}' must be an integer")
                         return
-                    if value < 1:
-                        error(f"'{name}' cache size must be at least 1, got '{value}'")
+                    if size < 1:
+                        error(f"'{name}' cache size must be at least 1, got '{size}'")
+                    if max_bytes < 1:
+                        error(f"'{name}' cache max_bytes must be at least 1, got '{max_bytes}'")
+                    if not isinstance(ttl, (int, float)) or ttl <= 0:
+                        error(f"'{name}' cache ttl must be a positive number, got '{ttl}'")
                 self.caches.update(caches)
 
+        if 'cachesMaxBytes' in config_dict:
+            max_bytes = config_dict['cachesMaxBytes']
+            if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+                error("c['cachesMaxBytes'] must be a positive integer or None")
+            else:
+                self.cachesMaxBytes = max_bytes
+
         if 'buildCacheSize' in config_dict:
             if explicit:
                 msg = "cannot specify c['caches'] and c['buildCacheSize']"
@@ -21,9 +21,13 @@ from buildbot.config import BuilderConfig
 from buildbot.configurators import ConfiguratorBase
 from buildbot.process.buildstep import BuildStep
 from buildbot.process.factory import BuildFactory
+from buildbot.process.metrics import MetricCountEvent
+from buildbot.process.results import CANCELLED
 from buildbot.process.results import SUCCESS
+from buildbot.process.results import WARNINGS
 from buildbot.schedulers.forcesched import ForceScheduler
 from buildbot.schedulers.timed import Nightly
+from buildbot.util import asyncSleep
 from buildbot.util import datetime2epoch
 from buildbot.worker.local import LocalWorker
 
@@ -36,18 +40,75 @@ def now():
 
 
 class LogChunksJanitor(BuildStep):
+    """
+    Deletes the chunks of the logs older than logHorizon, by batches of at most batch_size chunks
+    so that the database is not locked for long.  The step waits batch_pause seconds between the
+    batches and stops with WARNINGS after time_budget (if not None): the next run continues where
+    it stopped.
+    """
+
     name = 'LogChunksJanitor'
     renderables = ["logHorizon"]
 
-    def __init__(self, logHorizon):
+    # logs marked as deleted at once
+    LOGS_BATCH_SIZE = 1000
+
+    def __init__(self, logHorizon, batch_size=10000, batch_pause=0.1, time_budget=None):
         super().__init__()
         self.logHorizon = logHorizon
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.time_budget = time_budget
+        self.deleted = 0
+
+    def getCurrentSummary(self):
+        return {'step': f"deleting logchunks ({self.deleted} deleted)"}
 
     @defer.inlineCallbacks
     def run(self):
+        reactor = self.master.reactor
+        logs = self.master.db.logs
+        deadline = None
+        if self.time_budget is not None:
+            deadline = reactor.seconds() + self.time_budget.total_seconds()
+
         older_than_timestamp = datetime2epoch(now() - self.logHorizon)
-        deleted = yield self.master.db.logs.deleteOldLogChunks(older_than_timestamp)
-        self.descriptionDone = ["deleted", str(deleted), "logchunks"]
+
+        # mark the logs as deleted first to avoid having UI discrepancy
+        marking = True
+        # the batches continue from the last log of the previous one
+        logid = 0
+        while True:
+            if self.stopped or (deadline is not None and reactor.seconds() >= deadline):
+                self.descriptionDone = [
+                    "deleted",
+                    str(self.deleted),
+                    "logchunks,",
+                    "to be continued",
+                ]
+                return CANCELLED if self.stopped else WARNINGS
+
+            if marking:
+                marked, logid = yield logs.markOldLogsDeleted(
+                    older_than_timestamp, self.LOGS_BATCH_SIZE, logid
+                )
+                if not marked:
+                    marking = False
+                    logid = 0
+                    continue
+                MetricCountEvent.log('janitor.logs_marked_deleted', marked)
+            else:
+                deleted, logid = yield logs.deleteDeletedLogChunks(self.batch_size, logid)
+                if not deleted:
+                    break
+                self.deleted += deleted
+                MetricCountEvent.log('janitor.logchunks_deleted', deleted)
+                self.updateSummary()
+
+            if self.batch_pause:
+                yield asyncSleep(self.batch_pause, reactor=reactor)
+
+        self.descriptionDone = ["deleted", str(self.deleted), "logchunks"]
         return SUCCESS
 
 
@@ -70,9 +131,21 @@ class BuildDataJanitor(BuildStep):
 class JanitorConfigurator(ConfiguratorBase):
     """Janitor is a configurator which create a Janitor Builder with all needed Janitor steps"""
 
-    def __init__(self, logHorizon=None, hour=0, build_data_horizon=None, **kwargs):
+    def __init__(
+        self,
+        logHorizon=None,
+        hour=0,
+        build_data_horizon=None,
+        log_chunks_batch_size=10000,
+        log_chunks_batch_pause=0.1,
+        log_chunks_time_budget=None,
+        **kwargs,
+    ):
         super().__init__()
         self.logHorizon = logHorizon
+        self.log_chunks_batch_size = log_chunks_batch_size
+        self.log_chunks_batch_pause = log_chunks_batch_pause
+        self.log_chunks_time_budget = log_chunks_time_budget
         self.build_data_horizon = build_data_horizon
         self.hour = hour
         self.kwargs = kwargs
@@ -80,7 +153,14 @@ class JanitorConfigurator(ConfiguratorBase):
     def configure(self, config_dict):
         steps = []
         if self.logHorizon is not None:
-            steps.append(LogChunksJanitor(logHorizon=self.logHorizon))
+            steps.append(
+                LogChunksJanitor(
+                    logHorizon=self.logHorizon,
+                    batch_size=self.log_chunks_batch_size,
+                    batch_pause=self.log_chunks_batch_pause,
+                    time_budget=self.log_chunks_time_budget,
+                )
+            )
         if self.build_data_horizon is not None:
             steps.append(BuildDataJanitor(build_data_horizon=self.build_data_horizon))
 
@@ -55,6 +55,9 @@ class ResourceType:
     endpoints: list[type[Endpoint]] = []
     eventPathPatterns: list[str] | str = []
     entityType: types.Type | None = None
+    # set when every change of the resources produces an event, so that the events can version
+    # them (see getVersionEventFilters)
+    versionedByEvents = False
 
     def __init__(self, master: BuildMaster):
         self.master = master
@@ -106,6 +109,21 @@ class ResourceType:
         msg = copy.deepcopy(msg)
         return msg
 
+    def getVersionEventFilters(self):
+        """
+        Return the mq filters matching the events produced when resources of this type change,
+        which are counted to version them (see DataConnector.getResourceVersion). Resource types
+        with changes not producing any event, which do not set versionedByEvents, can not be
+        versioned.
+        """
+        if not self.versionedByEvents:
+            return []
+        # an event is seen once for each of its eventPaths, which still changes the version
+        return [
+            (*(None if p.startswith('{') else p for p in path.split('/')), None)
+            for path in self.eventPaths
+        ]
+
     def produceEvent(self, msg, event):
         if msg is not None:
             msg = self.sanitizeMessage(msg)
@@ -148,6 +166,16 @@ class Endpoint:
         """
         raise NotImplementedError
 
+    def getVersionResourceTypes(self, resultSpec: ResultSpec, kwargs: dict[str, Any]):
+        """
+        Return the names of the resource types whose changes may change the result of get() for
+        these arguments, or None if the result can not be versioned. This is used to tag REST
+        responses for conditional requests.
+        """
+        if self.rtype.getVersionEventFilters():
+            return [self.rtype.name]
+        return None
+
     def control(self, action, args, kwargs):
         # we convert the action into a mixedCase method name
         action_method = getattr(self, "action" + action.capitalize(), None)
@@ -138,6 +138,7 @@ class BuildRequestEndpoint(base.Endpoint):
         yield self.master.db.buildrequests.set_build_requests_priority(
             brids=[brid], priority=priority
         )
+        yield self.rtype.generateEvent([brid], 'update')
 
     @defer.inlineCallbacks
     def control(self, action, args, kwargs):
@@ -202,6 +203,7 @@ class BuildRequest(base.ResourceType):
         "/buildrequests/:buildrequestid",
         "/builders/:builderid/buildrequests/:buildrequestid",
     ]
+    versionedByEvents = True
 
     class EntityType(types.Entity):
         buildrequestid = types.Integer()
@@ -81,6 +81,13 @@ def _generate_filtered_properties(props, filters):
     return None
 
 
+def _add_properties_version(rtypes, resultSpec):
+    # properties are updated without build events
+    if rtypes is not None and resultSpec.properties:
+        rtypes = [*rtypes, 'property']
+    return rtypes
+
+
 class BuildEndpoint(base.BuildNestingMixin, base.Endpoint):
     kind = base.EndpointKind.SINGLE
     pathPatterns = [
@@ -89,6 +96,10 @@ class BuildEndpoint(base.BuildNestingMixin, base.Endpoint):
         "/builders/s:buildername/builds/n:build_number",
     ]
 
+    def getVersionResourceTypes(self, resultSpec, kwargs):
+        rtypes = super().getVersionResourceTypes(resultSpec, kwargs)
+        return _add_properties_version(rtypes, resultSpec)
+
     @defer.inlineCallbacks
     def get(self, resultSpec, kwargs):
         if 'buildid' in kwargs:
@@ -162,6 +173,10 @@ class BuildsEndpoint(base.BuildNestingMixin, base.Endpoint):
     ]
     rootLinkName = 'builds'
 
+    def getVersionResourceTypes(self, resultSpec, kwargs):
+        rtypes = super().getVersionResourceTypes(resultSpec, kwargs)
+        return _add_properties_version(rtypes, resultSpec)
+
     @defer.inlineCallbacks
     def get(self, resultSpec, kwargs):
         changeid = kwargs.get('changeid')
@@ -189,12 +204,16 @@ class BuildsEndpoint(base.BuildNestingMixin, base.Endpoint):
         # returns properties' list
         filters = resultSpec.popProperties()
 
+        # Avoid to request DB for Build's properties if not specified
+        builds_props = {}
+        if filters and builds:
+            builds_props = yield self.master.db.builds.get_builds_properties([b.id for b in builds])
+
         buildscol = []
         for b in builds:
             data = _db2data(b)
-            # Avoid to request DB for Build's properties if not specified
             if filters:
-                props = yield self.master.db.builds.getBuildProperties(data["buildid"])
+                props = builds_props.get(data["buildid"], {})
                 filtered_properties = _generate_filtered_properties(props, filters)
                 if filtered_properties:
                     data["properties"] = filtered_properties
@@ -212,6 +231,7 @@ class Build(base.ResourceType):
         "/builds/:buildid",
         "/workers/:workerid/builds/:buildid",
     ]
+    versionedByEvents = True
 
     class EntityType(types.Entity):
         buildid = types.Integer()
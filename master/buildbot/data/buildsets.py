@@ -142,6 +142,7 @@ class Buildset(base.ResourceType):
     eventPathPatterns = [
         "/buildsets/:bsid",
     ]
+    versionedByEvents = True
 
     class EntityType(types.Entity):
         bsid = types.Integer()
@@ -148,6 +148,24 @@ class CodebaseCommit(base.ResourceType):
         await self.generate_event(commitid, 'new')
         return commitid
 
+    @base.updateMethod
+    @async_to_deferred
+    async def add_commits(
+        self,
+        *,
+        codebaseid: int,
+        commits: list[dict[str, Any]],
+        parent_commitid: int | None = None,
+    ) -> list[int]:
+        commitids = await self.master.db.codebase_commits.add_commits(
+            codebaseid=codebaseid,
+            commits=commits,
+            parent_commitid=parent_commitid,
+        )
+        for commitid in commitids:
+            await self.generate_event(commitid, 'new')
+        return commitids
+
 
 class CodebaseCommitsGraphEndpoint(base.Endpoint):
     kind = base.EndpointKind.SINGLE
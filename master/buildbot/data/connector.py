@@ -15,8 +15,10 @@
 
 import functools
 import inspect
+import uuid
 
 from twisted.internet import defer
+from twisted.python import log
 from twisted.python import reflect
 
 from buildbot.data import base
@@ -69,6 +71,10 @@ class DataConnector(service.AsyncService):
     def __init__(self):
         self.matcher = pathmatch.Matcher()
         self.rootLinks = []  # links from the root of the API
+        # resource type name -> number of events seen for its resources, see getResourceVersion
+        self._resource_versions: dict[str, int] = {}
+        self._resource_versions_epoch = None
+        self._version_consumers = None
 
     @defer.inlineCallbacks
     def setServiceParent(self, parent):
@@ -109,6 +115,50 @@ class DataConnector(service.AsyncService):
                     if rootLinkName:
                         self.rootLinks.append({'name': rootLinkName})
 
+    def stopService(self):
+        if self._version_consumers is not None:
+            for qref in self._version_consumers:
+                qref.stopConsuming()
+        self._version_consumers = None
+        self._resource_versions = {}
+        return super().stopService()
+
+    def _startResourceVersionsTracking(self):
+        # versions are counted from zero each time, tell them apart from the previous ones
+        self._resource_versions_epoch = uuid.uuid4().hex[:8]
+        self._version_consumers = []
+        for rtype in vars(self.rtypes).values():
+            filters = rtype.getVersionEventFilters()
+            if not filters:
+                continue
+            self._resource_versions[rtype.name] = 0
+            for event_filter in filters:
+                d = self.master.mq.startConsuming(
+                    functools.partial(self._resourceChanged, rtype.name), event_filter
+                )
+                d.addCallback(self._version_consumers.append)
+                d.addErrback(log.err, f'while tracking versions of {rtype.name}')
+
+    def _resourceChanged(self, name, key, msg):
+        if name in self._resource_versions:
+            self._resource_versions[name] += 1
+
+    def getResourceVersion(self, name):
+        """
+        Return a string which changes every time an event is produced for resources of the
+        given type, or None if the events of this type are not tracked.
+
+        Events are tracked from the first call while the service is running.
+        """
+        if not self.running:
+            return None
+        if self._version_consumers is None:
+            self._startResourceVersionsTracking()
+        version = self._resource_versions.get(name)
+        if version is None:
+            return None
+        return f"{self._resource_versions_epoch}.{version}"
+
     def _setup(self):
         self.updates = Updates()
         self.rtypes = RTypes()
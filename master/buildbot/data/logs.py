@@ -20,6 +20,7 @@ from typing import TYPE_CHECKING
 from twisted.internet import defer
 
 from buildbot.data import base
+from buildbot.data import exceptions
 from buildbot.data import types
 from buildbot.db.logs import LogSlugExistsError
 from buildbot.util import identifiers
@@ -74,6 +75,7 @@ class LogEndpoint(EndpointMixin, base.BuildNestingMixin, base.Endpoint):
 class LogsEndpoint(EndpointMixin, base.BuildNestingMixin, base.Endpoint):
     kind = base.EndpointKind.COLLECTION
     pathPatterns = [
+        "/logs",
         "/steps/n:stepid/logs",
         "/builds/n:buildid/steps/i:step_name/logs",
         "/builds/n:buildid/steps/n:step_number/logs",
@@ -85,6 +87,17 @@ class LogsEndpoint(EndpointMixin, base.BuildNestingMixin, base.Endpoint):
 
     @defer.inlineCallbacks
     def get(self, resultSpec, kwargs):
+        if not kwargs:
+            # the root collection only lists the logs of the steps given by
+            # a stepid filter, fetching them all in a single query
+            stepids = resultSpec.popFilter('stepid', 'eq') if resultSpec else None
+            if not stepids:
+                raise exceptions.InvalidQueryParameter("/logs needs a stepid filter")
+            logs = yield self.master.db.logs.get_logs_for_steps([int(s) for s in stepids])
+            results = []
+            for dbdict in logs:
+                results.append((yield self.db2data(dbdict)))
+            return results
         retriever = base.NestedBuildDataRetriever(self.master, kwargs)
         step_dict = yield retriever.get_step_dict()
         if step_dict is None:
@@ -111,6 +111,10 @@ class Properties(base.ResourceType):
     endpoints = [BuildsetPropertiesEndpoint, BuildPropertiesEndpoint]
 
     entityType = types.SourcedProperties()
+    versionedByEvents = True
+
+    def getVersionEventFilters(self):
+        return [('builds', None, 'properties', 'update')]
 
     def generateUpdateEvent(self, buildid, newprops):
         # This event cannot use the produceEvent mechanism, as the properties resource type is a bit
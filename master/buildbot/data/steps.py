@@ -20,6 +20,7 @@ from typing import TYPE_CHECKING
 from twisted.internet import defer
 
 from buildbot.data import base
+from buildbot.data import exceptions
 from buildbot.data import types
 
 if TYPE_CHECKING:
@@ -73,6 +74,7 @@ class StepEndpoint(base.BuildNestingMixin, base.Endpoint):
 class StepsEndpoint(base.BuildNestingMixin, base.Endpoint):
     kind = base.EndpointKind.COLLECTION
     pathPatterns = [
+        "/steps",
         "/builds/n:buildid/steps",
         "/builders/n:builderid/builds/n:build_number/steps",
         "/builders/s:buildername/builds/n:build_number/steps",
@@ -80,6 +82,14 @@ class StepsEndpoint(base.BuildNestingMixin, base.Endpoint):
 
     @defer.inlineCallbacks
     def get(self, resultSpec, kwargs):
+        if not kwargs:
+            # the root collection only lists the steps of the builds given by
+            # a buildid filter, fetching them all in a single query
+            buildids = resultSpec.popFilter('buildid', 'eq') if resultSpec else None
+            if not buildids:
+                raise exceptions.InvalidQueryParameter("/steps needs a buildid filter")
+            steps = yield self.master.db.steps.get_steps_for_builds([int(b) for b in buildids])
+            return [_db2data(model) for model in steps]
         if 'buildid' in kwargs:
             buildid = kwargs['buildid']
         else:
@@ -103,6 +113,7 @@ class Step(base.ResourceType):
         "/builds/:buildid/steps/:stepid",
         "/steps/:stepid",
     ]
+    versionedByEvents = True
 
     class EntityType(types.Entity):
         stepid = types.Integer()
@@ -97,6 +97,10 @@ class TestResultSetsFromCommitRangeEndpoint(base.Endpoint):
         "/codebases/n:codebaseid/commit_range/n:commitid1/n:commitid2/test_result_sets",
     ]
 
+    def getVersionResourceTypes(self, resultSpec, kwargs):
+        # the codebase commits produce no event
+        return None
+
     @async_to_deferred
     async def get(self, result_spec, kwargs) -> list[dict[str, Any]]:
         commit_from = int(kwargs.get('commitid1'))
@@ -138,6 +142,7 @@ class TestResultSet(base.ResourceType):
     eventPathPatterns = [
         "/test_result_sets/:test_result_setid",
     ]
+    versionedByEvents = True
 
     class EntityType(types.Entity):
         test_result_setid = types.Integer()
@@ -316,6 +316,23 @@ class BuildsConnectorComponent(base.DBConnectorComponent):
 
         return self.db.pool.do(thd)
 
+    def get_builds_properties(self, buildids: list[int]) -> defer.Deferred[dict[int, dict]]:
+        def thd(conn) -> dict[int, dict]:
+            bp_tbl = self.db.model.build_properties
+            props: dict[int, dict] = {buildid: {} for buildid in buildids}
+            for batch in self.doBatch(sorted(props), 100):
+                q = sa.select(
+                    bp_tbl.c.buildid,
+                    bp_tbl.c.name,
+                    bp_tbl.c.value,
+                    bp_tbl.c.source,
+                ).where(bp_tbl.c.buildid.in_(batch))
+                for row in conn.execute(q):
+                    props[row.buildid][row.name] = (json.loads(row.value), row.source)
+            return props
+
+        return self.db.pool.do(thd)
+
     @defer.inlineCallbacks
     def setBuildProperty(self, bid, name, value, source):
         """A kind of create_or_update, that's between one or two queries per
@@ -311,6 +311,25 @@ class ChangesConnectorComponent(base.DBConnectorComponent):
 
         return self.db.pool.do(thd)
 
+    def getSourceStampIdsWithChanges(
+        self, sourcestampids: Iterable[int]
+    ) -> defer.Deferred[set[int]]:
+        """Returns the subset of the given sourcestamp ids which are associated with changes"""
+
+        def thd(conn) -> set[int]:
+            changes_tbl = self.db.model.changes
+            found: set[int] = set()
+            for batch in self.doBatch(sourcestampids):
+                q = (
+                    sa.select(changes_tbl.c.sourcestampid)
+                    .where(changes_tbl.c.sourcestampid.in_(batch))
+                    .distinct()
+                )
+                found.update(row.sourcestampid for row in conn.execute(q))
+            return found
+
+        return self.db.pool.do(thd)
+
     def getChangeUids(self, changeid: int) -> defer.Deferred[list[int]]:
         assert changeid >= 0
 
@@ -276,3 +276,46 @@ class CodebaseCommitsConnectorComponent(base.DBConnectorComponent):
             return got_id
 
         return await self.db.pool.do_with_transaction(thd)
+
+    @async_to_deferred
+    async def add_commits(
+        self,
+        *,
+        codebaseid: int,
+        commits: list[dict[str, Any]],
+        parent_commitid: int | None = None,
+    ) -> list[int]:
+        """
+        Adds a linear sequence of commits in a single transaction. Each element of commits
+        holds the author, committer, comments, when_timestamp and revision keys as accepted
+        by add_commit. The parent of the first commit is parent_commitid and the parent of
+        each following one is the commit preceding it. Returns the ids of the new commits.
+        """
+        for commit in commits:
+            self.checkLength(self.db.model.codebase_commits.c.author, commit['author'])
+            self.checkLength(self.db.model.codebase_commits.c.committer, commit.get('committer'))
+            self.checkLength(self.db.model.codebase_commits.c.revision, commit['revision'])
+
+        def thd(conn: sa.engine.Connection) -> list[int]:
+            q = self.db.model.codebase_commits.insert()
+            ids: list[int] = []
+            parentid = parent_commitid
+            for commit in commits:
+                r = conn.execute(
+                    q.values(
+                        codebaseid=codebaseid,
+                        author=commit['author'],
+                        committer=commit.get('committer'),
+                        comments=commit['comments'],
+                        when_timestamp=commit['when_timestamp'],
+                        revision=commit['revision'],
+                        parent_commitid=parentid,
+                    )
+                )
+                parentid = r.inserted_primary_key[0]
+                r.close()
+                ids.append(parentid)
+            conn.commit()
+            return ids
+
+        return await self.db.pool.do_with_transaction(thd)
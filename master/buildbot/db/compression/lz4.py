@@ -17,9 +17,11 @@ from __future__ import annotations
 
 from buildbot.db.compression.protocol import CompressObjInterface
 from buildbot.db.compression.protocol import CompressorInterface
+from buildbot.db.compression.protocol import DecompressObjInterface
 
 try:
     import lz4.block
+    import lz4.frame
 
     HAS_LZ4 = True
 except ImportError:
@@ -52,3 +54,12 @@ class LZ4Compressor(CompressorInterface):
             compressed_buffer = LZ4Compressor.dumps(b''.join(self._buffer))
             self._buffer = []
             return compressed_buffer
+
+    # LZ4.block can not be decompressed incrementally,
+    # streams (e.g. directory uploads) use the LZ4 frame format instead
+    class DecompressObj(DecompressObjInterface):
+        def __init__(self) -> None:
+            self._decompressor = lz4.frame.LZ4FrameDecompressor()
+
+        def decompress(self, data: bytes) -> bytes:
+            return self._decompressor.decompress(data)
@@ -36,6 +36,15 @@ class CompressObjInterface(Protocol):
         raise NotImplementedError
 
 
+class DecompressObjInterface(Protocol):
+    def __init__(self) -> None:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
 class CompressorInterface(Protocol):
     name: ClassVar[str]
     available: ClassVar[bool] = True
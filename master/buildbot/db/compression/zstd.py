@@ -24,6 +24,7 @@ from typing import TypeVar
 
 from buildbot.db.compression.protocol import CompressObjInterface
 from buildbot.db.compression.protocol import CompressorInterface
+from buildbot.db.compression.protocol import DecompressObjInterface
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -152,3 +153,12 @@ class ZStdCompressor(CompressorInterface):
                 compressor = self._compressor
                 self._compressor = None
                 ZStdCompressor._compressor_pool.release(compressor)
+
+    class DecompressObj(DecompressObjInterface):
+        def __init__(self) -> None:
+            # a decompression object is not re-usable and holds a reference
+            # to its decompressor, so do not take one from the pool
+            self._decompressobj = zstandard.ZstdDecompressor().decompressobj()
+
+        def decompress(self, data: bytes) -> bytes:
+            return self._decompressobj.decompress(data)
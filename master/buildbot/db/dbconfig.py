@@ -43,7 +43,7 @@ class FakeDBConnector:
 
 
 class FakeCacheManager:
-    def get_cache(self, cache_name, miss_fn):
+    def get_cache(self, cache_name, miss_fn, size_fn=None, default_size=1):
         return None
 
 
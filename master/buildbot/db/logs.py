@@ -17,8 +17,11 @@ from __future__ import annotations
 
 import dataclasses
 import io
+import itertools
 import os
 import threading
+from collections import OrderedDict
+from collections import deque
 from functools import partial
 from typing import TYPE_CHECKING
 
@@ -53,6 +56,8 @@ if TYPE_CHECKING:
     from twisted.internet.interfaces import IReactorThreads
     from typing_extensions import ParamSpec
 
+    from buildbot.util.twisted import InlineCallbacksType
+
     _T = TypeVar('_T')
     _P = ParamSpec('_P')
 
@@ -114,6 +119,179 @@ class RawCompressor(CompressorInterface):
             return b''
 
 
+class LogTailCache:
+    """
+    A cache of the last lines appended to the logs written by this master, so that the live views
+    of these logs do not fetch and decompress the same chunks again and again.  It holds the tails
+    of at most max_size logs, evicting the least recently used, and at most MAX_TAIL_SIZE
+    characters per log.
+    """
+
+    MAX_TAIL_SIZE = 256 * 1024
+
+    def __init__(self, max_size: int = 1) -> None:
+        self.max_size = max_size
+        self.hits = self.refhits = self.misses = 0
+        # logid -> [first_line, lines, size]
+        self._tails: OrderedDict[int, list] = OrderedDict()
+
+    def set_max_size(self, max_size: int) -> None:
+        self.max_size = max_size
+        while len(self._tails) > self.max_size:
+            self._tails.popitem(last=False)
+
+    def append(self, logid: int, first_line: int, lines: list[str]) -> None:
+        tail = self._tails.get(logid)
+        if tail is None or tail[0] + len(tail[1]) != first_line:
+            # new log, or lines were appended without us: start over
+            tail = self._tails[logid] = [first_line, deque(), 0]
+        self._tails.move_to_end(logid)
+
+        tail_lines = tail[1]
+        tail_lines.extend(lines)
+        tail[2] += sum(len(line) for line in lines)
+        while tail[2] > self.MAX_TAIL_SIZE and len(tail_lines) > 1:
+            tail[2] -= len(tail_lines.popleft())
+            tail[0] += 1
+
+        self.set_max_size(self.max_size)
+
+    def evict(self, logid: int) -> None:
+        self._tails.pop(logid, None)
+
+    def get_lines(self, logid: int, first_line: int, last_line: int | None) -> list[str] | None:
+        """
+        Returns the lines first_line to last_line (or to the end of the log if None), or None if
+        they are not all in the cache.
+        """
+        tail = self._tails.get(logid)
+        if tail is None or first_line < tail[0]:
+            self.misses += 1
+            return None
+
+        tail_first_line, tail_lines, _ = tail
+        end = len(tail_lines)
+        if last_line is not None:
+            if last_line >= tail_first_line + end:
+                self.misses += 1
+                return None
+            end = last_line - tail_first_line + 1
+
+        self.hits += 1
+        self._tails.move_to_end(logid)
+        return list(itertools.islice(tail_lines, first_line - tail_first_line, end))
+
+
+@dataclasses.dataclass
+class _PendingAppend:
+    logid: int
+    # rows of the logchunks table
+    chunks: list[dict]
+    num_lines: int
+    d: defer.Deferred[None]
+
+
+class _LogChunksWriter:
+    """
+    Write-behind of the chunks appended to the logs.  The appends queued while a write is
+    running (from any number of logs) are written together by the next one, in a single
+    transaction: one multi-row insert of the chunks and one bulk update of logs.num_lines.
+    The Deferred returned by write() fires once the chunks are committed.
+    """
+
+    def __init__(self, db: base.DBConnector) -> None:
+        self.db = db
+        self._pending: list[_PendingAppend] = []
+        self._running = False
+        # logid -> Deferred of the last write queued for this log
+        self._last_writes: dict[int, defer.Deferred[None]] = {}
+        self._idle_waiters: list[defer.Deferred[None]] = []
+
+    def write(self, logid: int, chunks: list[dict], num_lines: int) -> defer.Deferred[None]:
+        d: defer.Deferred[None] = defer.Deferred()
+        self._pending.append(_PendingAppend(logid, chunks, num_lines, d))
+        self._last_writes[logid] = d
+
+        @d.addBoth
+        def _forget(res):
+            if self._last_writes.get(logid) is d:
+                del self._last_writes[logid]
+            return res
+
+        if not self._running:
+            self._write_pending()
+        return d
+
+    def wait_written(self, logid: int) -> defer.Deferred[None]:
+        """Waits until the appends queued for a log are written, whatever their outcome"""
+        last_write = self._last_writes.get(logid)
+        if last_write is None:
+            return defer.succeed(None)
+        d: defer.Deferred[None] = defer.Deferred()
+
+        @last_write.addBoth
+        def _notify(res):
+            d.callback(None)
+            return res
+
+        return d
+
+    def wait_idle(self) -> defer.Deferred[None]:
+        if not self._running:
+            return defer.succeed(None)
+        d: defer.Deferred[None] = defer.Deferred()
+        self._idle_waiters.append(d)
+        return d
+
+    @defer.inlineCallbacks
+    def _write_pending(self) -> InlineCallbacksType[None]:
+        self._running = True
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                yield self._write_batch(batch)
+        finally:
+            self._running = False
+            waiters, self._idle_waiters = self._idle_waiters, []
+            for d in waiters:
+                d.callback(None)
+
+    @defer.inlineCallbacks
+    def _write_batch(self, batch: list[_PendingAppend]) -> InlineCallbacksType[None]:
+        try:
+            yield self.db.pool.do_with_transaction(self._thd_write, batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # do not fail the appends of all the logs for one of them:
+                # write them one by one to find out which ones fail
+                for append in batch:
+                    yield self._write_batch([append])
+                return
+            batch[0].d.errback(e)
+            return
+
+        for append in batch:
+            append.d.callback(None)
+
+    def _thd_write(self, conn: SAConnection, batch: list[_PendingAppend]) -> None:
+        logs_tbl = self.db.model.logs
+        chunks = [chunk for append in batch for chunk in append.chunks]
+        if chunks:
+            conn.execute(self.db.model.logchunks.insert(), chunks).close()
+
+        # the appends of the batch come in order, so the last value for a log is the right one
+        num_lines = {append.logid: append.num_lines for append in batch}
+        q = (
+            logs_tbl.update()
+            .where(logs_tbl.c.id == sa.bindparam('_logid'))
+            .values(num_lines=sa.bindparam('_num_lines'))
+        )
+        conn.execute(
+            q,
+            [{"_logid": logid, "_num_lines": n} for logid, n in num_lines.items()],
+        ).close()
+
+
 class LogsConnectorComponent(base.DBConnectorComponent):
     # Postgres and MySQL will both allow bigger sizes than this.  The limit
     # for MySQL appears to be max_packet_size (default 1M).
@@ -121,6 +299,13 @@ class LogsConnectorComponent(base.DBConnectorComponent):
     MAX_CHUNK_SIZE = 65536  # a chunk may not be bigger than this
     MAX_CHUNK_LINES = 1000  # a chunk may not have more lines than this
 
+    # default number of logs kept in the 'LogTails' cache
+    TAIL_CACHE_SIZE = 20
+
+    # default size of the batches of deleteOldLogChunks
+    DELETE_LOGS_BATCH_SIZE = 1000
+    DELETE_CHUNKS_BATCH_SIZE = 10000
+
     NO_COMPRESSION_ID = 0
     COMPRESSION_BYID: dict[int, type[CompressorInterface]] = {
         NO_COMPRESSION_ID: RawCompressor,
@@ -145,20 +330,40 @@ class LogsConnectorComponent(base.DBConnectorComponent):
             # the master on other processes
             max_threads = max(int(cpu_count / 2), max_threads)
 
+        # number of logs compressed in parallel by default
+        self.compression_jobs = max_threads
         self._compression_pool = util.twisted.ThreadPool(
             minthreads=1,
             maxthreads=max_threads,
             name='DBLogCompression',
         )
 
+        self._tail_cache = LogTailCache()
+
+        self._chunks_writer = _LogChunksWriter(connector)
+        # logid -> num_lines of the logs being appended by this master
+        self._num_lines: dict[int, int] = {}
+
     @defer.inlineCallbacks
     def startService(self):
         yield super().startService()
-        self._compression_pool.start()
+        self.master.caches.register_cache('LogTails', self._tail_cache, self.TAIL_CACHE_SIZE)
+        self.start_compression_pool()
 
     @defer.inlineCallbacks
     def stopService(self):
+        yield self._chunks_writer.wait_idle()
         yield super().stopService()
+        self.stop_compression_pool()
+
+    def start_compression_pool(self) -> None:
+        """
+        Starts the threads compressing the logs, for the scripts using the connector without
+        starting it as a service.
+        """
+        self._compression_pool.start()
+
+    def stop_compression_pool(self) -> None:
         self._compression_pool.stop()
 
     def _defer_to_compression_pool(
@@ -219,12 +424,32 @@ class LogsConnectorComponent(base.DBConnectorComponent):
 
         return self.db.pool.do(thdGetLogs)
 
+    def get_logs_for_steps(self, stepids: list[int]) -> defer.Deferred[list[LogModel]]:
+        def thd(conn) -> list[LogModel]:
+            tbl = self.db.model.logs
+            logs: list[LogModel] = []
+            for batch in self.doBatch(sorted(set(stepids)), 100):
+                q = tbl.select()
+                q = q.where(tbl.c.stepid.in_(batch))
+                res = conn.execute(q).mappings()
+                logs.extend(self._model_from_row(row) for row in res.fetchall())
+            logs.sort(key=lambda log: log.id)
+            return logs
+
+        return self.db.pool.do(thd)
+
     async def iter_log_lines(
         self,
         logid: int,
         first_line: int = 0,
         last_line: int | None = None,
     ) -> AsyncGenerator[str, None]:
+        cached_lines = self._tail_cache.get_lines(logid, first_line, last_line)
+        if cached_lines is not None:
+            for line in cached_lines:
+                yield line
+            return
+
         def _thd_get_chunks(
             conn: SAConnection,
             first_line: int,
@@ -270,29 +495,15 @@ class LogsConnectorComponent(base.DBConnectorComponent):
             # Retrieve associated "reader" and extract the data
             # Note that row.content is stored as bytes, and our caller expects unicode
             data = self._get_compressor(compressed).read(content)
-            # NOTE: we need a streaming decompression interface
-            with (
-                io.BytesIO(data) as data_buffer,
-                io.TextIOWrapper(
-                    data_buffer,
-                    encoding='utf-8',
-                ) as reader,
-            ):
-                # last line-ending is stripped from chunk on insert
-                # add it back here to simplify handling after
-                data_buffer.seek(0, os.SEEK_END)
-                data_buffer.write(b'\n')
-                data_buffer.seek(0, os.SEEK_SET)
-
-                line_idx = chunk_first_line
 
+            line_idx = chunk_first_line
+            for line in _iter_chunk_lines(data):
+                if last_line is not None and line_idx > last_line:
+                    break
                 # need to skip some lines
-                while line_idx < first_line and reader.readline():
-                    line_idx += 1
-
-                while (last_line is None or line_idx <= last_line) and (line := reader.readline()):
+                if line_idx >= first_line:
                     yield line
-                    line_idx += 1
+                line_idx += 1
 
         async for chunk_first_line, _, compressed, content in _iter_chunks_batched():
             async for line in _async_iter_on_pool(
@@ -361,40 +572,11 @@ class LogsConnectorComponent(base.DBConnectorComponent):
             res.close()
             return num_lines[0] if num_lines else None
 
-        def _thd_insert_chunk(
-            conn: SAConnection,
-            first_line: int,
-            last_line: int,
-            content: bytes,
-            compressed_id: int,
-        ) -> None:
-            res = conn.execute(
-                self.db.model.logchunks.insert(),
-                {
-                    "logid": logid,
-                    "first_line": first_line,
-                    "last_line": last_line,
-                    "content": content,
-                    "compressed": compressed_id,
-                },
-            )
-            conn.commit()
-            res.close()
-
-        def _thd_update_num_lines(conn: SAConnection, num_lines: int) -> None:
-            res = conn.execute(
-                self.db.model.logs.update()
-                .where(self.db.model.logs.c.id == logid)
-                .values(num_lines=num_lines)
-            )
-            conn.commit()
-            res.close()
-
         def _thd_compress_chunk(
             compress_obj: CompressObjInterface,
             compressor_id: int,
             lines: list[bytes],
-        ) -> tuple[bytes, int, int]:
+        ) -> tuple[bytes, int, int, list[str]]:
             # check for trailing newline and strip it for storage
             # chunks omit the trailing newline
             assert lines and lines[-1][-1:] == b'\n'
@@ -408,15 +590,19 @@ class LogsConnectorComponent(base.DBConnectorComponent):
             compressed_bytes.append(compress_obj.flush())
             compressed_chunk = b''.join(compressed_bytes)
 
+            # the lines as they will be read back, for the tail cache
+            uncompressed_chunk = b''.join(lines)
+            text_lines = list(_iter_chunk_lines(uncompressed_chunk))
+
             # Is it useful to compress the chunk?
             if uncompressed_size <= len(compressed_chunk):
-                return b''.join(lines), self.NO_COMPRESSION_ID, len(lines)
+                return uncompressed_chunk, self.NO_COMPRESSION_ID, len(lines), text_lines
 
-            return compressed_chunk, compressor_id, len(lines)
+            return compressed_chunk, compressor_id, len(lines), text_lines
 
         def _thd_iter_chunk_compress(
             content: str,
-        ) -> Generator[tuple[bytes, int, int], None]:
+        ) -> Generator[tuple[bytes, int, int, list[str]], None]:
             """
             Split content into chunk delimited by line-endings.
             Try our best to keep chunks smaller than MAX_CHUNK_SIZE
@@ -451,7 +637,7 @@ class LogsConnectorComponent(base.DBConnectorComponent):
 
                     if line_size > self.MAX_CHUNK_SIZE:
                         compressed = _thd_compress_chunk(compress_obj, compressor_id, [line_bytes])
-                        compressed_chunk, _, _ = compressed
+                        compressed_chunk, _, _, _ = compressed
                         # check if compressed size is compliant with DB row limit
                         if len(compressed_chunk) > self.MAX_CHUNK_SIZE:
                             compressed = _thd_compress_chunk(
@@ -466,17 +652,22 @@ class LogsConnectorComponent(base.DBConnectorComponent):
 
         assert content[-1] == '\n'
 
-        num_lines = await self.db.pool.do(_thd_get_numlines)
+        num_lines = self._num_lines.get(logid)
         if num_lines is None:
-            # ignore a missing log
-            return None
+            num_lines = await self.db.pool.do(_thd_get_numlines)
+            if num_lines is None:
+                # ignore a missing log
+                return None
 
         # Break the content up into chunks
+        chunks: list[dict] = []
+        chunks_lines: list[tuple[int, int, list[str]]] = []
         chunk_first_line = last_line = num_lines
         async for (
             compressed_chunk,
             compressed_id,
             chunk_lines_count,
+            text_lines,
         ) in _async_iter_on_pool(
             partial(
                 _thd_iter_chunk_compress,
@@ -493,33 +684,57 @@ class LogsConnectorComponent(base.DBConnectorComponent):
             max_backlog=100,
         ):
             last_line = chunk_first_line + chunk_lines_count - 1
-
-            await self.db.pool.do(
-                _thd_insert_chunk,
-                first_line=chunk_first_line,
-                last_line=last_line,
-                content=compressed_chunk,
-                compressed_id=compressed_id,
-            )
-
+            chunks.append({
+                "logid": logid,
+                "first_line": chunk_first_line,
+                "last_line": last_line,
+                "content": compressed_chunk,
+                "compressed": compressed_id,
+            })
+            chunks_lines.append((chunk_first_line, chunk_lines_count, text_lines))
             chunk_first_line = last_line + 1
 
-        await self.db.pool.do(_thd_update_num_lines, last_line + 1)
+        try:
+            await self._chunks_writer.write(logid, chunks, last_line + 1)
+        except Exception:
+            # we do not know what made it to the database
+            self._num_lines.pop(logid, None)
+            self._tail_cache.evict(logid)
+            raise
+        self._num_lines[logid] = last_line + 1
+
+        for chunk_first_line, chunk_lines_count, text_lines in chunks_lines:
+            if len(text_lines) == chunk_lines_count:
+                self._tail_cache.append(logid, chunk_first_line, text_lines)
+            else:
+                # lines split differently when read back (e.g. on '\r'), do not guess
+                self._tail_cache.evict(logid)
+                break
+
         return num_lines, last_line
 
-    def finishLog(self, logid: int) -> defer.Deferred[None]:
+    @async_to_deferred
+    async def finishLog(self, logid: int) -> None:
         def thdfinishLog(conn) -> None:
             tbl = self.db.model.logs
             q = tbl.update().where(tbl.c.id == logid)
             conn.execute(q.values(complete=1))
 
-        return self.db.pool.do_with_transaction(thdfinishLog)
+        # the log must not be marked complete before all its lines are stored
+        await self._chunks_writer.wait_written(logid)
+        # no more lines will be appended, the readers can go to the database
+        self._tail_cache.evict(logid)
+        self._num_lines.pop(logid, None)
+        await self.db.pool.do_with_transaction(thdfinishLog)
 
     @async_to_deferred
     async def compressLog(self, logid: int, force: bool = False) -> int:
         """
         returns the size (in bytes) saved.
         """
+        self._tail_cache.evict(logid)
+        await self._chunks_writer.wait_written(logid)
+
         tbl = self.db.model.logchunks
 
         def _thd_gather_chunks_to_process(conn: SAConnection) -> list[tuple[int, int]]:
@@ -696,15 +911,19 @@ class LogsConnectorComponent(base.DBConnectorComponent):
 
         return total_bytes_saved
 
-    def deleteOldLogChunks(self, older_than_timestamp: int) -> defer.Deferred[int]:
-        def thddeleteOldLogs(conn) -> int:
-            model = self.db.model
-            res = conn.execute(sa.select(sa.func.count(model.logchunks.c.logid)))
-            count1 = res.fetchone()[0]
-            res.close()
+    @async_to_deferred
+    async def markOldLogsDeleted(
+        self, older_than_timestamp: int, max_logs: int, after_logid: int = 0
+    ) -> tuple[int, int]:
+        """
+        Sets the type of at most max_logs logs of the steps started before older_than_timestamp
+        to 'd', so that their chunks are deleted by deleteDeletedLogChunks.  Only the logs with
+        an id greater than after_logid are considered.  Returns the number of logs updated, 0 once
+        they are all updated, and the id of the last one, to pass as after_logid to the next call.
+        """
 
-            # update log types older than timestamps
-            # we do it first to avoid having UI discrepancy
+        def thd(conn: SAConnection) -> list[int]:
+            model = self.db.model
 
             # N.B.: we utilize the fact that steps.id is auto-increment, thus steps.started_at
             # times are effectively sorted and we only need to find the steps.id at the upper
@@ -718,46 +937,122 @@ class LogsConnectorComponent(base.DBConnectorComponent):
                 .order_by(model.steps.c.id.desc())
                 .limit(1)
             )
-            res_list = res.fetchone()
-            stepid_max = None
-            if res_list:
-                stepid_max = res_list[0]
+            stepid_max = res.scalar()
             res.close()
+            if not stepid_max:
+                return []
 
-            # UPDATE logs SET logs.type = 'd' WHERE logs.stepid <= stepid_max AND type != 'd';
-            if stepid_max:
-                res = conn.execute(
-                    model.logs.update()
-                    .where(sa.and_(model.logs.c.stepid <= stepid_max, model.logs.c.type != 'd'))
-                    .values(type='d')
+            # the logids are selected first, as MySQL does not support LIMIT in UPDATE subqueries
+            res = conn.execute(
+                sa.select(model.logs.c.id)
+                .where(
+                    sa.and_(
+                        model.logs.c.id > after_logid,
+                        model.logs.c.stepid <= stepid_max,
+                        model.logs.c.type != 'd',
+                    )
                 )
-                conn.commit()
-                res.close()
-
-            # query all logs with type 'd' and delete their chunks.
-            if self.db._engine.dialect.name == 'sqlite':
-                # sqlite does not support delete with a join, so for this case we use a subquery,
-                # which is much slower
-                q = sa.select(model.logs.c.id)
-                q = q.select_from(model.logs)
-                q = q.where(model.logs.c.type == 'd')
-
-                # delete their logchunks
-                q = model.logchunks.delete().where(model.logchunks.c.logid.in_(q))
-            else:
-                q = model.logchunks.delete()
-                q = q.where(model.logs.c.id == model.logchunks.c.logid)
-                q = q.where(model.logs.c.type == 'd')
+                .order_by(model.logs.c.id)
+                .limit(max_logs)
+            )
+            logids = [row.id for row in res]
+            res.close()
+            if not logids:
+                return []
 
-            res = conn.execute(q)
-            conn.commit()
+            res = conn.execute(
+                model.logs.update().where(model.logs.c.id.in_(logids)).values(type='d')
+            )
             res.close()
-            res = conn.execute(sa.select(sa.func.count(model.logchunks.c.logid)))
-            count2 = res.fetchone()[0]
+            return logids
+
+        logids = await self.db.pool.do_with_transaction(thd)
+        for logid in logids:
+            self._tail_cache.evict(logid)
+        return len(logids), (logids[-1] if logids else after_logid)
+
+    def deleteDeletedLogChunks(
+        self, max_chunks: int, from_logid: int = 0
+    ) -> defer.Deferred[tuple[int, int]]:
+        """
+        Deletes at most max_chunks chunks of the logs of type 'd', in logid order, starting with
+        the log from_logid.  Returns the number of chunks deleted, 0 once they are all deleted,
+        and the logid of the last one, to pass as from_logid to the next call.
+        """
+
+        def thd(conn: SAConnection) -> tuple[int, int]:
+            logs_tbl = self.db.model.logs
+            chunks_tbl = self.db.model.logchunks
+
+            # the chunks of the batch, walking the logchunks_firstline index from the cursor
+            batch = (
+                sa.select(chunks_tbl.c.logid, chunks_tbl.c.first_line)
+                .select_from(chunks_tbl.join(logs_tbl, logs_tbl.c.id == chunks_tbl.c.logid))
+                .where(sa.and_(logs_tbl.c.type == 'd', chunks_tbl.c.logid >= from_logid))
+                .order_by(chunks_tbl.c.logid, chunks_tbl.c.first_line)
+                .limit(max_chunks)
+                .subquery()
+            )
+            res = conn.execute(
+                sa.select(batch.c.logid, batch.c.first_line)
+                .order_by(batch.c.logid.desc(), batch.c.first_line.desc())
+                .limit(1)
+            )
+            last_chunk = res.fetchone()
             res.close()
-            return count1 - count2
+            if last_chunk is None:
+                return 0, from_logid
+
+            q = chunks_tbl.delete().where(
+                sa.and_(
+                    chunks_tbl.c.logid.in_(
+                        sa.select(logs_tbl.c.id).where(
+                            sa.and_(
+                                logs_tbl.c.type == 'd',
+                                logs_tbl.c.id >= from_logid,
+                                logs_tbl.c.id <= last_chunk.logid,
+                            )
+                        )
+                    ),
+                    sa.or_(
+                        chunks_tbl.c.logid < last_chunk.logid,
+                        chunks_tbl.c.first_line <= last_chunk.first_line,
+                    ),
+                )
+            )
+            res = conn.execute(q)
+            deleted = res.rowcount
+            res.close()
+            return deleted, last_chunk.logid
 
-        return self.db.pool.do(thddeleteOldLogs)
+        return self.db.pool.do_with_transaction(thd)
+
+    @async_to_deferred
+    async def deleteOldLogChunks(self, older_than_timestamp: int) -> int:
+        """
+        Deletes the chunks of the logs of the steps started before older_than_timestamp, returns
+        the number of chunks deleted.  See markOldLogsDeleted and deleteDeletedLogChunks to do it
+        by batches.
+        """
+        # update log types older than timestamps
+        # we do it first to avoid having UI discrepancy
+        logid = 0
+        while True:
+            marked, logid = await self.markOldLogsDeleted(
+                older_than_timestamp, self.DELETE_LOGS_BATCH_SIZE, logid
+            )
+            if not marked:
+                break
+
+        deleted = 0
+        logid = 0
+        while True:
+            batch_deleted, logid = await self.deleteDeletedLogChunks(
+                self.DELETE_CHUNKS_BATCH_SIZE, logid
+            )
+            if not batch_deleted:
+                return deleted
+            deleted += batch_deleted
 
     def _model_from_row(self, row):
         return LogModel(
@@ -771,6 +1066,28 @@ class LogsConnectorComponent(base.DBConnectorComponent):
         )
 
 
+def _iter_chunk_lines(data: bytes) -> Generator[str, None, None]:
+    """
+    Yields the lines of the uncompressed content of a chunk, with their line-ending.
+    """
+    # NOTE: we need a streaming decompression interface
+    with (
+        io.BytesIO(data) as data_buffer,
+        io.TextIOWrapper(
+            data_buffer,
+            encoding='utf-8',
+        ) as reader,
+    ):
+        # last line-ending is stripped from chunk on insert
+        # add it back here to simplify handling after
+        data_buffer.seek(0, os.SEEK_END)
+        data_buffer.write(b'\n')
+        data_buffer.seek(0, os.SEEK_SET)
+
+        while line := reader.readline():
+            yield line
+
+
 async def _async_iter_on_pool(
     generator_sync: Callable[[], Generator[_T, None, None]],
     *,
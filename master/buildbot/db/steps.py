@@ -135,6 +135,20 @@ class StepsConnectorComponent(base.DBConnectorComponent):
 
         return self.db.pool.do(thd)
 
+    def get_steps_for_builds(self, buildids: list[int]) -> defer.Deferred[list[StepModel]]:
+        def thd(conn) -> list[StepModel]:
+            tbl = self.db.model.steps
+            steps: list[StepModel] = []
+            for batch in self.doBatch(sorted(set(buildids)), 100):
+                q = tbl.select()
+                q = q.where(tbl.c.buildid.in_(batch))
+                q = q.order_by(tbl.c.buildid, tbl.c.number)
+                res = conn.execute(q)
+                steps.extend(self._model_from_row(row) for row in res.fetchall())
+            return steps
+
+        return self.db.pool.do(thd)
+
     def addStep(
         self, buildid: int, name: str, state_string: str
     ) -> defer.Deferred[tuple[int, int, str]]:
@@ -61,61 +61,108 @@ class TestResultDict(TestResultModel):
 
 
 class TestResultsConnectorComponent(base.DBConnectorComponent):
-    def _add_code_paths(self, builderid: int, paths: set[str]) -> defer.Deferred[dict[str, int]]:
-        # returns a dictionary of path to id in the test_code_paths table.
-        # For paths that already exist, the id of the row in the test_code_paths is retrieved.
-        assert isinstance(paths, set)
+    # Maximum number of test name or code path ids remembered for each builder. Once it is
+    # reached, the ids that are already known are kept, so that a test suite whose names do not
+    # all fit still gets cache hits each time it runs.
+    MAX_INTERNED_IDS = 100000
+
+    def __init__(self, connector):
+        super().__init__(connector)
+        # builderid -> value -> id, for the test_names and test_code_paths tables. The rows of
+        # these tables are never changed nor deleted, thus the ids never become stale. These
+        # dictionaries are only accessed from the reactor thread.
+        self._name_ids: dict[int, dict[str, int]] = {}
+        self._code_path_ids: dict[int, dict[str, int]] = {}
+
+    @defer.inlineCallbacks
+    def _add_interned_values(self, table, column_name, interned_ids, builderid, values):
+        # returns a dictionary of value to id in the given table, inserting the missing values.
+        # The ids known from previous calls are not looked up again.
+        builder_ids = interned_ids.setdefault(builderid, {})
+        values_to_ids = {}
+        missing = set()
+        for value in values:
+            valueid = builder_ids.get(value)
+            if valueid is None:
+                missing.add(value)
+            else:
+                values_to_ids[value] = valueid
+
+        if not missing:
+            return values_to_ids
 
         def thd(conn) -> dict[str, int]:
-            paths_to_ids = {}
-            paths_table = self.db.model.test_code_paths
+            return self._thd_add_values(conn, table, column_name, builderid, missing)
+
+        added = yield self.db.pool.do(thd)
+        values_to_ids.update(added)
+
+        for value, valueid in added.items():
+            if len(builder_ids) >= self.MAX_INTERNED_IDS:
+                break
+            builder_ids[value] = valueid
+        return values_to_ids
+
+    def _thd_add_values(self, conn, table, column_name, builderid, values) -> dict[str, int]:
+        # For values that already exist, the id of the row in the table is retrieved.
+        values_to_ids = {}
+        column = table.c[column_name]
+
+        for value_batch in self.doBatch(values, batch_n=3000):
+            value_batch = set(value_batch)
+
+            while value_batch:
+                # Use expanding bindparam, because performance of sqlalchemy is very slow
+                # when filtering large sets otherwise.
+                q = sa.select(table.c.id, column).where(
+                    (column.in_(sa.bindparam('values', expanding=True)))
+                    & (table.c.builderid == builderid)
+                )
 
-            for path_batch in self.doBatch(paths, batch_n=3000):
-                path_batch = set(path_batch)
-
-                while path_batch:
-                    # Use expanding bindparam, because performance of sqlalchemy is very slow
-                    # when filtering large sets otherwise.
-                    q = paths_table.select().where(
-                        (paths_table.c.path.in_(sa.bindparam('paths', expanding=True)))
-                        & (paths_table.c.builderid == builderid)
-                    )
-
-                    res = conn.execute(q, {'paths': list(path_batch)})
-                    for row in res.fetchall():
-                        paths_to_ids[row.path] = row.id
-                        path_batch.remove(row.path)
-
-                    # paths now contains all the paths that need insertion.
-                    try:
-                        insert_values = [
-                            {'builderid': builderid, 'path': path} for path in path_batch
-                        ]
-
-                        q = paths_table.insert().values(insert_values)
-
-                        if self.db.pool.engine.dialect.name in ['postgresql', 'mssql']:
-                            # Use RETURNING, this way we won't need an additional select query
-                            q = q.returning(paths_table.c.id, paths_table.c.path)
-
-                            res = conn.execute(q)
-                            conn.commit()
-                            for row in res.fetchall():
-                                paths_to_ids[row.path] = row.id
-                                path_batch.remove(row.path)
-                        else:
-                            conn.execute(q)
-                            conn.commit()
-
-                    except (sa.exc.IntegrityError, sa.exc.ProgrammingError):
-                        # There was a competing addCodePaths() call that added a path for the same
-                        # builder. Depending on the DB driver, none or some rows were inserted, but
-                        # we will re-check what's got inserted in the next iteration of the loop
-                        conn.rollback()
-
-            return paths_to_ids
+                res = conn.execute(q, {'values': list(value_batch)})
+                for row in res.fetchall():
+                    values_to_ids[row[1]] = row.id
+                    value_batch.remove(row[1])
 
-        return self.db.pool.do(thd)
+                if not value_batch:
+                    break
+
+                # value_batch now contains all the values that need insertion.
+                try:
+                    insert_values = [
+                        {'builderid': builderid, column_name: value} for value in value_batch
+                    ]
+
+                    q = table.insert().values(insert_values)
+
+                    if self.db.pool.engine.dialect.name in ['postgresql', 'mssql']:
+                        # Use RETURNING, this way we won't need an additional select query
+                        q = q.returning(table.c.id, column)
+
+                        res = conn.execute(q)
+                        conn.commit()
+                        for row in res.fetchall():
+                            values_to_ids[row[1]] = row.id
+                            value_batch.remove(row[1])
+                    else:
+                        conn.execute(q)
+                        conn.commit()
+
+                except (sa.exc.IntegrityError, sa.exc.ProgrammingError):
+                    # There was a competing call that added a value for the same builder.
+                    # Depending on the DB driver, none or some rows were inserted, but we will
+                    # re-check what's got inserted in the next iteration of the loop
+                    conn.rollback()
+
+        return values_to_ids
+
+    def _add_code_paths(self, builderid: int, paths: set[str]) -> defer.Deferred[dict[str, int]]:
+        # returns a dictionary of path to id in the test_code_paths table.
+        # For paths that already exist, the id of the row in the test_code_paths is retrieved.
+        assert isinstance(paths, set)
+        return self._add_interned_values(
+            self.db.model.test_code_paths, 'path', self._code_path_ids, builderid, paths
+        )
 
     def getTestCodePaths(
         self, builderid, path_prefix: str | None = None, result_spec=None
@@ -136,56 +183,9 @@ class TestResultsConnectorComponent(base.DBConnectorComponent):
         # returns a dictionary of name to id in the test_names table.
         # For names that already exist, the id of the row in the test_names is retrieved.
         assert isinstance(names, set)
-
-        def thd(conn) -> dict[str, int]:
-            names_to_ids = {}
-            names_table = self.db.model.test_names
-
-            for name_batch in self.doBatch(names, batch_n=3000):
-                name_batch = set(name_batch)
-                while name_batch:
-                    # Use expanding bindparam, because performance of sqlalchemy is very slow
-                    # when filtering large sets otherwise.
-                    q = names_table.select().where(
-                        (names_table.c.name.in_(sa.bindparam('names', expanding=True)))
-                        & (names_table.c.builderid == builderid)
-                    )
-
-                    res = conn.execute(q, {'names': list(name_batch)})
-                    for row in res.fetchall():
-                        names_to_ids[row.name] = row.id
-                        name_batch.remove(row.name)
-
-                    # names now contains all the names that need insertion.
-                    try:
-                        insert_values = [
-                            {'builderid': builderid, 'name': name} for name in name_batch
-                        ]
-
-                        q = names_table.insert().values(insert_values)
-
-                        if self.db.pool.engine.dialect.name in ['postgresql', 'mssql']:
-                            # Use RETURNING, this way we won't need an additional select query
-                            q = q.returning(names_table.c.id, names_table.c.name)
-
-                            res = conn.execute(q)
-                            conn.commit()
-                            for row in res.fetchall():
-                                names_to_ids[row.name] = row.id
-                                name_batch.remove(row.name)
-                        else:
-                            conn.execute(q)
-                            conn.commit()
-
-                    except (sa.exc.IntegrityError, sa.exc.ProgrammingError):
-                        # There was a competing addNames() call that added a name for the same
-                        # builder. Depending on the DB driver, none or some rows were inserted, but
-                        # we will re-check what's got inserted in the next iteration of the loop
-                        conn.rollback()
-
-            return names_to_ids
-
-        return self.db.pool.do(thd)
+        return self._add_interned_values(
+            self.db.model.test_names, 'name', self._name_ids, builderid, names
+        )
 
     def getTestNames(
         self, builderid, name_prefix=None, result_spec=None
@@ -209,6 +209,9 @@ class TestResultsConnectorComponent(base.DBConnectorComponent):
         # least one of 'test_name', 'test_code_path'. 'line' key is optional.
         # The function returns nothing.
 
+        if not result_values:
+            return
+
         # Build values list for insertion.
         insert_values = []
 
@@ -256,8 +259,8 @@ class TestResultsConnectorComponent(base.DBConnectorComponent):
 
         def thd(conn):
             results_table = self.db.model.test_results
-            q = results_table.insert().values(insert_values)
-            conn.execute(q)
+            # executemany, compiling a multi-row VALUES clause is very slow for large batches
+            conn.execute(results_table.insert(), insert_values)
 
         yield self.db.pool.do_with_transaction(thd)
 
@@ -43,6 +43,10 @@ class BaseLock:
     We maintain the wait queue in FIFO order, and ensure that counting waiters
     in the queue behind exclusive waiters cannot acquire the lock. This ensures
     that exclusive waiters are not starved.
+
+    The wait queue is kept as one FIFO per access mode, ordered across modes by
+    a sequence number, so that finding a waiter and checking availability does
+    not need to scan the whole queue.
     """
 
     description = "<BaseLock>"
@@ -52,8 +56,11 @@ class BaseLock:
 
         # Name of the lock
         self.lockName = name
-        # Current queue, tuples (waiter_id, LockAccess, deferred)
-        self.waiting = []
+        # Current queues by access mode, waiter_id -> [seq, LockAccess, deferred]
+        self._waiting_counting = {}
+        self._waiting_exclusive = {}
+        # sequence number of the next waiter, orders the waiters of both queues
+        self._waiting_seq = 0
         # Current owners, tuples (owner_id, LockAccess)
         self.owners = []
         # maximal number of counting owners
@@ -69,12 +76,25 @@ class BaseLock:
         # it was lowered by
         self._claimed_counting = 0
 
+        # builders which could not start a build because of this lock, name -> LockAccess
+        self._blocked_builders = {}
+
         # subscriptions to this lock being released
         self.release_subs = subscription.SubscriptionPoint(f"{self!r} releases")
 
     def __repr__(self):
         return self.description
 
+    @property
+    def waiting(self):
+        """The wait queue in FIFO order, tuples (waiter_id, LockAccess, deferred)"""
+        waiters = sorted(
+            (seq, w_id, access, d)
+            for queue in (self._waiting_counting, self._waiting_exclusive)
+            for w_id, (seq, access, d) in queue.items()
+        )
+        return [(w_id, access, d) for _, w_id, access, d in waiters]
+
     def setMaxCount(self, count):
         old_max_count = self.maxCount
         self.maxCount = count
@@ -83,9 +103,12 @@ class BaseLock:
             self._tryWakeUp()
 
     def _find_waiting(self, requester):
-        for idx, waiter in enumerate(self.waiting):
-            if waiter[0] == id(requester):
-                return idx
+        # returns the wait queue holding the requester, or None
+        requester_id = id(requester)
+        if requester_id in self._waiting_counting:
+            return self._waiting_counting
+        if requester_id in self._waiting_exclusive:
+            return self._waiting_exclusive
         return None
 
     def isAvailable(self, requester, access):
@@ -96,22 +119,40 @@ class BaseLock:
 
         if not access.count:
             return True
+        if num_excl:
+            return False
 
-        w_index = self._find_waiting(requester)
-        if w_index is None:
-            w_index = len(self.waiting)
-
-        ahead = self.waiting[:w_index]
+        queue = self._find_waiting(requester)
+        if queue is None:
+            # the requester would be queued behind all the current waiters
+            if access.mode == 'counting':
+                return (
+                    not self._waiting_exclusive
+                    and num_counting + len(self._waiting_counting) + access.count <= self.maxCount
+                )
+            return not num_counting and not self._waiting_counting and not self._waiting_exclusive
+
+        seq = queue[id(requester)][0]
+        first_excl = next(iter(self._waiting_exclusive.values()), None)
+        if first_excl is not None and first_excl[0] < seq:
+            return False
 
         if access.mode == 'counting':
-            # Wants counting access
-            return (
-                not num_excl
-                and num_counting + len(ahead) + access.count <= self.maxCount
-                and all(w[1].mode == 'counting' for w in ahead)
-            )
+            # only the counting waiters ahead of the requester count, stop as soon as they
+            # are too many
+            available = self.maxCount - num_counting - access.count
+            if available < 0:
+                return False
+            for w_seq, _, _ in self._waiting_counting.values():
+                if w_seq >= seq:
+                    return True
+                available -= 1
+                if available < 0:
+                    return False
+            return True
         # else Wants exclusive access
-        return not num_excl and not num_counting and not ahead
+        first_counting = next(iter(self._waiting_counting.values()), None)
+        return not num_counting and (first_counting is None or first_counting[0] >= seq)
 
     def _addOwner(self, owner, access):
         self.owners.append((id(owner), access))
@@ -154,7 +195,9 @@ class BaseLock:
         if not access.count:
             return
 
-        self.waiting = [w for w in self.waiting if w[0] != id(owner)]
+        queue = self._find_waiting(owner)
+        if queue is not None:
+            del queue[id(owner)]
         self._addOwner(owner, access)
 
         debuglog(f" {self} is claimed '{access.mode}', {access.count} units")
@@ -181,12 +224,29 @@ class BaseLock:
         # notify any listeners
         self.release_subs.deliver()
 
+    def _iterWaiting(self):
+        # yields the entries of both queues in FIFO order, merging them by sequence number
+        counting = iter(self._waiting_counting.values())
+        exclusive = iter(self._waiting_exclusive.values())
+        next_counting = next(counting, None)
+        next_exclusive = next(exclusive, None)
+        while next_counting is not None or next_exclusive is not None:
+            if next_exclusive is None or (
+                next_counting is not None and next_counting[0] < next_exclusive[0]
+            ):
+                yield next_counting
+                next_counting = next(counting, None)
+            else:
+                yield next_exclusive
+                next_exclusive = next(exclusive, None)
+
     def _tryWakeUp(self):
         # After an exclusive access, we may need to wake up several waiting.
         # Break out of the loop when the first waiting client should not be
         # awakened.
         num_excl, num_counting = self._claimed_excl, self._claimed_counting
-        for i, (w_owner_id, w_access, d) in enumerate(self.waiting):
+        for waiter in self._iterWaiting():
+            _, w_access, d = waiter
             if w_access.mode == 'counting':
                 if num_excl > 0 or num_counting >= self.maxCount:
                     break
@@ -200,7 +260,7 @@ class BaseLock:
             # If the waiter has a deferred, wake it up and clear the deferred
             # from the wait queue entry to indicate that it has been woken.
             if d:
-                self.waiting[i] = (w_owner_id, w_access, None)
+                waiter[2] = None
                 eventually(d.callback, self)
 
     def waitUntilMaybeAvailable(self, owner, access):
@@ -222,17 +282,28 @@ class BaseLock:
             return defer.succeed(self)
         d = defer.Deferred()
 
+        new_queue = self._waiting_counting if access.mode == 'counting' else self._waiting_exclusive
+
         # Are we already in the wait queue?
-        w_index = self._find_waiting(owner)
-        if w_index is not None:
-            _, _, old_d = self.waiting[w_index]
+        queue = self._find_waiting(owner)
+        if queue is not None:
+            seq, _, old_d = queue[id(owner)]
             assert old_d is None, (
                 "waitUntilMaybeAvailable() must not be called again before the "
                 "previous deferred fired"
             )
-            self.waiting[w_index] = (id(owner), access, d)
+            if queue is new_queue:
+                queue[id(owner)] = [seq, access, d]
+            else:
+                # the access mode changed, keep the place of the waiter in the queue
+                del queue[id(owner)]
+                new_queue[id(owner)] = [seq, access, d]
+                entries = sorted(new_queue.items(), key=lambda item: item[1][0])
+                new_queue.clear()
+                new_queue.update(entries)
         else:
-            self.waiting.append((id(owner), access, d))
+            new_queue[id(owner)] = [self._waiting_seq, access, d]
+            self._waiting_seq += 1
         return d
 
     def stopWaitingUntilAvailable(self, owner, access, d):
@@ -243,15 +314,13 @@ class BaseLock:
         debuglog(f"{self} stopWaitingUntilAvailable({owner})")
         assert isinstance(access, LockAccess)
 
-        w_index = self._find_waiting(owner)
-        assert w_index is not None, "The owner was not waiting for the lock"
-        _, _, old_d = self.waiting[w_index]
+        queue = self._find_waiting(owner)
+        assert queue is not None, "The owner was not waiting for the lock"
+        _, _, old_d = queue.pop(id(owner))
         if old_d is not None:
             assert d is old_d, "The supplied deferred must be a result of waitUntilMaybeAvailable()"
-            del self.waiting[w_index]
             d.callback(None)
         else:
-            del self.waiting[w_index]
             # if the callback has already been woken up, then it must schedule another waiter,
             # otherwise we will have an available lock with a waiter list and no-one to wake the
             # waiters up.
@@ -260,6 +329,24 @@ class BaseLock:
     def isOwner(self, owner, access):
         return (id(owner), access) in self.owners
 
+    def addBlockedBuilder(self, buildername, access):
+        """Record that a builder could not start a build because the lock was not available
+        for the given access. The builder is returned by popUnblockedBuilders() once the lock
+        becomes available for it."""
+        self._blocked_builders[buildername] = access
+
+    def popUnblockedBuilders(self):
+        """Return the names of the builders recorded by addBlockedBuilder() for which the lock
+        is now available, and forget them."""
+        unblocked = [
+            name
+            for name, access in self._blocked_builders.items()
+            if self.isAvailable(None, access)
+        ]
+        for name in unblocked:
+            del self._blocked_builders[name]
+        return unblocked
+
 
 class RealMasterLock(BaseLock, service.SharedService):
     def __init__(self, name):
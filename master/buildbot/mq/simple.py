@@ -29,6 +29,8 @@ class SimpleMQ(service.ReconfigurableServiceMixin, base.MQBase):
         super().__init__()
         self.qrefs = []
         self.persistent_qrefs = {}
+        # index of self.qrefs by filter, so that produce() only visits matching consumers
+        self.qref_index = tuplematch.TupleTrie()
         self.debug = False
 
     def reconfigServiceWithBuildbotConfig(self, new_config):
@@ -38,9 +40,8 @@ class SimpleMQ(service.ReconfigurableServiceMixin, base.MQBase):
     def produce(self, routingKey, data):
         if self.debug:
             log.msg(f"MSG: {routingKey}\n{pprint.pformat(data)}")
-        for qref in self.qrefs:
-            if tuplematch.matchTuple(routingKey, qref.filter):
-                self.invokeQref(qref, routingKey, data)
+        for qref in self.qref_index.match(routingKey):
+            self.invokeQref(qref, routingKey, data)
 
     def startConsuming(self, callback, filter, persistent_name=None):
         if any(not isinstance(k, str) and k is not None for k in filter):
@@ -51,13 +52,21 @@ class SimpleMQ(service.ReconfigurableServiceMixin, base.MQBase):
                 qref.startConsuming(callback)
             else:
                 qref = PersistentQueueRef(self, callback, filter)
-                self.qrefs.append(qref)
+                self._addQref(qref)
                 self.persistent_qrefs[persistent_name] = qref
         else:
             qref = QueueRef(self, callback, filter)
-            self.qrefs.append(qref)
+            self._addQref(qref)
         return defer.succeed(qref)
 
+    def _addQref(self, qref):
+        self.qrefs.append(qref)
+        self.qref_index.add(qref.filter, qref)
+
+    def _removeQref(self, qref):
+        if self.qref_index.remove(qref.filter, qref):
+            self.qrefs.remove(qref)
+
 
 class QueueRef(base.QueueRef):
     __slots__ = ['filter', 'mq']
@@ -69,10 +78,7 @@ class QueueRef(base.QueueRef):
 
     def stopConsuming(self):
         self.callback = None
-        try:
-            self.mq.qrefs.remove(self)
-        except ValueError:
-            pass
+        self.mq._removeQref(self)
 
 
 class PersistentQueueRef(QueueRef):
@@ -111,6 +111,7 @@ class BotMaster(service.ReconfigurableServiceMixin, service.AsyncMultiService, L
         self.buildrequest_consumer_new = None
         self.buildrequest_consumer_unclaimed = None
         self.buildrequest_consumer_cancel = None
+        self.buildrequest_consumer_update = None
 
         # a distributor for incoming build requests; see below
         self.brd = BuildRequestDistributor(self)
@@ -291,8 +292,14 @@ class BotMaster(service.ReconfigurableServiceMixin, service.AsyncMultiService, L
         self.buildrequest_consumer_cancel = yield startConsuming(
             self._buildrequest_canceled, ('control', 'buildrequests', None, 'cancel')
         )
+        self.buildrequest_consumer_update = yield startConsuming(
+            self._buildrequest_updated, ('buildrequests', None, 'update')
+        )
         yield super().startService()
 
+    def _buildrequest_updated(self, key, msg):
+        self.brd.set_build_requests_priority([msg['buildrequestid']], msg['priority'])
+
     @defer.inlineCallbacks
     def _buildrequest_canceled(self, key, msg):
         brid = int(key[2])
@@ -438,6 +445,9 @@ class BotMaster(service.ReconfigurableServiceMixin, service.AsyncMultiService, L
         if self.buildrequest_consumer_cancel:
             self.buildrequest_consumer_cancel.stopConsuming()
             self.buildrequest_consumer_cancel = None
+        if self.buildrequest_consumer_update:
+            self.buildrequest_consumer_update.stopConsuming()
+            self.buildrequest_consumer_update = None
         self._pending_builderids.clear()
         self._flush_pending_builders.stop()
         return super().stopService()
@@ -476,6 +486,21 @@ class BotMaster(service.ReconfigurableServiceMixin, service.AsyncMultiService, L
         builders = self.getBuildersForWorker(worker_name)
         self.brd.maybeStartBuildsOn([b.name for b in builders])
 
+    def maybeStartBuildsForLocks(self, locks):
+        """
+        Call this when the given locks have been released. Only the builders
+        which could not start a build because of one of these locks, and for
+        which the lock is now available, are considered.
+
+        @param locks: the released real locks
+        """
+        buildernames = {}
+        for lock in locks:
+            for name in lock.popUnblockedBuilders():
+                buildernames[name] = None
+        if buildernames:
+            self.brd.maybeStartBuildsOn(list(buildernames))
+
     def maybeStartBuildsForAllBuilders(self):
         """
         Call this when something suggests that this would be a good time to
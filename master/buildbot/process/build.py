@@ -553,7 +553,11 @@ class Build(properties.PropertiesMixin):
             yield self.master.data.updates.startStep(
                 self._locks_acquire_step.stepid, started_at=locks_acquire_start_at
             )
+            locks_wait_start = self.master.reactor.seconds()
             yield self.acquireLocks()
+            metrics.MetricTimeEvent.log(
+                "Build.locks_wait", self.master.reactor.seconds() - locks_wait_start
+            )
             locks_acquired_at = int(self.master.reactor.seconds())
             yield self.master.data.updates.set_step_locks_acquired_at(
                 self._locks_acquire_step.stepid, locks_acquired_at=locks_acquired_at
@@ -911,13 +915,9 @@ class Build(properties.PropertiesMixin):
         # we need to inform the botmaster to attempt to schedule any pending
         # build request if we released any locks. This is because buildrequest
         # may be started for a completely unrelated builder and yet depend on
-        # a lock released by this build.
-        #
-        # TODO: the current approach is dumb as we just attempt to schedule
-        # all buildrequests. A much better idea would be to record the reason
-        # of why a buildrequest was not scheduled in the BuildRequestDistributor
-        # and then attempt to schedule only these buildrequests which may have
-        # had that reason resolved.
+        # a lock released by this build. The locks record the builders which
+        # could not start a build because of them, so only these builders are
+        # looked at again.
 
         # this function is complicated by the fact that the botmaster must be
         # informed only when all locks have been released and the actions in
@@ -930,7 +930,7 @@ class Build(properties.PropertiesMixin):
             return
 
         if self._locks_released and self._build_finished:
-            self.master.botmaster.maybeStartBuildsForAllBuilders()
+            self.master.botmaster.maybeStartBuildsForLocks([l for l, _ in self._locks_to_acquire])
 
     def getSummaryStatistic(
         self,
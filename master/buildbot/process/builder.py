@@ -381,6 +381,8 @@ class Builder(util_service.ReconfigurableServiceMixin, service.MultiService):
     def _can_acquire_locks(self, lock_list):
         for lock, access in lock_list:
             if not lock.isAvailable(None, access):
+                # the builder is looked at again once the lock is released
+                lock.addBlockedBuilder(self.name, access)
                 return False
         return True
 
@@ -28,6 +28,7 @@ from buildbot.data import resultspec
 from buildbot.db.buildsets import BsProps
 from buildbot.process import properties
 from buildbot.process.results import SKIPPED
+from buildbot.util import lru
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -45,6 +46,30 @@ if TYPE_CHECKING:
     from buildbot.util.twisted import InlineCallbacksType
 
 
+class _CollapseSignature:
+    # the parts of a buildset compared by the default collapse function which never change once
+    # the buildset is created (whether its sourcestamps have changes is queried each time, as
+    # changes can be added or pruned later)
+
+    __slots__ = ('__weakref__', 'key', 'properties', 'sourcestamps')
+
+    def __init__(self, bsdata: BuildSetData, bs_props: BsProps) -> None:
+        sources = {ss['codebase']: ss for ss in bsdata['sourcestamps']}
+        # anything with a patch won't be collapsed
+        self.key: tuple[tuple[str, str | None, str | None, str | None], ...] | None = None
+        if not any(ss['patch'] for ss in sources.values()):
+            self.key = tuple(
+                sorted(
+                    (c, ss['repository'], ss['branch'], ss['project']) for c, ss in sources.items()
+                )
+            )
+        # codebase -> (ssid, revision)
+        self.sourcestamps: dict[str, tuple[int, str | None]] = {
+            c: (ss['ssid'], ss['revision']) for c, ss in sources.items()
+        }
+        self.properties = BuildRequest.filter_buildset_props_for_collapsing(bs_props)
+
+
 class BuildRequestCollapser:
     # brids is a list of the new added buildrequests id
     # This class is called before generated the 'new' event for the
@@ -75,9 +100,80 @@ class BuildRequestCollapser:
         unclaim_brs.sort(key=lambda brd: brd['submitted_at'])
         return unclaim_brs
 
+    @staticmethod
+    @defer.inlineCallbacks
+    def _makeCollapseSignature(
+        bsid: int, master: BuildMaster
+    ) -> InlineCallbacksType[_CollapseSignature]:
+        bsdata: BuildSetData | None = yield master.data.get(('buildsets', str(bsid)))
+        assert bsdata is not None
+        bs_props: BsProps = yield master.data.get(('buildsets', str(bsid), 'properties'))
+        return _CollapseSignature(bsdata, bs_props)
+
+    def _getCollapseSignature(self, bsid: int) -> Deferred[_CollapseSignature]:
+        cache = self.master.caches.get_cache(
+            "CollapseSignatures", self._makeCollapseSignature, default_size=1000
+        )
+        return cache.get(bsid, master=self.master)
+
+    @defer.inlineCallbacks
+    def _getCollapsibleByDefault(
+        self, br: BuildRequestData, unclaim_brs: list[BuildRequestData]
+    ) -> InlineCallbacksType[list[int]]:
+        # Same decisions as BuildRequest.canBeCollapsed, but comparing the cached signatures of
+        # the buildsets, and querying which sourcestamps have changes once for all the candidates
+        collapsible: list[int] = []
+        candidates: list[tuple[int, _CollapseSignature]] = []
+        signature: _CollapseSignature | None = None
+        for unclaim_br in unclaim_brs:
+            if unclaim_br['buildrequestid'] == br['buildrequestid']:
+                continue
+            if unclaim_br['buildsetid'] == br['buildsetid']:
+                collapsible.append(unclaim_br['buildrequestid'])
+                continue
+            if br['buildrequestid'] < unclaim_br['buildrequestid']:
+                continue
+
+            if signature is None:
+                signature = yield self._getCollapseSignature(br['buildsetid'])
+            if signature.key is None:
+                continue
+            other: _CollapseSignature = yield self._getCollapseSignature(unclaim_br['buildsetid'])
+            if other.key != signature.key or other.properties != signature.properties:
+                continue
+            candidates.append((unclaim_br['buildrequestid'], other))
+
+        if not candidates:
+            return collapsible
+
+        assert signature is not None
+        ssids = {ssid for ssid, _ in signature.sourcestamps.values()}
+        for _, other in candidates:
+            ssids.update(ssid for ssid, _ in other.sourcestamps.values())
+        with_changes: set[int] = yield self.master.db.changes.getSourceStampIdsWithChanges(ssids)
+
+        for brid, other in candidates:
+            for codebase, (ssid, revision) in signature.sourcestamps.items():
+                other_ssid, other_revision = other.sourcestamps[codebase]
+                has_changes = ssid in with_changes
+                # if both have changes, proceed, else fail - if no changes check revision instead
+                if has_changes != (other_ssid in with_changes):
+                    break
+                if not has_changes and revision != other_revision:
+                    break
+            else:
+                collapsible.append(brid)
+        return collapsible
+
     @defer.inlineCallbacks
     def collapse(self) -> InlineCallbacksType[list[int]]:
+        # avoid a circular import
+        from buildbot.process.builder import Builder
+
         brids_to_collapse: set[int] = set()
+        # nothing is claimed or completed before the end of the loop, so the unclaimed
+        # buildrequests of a builder are fetched once for all the new buildrequests
+        unclaim_brs_by_builder: dict[int, list[BuildRequestData]] = {}
 
         for brid in self.brids:
             # Get the BuildRequest object
@@ -93,10 +189,20 @@ class BuildRequestCollapser:
                 continue
             # Get the Collapse BuildRequest function (from the configuration)
             collapseRequestsFn = bldr.getCollapseRequestsFn()
-            unclaim_brs: list[BuildRequestData] = yield self._getUnclaimedBrs(builderid)
+            if not collapseRequestsFn:
+                continue
+            unclaim_brs = unclaim_brs_by_builder.get(builderid)
+            if unclaim_brs is None:
+                unclaim_brs = yield self._getUnclaimedBrs(builderid)
+                unclaim_brs_by_builder[builderid] = unclaim_brs
 
             # short circuit if there is no merging to do
-            if not collapseRequestsFn or not unclaim_brs:
+            if not unclaim_brs:
+                continue
+
+            if collapseRequestsFn is Builder._defaultCollapseRequestFn:
+                collapsible = yield self._getCollapsibleByDefault(br, unclaim_brs)
+                brids_to_collapse.update(collapsible)
                 continue
 
             for unclaim_br in unclaim_brs:
@@ -247,7 +353,9 @@ class BuildRequest:
 
         @returns: L{BuildRequest}, via Deferred
         """
-        cache = master.caches.get_cache("BuildRequests", cls._make_br)
+        cache = master.caches.get_cache(
+            "BuildRequests", cls._make_br, size_fn=cls._approximate_size
+        )
         return cache.get(brdict.buildrequestid, brdict=brdict, master=master)
 
     @classmethod
@@ -293,6 +401,19 @@ class BuildRequest:
             sources=sources,
         )
 
+    @staticmethod
+    def _approximate_size(br: BuildRequest) -> int:
+        # the master is shared, only count the data of the request
+        return lru.approximate_size([
+            br.buildername,
+            br.reason,
+            br.properties.properties,
+            [
+                (ss.asSSDict(), [c.asChDict() for c in getattr(ss, 'changes', [])])
+                for ss in br.sources.values()
+            ],
+        ])
+
     @property
     @deprecated(Version("buildbot", 4, 3, 0), ".submitted_at")
     def submittedAt(self) -> int | None:
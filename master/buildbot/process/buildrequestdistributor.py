@@ -16,12 +16,14 @@
 from __future__ import annotations
 
 import copy
+import heapq
 import math
 import random
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 from twisted.internet import defer
+from twisted.internet import task
 from twisted.python import log
 from twisted.python.failure import Failure
 
@@ -39,6 +41,144 @@ if TYPE_CHECKING:
     from buildbot.process.builder import Builder
 
 
+class UnclaimedBuildRequests:
+    """
+    The unclaimed brdicts of a builder, indexed by buildrequestid.
+
+    Iterating yields the brdicts in buildrequestid order, so the first is the oldest, while
+    highest_priority() returns the oldest of the requests with the highest priority using a heap.
+    Removals and priority updates are lazy: the heap entries that no longer match a request
+    are dropped when they reach the top of the heap.
+    """
+
+    def __init__(self, brdicts):
+        self._brdicts = {
+            brdict['buildrequestid']: brdict
+            for brdict in sorted(brdicts, key=lambda brd: brd['buildrequestid'])
+        }
+        self._heap = [(-brdict['priority'], brid) for brid, brdict in self._brdicts.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._brdicts)
+
+    def __iter__(self):
+        return iter(list(self._brdicts.values()))
+
+    def get(self, brid):
+        return self._brdicts.get(brid)
+
+    def remove(self, brid):
+        return self._brdicts.pop(brid, None)
+
+    def set_priority(self, brid, priority):
+        brdict = self._brdicts.get(brid)
+        if brdict is None or brdict['priority'] == priority:
+            return
+        brdict['priority'] = priority
+        heapq.heappush(self._heap, (-priority, brid))
+
+    def highest_priority(self):
+        while self._heap:
+            neg_priority, brid = self._heap[0]
+            brdict = self._brdicts.get(brid)
+            if brdict is not None and brdict['priority'] == -neg_priority:
+                return brdict
+            # removed request, or outdated priority
+            heapq.heappop(self._heap)
+        return None
+
+
+class BuilderQueueStats:
+    """
+    The highest priority and the oldest submission time of the unclaimed build requests of each
+    builder, so that the default builder sort does not query the database for each builder.
+
+    The statistics follow the buildrequests events: each state event carries the current state of
+    a request, which is tracked while it is unclaimed and incomplete, and the 'update' events only
+    carry the new priority of a request. They are also reloaded from the database periodically,
+    in case some events were missed. The events received while loading are replayed over the
+    loaded statistics.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # builderid -> {brid: (priority, submitted_at)}
+        self._unclaimed = {}
+        # builderid -> (highest priority, oldest submitted_at), computed on demand
+        self._summaries = {}
+        self._events_while_loading = None
+
+    def start_loading(self):
+        self._events_while_loading = []
+
+    def abort_loading(self):
+        self._events_while_loading = None
+
+    def load(self, brdicts):
+        if self._events_while_loading is None:
+            # loading was aborted meanwhile
+            return
+        events = self._events_while_loading
+        self._events_while_loading = None
+        self._unclaimed = {}
+        self._summaries = {}
+        for brdict in brdicts:
+            self._set(brdict.builderid, brdict.buildrequestid, brdict.priority, brdict.submitted_at)
+        for handler, msg in events:
+            handler(msg)
+        self.loaded = True
+
+    def clear(self):
+        self.loaded = False
+        self._unclaimed = {}
+        self._summaries = {}
+        self._events_while_loading = None
+
+    def update(self, msg):
+        if self._events_while_loading is not None:
+            self._events_while_loading.append((self.update, msg))
+        if msg['claimed'] or msg['complete']:
+            self._remove(msg['builderid'], msg['buildrequestid'])
+        else:
+            self._set(msg['builderid'], msg['buildrequestid'], msg['priority'], msg['submitted_at'])
+
+    def update_priority(self, msg):
+        if self._events_while_loading is not None:
+            self._events_while_loading.append((self.update_priority, msg))
+        unclaimed = self._unclaimed.get(msg['builderid'])
+        if unclaimed is None or msg['buildrequestid'] not in unclaimed:
+            return
+        _, submitted_at = unclaimed[msg['buildrequestid']]
+        self._set(msg['builderid'], msg['buildrequestid'], msg['priority'], submitted_at)
+
+    def _set(self, builderid, brid, priority, submitted_at):
+        self._unclaimed.setdefault(builderid, {})[brid] = (priority, submitted_at)
+        self._summaries.pop(builderid, None)
+
+    def _remove(self, builderid, brid):
+        unclaimed = self._unclaimed.get(builderid)
+        if unclaimed is None or unclaimed.pop(brid, None) is None:
+            return
+        if not unclaimed:
+            del self._unclaimed[builderid]
+        self._summaries.pop(builderid, None)
+
+    def get(self, builderid):
+        # returns (highest priority, oldest submitted_at), or (None, None) if the builder has no
+        # unclaimed build requests
+        summary = self._summaries.get(builderid)
+        if summary is None:
+            unclaimed = self._unclaimed.get(builderid)
+            if not unclaimed:
+                return (None, None)
+            summary = self._summaries[builderid] = (
+                max(priority for priority, _ in unclaimed.values()),
+                min(submitted_at for _, submitted_at in unclaimed.values()),
+            )
+        return summary
+
+
 class BuildChooserBase:
     #
     # WARNING: This API is experimental and in active development.
@@ -52,6 +192,8 @@ class BuildChooserBase:
     # The entry point is:
     #    * bc.chooseNextBuild() - get the next (worker, [breqs]) or
     #      (None, None)
+    #    * bc.chooseNextBuilds(max_builds) - get up to max_builds
+    #      (worker, [breqs]) pairs, to be claimed and started together
     #
     # The default implementation of this class implements a default
     # chooseNextBuild() that delegates out to two other functions:
@@ -62,6 +204,8 @@ class BuildChooserBase:
         self.master = master
         self.breqCache = {}
         self.unclaimedBrdicts = None
+        # workers chosen by the current chooseNextBuilds() call, whose builds are not started yet
+        self.batchWorkers = []
 
     @defer.inlineCallbacks
     def chooseNextBuild(self):
@@ -73,6 +217,22 @@ class BuildChooserBase:
 
         return (worker, [breq])
 
+    @defer.inlineCallbacks
+    def chooseNextBuilds(self, max_builds):
+        # Return up to max_builds builds, as a list of (worker, [breqs]) pairs
+        self.batchWorkers = []
+        builds = []
+        try:
+            while len(builds) < max_builds:
+                worker, breqs = yield self.chooseNextBuild()
+                if not worker or not breqs:
+                    break
+                builds.append((worker, breqs))
+                self.batchWorkers.append(worker)
+        finally:
+            self.batchWorkers = []
+        return builds
+
     # Must be implemented by subclass
     def popNextBuild(self):
         # Pick the next (worker, breq) pair; note this is pre-merge, so
@@ -92,9 +252,7 @@ class BuildChooserBase:
                 ('builders', (yield self.bldr.getBuilderId()), 'buildrequests'),
                 [resultspec.Filter('claimed', 'eq', [False])],
             )
-            # sort by buildrequestid, so the first is the oldest
-            brdicts.sort(key=lambda brd: brd['buildrequestid'])
-            self.unclaimedBrdicts = brdicts
+            self.unclaimedBrdicts = UnclaimedBuildRequests(brdicts)
         return self.unclaimedBrdicts
 
     @defer.inlineCallbacks
@@ -144,11 +302,7 @@ class BuildChooserBase:
         if breq is None:
             return None
 
-        brid = breq.id
-        for brdict in self.unclaimedBrdicts:
-            if brid == brdict['buildrequestid']:
-                return brdict
-        return None
+        return self.unclaimedBrdicts.get(breq.id)
 
     def _removeBuildRequest(self, breq):
         # Remove a BuildrRequest object (and its brdict)
@@ -157,9 +311,8 @@ class BuildChooserBase:
         if breq is None:
             return
 
-        brdict = self._getBrdictForBuildRequest(breq)
-        if brdict is not None:
-            self.unclaimedBrdicts.remove(brdict)
+        if self.unclaimedBrdicts is not None:
+            self.unclaimedBrdicts.remove(breq.id)
 
         if breq.id in self.breqCache:
             del self.breqCache[breq.id]
@@ -171,6 +324,17 @@ class BuildChooserBase:
             consumeErrors=True,
         )
 
+    def set_build_requests_priority(self, brids, priority):
+        # Keep the cache in sync with priority changes made while choosing builds
+        if self.unclaimedBrdicts is None:
+            return
+        for brid in brids:
+            self.unclaimedBrdicts.set_priority(brid, priority)
+        for brid in brids:
+            breq = self.breqCache.get(brid)
+            if breq is not None:
+                breq.priority = priority
+
 
 class BasicBuildChooser(BuildChooserBase):
     # BasicBuildChooser generates build pairs via the configuration points:
@@ -216,7 +380,9 @@ class BasicBuildChooser(BuildChooserBase):
             if not breq:
                 break
 
-            if not self.workerpool and not self.preferredWorkers:
+            # the workers chosen for the builds of the current batch are still available until
+            # these builds are started, so they must not be fetched again
+            if not self.workerpool and not self.preferredWorkers and not self.batchWorkers:
                 self.workerpool = self.bldr.getAvailableWorkers()
 
             #  2. pick a worker
@@ -268,9 +434,7 @@ class BasicBuildChooser(BuildChooserBase):
                 nextBreq = None
         else:
             # otherwise just return the build with highest priority
-            brdict = sorted(self.unclaimedBrdicts.data, key=lambda b: b['priority'], reverse=True)[
-                0
-            ]
+            brdict = self.unclaimedBrdicts.highest_priority()
             nextBreq = yield self._getBuildRequestForBrdict(brdict)
 
         return nextBreq
@@ -320,6 +484,12 @@ class BuildRequestDistributor(service.AsyncMultiService):
 
     BuildChooser = BasicBuildChooser
 
+    # maximum number of builds claimed and started together on a builder
+    MAX_BUILDS_PER_CLAIM = 100
+
+    # interval between the reloads of the builder queue statistics from the database, in seconds
+    QUEUE_STATS_RELOAD_INTERVAL = 300
+
     def __init__(self, botmaster):
         super().__init__()
         self.botmaster = botmaster
@@ -336,6 +506,20 @@ class BuildRequestDistributor(service.AsyncMultiService):
         self._deferwaiter = deferwaiter.DeferWaiter()
         self._activity_loop_deferred = None
 
+        # build choosers in use, by builder name
+        self._build_choosers = {}
+
+        # time at which builders were added to the pending builders, by builder name
+        self._pending_since = {}
+
+        # fired when the concurrent activity loop should look at the pending builders again
+        self._activity_wakeup = None
+
+        # statistics of the unclaimed build requests, used by the default builder sort
+        self._queue_stats = BuilderQueueStats()
+        self._buildrequests_consumer = None
+        self._queue_stats_reload = None
+
         # Use in Master clean shutdown
         # this flag will allow the distributor to still
         # start new builds if it has a parent waiting on it
@@ -345,8 +529,28 @@ class BuildRequestDistributor(service.AsyncMultiService):
     def can_distribute(self):
         return bool(self.running) or self.distribute_only_waited_childs
 
+    @defer.inlineCallbacks
+    def startService(self):
+        self._buildrequests_consumer = yield self.master.mq.startConsuming(
+            self._buildrequestEvent, ('buildrequests', None, None)
+        )
+        self._queue_stats_reload = task.LoopingCall(self._reloadQueueStats)
+        self._queue_stats_reload.clock = self.master.reactor
+        self._queue_stats_reload.start(self.QUEUE_STATS_RELOAD_INTERVAL, now=True)
+        yield super().startService()
+
     @defer.inlineCallbacks
     def stopService(self):
+        # without the events, the statistics would become stale
+        if self._buildrequests_consumer is not None:
+            self._buildrequests_consumer.stopConsuming()
+            self._buildrequests_consumer = None
+        if self._queue_stats_reload is not None:
+            if self._queue_stats_reload.running:
+                self._queue_stats_reload.stop()
+            self._queue_stats_reload = None
+        self._queue_stats.clear()
+
         # Lots of stuff happens asynchronously here, so we need to let it all
         # quiesce.  First, let the parent stopService succeed between
         # activities; then the loop will stop calling itself, since
@@ -397,14 +601,47 @@ class BuildRequestDistributor(service.AsyncMultiService):
                 self._pending_builders = await self._sortBuilders(
                     list(existing_pending | new_builder_set)
                 )
+                now = self.master.reactor.seconds()
+                for bldr_name in self._pending_builders:
+                    self._pending_since.setdefault(bldr_name, now)
 
                 # start the activity loop, if we aren't already
                 # working on that.
                 if not self.active:
                     self._activity_loop_deferred = defer.ensureDeferred(self._activityLoop())
+                else:
+                    self._wakeActivityLoop()
         except Exception:  # pragma: no cover
             log.err(Failure(), f"while attempting to start builds on {self.name}")
 
+    def _buildrequestEvent(self, key, msg):
+        if key[2] in ('new', 'unclaimed', 'claimed', 'complete'):
+            self._queue_stats.update(msg)
+        elif key[2] == 'update':
+            self._queue_stats.update_priority(msg)
+
+    @defer.inlineCallbacks
+    def _reloadQueueStats(self):
+        self._queue_stats.start_loading()
+        try:
+            brdicts = yield self.master.db.buildrequests.getBuildRequests(claimed=False)
+        except Exception:
+            self._queue_stats.abort_loading()
+            log.err(Failure(), "while loading the unclaimed build requests")
+            return
+        self._queue_stats.load(brdicts)
+
+    @defer.inlineCallbacks
+    def _getQueueStats(self, bldr):
+        # returns the highest priority and the oldest submission time of the unclaimed build
+        # requests of the builder, from the statistics once they are loaded
+        if self._queue_stats.loaded:
+            builderid = yield bldr.getBuilderId()
+            return self._queue_stats.get(builderid)
+        priority = yield bldr.get_highest_priority()
+        time = yield bldr.getOldestRequestTime()
+        return (priority, time)
+
     @defer.inlineCallbacks
     def _defaultSorter(self, master, builders):
         timer = metrics.Timer("BuildRequestDistributor._defaultSorter()")
@@ -412,13 +649,12 @@ class BuildRequestDistributor(service.AsyncMultiService):
 
         @defer.inlineCallbacks
         def key(bldr):
+            priority, time = yield self._getQueueStats(bldr)
             # Sort primarily highest priority of build requests
-            priority = yield bldr.get_highest_priority()
             if priority is None:
                 # for builders that do not have pending buildrequest, we just use large number
                 priority = -math.inf
             # Break ties using the time of oldest build request
-            time = yield bldr.getOldestRequestTime()
             if time is None:
                 # for builders that do not have pending buildrequest, we just use large number
                 time = math.inf
@@ -462,7 +698,16 @@ class BuildRequestDistributor(service.AsyncMultiService):
     async def _activityLoop(self) -> None:
         self.active = True
 
-        pending_builders: list[Builder] = []
+        concurrency = self.master.config.builderDistributionConcurrency
+        if concurrency > 1:
+            await self._concurrentActivityLoop(concurrency)
+        else:
+            await self._serialActivityLoop()
+
+        self.active = False
+
+    async def _serialActivityLoop(self) -> None:
+        pending_builders: list[str] = []
         while True:
             async with self.activity_lock:
                 if not self.can_distribute:
@@ -483,67 +728,231 @@ class BuildRequestDistributor(service.AsyncMultiService):
 
                 # get the actual builder object
                 bldr = self.botmaster.builders.get(bldr_name)
+                self._logPendingTime(bldr_name)
                 try:
                     if bldr:
-                        await self._maybeStartBuildsOnBuilder(bldr)
+                        await self._timedMaybeStartBuildsOnBuilder(bldr)
                 except Exception:
                     log.err(Failure(), f"from maybeStartBuild for builder '{bldr_name}'")
 
-        self.active = False
+    async def _concurrentActivityLoop(self, concurrency: int) -> None:
+        # Up to `concurrency` builders are distributed at the same time. Builders are started in
+        # the order of the pending builders, but a builder sharing a worker with a builder that
+        # is in progress, or with a builder before it that could not be started yet, has to
+        # wait: this keeps each worker chosen by one builder at a time, by order of priority.
+        pending_builders: list[str] = []
+        in_progress: dict[str, tuple[set[str], defer.Deferred]] = {}
+        while True:
+            self._activity_wakeup = defer.Deferred()
+            async with self.activity_lock:
+                if not self.can_distribute:
+                    break
+
+                async with self.pending_builders_lock:
+                    # the builders added meanwhile come after the ones already pending, as in
+                    # the serial loop
+                    pending_builders.extend(
+                        n for n in self._pending_builders if n not in pending_builders
+                    )
+                    self._pending_builders = []
+
+                if not pending_builders and not in_progress:
+                    break
+
+                for bldr, worker_names in self._popStartableBuilders(
+                    pending_builders, in_progress, concurrency
+                ):
+                    d = defer.ensureDeferred(self._concurrentMaybeStartBuildsOnBuilder(bldr))
+                    in_progress[bldr.name] = (worker_names, d)
+                    d.addBoth(self._concurrentBuilderDone, bldr.name, in_progress)
+                    self._deferwaiter.add(d)
+                metrics.MetricCountEvent.log(
+                    "BuildRequestDistributor.builders_in_progress", len(in_progress), absolute=True
+                )
+
+            # wait for a builder to be done, or for new pending builders
+            if in_progress:
+                await self._activity_wakeup
+
+        self._activity_wakeup = None
+        # do not let a new activity loop distribute the same builders
+        await defer.DeferredList([d for _, d in in_progress.values()])
+
+    def _popStartableBuilders(self, pending_builders, in_progress, concurrency):
+        busy_workers = set()
+        for worker_names, _ in in_progress.values():
+            busy_workers |= worker_names
+
+        startable = []
+        remaining = []
+        for bldr_name in pending_builders:
+            bldr = self.botmaster.builders.get(bldr_name)
+            if bldr is None:
+                self._pending_since.pop(bldr_name, None)
+                continue
+            worker_names = {wfb.worker.workername for wfb in bldr.workers if wfb.worker}
+            if (
+                len(in_progress) + len(startable) < concurrency
+                and bldr_name not in in_progress
+                and not worker_names & busy_workers
+            ):
+                self._logPendingTime(bldr_name)
+                startable.append((bldr, worker_names))
+            else:
+                remaining.append(bldr_name)
+            busy_workers |= worker_names
+
+        pending_builders[:] = remaining
+        return startable
+
+    async def _concurrentMaybeStartBuildsOnBuilder(self, bldr: Builder) -> None:
+        try:
+            await self._timedMaybeStartBuildsOnBuilder(bldr)
+        except Exception:
+            log.err(Failure(), f"from maybeStartBuild for builder '{bldr.name}'")
+
+    def _concurrentBuilderDone(self, res, bldr_name, in_progress):
+        del in_progress[bldr_name]
+        self._wakeActivityLoop()
+        return res
+
+    def _wakeActivityLoop(self):
+        if self._activity_wakeup is not None and not self._activity_wakeup.called:
+            self._activity_wakeup.callback(None)
+
+    def _logPendingTime(self, bldr_name):
+        # time spent by the builder waiting for the activity loop
+        pending_since = self._pending_since.pop(bldr_name, None)
+        if pending_since is not None:
+            metrics.MetricTimeEvent.log(
+                "BuildRequestDistributor.pending_builder_latency",
+                self.master.reactor.seconds() - pending_since,
+            )
+
+    async def _timedMaybeStartBuildsOnBuilder(self, bldr: Builder) -> None:
+        timer = metrics.Timer("BuildRequestDistributor._maybeStartBuildsOnBuilder()")
+        timer.start()
+        try:
+            await self._maybeStartBuildsOnBuilder(bldr)
+        finally:
+            timer.stop()
+
+    def set_build_requests_priority(self, brids, priority):
+        for bc in self._build_choosers.values():
+            bc.set_build_requests_priority(brids, priority)
 
     async def _maybeStartBuildsOnBuilder(self, bldr: Builder) -> None:
+        try:
+            await self._maybeStartBuildsOnBuilderWithChooser(bldr)
+        finally:
+            self._build_choosers.pop(bldr.name, None)
+
+    async def _maybeStartBuildsOnBuilderWithChooser(self, bldr: Builder) -> None:
         # create a chooser to give us our next builds
         # this object is temporary and will go away when we're done
-        bc = self.createBuildChooser(bldr, self.master)
+        bc = self._build_choosers[bldr.name] = self.createBuildChooser(bldr, self.master)
+
+        # the builds are chosen, claimed and started by batches, unless choosing a build depends
+        # on the builds started before it
+        max_builds = self.MAX_BUILDS_PER_CLAIM
+        assert bldr.config is not None
+        if bldr.config.locks or callable(bldr.config.canStartBuild):
+            max_builds = 1
 
         while True:
-            worker, breqs = await bc.chooseNextBuild()
-            if not worker or not breqs:
+            builds = await bc.chooseNextBuilds(max_builds)
+            if not builds:
                 break
 
             if self.distribute_only_waited_childs:
-                # parenting is a field of Buildset
-                # get the buildsets only for requests
-                # that are waited for
-                buildset_ids = set(br.bsid for br in breqs if br.waited_for)
-                if not buildset_ids:
-                    continue
-                # get buildsets if they have a parent
-                buildsets_data: list[dict] = await self.master.data.get(
-                    ('buildsets',),
-                    filters=[
-                        resultspec.Filter('bsid', 'in', buildset_ids),
-                        resultspec.Filter('parent_buildid', 'ne', [None]),
-                    ],
-                    fields=['bsid', 'parent_buildid'],
-                )
-                parented_buildset_ids = set(bs['bsid'] for bs in buildsets_data)
-                breqs = [br for br in breqs if br.bsid in parented_buildset_ids]
-                if not breqs:
+                builds = await self._filterWaitedChildBuilds(builds)
+                if not builds:
                     continue
 
-            # claim brid's
-            brids = [br.id for br in breqs]
-            claimed_at_epoch = self.master.reactor.seconds()
-            claimed_at = epoch2datetime(claimed_at_epoch)
+            builds, all_claimed = await self._claimBuilds(builds)
+            if not all_claimed:
+                # some brids were already claimed, so start over once the others are started
+                bc = self._build_choosers[bldr.name] = self.createBuildChooser(bldr, self.master)
+
+            # start the builds concurrently
+            results = await defer.DeferredList(
+                [
+                    defer.maybeDeferred(bldr.maybeStartBuild, worker, breqs)
+                    for worker, breqs in builds
+                ],
+                consumeErrors=True,
+            )
 
-            self._add_in_progress_brids(brids)
-            if not (
-                await self.master.data.updates.claimBuildRequests(brids, claimed_at=claimed_at)
-            ):
-                # some brids were already claimed, so start over
-                bc = self.createBuildChooser(bldr, self.master)
-                continue
+            failure = None
+            unstarted_brids: list[int] = []
+            for (_, breqs), (success, result) in zip(builds, results):
+                if not success:
+                    failure = failure or result
+                elif not result:
+                    unstarted_brids.extend(br.id for br in breqs)
 
-            buildStarted = await bldr.maybeStartBuild(worker, breqs)
-            if not buildStarted:
-                await self.master.data.updates.unclaimBuildRequests(brids)
-                self._remove_in_progress_brids(brids)
+            if unstarted_brids:
+                await self.master.data.updates.unclaimBuildRequests(unstarted_brids)
+                self._remove_in_progress_brids(unstarted_brids)
 
                 # try starting builds again.  If we still have a working worker,
                 # then this may re-claim the same buildrequests
                 self.botmaster.maybeStartBuildsForBuilder(self.name)
 
+            if failure is not None:
+                failure.raiseException()
+
+    async def _filterWaitedChildBuilds(self, builds):
+        # parenting is a field of Buildset
+        # get the buildsets only for requests
+        # that are waited for
+        buildset_ids = set(br.bsid for _, breqs in builds for br in breqs if br.waited_for)
+        if not buildset_ids:
+            return []
+        # get buildsets if they have a parent
+        buildsets_data: list[dict] = await self.master.data.get(
+            ('buildsets',),
+            filters=[
+                resultspec.Filter('bsid', 'in', buildset_ids),
+                resultspec.Filter('parent_buildid', 'ne', [None]),
+            ],
+            fields=['bsid', 'parent_buildid'],
+        )
+        parented_buildset_ids = set(bs['bsid'] for bs in buildsets_data)
+        filtered_builds = []
+        for worker, breqs in builds:
+            breqs = [br for br in breqs if br.bsid in parented_buildset_ids]
+            if breqs:
+                filtered_builds.append((worker, breqs))
+        return filtered_builds
+
+    async def _claimBuilds(self, builds):
+        """
+        Claim the brids of the given builds in a single call.  If some of them turn out to be
+        already claimed, the builds are claimed one by one so that only those conflicting are
+        dropped.  Returns the claimed builds, and whether all of them were claimed.
+        """
+        claimed_at = epoch2datetime(self.master.reactor.seconds())
+
+        brids = [br.id for _, breqs in builds for br in breqs]
+        self._add_in_progress_brids(brids)
+        if await self.master.data.updates.claimBuildRequests(brids, claimed_at=claimed_at):
+            return builds, True
+
+        claimed_builds = []
+        if len(builds) > 1:
+            for worker, breqs in builds:
+                build_brids = [br.id for br in breqs]
+                if await self.master.data.updates.claimBuildRequests(
+                    build_brids, claimed_at=claimed_at
+                ):
+                    claimed_builds.append((worker, breqs))
+                else:
+                    self._remove_in_progress_brids(build_brids)
+        else:
+            self._remove_in_progress_brids(brids)
+        return claimed_builds, False
+
     def _add_in_progress_brids(self, brids):
         for brid in brids:
             self.master.botmaster.add_in_progress_buildrequest(brid)
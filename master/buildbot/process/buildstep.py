@@ -45,6 +45,7 @@ from buildbot.db import model_config
 from buildbot.interfaces import IRenderable
 from buildbot.interfaces import WorkerSetupError
 from buildbot.process import log as plog
+from buildbot.process import metrics
 from buildbot.process import properties
 from buildbot.process import remotecommand
 from buildbot.process import results
@@ -535,7 +536,11 @@ class BuildStep(
 
                 # set up locks
                 if self._locks_to_acquire:
+                    locks_wait_start = self.master.reactor.seconds()
                     yield self.acquireLocks()
+                    metrics.MetricTimeEvent.log(
+                        "BuildStep.locks_wait", self.master.reactor.seconds() - locks_wait_start
+                    )
 
                     if self.stopped:
                         raise BuildStepCancelled
@@ -784,12 +789,18 @@ class BuildStep(
 
     def releaseLocks(self) -> None:
         log.msg(f"releaseLocks({self}): {self._locks_to_acquire}")
+        released = []
         for lock, access in self._locks_to_acquire:
             if lock.isOwner(self, access):
                 lock.release(self, access)
+                released.append(lock)
             else:
                 # This should only happen if we've been interrupted
                 assert self.stopped
+        if released:
+            # builders waiting for these locks may now start a build
+            assert self.master is not None
+            self.master.botmaster.maybeStartBuildsForLocks(released)
 
     # utility methods that BuildSteps may find useful
 
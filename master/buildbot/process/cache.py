@@ -35,8 +35,25 @@ class CacheManager(service.ReconfigurableServiceMixin, service.AsyncService):
         self.setName('caches')
         self.config = {}
         self._caches = {}
+        self._default_sizes = {}
+        # shared by all the AsyncLRUCache caches, see c['cachesMaxBytes']
+        self.memory_budget = lru.MemoryBudget()
 
-    def get_cache(self, cache_name, miss_fn):
+    @classmethod
+    def _get_limits(cls, cache_config, default_size=DEFAULT_CACHE_SIZE):
+        """
+        Returns the (max_size, max_bytes, ttl) of a cache from its configuration, which is either
+        a number of entries or a dictionary with the optional 'size', 'max_bytes' and 'ttl' keys.
+        """
+        if isinstance(cache_config, dict):
+            return (
+                cache_config.get('size', default_size),
+                cache_config.get('max_bytes'),
+                cache_config.get('ttl'),
+            )
+        return cache_config, None, None
+
+    def get_cache(self, cache_name, miss_fn, size_fn=None, default_size=DEFAULT_CACHE_SIZE):
         """
         Get an L{AsyncLRUCache} object with the given name.  If such an object
         does not exist, it will be created.  Since the cache is permanent, this
@@ -47,25 +64,92 @@ class CacheManager(service.ReconfigurableServiceMixin, service.AsyncService):
         object it stores)
         @param miss_fn: miss function for the cache; see L{AsyncLRUCache}
         constructor.
+        @param size_fn: function estimating the size in bytes of the cached
+        objects, when the cache is bounded in bytes; see L{lru.approximate_size}
+        @param default_size: size of the cache when it is not configured
         @returns: L{AsyncLRUCache} instance
         """
         try:
             return self._caches[cache_name]
         except KeyError:
-            max_size = self.config.get(cache_name, self.DEFAULT_CACHE_SIZE)
+            self._default_sizes[cache_name] = default_size
+            max_size, max_bytes, ttl = self._get_limits(
+                self.config.get(cache_name, default_size), default_size
+            )
             assert max_size >= 1
-            c = self._caches[cache_name] = lru.AsyncLRUCache(miss_fn, max_size)
+            c = self._caches[cache_name] = lru.AsyncLRUCache(
+                miss_fn,
+                max_size,
+                max_bytes=max_bytes,
+                size_fn=size_fn,
+                ttl=ttl,
+                budget=self.memory_budget,
+            )
             return c
 
+    def register_cache(self, cache_name, cache, default_size=DEFAULT_CACHE_SIZE):
+        """
+        Register a cache which is not an L{AsyncLRUCache}, so that its size is
+        configured and its metrics reported along with the other caches.  Such
+        caches are only bounded by their number of entries.
+
+        @param cache_name: name of the cache
+        @param cache: the cache; it must have C{hits}, C{refhits}, C{misses}
+        and C{max_size} attributes, and a C{set_max_size} method.
+        @param default_size: size of the cache when it is not configured
+        @returns: the cache
+        """
+        self._caches[cache_name] = cache
+        self._default_sizes[cache_name] = default_size
+        max_size, _, _ = self._get_limits(self.config.get(cache_name, default_size), default_size)
+        cache.set_max_size(max_size)
+        return cache
+
+    def remove_cache(self, cache_name):
+        """
+        Forget the cache with the given name, and all its entries, e.g. when it
+        is no longer configured.  A later L{get_cache} creates a new cache.
+
+        @param cache_name: name of the cache
+        """
+        cache = self._caches.pop(cache_name, None)
+        self._default_sizes.pop(cache_name, None)
+        if isinstance(cache, lru.LRUCache):
+            cache.clear()
+            if cache.budget is not None:
+                cache.budget.caches.remove(cache)
+                cache.budget = None
+
     def reconfigServiceWithBuildbotConfig(self, new_config):
         self.config = new_config.caches
+        self.memory_budget.max_bytes = new_config.cachesMaxBytes
         for name, cache in self._caches.items():
-            cache.set_max_size(new_config.caches.get(name, self.DEFAULT_CACHE_SIZE))
+            default_size = self._default_sizes.get(name, self.DEFAULT_CACHE_SIZE)
+            max_size, max_bytes, ttl = self._get_limits(
+                new_config.caches.get(name, default_size), default_size
+            )
+            cache.set_max_size(max_size)
+            if isinstance(cache, lru.LRUCache):
+                cache.set_limits(max_bytes, ttl)
 
         return super().reconfigServiceWithBuildbotConfig(new_config)
 
     def get_metrics(self):
-        return {
-            n: {'hits': c.hits, 'refhits': c.refhits, 'misses': c.misses, 'max_size': c.max_size}
-            for n, c in self._caches.items()
-        }
+        metrics = {}
+        for n, c in self._caches.items():
+            metric = metrics[n] = {
+                'hits': c.hits,
+                'refhits': c.refhits,
+                'misses': c.misses,
+                'max_size': c.max_size,
+            }
+            if isinstance(c, lru.LRUCache):
+                metric.update({
+                    'size': len(c.cache),
+                    'evictions': c.evictions,
+                    'expirations': c.expirations,
+                    'bytes': c.total_bytes if c.sizes is not None else None,
+                    'max_bytes': c.max_bytes,
+                    'ttl': c.ttl,
+                })
+        return metrics
@@ -65,6 +65,10 @@ class Properties(util.ComparableMixin):
         self.runtime = set()
         self.build = None  # will be set by the Build when starting
         self._used_secrets = {}
+        # incremented on each change of the properties, see render()
+        self._version = 0
+        # id(renderable) -> (renderable, version, rendering)
+        self._render_cache = {}
         if kwargs:
             self.update(kwargs, "TEST")
         self._master = None
@@ -131,12 +135,16 @@ class Properties(util.ComparableMixin):
     def __getstate__(self):
         d = self.__dict__.copy()
         d['build'] = None
+        d['_render_cache'] = {}
         return d
 
     def __setstate__(self, d):
         self.__dict__ = d
         if not hasattr(self, 'runtime'):
             self.runtime = set()
+        if not hasattr(self, '_render_cache'):
+            self._version = 0
+            self._render_cache = {}
 
     def __contains__(self, name):
         return name in self.properties
@@ -174,6 +182,7 @@ class Properties(util.ComparableMixin):
         """Update this object based on another object; the other object's"""
         self.properties.update(other.properties)
         self.runtime.update(other.runtime)
+        self._version += 1
 
     def updateFromPropertiesNoRuntime(self, other):
         """Update this object based on another object, but don't
@@ -181,6 +190,7 @@ class Properties(util.ComparableMixin):
         for k, v in other.properties.items():
             if k not in other.runtime:
                 self.properties[k] = v
+        self._version += 1
 
     # IProperties methods
 
@@ -201,6 +211,7 @@ class Properties(util.ComparableMixin):
         self.properties[name] = (value, source)
         if runtime:
             self.runtime.add(name)
+        self._version += 1
 
     def getProperties(self):
         return self
@@ -209,9 +220,33 @@ class Properties(util.ComparableMixin):
         return self.build
 
     def render(self, value):
+        if type(value) in _RENDER_CACHEABLE_TYPES:
+            # the renderables which only depend on the properties are rendered again only when
+            # the properties change, which is much cheaper for the steps of big factories
+            cached = self._render_cache.get(id(value))
+            if cached is not None and cached[0] is value and cached[1] == self._version:
+                return defer.succeed(cached[2])
+            return self._render_and_cache(value)
+
         renderable = IRenderable(value)
         return defer.maybeDeferred(renderable.getRenderingFor, self)
 
+    def _render_and_cache(self, value):
+        version = self._version
+        d = defer.maybeDeferred(value.getRenderingFor, self)
+
+        @d.addCallback
+        def store(rendering):
+            if (
+                self._version == version
+                and isinstance(rendering, _IMMUTABLE_TYPES)
+                and _renders_static_properties(value, self)
+            ):
+                self._render_cache[id(value)] = (value, version, rendering)
+            return rendering
+
+        return d
+
     # as the secrets are used in the renderable, they can pretty much arrive anywhere
     # in the log of state strings
     # so we have the renderable record here which secrets are used that we must remove
@@ -451,6 +486,31 @@ class WithProperties(util.ComparableMixin):
             s = self.fmtstring % pmap
         return s
 
+    def _getRenderPropertyNames(self):
+        if self.args:
+            keys = self.args
+        elif self.lambda_subs:
+            # the lambda substitutions are called with the build
+            return None
+        else:
+            try:
+                keys = _getInterpolationList(self.fmtstring)
+            except (TypeError, ValueError):
+                return None
+        names = []
+        for key in keys:
+            for regexp in (
+                _PropertyMap.colon_minus_re,
+                _PropertyMap.colon_tilde_re,
+                _PropertyMap.colon_plus_re,
+            ):
+                mo = regexp.match(key)
+                if mo:
+                    key = mo.group(1)
+                    break
+            names.append(key)
+        return tuple(names)
+
 
 class _NotHasKey(util.ComparableMixin):
     """A marker for missing ``hasKey`` parameter.
@@ -815,6 +875,17 @@ class Interpolate(RenderableOperatorsMixin, util.ComparableMixin):
             res = yield props.render(self.interpolations)
             return self.fmtstring % res
 
+    def _getRenderPropertyNames(self):
+        if self.args:
+            return _render_property_names(self.args)
+        names = ()
+        for lookup in self.interpolations.values():
+            lookup_names = _lookup_property_names(lookup) if isinstance(lookup, _Lookup) else None
+            if lookup_names is None:
+                return None
+            names += lookup_names
+        return names
+
 
 @implementer(IRenderable)
 class Property(RenderableOperatorsMixin, util.ComparableMixin):
@@ -855,6 +926,12 @@ class Property(RenderableOperatorsMixin, util.ComparableMixin):
             return props.render(props.getProperty(self.key))
         return props.render(self.default)
 
+    def _getRenderPropertyNames(self):
+        names = _render_property_names(self.default)
+        if names is None:
+            return None
+        return (self.key, *names)
+
 
 @implementer(IRenderable)
 class FlattenList(RenderableOperatorsMixin, util.ComparableMixin):
@@ -1011,3 +1088,67 @@ class Transform:
         rargs = yield iprops.render(self._args)
         rkwargs = yield iprops.render(self._kwargs)
         return rfunction(*rargs, **rkwargs)
+
+
+# renderings which can be shared between the callers of Properties.render
+_IMMUTABLE_TYPES = (str, bytes, int, float, type(None))
+
+
+def _render_property_names(value):
+    """
+    Returns the names of the properties that the rendering of value depends on, or None if it may
+    depend on something else (secrets, workers, source stamps, functions...) and can not be
+    cached.
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return ()
+    if isinstance(value, (list, tuple)):
+        items = value
+    elif isinstance(value, dict):
+        items = [*value.keys(), *value.values()]
+    elif type(value) in _RENDER_CACHEABLE_TYPES:
+        names = value.__dict__.get('_render_property_names', _notHasKey)
+        if names is _notHasKey:
+            names = value._render_property_names = value._getRenderPropertyNames()
+        return names
+    else:
+        return None
+
+    names = []
+    for item in items:
+        item_names = _render_property_names(item)
+        if item_names is None:
+            return None
+        names.extend(item_names)
+    return tuple(names)
+
+
+def _renders_static_properties(value, props):
+    names = _render_property_names(value)
+    # the property values which are renderables, or could be modified in place, are excluded
+    return names is not None and all(
+        isinstance(props.getProperty(name), _IMMUTABLE_TYPES) for name in names
+    )
+
+
+def _lookup_property_names(lookup):
+    # the properties used by an Interpolate substitution, see Interpolate._parse
+    if lookup.value is _thePropertyDict:
+        names = (lookup.index,)
+    elif isinstance(lookup.value, _Lazy):
+        names = _render_property_names(lookup.value.value.get(lookup.index))
+    else:
+        return None
+
+    for nested in (lookup.default, lookup.hasKey, lookup.elideNoneAs):
+        if nested == _notHasKey:
+            continue
+        nested_names = _render_property_names(nested)
+        if names is None or nested_names is None:
+            return None
+        names += nested_names
+    return names
+
+
+# the renderables whose rendering is cached by Properties.render, subclasses may depend on anything
+_RENDER_CACHEABLE_TYPES = (Interpolate, Property, WithProperties)
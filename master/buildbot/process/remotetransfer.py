@@ -21,8 +21,17 @@ import os
 import shutil
 import tarfile
 import tempfile
+import threading
+from collections import deque
 from io import BytesIO
 
+from twisted.internet import defer
+from twisted.internet import reactor
+from twisted.internet import threads
+from twisted.python.threadpool import ThreadPool
+
+from buildbot.db.compression import LZ4Compressor
+from buildbot.db.compression import ZStdCompressor
 from buildbot.util import bytes2unicode
 from buildbot.util import unicode2bytes
 from buildbot.worker.protocols import base
@@ -96,46 +105,199 @@ class FileWriter(base.FileWriterImpl):
             os.unlink(self.tmpname)
 
 
-class DirectoryWriter(FileWriter):
+class _ArchiveStream:
+    """
+    File-like object fed with the archive data received from the worker and read
+    by the thread unpacking it. All methods except read() and abort() are called
+    from the reactor.
+    """
+
+    def __init__(self, max_pending_size, decompress_obj=None):
+        self._cond = threading.Condition()
+        self._blocks = deque()
+        self._buffer = bytearray()
+        self._decompress_obj = decompress_obj
+        self._max_pending_size = max_pending_size
+        self.pending_size = 0
+        # fired from the reading thread once the pending size is back under the limit
+        self._room_waiter = None
+        self._eof = False
+        self._closed = False
+
+    def feed(self, data):
+        with self._cond:
+            if self._closed:
+                return
+            self._blocks.append(data)
+            self.pending_size += len(data)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    def abort(self):
+        with self._cond:
+            self._closed = True
+            self._blocks.clear()
+            self.pending_size = 0
+            self._cond.notify_all()
+            self._notify_room()
+
+    def wait_for_room(self):
+        with self._cond:
+            if self._closed or self.pending_size <= self._max_pending_size:
+                return defer.succeed(None)
+            if self._room_waiter is None:
+                self._room_waiter = defer.Deferred()
+            return self._room_waiter
+
+    def _notify_room(self):
+        # called with the lock held
+        if self._room_waiter is not None:
+            d, self._room_waiter = self._room_waiter, None
+            reactor.callFromThread(d.callback, None)
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._eof or self._blocks)
+                if self._closed:
+                    raise _TransferAborted()
+                if not self._blocks:
+                    break
+                data = self._blocks.popleft()
+                self.pending_size -= len(data)
+                if self.pending_size <= self._max_pending_size:
+                    self._notify_room()
+            if self._decompress_obj is not None:
+                data = self._decompress_obj.decompress(data)
+            self._buffer += data
+
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class _TransferAborted(Exception):
+    pass
+
+
+class DirectoryWriter(base.FileWriterImpl):
     """
-    A DirectoryWriter is implemented as a FileWriter, with an added post-processing
-    step to unpack the archive, once the transfer has completed.
+    A DirectoryWriter unpacks the archive sent by the worker as it is received,
+    without storing it in a temporary file first.
     """
 
+    # amount of received data waiting to be unpacked above which writes are
+    # delayed, so that a fast worker can not fill up the master memory
+    MAX_PENDING_SIZE = 4 * 1024 * 1024
+    # archives unpacked at the same time, the next uploads wait for a thread
+    MAX_UNPACK_THREADS = 16
+    _unpack_pool = None
+
+    @classmethod
+    def _get_unpack_pool(cls):
+        if DirectoryWriter._unpack_pool is None:
+            pool = DirectoryWriter._unpack_pool = ThreadPool(
+                minthreads=0, maxthreads=cls.MAX_UNPACK_THREADS, name='DirectoryWriter'
+            )
+            # unclosed ThreadPool leads to reactor hangs at shutdown. The reactor
+            # may be run again afterwards (e.g. by trial), the next upload then
+            # starts a new pool
+            reactor.addSystemEventTrigger("after", "shutdown", cls._stop_unpack_pool)
+            pool.start()
+        return DirectoryWriter._unpack_pool
+
+    @staticmethod
+    def _stop_unpack_pool():
+        pool = DirectoryWriter._unpack_pool
+        DirectoryWriter._unpack_pool = None
+        if pool is not None:
+            pool.stop()
+
     def __init__(self, destroot, maxsize, compress, mode):
         self.destroot = destroot
         self.compress = compress
+        self.remaining = maxsize
 
-        self.fd, self.tarname = tempfile.mkstemp(prefix='buildbot-transfer-')
-        os.close(self.fd)
+        # Map configured compression to a TarFile setting, zstd and lz4 are
+        # not supported by tarfile and decompressed before it reads them
+        decompress_obj = None
+        if self.compress == 'bz2':
+            tar_mode = 'r|bz2'
+        elif self.compress == 'gz':
+            tar_mode = 'r|gz'
+        else:
+            tar_mode = 'r|'
+            if self.compress == 'zstd':
+                decompress_obj = ZStdCompressor.DecompressObj()
+            elif self.compress == 'lz4':
+                decompress_obj = LZ4Compressor.DecompressObj()
+
+        self._stream = _ArchiveStream(self.MAX_PENDING_SIZE, decompress_obj)
+        self._unpack_error = None
+        self._unpacked = threads.deferToThreadPool(
+            reactor, self._get_unpack_pool(), self._unpack, tar_mode
+        )
+
+    def _unpack(self, tar_mode):
+        try:
+            with tarfile.open(fileobj=self._stream, mode=tar_mode) as archive:
+                if hasattr(tarfile, 'data_filter'):
+                    archive.extractall(path=self.destroot, filter='data')
+                else:
+                    archive.extractall(path=self.destroot)
+        except Exception as e:
+            self._unpack_error = e
+        finally:
+            # the end of the archive may not be read, make sure the worker
+            # is not left waiting on it
+            self._stream.abort()
 
-        super().__init__(self.tarname, maxsize, mode)
+    def remote_write(self, data):
+        """
+        Called from remote worker to write L{data} to the archive within
+        boundaries of L{maxsize}
 
+        @type  data: C{string}
+        @param data: String of data to write
+        """
+        data = unicode2bytes(data)
+        if self.remaining is not None:
+            if len(data) > self.remaining:
+                data = data[: self.remaining]
+            self.remaining = self.remaining - len(data)
+        self._stream.feed(data)
+
+        if self._stream.pending_size > self.MAX_PENDING_SIZE:
+            return self._stream.wait_for_room()
+        return None
+
+    @defer.inlineCallbacks
     def remote_unpack(self):
         """
         Called by remote worker to state that no more data will be transferred
         """
-        # Make sure remote_close is called, otherwise atomic rename won't happen
-        self.remote_close()
-
-        # Map configured compression to a TarFile setting
-        if self.compress == 'bz2':
-            mode = 'r|bz2'
-        elif self.compress == 'gz':
-            mode = 'r|gz'
-        else:
-            mode = 'r'
+        self._stream.close()
+        yield self._unpacked
+        if self._unpack_error is not None:
+            raise self._unpack_error
 
-        # Unpack archive and clean up after self
-        with tarfile.open(name=self.tarname, mode=mode) as archive:
-            if hasattr(tarfile, 'data_filter'):
-                archive.extractall(path=self.destroot, filter='data')
-            else:
-                archive.extractall(path=self.destroot)
-        os.remove(self.tarname)
+    def cancel(self):
+        """
+        Stops the unpacking, returns a Deferred firing once the unpacking thread
+        does not write to destroot anymore.
+        """
+        self._stream.abort()
+        d = defer.Deferred()
+        self._unpacked.addBoth(lambda _: d.callback(None))
+        return d
 
     def purge(self):
-        super().purge()
         if os.path.isdir(self.destroot):
             shutil.rmtree(self.destroot)
 
@@ -16,7 +16,6 @@
 from __future__ import annotations
 
 import dataclasses
-from collections import UserList
 from typing import TYPE_CHECKING
 
 from twisted.internet import defer
@@ -25,7 +24,6 @@ from twisted.python import log
 from buildbot.data import resultspec
 from buildbot.process.properties import renderer
 from buildbot.process.results import RETRY
-from buildbot.util import flatten
 
 if TYPE_CHECKING:
     from buildbot.db.buildrequests import BuildRequestModel
@@ -33,12 +31,17 @@ if TYPE_CHECKING:
 
 @defer.inlineCallbacks
 def getPreviousBuild(master, build):
+    prev = yield _get_previous_build(master, build['builderid'], build['number'] - 1)
+    return prev
+
+
+@defer.inlineCallbacks
+def _get_previous_build(master, builderid, n):
     # naive n-1 algorithm. Still need to define what we should skip
     # SKIP builds? forced builds? rebuilds?
     # don't hesitate to contribute improvements to that algorithm
-    n = build['number'] - 1
     while n >= 0:
-        prev = yield master.data.get(("builders", build['builderid'], "builds", n))
+        prev = yield master.data.get(("builders", builderid, "builds", n))
 
         if prev and prev['results'] != RETRY:
             return prev
@@ -46,6 +49,36 @@ def getPreviousBuild(master, build):
     return None
 
 
+@defer.inlineCallbacks
+def get_previous_builds(master, builds):
+    # the n-1 build of each build is fetched with one query per builder; walking back one
+    # build at a time is only needed when that build has been retried or does not exist
+    numbers_by_builder = {}
+    for build in builds:
+        if build['number'] > 0:
+            numbers_by_builder.setdefault(build['builderid'], set()).add(build['number'] - 1)
+
+    builder_builds = yield defer.gatherResults(
+        [
+            master.data.get(
+                ("builders", builderid, "builds"),
+                filters=[resultspec.Filter('number', 'in', sorted(numbers))],
+            )
+            for builderid, numbers in numbers_by_builder.items()
+        ],
+        consumeErrors=True,
+    )
+    candidates = {(b['builderid'], b['number']): b for bl in builder_builds for b in bl}
+
+    prev_builds = []
+    for build in builds:
+        prev = candidates.get((build['builderid'], build['number'] - 1))
+        if prev is None or prev['results'] == RETRY:
+            prev = yield _get_previous_build(master, build['builderid'], build['number'] - 2)
+        prev_builds.append(prev)
+    return prev_builds
+
+
 @defer.inlineCallbacks
 def getDetailsForBuildset(
     master,
@@ -70,11 +103,14 @@ def getDetailsForBuildset(
         ),
     ]
     (buildset, breqs) = yield defer.gatherResults(dl, consumeErrors=True)
-    # next, get the bdictlist for each build request
-    dl = [master.data.get(("buildrequests", breq['buildrequestid'], 'builds')) for breq in breqs]
-
-    builds = yield defer.gatherResults(dl, consumeErrors=True)
-    builds = flatten(builds, types=(list, UserList))
+    # next, get the builds of all build requests at once
+    builds = []
+    if breqs:
+        breq_order = {breq['buildrequestid']: i for i, breq in enumerate(breqs)}
+        builds = yield master.data.get(
+            ('builds',), filters=[resultspec.Filter('buildrequestid', 'in', list(breq_order))]
+        )
+        builds = sorted(builds, key=lambda b: (breq_order[b['buildrequestid']], b['buildid']))
     if builds:
         yield getDetailsForBuilds(
             master,
@@ -177,18 +213,23 @@ def getDetailsForBuilds(
 
     buildersbyid = {builder['builderid']: builder for builder in builders}
 
+    buildids = [build['buildid'] for build in builds]
+
     if want_properties:
-        buildproperties = yield defer.gatherResults(
-            [master.data.get(("builds", build['buildid'], 'properties')) for build in builds],
-            consumeErrors=True,
+        builds_with_props = yield master.data.get_with_resultspec(
+            ('builds',),
+            resultspec.ResultSpec(
+                filters=[resultspec.Filter('buildid', 'in', buildids)],
+                properties=[resultspec.Property(b'property', 'eq', ['*'])],
+            ),
         )
+        props_by_buildid = {b['buildid']: b['properties'] for b in builds_with_props}
+        buildproperties = [props_by_buildid.get(buildid, {}) for buildid in buildids]
     else:  # we still need a list for the big zip
         buildproperties = list(range(len(builds)))
 
     if want_previous_build:
-        prev_builds = yield defer.gatherResults(
-            [getPreviousBuild(master, build) for build in builds], consumeErrors=True
-        )
+        prev_builds = yield get_previous_builds(master, builds)
     else:  # we still need a list for the big zip
         prev_builds = list(range(len(builds)))
 
@@ -204,16 +245,28 @@ def getDetailsForBuilds(
     if want_logs:
         want_steps = True
 
-    if want_steps:  # pylint: disable=too-many-nested-blocks
-        buildsteps = yield defer.gatherResults(
-            [master.data.get(("builds", build['buildid'], 'steps')) for build in builds],
-            consumeErrors=True,
+    if want_steps:
+        # steps, and logs if needed, of all builds are fetched with a single query each
+        steps = yield master.data.get(
+            ('steps',), filters=[resultspec.Filter('buildid', 'eq', buildids)]
         )
+        steps_by_buildid = {buildid: [] for buildid in buildids}
+        for s in steps:
+            steps_by_buildid[s['buildid']].append(s)
+        buildsteps = [steps_by_buildid[buildid] for buildid in buildids]
+
         if want_logs:
+            logs_by_stepid = {s['stepid']: [] for s in steps}
+            if logs_by_stepid:
+                logs = yield master.data.get(
+                    ('logs',), filters=[resultspec.Filter('stepid', 'eq', list(logs_by_stepid))]
+                )
+                for l in logs:
+                    logs_by_stepid[l['stepid']].append(l)
+
             for build, build_steps in zip(builds, buildsteps):
                 for s in build_steps:
-                    logs = yield master.data.get(("steps", s['stepid'], 'logs'))
-                    s['logs'] = list(logs)
+                    s['logs'] = logs_by_stepid[s['stepid']]
                     for l in s['logs']:
                         l['stepname'] = s['name']
                         l['url'] = get_url_for_log(
@@ -16,11 +16,14 @@
 from __future__ import annotations
 
 import os
+import time
 from typing import TYPE_CHECKING
 
+import sqlalchemy as sa
 from twisted.internet import defer
 
 from buildbot import config as config_module
+from buildbot.db.logs import LogsConnectorComponent
 from buildbot.master import BuildMaster
 from buildbot.scripts import base
 from buildbot.util import in_reactor
@@ -29,24 +32,116 @@ if TYPE_CHECKING:
     from sqlalchemy.engine import Connection
 
 
+CURSOR_FILE = 'cleanupdb.cursor'
+
+
+def _read_cursor(path: str) -> int:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_cursor(path: str, logid: int) -> None:
+    # write then rename, so that an interruption does not leave a corrupted cursor
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(f"{logid}\n")
+    os.replace(path + '.tmp', path)
+
+
+async def _compress_logs(config, master: BuildMaster, cursor_path: str) -> None:
+    """
+    Recompresses the logs in batches of increasing ids, several of them at once. The id of the
+    last log of each processed batch is saved in cursor_path, so that an interrupted cleanup can
+    be resumed.
+    """
+    db = master.db
+    logs_tbl = db.model.logs
+    chunks_tbl = db.model.logchunks
+
+    last_logid = _read_cursor(cursor_path) if config['resume'] else 0
+    if last_logid and not config['quiet']:
+        print(f"resuming after log {last_logid}")
+
+    def thd_count_logs(conn: Connection) -> int:
+        q = sa.select(sa.func.count(logs_tbl.c.id)).where(logs_tbl.c.id > last_logid)
+        return conn.execute(q).scalar_one()
+
+    def thd_get_batch(conn: Connection, after_logid: int) -> list[tuple[int, int, int]]:
+        # (logid, number of chunks, size of the chunks) of the next logs
+        q = (
+            sa.select(
+                logs_tbl.c.id,
+                sa.func.count(chunks_tbl.c.logid),
+                sa.func.coalesce(sa.func.sum(sa.func.length(chunks_tbl.c.content)), 0),
+            )
+            .select_from(logs_tbl.outerjoin(chunks_tbl, chunks_tbl.c.logid == logs_tbl.c.id))
+            .where(logs_tbl.c.id > after_logid)
+            .group_by(logs_tbl.c.id)
+            .order_by(logs_tbl.c.id)
+            .limit(config['batch-size'])
+        )
+        return [tuple(row) for row in conn.execute(q)]
+
+    jobs = config['jobs'] or db.logs.compression_jobs
+    sem = defer.DeferredSemaphore(jobs)
+    force = config['force'] or config['compression'] is not None
+
+    total_logs = await db.pool.do(thd_count_logs)
+    done_logs = 0
+    percent = 0
+    while batch := await db.pool.do(thd_get_batch, last_logid):
+        start = time.monotonic()
+        batch_rows = sum(num_chunks for _, num_chunks, _ in batch)
+        batch_size = sum(size for _, _, size in batch)
+
+        try:
+            saved = await defer.gatherResults(
+                [
+                    sem.run(db.logs.compressLog, logid, force=force)
+                    for logid, num_chunks, _ in batch
+                    # logs without chunks (e.g. deleted by the janitor) have nothing to compress
+                    if num_chunks
+                ],
+                consumeErrors=True,
+            )
+        except defer.FirstError as e:
+            raise e.subFailure.value from e
+
+        last_logid = batch[-1][0]
+        _write_cursor(cursor_path, last_logid)
+
+        done_logs += len(batch)
+        if not config['quiet'] and percent != int(done_logs * 100 / total_logs):
+            percent = int(done_logs * 100 / total_logs)
+            elapsed = max(time.monotonic() - start, 1e-6)
+            print(
+                f" {percent}%  {sum(saved)} saved, "
+                f"{batch_size / elapsed / 1e6:.1f} MB/s, {batch_rows / elapsed:.0f} rows/s",
+                flush=True,
+            )
+
+    # the cleanup is complete, the next one starts over
+    if os.path.exists(cursor_path):
+        os.remove(cursor_path)
+
+
 async def doCleanupDatabase(config, master_cfg) -> None:
     if not config['quiet']:
         print(f"cleaning database ({master_cfg.db.db_url})")
 
+    if config['compression'] is not None:
+        # switch the logs to another compression method, as if it was configured
+        master_cfg.logCompressionMethod = config['compression']
+
     master = BuildMaster(config['basedir'])
     master.config = master_cfg
     db = master.db
     try:
         await db.setup(check_version=False, verbose=not config['quiet'])
-        res = await db.logs.getLogs()
-        percent = 0
-        saved = 0
-        for i, log in enumerate(res, start=1):
-            saved += await db.logs.compressLog(log.id, force=config['force'])
-            if not config['quiet'] and percent != int(i * 100 / len(res)):
-                percent = int(i * 100 / len(res))
-                print(f" {percent}%  {saved} saved", flush=True)
-                saved = 0
+        db.logs.start_compression_pool()
+        await _compress_logs(config, master, os.path.join(config['basedir'], CURSOR_FILE))
 
         assert master.db._engine is not None
         vacuum_stmt = {
@@ -73,6 +168,7 @@ async def doCleanupDatabase(config, master_cfg) -> None:
 
             await db.pool.do(thd)
     finally:
+        db.logs.stop_compression_pool()
         await db.pool.stop()
 
 
@@ -107,6 +203,21 @@ async def _cleanupDatabase(config) -> int:
         if not master_cfg:
             return 1
 
+        if config['compression'] is not None:
+            compression = LogsConnectorComponent.COMPRESSION_MODE.get(config['compression'])
+            if compression is None:
+                print(
+                    f"Unknown log compression method '{config['compression']}', "
+                    f"expected one of: {', '.join(LogsConnectorComponent.COMPRESSION_MODE)}"
+                )
+                return 1
+            if not compression[1].available:
+                print(
+                    f"Log compression method '{config['compression']}' is not available. "
+                    "You might be missing a dependency."
+                )
+                return 1
+
         await doCleanupDatabase(config, master_cfg)
 
         if not config['quiet']:
@@ -727,10 +727,27 @@ class CleanupDBOptions(base.BasedirMixin, base.SubcommandOptions):
     optFlags = [
         ["quiet", "q", "Do not emit the commands being run"],
         ["force", "f", "Force log recompression (useful when changing compression algorithm)"],
+        ["resume", "r", "Resume an interrupted log recompression after the last processed log"],
         # when this command has several maintenance jobs, we should make
         # them optional here. For now there is only one.
     ]
-    optParameters: list[tuple[str, str | None, Any, str]] = []
+    optParameters = [
+        [
+            "jobs",
+            "j",
+            None,
+            "Number of logs recompressed concurrently (default: half the number of CPUs)",
+            int,
+        ],
+        ["batch-size", None, 1000, "Number of logs fetched from the database at once", int],
+        [
+            "compression",
+            None,
+            None,
+            "Recompress all the logs with this compression method, e.g. zstd "
+            "(default: the configured logCompressionMethod)",
+        ],
+    ]
 
     def getSynopsis(self):
         return "Usage:    buildbot cleanupdb [options] [<basedir>]"
@@ -744,6 +761,10 @@ class CleanupDBOptions(base.BasedirMixin, base.SubcommandOptions):
     - optimiselogs: This optimization groups logs into bigger chunks
       to apply higher level of compression.
 
+    The logs are processed in batches, several of them at once (see --jobs).
+    The progress is saved in the cleanupdb.cursor file of the master
+    directory: an interrupted cleanup can be resumed with --resume.
+
     This command uses the database specified in
     the master configuration file.  If you wish to use a database other than
     the default (sqlite), be sure to set that parameter before upgrading.
@@ -20,6 +20,7 @@ from __future__ import annotations
 
 from twisted.internet import defer
 
+from buildbot.process import metrics
 from buildbot.secrets.providers.base import SecretProviderBase
 from buildbot.secrets.secret import SecretDetails
 from buildbot.util import service
@@ -28,10 +29,20 @@ from buildbot.util import service
 class SecretManager(service.BuildbotServiceManager):
     """
     Secret manager
+
+    The secrets found by the providers are kept in memory only when the 'secrets' cache is
+    configured in c['caches'], usually with a ttl so that changed secrets are eventually seen,
+    e.g. c['caches'] = {'secrets': {'size': 100, 'ttl': 300}}. The cache is emptied on each
+    reconfig, and dropped when it is no longer configured.
     """
 
     name: str | None = 'secrets'
     config_attr = "secretsProviders"
+    cache_name = 'secrets'
+
+    def __init__(self):
+        super().__init__()
+        self._cache = None
 
     @defer.inlineCallbacks
     def setup(self):
@@ -43,6 +54,22 @@ class SecretManager(service.BuildbotServiceManager):
             yield child.configureService()
 
     @defer.inlineCallbacks
+    def reconfigServiceWithBuildbotConfig(self, new_config):
+        yield super().reconfigServiceWithBuildbotConfig(new_config)
+
+        if self.cache_name in new_config.caches:
+            if self._cache is None:
+                self._cache = self.master.caches.get_cache(
+                    self.cache_name, self._get_from_providers
+                )
+            else:
+                # the providers, or their configuration, may have changed
+                self._cache.clear()
+        elif self._cache is not None:
+            # do not keep the secrets in memory once the cache is no longer configured
+            self.master.caches.remove_cache(self.cache_name)
+            self._cache = None
+
     def get(self, secret, *args, **kwargs):
         """
         get secrets from the provider defined in the secret using args and
@@ -51,9 +78,20 @@ class SecretManager(service.BuildbotServiceManager):
         @type: string
         @return type: SecretDetails
         """
+        if self._cache is not None:
+            return self._cache.get(secret)
+        return self._get_from_providers(secret)
+
+    @defer.inlineCallbacks
+    def _get_from_providers(self, secret):
         for provider in self.services:
-            value = yield provider.get(secret)
             source_name = provider.__class__.__name__
+            timer = metrics.Timer(f"{source_name}.get()")
+            timer.start()
+            try:
+                value = yield provider.get(secret)
+            finally:
+                timer.stop()
             if value is not None:
                 return SecretDetails(source_name, secret, value)
         return None
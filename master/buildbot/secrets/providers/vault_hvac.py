@@ -133,6 +133,8 @@ class HashiCorpVaultKvSecretProvider(SecretProviderBase):
         self.client = hvac.Client(vault_server)
         self.version = parse_version(importlib.metadata.version('hvac'))
         self.client.secrets.kv.default_kv_version = api_version
+        # path -> Deferreds waiting for the read of the path in progress
+        self._pending_reads = {}
         return self
 
     def escaped_split(self, s):
@@ -187,6 +189,31 @@ class HashiCorpVaultKvSecretProvider(SecretProviderBase):
 
         return response
 
+    def _read_path(self, path):
+        # the lookups of keys stored at the same path which are done at the same time, e.g. when
+        # the secrets of a build are rendered, share a single read of the path
+        d = defer.Deferred()
+        waiters = self._pending_reads.get(path)
+        if waiters is not None:
+            waiters.append(d)
+            return d
+        waiters = self._pending_reads[path] = [d]
+
+        def done(result, fire):
+            if self._pending_reads.get(path) is waiters:
+                del self._pending_reads[path]
+            for waiter in waiters:
+                fire(waiter, result)
+
+        read_d = threads.deferToThread(self.thd_hvac_get, path=path)
+        read_d.addCallbacks(
+            done,
+            done,
+            callbackArgs=(defer.Deferred.callback,),
+            errbackArgs=(defer.Deferred.errback,),
+        )
+        return d
+
     @defer.inlineCallbacks
     def get(self, entry):
         """
@@ -209,7 +236,7 @@ class HashiCorpVaultKvSecretProvider(SecretProviderBase):
         name = parts[0]
         key = parts[1]
 
-        response = yield threads.deferToThread(self.thd_hvac_get, path=name)
+        response = yield self._read_path(name)
 
         # in KVv2 we have extra "data" dictionary, as vault provides metadata as well
         if self.api_version == 2:
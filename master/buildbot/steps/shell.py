@@ -14,6 +14,7 @@
 # Copyright Buildbot Team Members
 from __future__ import annotations
 
+import bisect
 import re
 
 from twisted.internet import defer
@@ -212,6 +213,151 @@ class Configure(ShellCommand):
     command = ["./configure"]
 
 
+# lines longer than this are ignored when counting warnings, as in logobserver.LogLineObserver
+_MAX_WARNING_LINE_LENGTH = 16384
+
+_GLOBAL_FLAGS_RE = re.compile(r"^\(\?([aiLmsux]+)\)")
+# constructs which do not behave the same when searching a line or a whole chunk of lines, or
+# when the pattern is part of a bigger one
+_PREFILTER_UNSAFE_RE = re.compile(r"\\[AZ1-9]|\(\?<?[=!]")
+_SCOPED_FLAGS = (
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+    (re.VERBOSE, 'x'),
+    (re.ASCII, 'a'),
+)
+
+
+def _scoped_pattern(regex) -> str | None:
+    # returns regex as a group with its own flags, to be combined with other patterns
+    if isinstance(regex, str):
+        pattern = regex
+        flags = ''
+    else:
+        pattern = regex.pattern
+        if not isinstance(pattern, str):
+            return None
+        flags = ''.join(letter for flag, letter in _SCOPED_FLAGS if regex.flags & flag)
+
+    while match := _GLOBAL_FLAGS_RE.match(pattern):
+        flags += match.group(1)
+        pattern = pattern[match.end() :]
+    if _PREFILTER_UNSAFE_RE.search(pattern):
+        return None
+
+    flags = ''.join(sorted(set(flags) - {'u'}))
+    if 'x' in flags:
+        # a trailing comment would hide the end of the group
+        pattern += '\n'
+    return f"(?{flags}:{pattern})"
+
+
+def _warning_prefilter(warning_re, search_res):
+    """
+    Returns a single regular expression finding, in a chunk of lines, the lines which may match
+    warning_re (with match()) or one of search_res (with search()), or None if these patterns can
+    not be combined safely.
+    """
+    parts = []
+    for regex, anchored in [(warning_re, True)] + [(r, False) for r in search_res if r]:
+        part = _scoped_pattern(regex)
+        if part is None:
+            return None
+        parts.append('^' + part if anchored else part)
+    try:
+        return re.compile('|'.join(parts), re.MULTILINE)
+    except re.error:
+        return None
+
+
+def _iter_prefiltered_lines(prefilter, text):
+    pos = 0
+    while (match := prefilter.search(text, pos)) is not None:
+        start = text.rfind('\n', 0, match.start()) + 1
+        end = text.find('\n', match.start())
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        pos = end + 1
+
+
+class _SuppressionIndex:
+    """
+    The warning suppressions of a WarningCountingShellCommand, grouped by file regexp so that each
+    of them is matched once per file name, and sorted by line range. The index follows the
+    suppressions list it is given, and is rebuilt when suppressions are added to it.
+    """
+
+    MAX_CACHED_FILES = 10000
+
+    def __init__(self, suppressions):
+        self._suppressions = suppressions
+        self.size = None
+        # fileRe -> [(warnRe, start, end)]
+        self._groups = {}
+        # file -> (warnRes, starts, ranges) of the suppressions applying to the file
+        self._by_file = {}
+
+    def _refresh(self):
+        if self.size == len(self._suppressions):
+            return
+        self.size = len(self._suppressions)
+        self._groups.clear()
+        for fileRe, warnRe, start, end in self._suppressions:
+            self._groups.setdefault(fileRe, []).append((warnRe, start, end))
+        self._by_file.clear()
+
+    def _for_file(self, file):
+        rules = self._by_file.get(file)
+        if rules is not None:
+            return rules
+
+        unranged = []
+        ranged = []
+        for fileRe, group in self._groups.items():
+            if not (file is None or fileRe is None or fileRe.match(file)):
+                continue
+            for warnRe, start, end in group:
+                if start is not None and end is not None:
+                    ranged.append((start, end, warnRe))
+                else:
+                    unranged.append(warnRe)
+        ranged.sort(key=lambda r: r[0])
+
+        if len(self._by_file) >= self.MAX_CACHED_FILES:
+            self._by_file.clear()
+        rules = self._by_file[file] = (unranged, [r[0] for r in ranged], ranged)
+        return rules
+
+    def is_suppressed(self, file, lineNo, text):
+        self._refresh()
+        unranged, starts, ranged = self._for_file(file)
+        for warnRe in unranged:
+            if warnRe is None or warnRe.search(text):
+                return True
+        if lineNo is not None:
+            # only the ranges starting before lineNo may contain it
+            for _, end, warnRe in ranged[: bisect.bisect_right(starts, lineNo)]:
+                if lineNo <= end and (warnRe is None or warnRe.search(text)):
+                    return True
+        return False
+
+
+class _WarningLogObserver(logobserver.LogObserver):
+    # hands the whole chunks of the log to the step, see WarningCountingShellCommand.scanWarnings
+
+    def outReceived(self, data):
+        self.step.scanWarnings(data)
+
+    def errReceived(self, data):
+        self.step.scanWarnings(data)
+
+    def headerReceived(self, data):
+        self.step.scanWarnings(data)
+
+
 class WarningCountingShellCommand(buildstep.ShellMixin, CompositeStepMixin, buildstep.BuildStep):
     renderables = [
         'suppressionFile',
@@ -281,11 +427,17 @@ class WarningCountingShellCommand(buildstep.ShellMixin, CompositeStepMixin, buil
 
         self.warnCount = 0
         self.loggedWarnings = []
+        self._warningRes = None
+        self._suppressionIndex = _SuppressionIndex(self.suppressions)
 
         if self.warningPattern is not None:
-            self.addLogObserver(
-                'stdio', logobserver.LineConsumerLogObserver(self.warningLogConsumer)
-            )
+            if type(self).warningLogConsumer is not WarningCountingShellCommand.warningLogConsumer:
+                # a subclass customizes the consumer, feed it line by line
+                self.addLogObserver(
+                    'stdio', logobserver.LineConsumerLogObserver(self.warningLogConsumer)
+                )
+            else:
+                self.addLogObserver('stdio', _WarningLogObserver())
 
     def addSuppression(self, suppressionList):
         """
@@ -332,7 +484,7 @@ class WarningCountingShellCommand(buildstep.ShellMixin, CompositeStepMixin, buil
         text = match.group(3)
         return (file, lineNo, text)
 
-    def warningLogConsumer(self):
+    def _compileWarningPatterns(self):
         # Now compile a regular expression from whichever warning pattern we're
         # using
         wre = self.warningPattern
@@ -347,24 +499,56 @@ class WarningCountingShellCommand(buildstep.ShellMixin, CompositeStepMixin, buil
         if directoryLeaveRe is not None and isinstance(directoryLeaveRe, str):
             directoryLeaveRe = re.compile(directoryLeaveRe)
 
-        # Check if each line in the output from this command matched our
-        # warnings regular expressions. If did, bump the warnings count and
-        # add the line to the collection of lines with warnings
+        return wre, directoryEnterRe, directoryLeaveRe
+
+    def _scanWarningLine(self, line, wre, directoryEnterRe, directoryLeaveRe):
+        if directoryEnterRe:
+            match = directoryEnterRe.search(line)
+            if match:
+                self.directoryStack.append(match.group(1))
+                return
+        if directoryLeaveRe and self.directoryStack and directoryLeaveRe.search(line):
+            self.directoryStack.pop()
+            return
+
+        match = wre.match(line)
+        if match:
+            self.maybeAddWarning(self.loggedWarnings, line, match)
+
+    def scanWarnings(self, data):
+        """
+        Check if each line in a chunk of output from this command matches our
+        warnings regular expressions. If it does, bump the warnings count and
+        add the line to the collection of lines with warnings.
+
+        The lines which can not match any of the expressions are skipped at
+        once by a single expression combining them."""
+        if self._warningRes is None:
+            wre, directoryEnterRe, directoryLeaveRe = self._compileWarningPatterns()
+            prefilter = _warning_prefilter(wre, [directoryEnterRe, directoryLeaveRe])
+            self._warningRes = (prefilter, wre, directoryEnterRe, directoryLeaveRe)
+            self.loggedWarnings = []
+        prefilter, *res = self._warningRes
+
+        # lines are split as in logobserver.LogLineObserver
+        data = data.rstrip()
+        if prefilter is None:
+            lines = data.split('\n')
+        else:
+            lines = _iter_prefiltered_lines(prefilter, data)
+        for line in lines:
+            if len(line) <= _MAX_WARNING_LINE_LENGTH:
+                self._scanWarningLine(line, *res)
+
+    def warningLogConsumer(self):
+        """
+        Line by line equivalent of scanWarnings, used when overridden by a
+        subclass."""
+        res = self._compileWarningPatterns()
         self.loggedWarnings = []
         while True:
             _, line = yield
-            if directoryEnterRe:
-                match = directoryEnterRe.search(line)
-                if match:
-                    self.directoryStack.append(match.group(1))
-                    continue
-            if directoryLeaveRe and self.directoryStack and directoryLeaveRe.search(line):
-                self.directoryStack.pop()
-                continue
-
-            match = wre.match(line)
-            if match:
-                self.maybeAddWarning(self.loggedWarnings, line, match)
+            self._scanWarningLine(line, *res)
 
     def maybeAddWarning(self, warnings, line, match):
         if self.suppressions:
@@ -377,15 +561,7 @@ class WarningCountingShellCommand(buildstep.ShellMixin, CompositeStepMixin, buil
                     file = f"{currentDirectory}/{file}"
 
             # Skip adding the warning if any suppression matches.
-            for fileRe, warnRe, start, end in self.suppressions:
-                if not (file is None or fileRe is None or fileRe.match(file)):
-                    continue
-                if not (warnRe is None or warnRe.search(text)):
-                    continue
-                if (start is not None and end is not None) and not (
-                    lineNo is not None and start <= lineNo <= end
-                ):
-                    continue
+            if self._suppressionIndex.is_suppressed(file, lineNo, text):
                 return
 
         warnings.append(line)
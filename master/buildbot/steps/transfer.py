@@ -23,6 +23,8 @@ from twisted.internet import defer
 from twisted.python import log
 
 from buildbot import config
+from buildbot.db.compression import LZ4Compressor
+from buildbot.db.compression import ZStdCompressor
 from buildbot.interfaces import WorkerSetupError
 from buildbot.process import remotecommand
 from buildbot.process import remotetransfer
@@ -40,6 +42,25 @@ def makeStatusRemoteCommand(step, remote_command, args) -> remotecommand.RemoteC
     return self
 
 
+def _check_compress(compress):
+    if compress not in (None, 'gz', 'bz2', 'zstd', 'lz4'):
+        config.error("'compress' must be one of None, 'gz', 'bz2', 'zstd' or 'lz4'")
+    elif compress == 'zstd' and not ZStdCompressor.available:
+        config.error("'compress' is 'zstd' but the 'zstandard' package is not installed")
+    elif compress == 'lz4' and not LZ4Compressor.available:
+        config.error("'compress' is 'lz4' but the 'lz4' package is not installed")
+
+
+def _check_worker_supports_compress(step):
+    # zstd and lz4 archives are only produced by workers streaming directory uploads
+    if step.compress in ('zstd', 'lz4') and step.workerVersionIsOlderThan('uploadDirectory', '3.4'):
+        m = (
+            f"This worker ({step.build.workername}) does not support '{step.compress}' "
+            "compression of uploaded directories. Please upgrade the worker."
+        )
+        raise WorkerSetupError(m)
+
+
 class _TransferBuildStep(BuildStep):
     """
     Base class for FileUpload and FileDownload to factor out common
@@ -68,7 +89,7 @@ class _TransferBuildStep(BuildStep):
             yield self.runCommand(cmd)
         finally:
             if writer:
-                writer.cancel()
+                yield writer.cancel()
 
         cmd_res = cmd.results()
         if cmd_res >= FAILURE:
@@ -101,6 +122,7 @@ class FileUpload(_TransferBuildStep):
         workdir=None,
         maxsize=None,
         blocksize=256 * 1024,
+        window=8,
         mode=None,
         keepstamp=False,
         url=None,
@@ -117,6 +139,7 @@ class FileUpload(_TransferBuildStep):
         self.masterdest = masterdest
         self.maxsize = maxsize
         self.blocksize = blocksize
+        self.window = window
         if not isinstance(mode, (int, type(None))):
             config.error('mode must be an integer or None')
         self.mode = mode
@@ -169,6 +192,7 @@ class FileUpload(_TransferBuildStep):
             'maxsize': self.maxsize,
             'blocksize': self.blocksize,
             'keepstamp': self.keepstamp,
+            'window': self.window,
         }
 
         if self.workerVersionIsOlderThan('uploadFile', '3.0'):
@@ -211,8 +235,7 @@ class DirectoryUpload(_TransferBuildStep):
         self.masterdest = masterdest
         self.maxsize = maxsize
         self.blocksize = blocksize
-        if compress not in (None, 'gz', 'bz2'):
-            config.error("'compress' must be one of None, 'gz', or 'bz2'")
+        _check_compress(compress)
         self.compress = compress
         self.url = url
         self.urlText = urlText
@@ -240,6 +263,8 @@ class DirectoryUpload(_TransferBuildStep):
 
             yield self.addURL(urlText, self.url)
 
+        _check_worker_supports_compress(self)
+
         # we use maxsize to limit the amount of data on both sides
         dirWriter = remotetransfer.DirectoryWriter(masterdest, self.maxsize, self.compress, 0o600)
 
@@ -275,6 +300,7 @@ class MultipleFileUpload(_TransferBuildStep, CompositeStepMixin):
         workdir=None,
         maxsize=None,
         blocksize=16 * 1024,
+        window=8,
         glob=False,
         mode=None,
         compress=None,
@@ -293,11 +319,11 @@ class MultipleFileUpload(_TransferBuildStep, CompositeStepMixin):
         self.masterdest = masterdest
         self.maxsize = maxsize
         self.blocksize = blocksize
+        self.window = window
         if not isinstance(mode, (int, type(None))):
             config.error('mode must be an integer or None')
         self.mode = mode
-        if compress not in (None, 'gz', 'bz2'):
-            config.error("'compress' must be one of None, 'gz', or 'bz2'")
+        _check_compress(compress)
         self.compress = compress
         self.glob = glob
         self.keepstamp = keepstamp
@@ -313,6 +339,7 @@ class MultipleFileUpload(_TransferBuildStep, CompositeStepMixin):
             'maxsize': self.maxsize,
             'blocksize': self.blocksize,
             'keepstamp': self.keepstamp,
+            'window': self.window,
         }
 
         if self.workerVersionIsOlderThan('uploadFile', '3.0'):
@@ -324,6 +351,7 @@ class MultipleFileUpload(_TransferBuildStep, CompositeStepMixin):
         return self.runTransferCommand(cmd, fileWriter)
 
     def uploadDirectory(self, source, masterdest):
+        _check_worker_supports_compress(self)
         dirWriter = remotetransfer.DirectoryWriter(masterdest, self.maxsize, self.compress, 0o600)
 
         args = {
@@ -444,6 +472,7 @@ class FileDownload(_TransferBuildStep):
         workdir=None,
         maxsize=None,
         blocksize=16 * 1024,
+        window=8,
         mode=None,
         **buildstep_kwargs,
     ):
@@ -457,6 +486,7 @@ class FileDownload(_TransferBuildStep):
         self.workerdest = workerdest
         self.maxsize = maxsize
         self.blocksize = blocksize
+        self.window = window
         if not isinstance(mode, (int, type(None))):
             config.error('mode must be an integer or None')
         self.mode = mode
@@ -491,6 +521,7 @@ class FileDownload(_TransferBuildStep):
             'blocksize': self.blocksize,
             'workdir': self.workdir,
             'mode': self.mode,
+            'window': self.window,
         }
 
         if self.workerVersionIsOlderThan('downloadFile', '3.0'):
@@ -515,6 +546,7 @@ class StringDownload(_TransferBuildStep):
         workdir=None,
         maxsize=None,
         blocksize=16 * 1024,
+        window=8,
         mode=None,
         **buildstep_kwargs,
     ):
@@ -528,6 +560,7 @@ class StringDownload(_TransferBuildStep):
         self.workerdest = workerdest
         self.maxsize = maxsize
         self.blocksize = blocksize
+        self.window = window
         if not isinstance(mode, (int, type(None))):
             config.error(f"StringDownload step's mode must be an integer or None, got '{mode}'")
         self.mode = mode
@@ -555,6 +588,7 @@ class StringDownload(_TransferBuildStep):
             'blocksize': self.blocksize,
             'workdir': self.workdir,
             'mode': self.mode,
+            'window': self.window,
         }
 
         if self.workerVersionIsOlderThan('downloadFile', '3.0'):
@@ -0,0 +1,92 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+
+from __future__ import annotations
+
+import functools
+from types import SimpleNamespace
+from typing import Any
+from typing import Callable
+from unittest import mock
+
+from twisted.internet import defer
+
+from buildbot.process import buildrequestdistributor
+from buildbot.test.util import benchmark
+
+
+class LegacyBuildChooser(buildrequestdistributor.BasicBuildChooser):
+    # unclaimed requests kept in a list, sorted on each pick
+
+    def _getNextUnclaimedBuildRequest(self) -> Any:
+        brdict = sorted(self.unclaimedBrdicts, key=lambda b: b['priority'], reverse=True)[0]
+        return self._getBuildRequestForBrdict(brdict)
+
+    def _removeBuildRequest(self, breq: Any) -> None:
+        for brdict in self.unclaimedBrdicts:
+            if brdict['buildrequestid'] == breq.id:
+                self.unclaimedBrdicts.remove(brdict)
+                break
+        self.breqCache.pop(breq.id, None)
+
+
+class BuildChooserQueueDepth(benchmark.BenchmarkTestCase):
+    def make_chooser(
+        self, cls: type, brdicts: list[dict[str, int]], structure: Callable[[list], Any]
+    ) -> Any:
+        bldr = mock.Mock()
+        bldr.config.nextWorker = None
+        bldr.config.nextBuild = None
+        bldr.getAvailableWorkers = list
+        bc = cls(bldr, mock.Mock())
+        bc.unclaimedBrdicts = structure([dict(brd) for brd in brdicts])
+
+        def get_breq(brdict: dict[str, int]) -> defer.Deferred[SimpleNamespace]:
+            return defer.succeed(SimpleNamespace(id=brdict['buildrequestid']))
+
+        bc._getBuildRequestForBrdict = get_breq
+        return bc
+
+    def drain(self, bc: Any) -> None:
+        # what a _maybeStartBuildsOnBuilder pass does with enough workers for every request
+        while bc.unclaimedBrdicts:
+            d = bc._getNextUnclaimedBuildRequest()
+            breq = self.successResultOf(d) if isinstance(d, defer.Deferred) else d
+            bc._removeBuildRequest(breq)
+
+    def drain_new_chooser(
+        self, cls: type, brdicts: list[dict[str, int]], structure: Callable[[list], Any]
+    ) -> None:
+        self.drain(self.make_chooser(cls, brdicts, structure))
+
+    def test_drain_queue(self) -> None:
+        for depth in (100, 1000, 5000):
+            brdicts = [
+                {'buildrequestid': brid, 'priority': brid % 7} for brid in range(1, depth + 1)
+            ]
+            for name, cls, structure in [
+                ('legacy', LegacyBuildChooser, list),
+                (
+                    'heap',
+                    buildrequestdistributor.BasicBuildChooser,
+                    buildrequestdistributor.UnclaimedBuildRequests,
+                ),
+            ]:
+                self.measure(
+                    f"{name} pick per request with {depth} queued",
+                    functools.partial(self.drain_new_chooser, cls, brdicts, structure),
+                    count=depth,
+                )
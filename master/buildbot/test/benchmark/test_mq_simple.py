@@ -0,0 +1,60 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from twisted.internet import defer
+
+from buildbot.mq import simple
+from buildbot.test.fake import fakemaster
+from buildbot.test.reactor import TestReactorMixin
+from buildbot.test.util import benchmark
+
+if TYPE_CHECKING:
+    from buildbot.util.twisted import InlineCallbacksType
+
+
+class SimpleMQDispatch(TestReactorMixin, benchmark.BenchmarkTestCase):
+    @defer.inlineCallbacks
+    def setUp(self) -> InlineCallbacksType[None]:  # type: ignore[override]
+        self.setup_test_reactor()
+        self.master = yield fakemaster.make_master(self)
+        self.mq = simple.SimpleMQ()
+        yield self.mq.setServiceParent(self.master)
+
+    @defer.inlineCallbacks
+    def subscribe(self, count: int) -> InlineCallbacksType[None]:
+        # looks like the web UI: each client watches the logs of a different build, plus a
+        # handful of consumers interested in all steps
+        for i in range(count):
+            yield self.mq.startConsuming(
+                lambda k, d: None, ('builds', str(i), 'steps', None, 'logs', None, None)
+            )
+        for _ in range(5):
+            yield self.mq.startConsuming(lambda k, d: None, ('builds', None, 'steps', None, None))
+
+    @defer.inlineCallbacks
+    def test_dispatch_cost_vs_subscribers(self) -> InlineCallbacksType[None]:
+        previous = 0
+        for count in (10, 100, 1000, 10000):
+            yield self.subscribe(count - previous)
+            previous = count
+            self.measure(
+                f"produce with {count} subscribers",
+                lambda: self.mq.produce(('builds', '1', 'steps', '2', 'logs', '3', 'appended'), {}),
+            )
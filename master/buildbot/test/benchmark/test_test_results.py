@@ -0,0 +1,79 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from twisted.internet import defer
+from twisted.python import log
+
+from buildbot.test import fakedb
+from buildbot.test.fake import fakemaster
+from buildbot.test.reactor import TestReactorMixin
+from buildbot.test.util import benchmark
+from buildbot.util.test_result_submitter import TestResultSubmitter
+
+if TYPE_CHECKING:
+    from buildbot.util.twisted import InlineCallbacksType
+
+
+class SubmitTestResults(TestReactorMixin, benchmark.BenchmarkTestCase):
+    RESULT_COUNT = 1000000
+    NAME_COUNT = 50000
+
+    @defer.inlineCallbacks
+    def setUp(self) -> InlineCallbacksType[None]:  # type: ignore[override]
+        self.setup_test_reactor()
+        self.master = yield fakemaster.make_master(self, wantData=True, wantDb=True)
+        yield self.master.startService()
+        self.addCleanup(self.master.stopService)
+
+        yield self.master.db.insert_test_data([
+            fakedb.Worker(id=47, name='linux'),
+            fakedb.Buildset(id=20),
+            fakedb.Builder(id=88, name='b1'),
+            fakedb.BuildRequest(id=41, buildsetid=20, builderid=88),
+            fakedb.Master(id=88),
+            fakedb.Build(
+                id=30, buildrequestid=41, number=7, masterid=88, builderid=88, workerid=47
+            ),
+            fakedb.Step(id=131, number=132, name='step132', buildid=30),
+        ])
+
+    @defer.inlineCallbacks
+    def submit(self, name: str) -> InlineCallbacksType[None]:
+        # the same test suite runs several times, each time with the same test names
+        sub = TestResultSubmitter()
+        yield sub.setup_by_ids(self.master, 88, 30, 131, 'desc', 'pass_fail', 'boolean')
+        start = time.perf_counter()
+        for i in range(self.RESULT_COUNT):
+            sub.add_test_result(
+                '1', test_name=f'test_{i % self.NAME_COUNT}', test_code_path=f'path_{i % 100}'
+            )
+        yield sub.finish()
+        per_op = (time.perf_counter() - start) / self.RESULT_COUNT
+        log.msg(f"benchmark {self.id()} {name}: {per_op * 1e6:.3f} us/op")
+
+    @defer.inlineCallbacks
+    def test_submit(self) -> InlineCallbacksType[None]:
+        self.master.db.test_results.MAX_INTERNED_IDS = 0
+        yield self.submit(f"{self.RESULT_COUNT} results without interned ids")
+
+        self.master.db.test_results.MAX_INTERNED_IDS = self.NAME_COUNT
+        # the first run interns the ids, the second one uses them
+        yield self.submit(f"{self.RESULT_COUNT} results, interning ids")
+        yield self.submit(f"{self.RESULT_COUNT} results with interned ids")
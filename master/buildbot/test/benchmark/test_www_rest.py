@@ -0,0 +1,161 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+
+from __future__ import annotations
+
+import datetime
+import functools
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+
+from twisted.internet import defer
+
+from buildbot.test.reactor import TestReactorMixin
+from buildbot.test.util import benchmark
+from buildbot.test.util import www
+from buildbot.util import toJson
+from buildbot.util import unicode2bytes
+from buildbot.www import rest
+
+if TYPE_CHECKING:
+    from buildbot.util.twisted import InlineCallbacksType
+
+COLLECTION_SIZE = 5000
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def make_build(i: int) -> dict[str, Any]:
+    return {
+        'buildid': i,
+        'number': i,
+        'builderid': i % 50,
+        'buildrequestid': i,
+        'workerid': i % 20,
+        'masterid': 1,
+        'started_at': EPOCH,
+        'complete_at': EPOCH,
+        'locks_duration_s': 0,
+        'complete': True,
+        'state_string': 'build successful',
+        'results': 0,
+        'properties': {},
+    }
+
+
+def make_step(i: int) -> dict[str, Any]:
+    return {
+        'stepid': i,
+        'number': i % 30,
+        'name': f'step-{i % 30}',
+        'buildid': i // 30,
+        'started_at': EPOCH,
+        'locks_acquired_at': EPOCH,
+        'complete_at': EPOCH,
+        'complete': True,
+        'state_string': 'compile (warnings)',
+        'results': 1,
+        'urls': [{'name': 'coverage', 'url': f'http://cov/{i}'}],
+        'hidden': False,
+    }
+
+
+def make_change(i: int) -> dict[str, Any]:
+    return {
+        'changeid': i,
+        'author': 'Some Developer <dev@example.com>',
+        'committer': 'Some Developer <dev@example.com>',
+        'files': [f'src/module{j}/file{i}.py' for j in range(5)],
+        'comments': 'Fix the frobnicator\n\nLonger description of the change. ' * 3,
+        'revision': f'{i:040x}',
+        'when_timestamp': EPOCH,
+        'branch': 'main',
+        'category': None,
+        'revlink': f'https://example.com/commit/{i:040x}',
+        'properties': {},
+        'repository': 'https://example.com/repo.git',
+        'project': 'project',
+        'codebase': '',
+        'parent_changeids': [i - 1],
+        'sourcestamp': {'ssid': i, 'branch': 'main', 'revision': f'{i:040x}'},
+    }
+
+
+def legacy_write_json_data(request: Any, encoder: json.JSONEncoder, data: Any) -> None:
+    # the implementation before the single-pass encoding, kept for comparison
+    content_length = 0
+    for chunk in encoder.iterencode(data):
+        content_length += len(unicode2bytes(chunk))
+    request.setHeader(b"content-length", unicode2bytes(str(content_length)))
+    for chunk in encoder.iterencode(data):
+        request.write(unicode2bytes(chunk))
+
+
+class NullRequest:
+    method = b'GET'
+    finished = False
+    channel = True
+
+    def setHeader(self, name: bytes, value: bytes) -> None:
+        pass
+
+    def write(self, data: bytes) -> None:
+        pass
+
+
+class RestJsonEncoding(TestReactorMixin, www.WwwTestMixin, benchmark.BenchmarkTestCase):
+    @defer.inlineCallbacks
+    def setUp(self) -> InlineCallbacksType[None]:  # type: ignore[override]
+        self.setup_test_reactor()
+        self.master = yield self.make_master(url='http://server/path/')
+        self.rsrc = rest.V2RootResource(self.master)
+        self.rsrc.reconfigResource(self.master.config)
+
+    def make_encoder(self, compact: bool) -> json.JSONEncoder:
+        encoder = json.encoder.JSONEncoder(default=toJson, sort_keys=True)
+        if compact:
+            encoder.item_separator, encoder.key_separator = (',', ':')
+        else:
+            encoder.indent = 2
+        return encoder
+
+    def do_benchmark(self, type_name: str, make_item: Callable[[int], dict[str, Any]]) -> None:
+        data = {
+            type_name: [make_item(i) for i in range(COLLECTION_SIZE)],
+            'meta': {'total': COLLECTION_SIZE},
+        }
+        request: Any = NullRequest()
+        for compact in (True, False):
+            encoder = self.make_encoder(compact)
+            mode = 'compact' if compact else 'indented'
+            self.measure(
+                f"{type_name} x{COLLECTION_SIZE} {mode} legacy",
+                functools.partial(legacy_write_json_data, request, encoder, data),
+            )
+            self.measure(
+                f"{type_name} x{COLLECTION_SIZE} {mode}",
+                functools.partial(self.rsrc._write_json_data, request, encoder, data),
+            )
+
+    def test_builds(self) -> None:
+        self.do_benchmark('builds', make_build)
+
+    def test_steps(self) -> None:
+        self.do_benchmark('steps', make_step)
+
+    def test_changes(self) -> None:
+        self.do_benchmark('changes', make_change)
@@ -38,6 +38,10 @@ class FakeBotMaster(service.AsyncMultiService, botmaster.LockRetrieverMixin):
     def maybeStartBuildsForAllBuilders(self):
         self.buildsStartedForWorkers += self.builders.keys()
 
+    def maybeStartBuildsForLocks(self, locks):
+        for lock in locks:
+            lock.popUnblockedBuilders()
+
     def workerLost(self, bot):
         pass
 
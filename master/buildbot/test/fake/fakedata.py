@@ -26,6 +26,7 @@ from buildbot.util.twisted import async_to_deferred
 
 if TYPE_CHECKING:
     import datetime
+    from typing import Any
 
 
 class FakeUpdates(service.AsyncService):
@@ -287,6 +288,50 @@ class FakeUpdates(service.AsyncService):
             parent_commitid=parent_commitid,
         )
 
+    @async_to_deferred
+    async def add_commits(
+        self,
+        *,
+        codebaseid: int,
+        commits: list[dict[str, Any]],
+        parent_commitid: int | None = None,
+    ) -> list[int]:
+        validation.verifyType(self.testcase, 'codebaseid', codebaseid, validation.IntValidator())
+        for commit in commits:
+            validation.verifyType(
+                self.testcase, 'author', commit['author'], validation.StringValidator()
+            )
+            validation.verifyType(
+                self.testcase,
+                'committer',
+                commit.get('committer'),
+                validation.NoneOk(validation.StringValidator()),
+            )
+            validation.verifyType(
+                self.testcase, 'comments', commit['comments'], validation.StringValidator()
+            )
+            validation.verifyType(
+                self.testcase,
+                'when_timestamp',
+                commit['when_timestamp'],
+                validation.IntValidator(),
+            )
+            validation.verifyType(
+                self.testcase, 'revision', commit['revision'], validation.StringValidator()
+            )
+        validation.verifyType(
+            self.testcase,
+            'parent_commitid',
+            parent_commitid,
+            validation.NoneOk(validation.IntValidator()),
+        )
+
+        return await self.data.updates.add_commits(
+            codebaseid=codebaseid,
+            commits=commits,
+            parent_commitid=parent_commitid,
+        )
+
     @async_to_deferred
     async def update_branch(
         self,
@@ -598,6 +643,9 @@ class FakeDataConnector(service.AsyncMultiService):
     def getResourceType(self, name):
         return getattr(self.rtypes, name)
 
+    def getResourceVersion(self, name):
+        return self.realConnector.getResourceVersion(name)
+
     def get(self, path, filters=None, fields=None, order=None, limit=None, offset=None):
         if not isinstance(path, tuple):
             raise TypeError('path must be a tuple')
@@ -62,11 +62,18 @@ class FakeCache:
     def put(self, key, val):
         pass
 
+    def clear(self):
+        pass
+
 
 class FakeCaches:
-    def get_cache(self, name, miss_fn):
+    def get_cache(self, name, miss_fn, size_fn=None, default_size=1):
         return FakeCache(name, miss_fn)
 
+    def register_cache(self, name, cache, default_size=1):
+        cache.set_max_size(default_size)
+        return cache
+
 
 class FakeBuilder:
     def __init__(self, master=None, buildername="Builder"):
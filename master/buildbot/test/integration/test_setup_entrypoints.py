@@ -131,6 +131,7 @@ class TestSetupPyEntryPoints(unittest.TestCase):
             'buildbot.util.lineboundaries.LineBoundaryFinder',
             'buildbot.util.lru.AsyncLRUCache',
             'buildbot.util.lru.LRUCache',
+            'buildbot.util.lru.MemoryBudget',
             'buildbot.util.maildir.MaildirService',
             'buildbot.util.maildir.NoSuchMaildir',
             'buildbot.util.netstrings.NetstringParser',
@@ -162,6 +163,7 @@ class TestSetupPyEntryPoints(unittest.TestCase):
             'buildbot.util.subscription.Subscription',
             'buildbot.util.subscription.SubscriptionPoint',
             'buildbot.util.test_result_submitter.TestResultSubmitter',
+            'buildbot.util.tuplematch.TupleTrie',
             "buildbot.util.watchdog.Watchdog",
             "buildbot.util.twisted.ThreadPool",
         }
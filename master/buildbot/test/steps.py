@@ -362,10 +362,13 @@ class ExpectUploadFile(Expect):
         keepstamp=None,
         slavesrc=None,
         interrupted=False,
+        window=None,
     ):
         args = {'workdir': workdir, 'writer': writer, 'blocksize': blocksize, 'maxsize': maxsize}
         if keepstamp is not None:
             args['keepstamp'] = keepstamp
+        if window is not None:
+            args['window'] = window
         if slavesrc is not None:
             args['slavesrc'] = slavesrc
         if workersrc is not None:
@@ -425,6 +428,7 @@ class ExpectUploadDirectory(Expect):
         super().__init__('uploadDirectory', args, interrupted=interrupted)
 
     def upload_tar_file(self, filename, members, error=None, out_writers=None):
+        @defer.inlineCallbacks
         def behavior(command):
             f = BytesIO()
             archive = tarfile.TarFile(fileobj=f, name=filename, mode='w')
@@ -436,8 +440,8 @@ class ExpectUploadDirectory(Expect):
             if out_writers is not None:
                 out_writers.append(writer)
 
-            writer.remote_write(f.getvalue())
-            writer.remote_unpack()
+            yield writer.remote_write(f.getvalue())
+            yield writer.remote_unpack()
 
             if error is not None:
                 writer.cancel = mock.Mock(wraps=writer.cancel)
@@ -462,6 +466,7 @@ class ExpectDownloadFile(Expect):
         interrupted=False,
         slavesrc=None,
         slavedest=None,
+        window=None,
     ):
         args = {
             'workdir': workdir,
@@ -470,6 +475,8 @@ class ExpectDownloadFile(Expect):
             'blocksize': blocksize,
             'maxsize': maxsize,
         }
+        if window is not None:
+            args['window'] = window
         if slavesrc is not None:
             args['slavesrc'] = slavesrc
         if slavedest is not None:
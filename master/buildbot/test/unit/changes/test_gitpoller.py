@@ -78,30 +78,19 @@ class TestGitPollerBase(
 
     def patch_poller_get_commit_info(self, poller, timestamp):
         # There is a separate test suite for the methods below, no need to complicate each test
-        def get_timestamp(rev):
-            return defer.succeed(timestamp)
-
-        self.patch(self.poller, '_get_commit_timestamp', get_timestamp)
-
-        def author(rev):
-            return defer.succeed('by:' + rev[:8])
-
-        self.patch(self.poller, '_get_commit_author', author)
-
-        def committer(rev):
-            return defer.succeed('by:' + rev[:8])
-
-        self.patch(self.poller, '_get_commit_committer', committer)
-
-        def files(rev):
-            return defer.succeed(['/etc/' + rev[:3]])
-
-        self.patch(self.poller, '_get_commit_files', files)
-
-        def comments(rev):
-            return defer.succeed('hello!')
+        def get_commits_info(revs):
+            return defer.succeed({
+                rev: gitpoller._CommitInfo(
+                    timestamp=timestamp,
+                    author='by:' + rev[:8],
+                    committer='by:' + rev[:8],
+                    files=['/etc/' + rev[:3]],
+                    comments='hello!',
+                )
+                for rev in revs
+            })
 
-        self.patch(self.poller, '_get_commit_comments', comments)
+        self.patch(self.poller, '_get_commits_info', get_commits_info)
 
     @async_to_deferred
     async def set_last_rev(self, state: dict[str, str]) -> None:
@@ -257,6 +246,101 @@ class TestGitPoller(TestGitPollerBase):
             float(stampStr),
         )
 
+    def _expect_commits_info(self, revs):
+        return ExpectMasterShell([
+            'git',
+            'log',
+            '--name-only',
+            '--no-walk',
+            '--format=%x00%H%x00%ct%x00%aN <%aE>%x00%cN <%cE>%x00%s%n%b%x00',
+            '-m',
+            '--first-parent',
+            *revs,
+            '--',
+        ]).workdir(self.POLLER_WORKDIR)
+
+    @async_to_deferred
+    async def test_get_commits_info(self):
+        self.expect_commands(
+            self._expect_commits_info(['aaaa', 'bbbb']).stdout(
+                b'\0bbbb\x001273258009\0Sammy Jankis <email@example.com>\0'
+                b'Lenny <lenny@example.com>\0merge\n\nlonger message\n\n\0\n\n'
+                b'file1\n"\146ile_octal"\ndirectory with space/file2\n'
+                b'\0aaaa\x001273258010\0Sammy Jankis <email@example.com>\0'
+                b'Sammy Jankis <email@example.com>\0empty commit\n\n\0\n'
+            )
+        )
+        infos = await self.poller._get_commits_info(['aaaa', 'bbbb'])
+        self.assert_all_commands_ran()
+
+        self.assertEqual(
+            infos,
+            {
+                'aaaa': gitpoller._CommitInfo(
+                    timestamp=1273258010,
+                    author='Sammy Jankis <email@example.com>',
+                    committer='Sammy Jankis <email@example.com>',
+                    files=[],
+                    comments='empty commit',
+                ),
+                'bbbb': gitpoller._CommitInfo(
+                    timestamp=1273258009,
+                    author='Sammy Jankis <email@example.com>',
+                    committer='Lenny <lenny@example.com>',
+                    files=['file1', 'file_octal', 'directory with space/file2'],
+                    comments='merge\n\nlonger message',
+                ),
+            },
+        )
+
+    @async_to_deferred
+    async def test_get_commits_info_batches(self):
+        self.patch(self.poller, '_COMMIT_INFO_BATCH_SIZE', 2)
+        revs = ['aaaa', 'bbbb', 'cccc']
+        outputs = [
+            b''.join(
+                b'\0' + rev.encode() + b'\x001273258009\0author\0committer\0comments\0\n\nf\n'
+                for rev in batch
+            )
+            for batch in (revs[:2], revs[2:])
+        ]
+        self.expect_commands(
+            self._expect_commits_info(revs[:2]).stdout(outputs[0]),
+            self._expect_commits_info(revs[2:]).stdout(outputs[1]),
+        )
+        infos = await self.poller._get_commits_info(revs)
+        self.assert_all_commands_ran()
+        self.assertEqual(sorted(infos), revs)
+
+    @async_to_deferred
+    async def test_get_commits_info_missing_commit(self):
+        self.expect_commands(
+            self._expect_commits_info(['aaaa', 'bbbb']).stdout(
+                b'\0aaaa\x001273258009\0author\0committer\0comments\0\n'
+            )
+        )
+        with self.assertRaises(OSError):
+            await self.poller._get_commits_info(['aaaa', 'bbbb'])
+        self.assert_all_commands_ran()
+
+    @async_to_deferred
+    async def test_get_commits_info_no_author(self):
+        self.expect_commands(
+            self._expect_commits_info(['aaaa']).stdout(
+                b'\0aaaa\x001273258009\0\0committer\0comments\0\n'
+            )
+        )
+        with self.assertRaises(OSError):
+            await self.poller._get_commits_info(['aaaa'])
+        self.assert_all_commands_ran()
+
+    @async_to_deferred
+    async def test_get_commits_info_bad_output(self):
+        self.expect_commands(self._expect_commits_info(['aaaa']).stdout(b'garbage'))
+        with self.assertRaises(OSError):
+            await self.poller._get_commits_info(['aaaa'])
+        self.assert_all_commands_ran()
+
     def test_describe(self):
         self.assertSubstring("GitPoller", self.poller.describe())
 
@@ -2614,6 +2698,25 @@ class TestGitPollerBareRepository(
             [],
         )
 
+    @async_to_deferred
+    async def test_get_commits_info_matches_per_commit(self):
+        await self.set_last_rev({'main': self.INITIAL_SHA})
+        self.poller.doPoll.running = True
+        await self.poller.poll()
+
+        revs = [self.INITIAL_SHA, self.FIX_1_SHA, self.FEATURE_1_SHA, self.MERGE_FEATURE_1_SHA]
+        infos = await self.poller._get_commits_info(revs)
+        self.assertEqual(sorted(infos), sorted(revs))
+        for rev in revs:
+            expected = gitpoller._CommitInfo(
+                timestamp=await self.poller._get_commit_timestamp(rev),
+                author=await self.poller._get_commit_author(rev),
+                committer=await self.poller._get_commit_committer(rev),
+                files=await self.poller._get_commit_files(rev),
+                comments=await self.poller._get_commit_comments(rev),
+            )
+            self.assertEqual(infos[rev], expected)
+
     @async_to_deferred
     async def test_poll_from_last(self):
         self.maxDiff = None
@@ -62,6 +62,7 @@ global_defaults = {
     "properties": properties.Properties(),
     "collapseRequests": None,
     "prioritizeBuilders": None,
+    "builderDistributionConcurrency": 1,
     "select_next_worker": None,
     "protocols": {},
     "multiMaster": False,
@@ -253,6 +254,7 @@ class MasterConfigTests(ConfigErrorsMixin, dirs.DirsMixin, unittest.TestCase):
             "mq": {"type": 'simple'},
             "metrics": None,
             "caches": {"Changes": 10, "Builds": 15},
+            "cachesMaxBytes": None,
             "schedulers": {},
             "builders": [],
             "workers": [],
@@ -514,6 +516,17 @@ class MasterConfig_loaders(ConfigErrorsMixin, unittest.TestCase):
 
         self.assertConfigError(errors, "must be a callable")
 
+    def test_load_global_builderDistributionConcurrency(self):
+        self.do_test_load_global(
+            {"builderDistributionConcurrency": 4}, builderDistributionConcurrency=4
+        )
+
+    def test_load_global_builderDistributionConcurrency_invalid(self):
+        with capture_config_errors() as errors:
+            self.cfg.load_global(self.filename, {'builderDistributionConcurrency': 0})
+
+        self.assertConfigError(errors, "must be a positive integer")
+
     def test_load_global_select_next_worker_callable(self):
         callable = lambda: None
         self.do_test_load_global({"select_next_worker": callable}, select_next_worker=callable)
@@ -687,6 +700,46 @@ class MasterConfig_loaders(ConfigErrorsMixin, unittest.TestCase):
 
         self.assertConfigError(errors, "'Changes' cache size must be at least 1, got '-12'")
 
+    def test_load_caches_limits(self):
+        self.cfg.load_caches(
+            self.filename,
+            {
+                "caches": {"Changes": {"size": 100, "max_bytes": 1000000, "ttl": 60}},
+                "cachesMaxBytes": 5000000,
+            },
+        )
+        self.assertResults(
+            caches={
+                "Changes": {"size": 100, "max_bytes": 1000000, "ttl": 60},
+                "Builds": 15,
+            },
+            cachesMaxBytes=5000000,
+        )
+
+    def test_load_caches_max_bytes_err(self):
+        with capture_config_errors() as errors:
+            self.cfg.load_caches(self.filename, {"caches": {"Changes": {"max_bytes": 0}}})
+
+        self.assertConfigError(errors, "'Changes' cache max_bytes must be at least 1, got '0'")
+
+    def test_load_caches_ttl_err(self):
+        with capture_config_errors() as errors:
+            self.cfg.load_caches(self.filename, {"caches": {"Changes": {"ttl": -1}}})
+
+        self.assertConfigError(errors, "'Changes' cache ttl must be a positive number, got '-1'")
+
+    def test_load_caches_cachesMaxBytes_err(self):
+        with capture_config_errors() as errors:
+            self.cfg.load_caches(self.filename, {"cachesMaxBytes": "1G"})
+
+        self.assertConfigError(errors, "c['cachesMaxBytes'] must be a positive integer or None")
+
+    def test_load_caches_unknown_limit_err(self):
+        with capture_config_errors() as errors:
+            self.cfg.load_caches(self.filename, {"caches": {"Changes": {"sz": 10}}})
+
+        self.assertConfigError(errors, "unknown keys ['sz'] for cache 'Changes'")
+
     def test_load_schedulers_defaults(self):
         self.cfg.load_schedulers(self.filename, {})
         self.assertResults(schedulers={})
@@ -112,6 +112,20 @@ class TestBuildRequestEndpoint(endpoint.EndpointMixin, unittest.TestCase):
             buildrequest['properties'], {'prop1': ('one', 'fake1'), 'prop2': ('two', 'fake2')}
         )
 
+    @defer.inlineCallbacks
+    def test_control_set_priority(self):
+        yield self.callControl('set_priority', {'priority': 12}, ('buildrequests', 44))
+        buildrequest = yield self.callGet(('buildrequests', 44))
+        self.assertEqual(buildrequest['priority'], 12)
+        self.master.mq.assertProductions([
+            (
+                ('buildsets', '8822', 'builders', '77', 'buildrequests', '44', 'update'),
+                buildrequest,
+            ),
+            (('buildrequests', '44', 'update'), buildrequest),
+            (('builders', '77', 'buildrequests', '44', 'update'), buildrequest),
+        ])
+
 
 class TestBuildRequestsEndpoint(endpoint.EndpointMixin, unittest.TestCase):
     endpointClass = buildrequests.BuildRequestsEndpoint
@@ -199,3 +199,69 @@ class CodebaseCommitTests(interfaces.InterfaceTests, TestReactorMixin, unittest.
                 }
             ],
         )
+
+    def test_signature_add_commits(self) -> None:
+        @self.assertArgSpecMatches(
+            self.master.data.updates.add_commits,
+            self.rtype.add_commits,
+        )
+        def add_commits(
+            self: Any,
+            *,
+            codebaseid: int,
+            commits: list[dict[str, Any]],
+            parent_commitid: int | None = None,
+        ) -> list[int]:
+            return []
+
+    @async_to_deferred
+    async def test_add_commits(self) -> None:
+        commitids = await self.master.data.updates.add_commits(
+            codebaseid=13,
+            commits=[
+                {
+                    'author': f'author{i}',
+                    'committer': f'committer{i}',
+                    'comments': f'comments{i}',
+                    'when_timestamp': 12345678 + i,
+                    'revision': f'rev{i}',
+                }
+                for i in (1, 2)
+            ],
+        )
+        self.assertEqual(commitids, [1, 2])
+        commits = await self.master.data.get(('codebases', 13, 'commits'))
+        self.assertEqual(
+            commits,
+            [
+                {
+                    'commitid': 1,
+                    'codebaseid': 13,
+                    'author': 'author1',
+                    'committer': 'committer1',
+                    'comments': 'comments1',
+                    'when_timestamp': 12345679,
+                    'revision': 'rev1',
+                    'parent_commitid': None,
+                },
+                {
+                    'commitid': 2,
+                    'codebaseid': 13,
+                    'author': 'author2',
+                    'committer': 'committer2',
+                    'comments': 'comments2',
+                    'when_timestamp': 12345680,
+                    'revision': 'rev2',
+                    'parent_commitid': 1,
+                },
+            ],
+        )
+        self.assertEqual(
+            [(k, v['commitid']) for k, v in self.master.mq.productions],
+            [
+                (('commits', '1', 'new'), 1),
+                (('codebases', '13', 'commits', '1', 'new'), 1),
+                (('commits', '2', 'new'), 2),
+                (('codebases', '13', 'commits', '2', 'new'), 2),
+            ],
+        )
@@ -46,6 +46,11 @@ class Tests(interfaces.InterfaceTests):
         def getEndpoint(self, path):
             pass
 
+    def test_signature_getResourceVersion(self):
+        @self.assertArgSpecMatches(self.data.getResourceVersion)
+        def getResourceVersion(self, name):
+            pass
+
     def test_signature_control(self):
         @self.assertArgSpecMatches(self.data.control)
         def control(self, action, args, path):
@@ -251,6 +256,60 @@ class DataConnector(TestReactorMixin, unittest.TestCase):
         ep.control.assert_called_once_with('foo!', {'arg': 2}, {'fooid': 10})
 
 
+class ResourceVersions(TestReactorMixin, unittest.TestCase):
+    @defer.inlineCallbacks
+    def setUp(self):
+        self.setup_test_reactor()
+        self.master = yield fakemaster.make_master(self, wantMq=True)
+        self.master.mq.verifyMessages = False
+        self.data = connector.DataConnector()
+        yield self.data.setServiceParent(self.master)
+
+    def test_not_running(self):
+        self.assertIsNone(self.data.getResourceVersion('build'))
+        self.assertEqual(self.master.mq.qrefs, [])
+
+    @defer.inlineCallbacks
+    def test_versions(self):
+        yield self.data.startService()
+        builds = self.data.getResourceVersion('build')
+        buildrequests = self.data.getResourceVersion('buildrequest')
+        properties = self.data.getResourceVersion('property')
+        self.assertIsNotNone(builds)
+
+        self.master.mq.callConsumer(('builds', '13', 'new'), {'buildid': 13})
+        self.assertNotEqual(self.data.getResourceVersion('build'), builds)
+        self.assertEqual(self.data.getResourceVersion('buildrequest'), buildrequests)
+        self.assertEqual(self.data.getResourceVersion('property'), properties)
+
+        builds = self.data.getResourceVersion('build')
+        self.master.mq.callConsumer(('builds', '13', 'properties', 'update'), {})
+        self.assertEqual(self.data.getResourceVersion('build'), builds)
+        self.assertNotEqual(self.data.getResourceVersion('property'), properties)
+
+    @defer.inlineCallbacks
+    def test_not_versioned(self):
+        yield self.data.startService()
+        # logchunks do not produce events, and unknown types are not versioned
+        self.assertIsNone(self.data.getResourceVersion('logchunk'))
+        self.assertIsNone(self.data.getResourceVersion('nosuchtype'))
+        # some changes of these types produce no event
+        for name in ('builder', 'master', 'worker', 'test_result'):
+            self.assertIsNone(self.data.getResourceVersion(name))
+
+    @defer.inlineCallbacks
+    def test_restart(self):
+        yield self.data.startService()
+        builds = self.data.getResourceVersion('build')
+
+        yield self.data.stopService()
+        self.assertEqual(self.master.mq.qrefs, [])
+        self.assertIsNone(self.data.getResourceVersion('build'))
+
+        yield self.data.startService()
+        self.assertNotEqual(self.data.getResourceVersion('build'), builds)
+
+
 # classes discovered by test_scanModule, above
 
 
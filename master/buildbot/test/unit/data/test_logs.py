@@ -18,7 +18,9 @@ from unittest import mock
 from twisted.internet import defer
 from twisted.trial import unittest
 
+from buildbot.data import exceptions
 from buildbot.data import logs
+from buildbot.data import resultspec
 from buildbot.db.logs import LogSlugExistsError
 from buildbot.test import fakedb
 from buildbot.test.fake import fakemaster
@@ -154,6 +156,25 @@ class LogsEndpoint(endpoint.EndpointMixin, unittest.TestCase):
         logs = yield self.callGet(('steps', 99, 'logs'))
         self.assertEqual(logs, [])
 
+    @defer.inlineCallbacks
+    def test_get_stepid_filter(self):
+        logs = yield self.callGet(
+            ('logs',),
+            resultSpec=resultspec.ResultSpec(
+                filters=[resultspec.Filter('stepid', 'eq', [51, 50, 52])]
+            ),
+        )
+
+        for log in logs:
+            self.validateData(log)
+
+        self.assertEqual([l['logid'] for l in logs], [60, 61, 70, 71])
+
+    @defer.inlineCallbacks
+    def test_get_no_stepid_filter(self):
+        with self.assertRaises(exceptions.InvalidQueryParameter):
+            yield self.callGet(('logs',))
+
     @defer.inlineCallbacks
     def test_get_buildid_step_name(self):
         logs = yield self.callGet(('builds', 13, 'steps', 'make_install', 'logs'))
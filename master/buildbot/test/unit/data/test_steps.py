@@ -17,6 +17,8 @@
 from twisted.internet import defer
 from twisted.trial import unittest
 
+from buildbot.data import exceptions
+from buildbot.data import resultspec
 from buildbot.data import steps
 from buildbot.db.steps import StepModel
 from buildbot.db.steps import UrlModel
@@ -189,6 +191,25 @@ class StepsEndpoint(endpoint.EndpointMixin, unittest.TestCase):
 
         self.assertEqual([s['number'] for s in steps], [0, 1, 2])
 
+    @defer.inlineCallbacks
+    def test_get_buildid_filter(self):
+        steps = yield self.callGet(
+            ('steps',),
+            resultSpec=resultspec.ResultSpec(
+                filters=[resultspec.Filter('buildid', 'eq', [31, 30])]
+            ),
+        )
+
+        for step in steps:
+            self.validateData(step)
+
+        self.assertEqual([s['stepid'] for s in steps], [70, 71, 72, 73])
+
+    @defer.inlineCallbacks
+    def test_get_no_buildid_filter(self):
+        with self.assertRaises(exceptions.InvalidQueryParameter):
+            yield self.callGet(('steps',))
+
     @defer.inlineCallbacks
     def test_get_builder(self):
         steps = yield self.callGet(('builders', 77, 'builds', 7, 'steps'))
@@ -673,3 +673,28 @@ class Tests(TestReactorMixin, unittest.TestCase):
         return self.do_test_unclaimMethod(
             lambda: self.db.buildrequests.unclaimBuildRequests(to_unclaim), [45, 47, 48]
         )
+
+    @defer.inlineCallbacks
+    def test_set_build_requests_priority(self):
+        yield self.master.db.insert_test_data([
+            fakedb.BuildRequest(id=44, buildsetid=self.BSID, builderid=self.BLDRID1, priority=1),
+            fakedb.BuildRequest(id=45, buildsetid=self.BSID, builderid=self.BLDRID1, priority=1),
+        ])
+        yield self.db.buildrequests.set_build_requests_priority(brids=[44], priority=10)
+        results = yield self.db.buildrequests.getBuildRequests()
+        self.assertEqual(
+            sorted([(r.buildrequestid, r.priority) for r in results]), [(44, 10), (45, 1)]
+        )
+
+    @defer.inlineCallbacks
+    def test_set_build_requests_priority_completed(self):
+        yield self.master.db.insert_test_data([
+            fakedb.BuildRequest(
+                id=44, buildsetid=self.BSID, builderid=self.BLDRID1, priority=1, complete=1
+            ),
+        ])
+        with self.assertRaises(buildrequests.NotClaimedError):
+            yield self.db.buildrequests.set_build_requests_priority(brids=[44], priority=10)
+        self.flushLoggedErrors(buildrequests.NotClaimedError)
+        results = yield self.db.buildrequests.getBuildRequests()
+        self.assertEqual([r.priority for r in results], [1])
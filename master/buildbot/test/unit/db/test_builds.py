@@ -433,6 +433,22 @@ class Tests(TestReactorMixin, unittest.TestCase):
         props = yield self.db.builds.getBuildProperties(50)
         self.assertEqual(props, {'prop': (42, 'test')})
 
+    @defer.inlineCallbacks
+    def test_get_builds_properties(self):
+        yield self.db.insert_test_data(self.backgroundData + self.threeBuilds)
+        yield self.db.builds.setBuildProperty(50, 'prop', 42, 'test')
+        yield self.db.builds.setBuildProperty(50, 'prop2', 43, 'test')
+        yield self.db.builds.setBuildProperty(52, 'prop', 44, 'other')
+        props = yield self.db.builds.get_builds_properties([50, 51, 52])
+        self.assertEqual(
+            props,
+            {
+                50: {'prop': (42, 'test'), 'prop2': (43, 'test')},
+                51: {},
+                52: {'prop': (44, 'other')},
+            },
+        )
+
     @defer.inlineCallbacks
     def testsetgetsetProperties(self):
         yield self.db.insert_test_data(self.backgroundData + self.threeBuilds)
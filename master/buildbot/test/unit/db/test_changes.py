@@ -350,6 +350,20 @@ class Tests(TestReactorMixin, unittest.TestCase):
 
         self.assertEqual(changeid, None)
 
+    @defer.inlineCallbacks
+    def test_getSourceStampIdsWithChanges(self):
+        yield self.db.insert_test_data([
+            *self.change13_rows,
+            *self.change14_rows,
+            fakedb.SourceStamp(id=234),
+        ])
+
+        ssids = yield self.db.changes.getSourceStampIdsWithChanges([92, 233, 234, 235])
+        self.assertEqual(ssids, {92, 233})
+
+        ssids = yield self.db.changes.getSourceStampIdsWithChanges([])
+        self.assertEqual(ssids, set())
+
     @defer.inlineCallbacks
     def test_getParentChangeIds(self):
         yield self.db.insert_test_data(self.change14_rows + self.change13_rows)
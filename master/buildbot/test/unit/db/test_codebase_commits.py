@@ -153,3 +153,47 @@ class Tests(TestReactorMixin, unittest.TestCase):
                 )
             ],
         )
+
+    @async_to_deferred
+    async def test_add_commits(self) -> None:
+        ids = await self.master.db.codebase_commits.add_commits(
+            codebaseid=13,
+            commits=[
+                {
+                    'author': 'new_author',
+                    'committer': None,
+                    'comments': f'new_comments{i}',
+                    'when_timestamp': 12345678,
+                    'revision': f'new_revision{i}',
+                }
+                for i in range(2)
+            ],
+            parent_commitid=110,
+        )
+        self.assertEqual(ids, [121, 122])
+        dbdicts = await self.master.db.codebase_commits.get_commits_by_id(ids)
+        self.assertEqual(
+            dbdicts,
+            [
+                codebase_commits.CodebaseCommitModel(
+                    id=121,
+                    codebaseid=13,
+                    author='new_author',
+                    committer=None,
+                    comments='new_comments0',
+                    when_timestamp=12345678,
+                    revision='new_revision0',
+                    parent_commitid=110,
+                ),
+                codebase_commits.CodebaseCommitModel(
+                    id=122,
+                    codebaseid=13,
+                    author='new_author',
+                    committer=None,
+                    comments='new_comments1',
+                    when_timestamp=12345678,
+                    revision='new_revision1',
+                    parent_commitid=121,
+                ),
+            ],
+        )
@@ -237,6 +237,36 @@ class Tests(TestReactorMixin, unittest.TestCase):
             self.assertIsInstance(logdict, logs.LogModel)
         self.assertEqual(sorted([ld.id for ld in logdicts]), [201, 202])
 
+    @defer.inlineCallbacks
+    def test_get_logs_for_steps(self):
+        yield self.db.insert_test_data([
+            *self.backgroundData,
+            fakedb.Log(
+                id=201, stepid=101, name="stdio", slug="stdio", complete=0, num_lines=200, type="s"
+            ),
+            fakedb.Log(
+                id=202, stepid=102, name="stdio", slug="stdio", complete=0, num_lines=200, type="s"
+            ),
+            fakedb.Log(
+                id=203,
+                stepid=101,
+                name="dbg.log",
+                slug="dbg_log",
+                complete=1,
+                num_lines=300,
+                type="t",
+            ),
+        ])
+        logdicts = yield self.db.logs.get_logs_for_steps([102, 101])
+        for logdict in logdicts:
+            self.assertIsInstance(logdict, logs.LogModel)
+        self.assertEqual(
+            [(ld.id, ld.stepid) for ld in logdicts], [(201, 101), (202, 102), (203, 101)]
+        )
+
+        logdicts = yield self.db.logs.get_logs_for_steps([102])
+        self.assertEqual([ld.id for ld in logdicts], [202])
+
     @defer.inlineCallbacks
     def test_getLogLines(self):
         yield self.db.insert_test_data(self.backgroundData + self.testLogLines)
@@ -648,6 +678,47 @@ class Tests(TestReactorMixin, unittest.TestCase):
             lines = yield self.db.logs.getLogLines(logid, 0, logdict.num_lines)
             self.assertEqual(lines, '')
 
+    @async_to_deferred
+    async def test_deleteOldLogChunks_batches(self):
+        await self.db.insert_test_data(self.backgroundData)
+        logids = []
+        for stepid in (101, 102):
+            for i in range(3):
+                logid = await self.db.logs.addLog(
+                    stepid=stepid, name=f'another{i}', slug=f'another{i}', type='s'
+                )
+                for _ in range(4):
+                    await self.db.logs.appendLog(logid, 'xyz\n')
+                logids.append(logid)
+
+        older_than = (self.TIMESTAMP_STEP102 + self.TIMESTAMP_STEP101) / 2
+        marked, logid = await self.db.logs.markOldLogsDeleted(older_than, 2)
+        self.assertEqual((marked, logid), (2, logids[1]))
+        marked, logid = await self.db.logs.markOldLogsDeleted(older_than, 2, logid)
+        self.assertEqual((marked, logid), (1, logids[2]))
+        self.assertEqual(
+            await self.db.logs.markOldLogsDeleted(older_than, 2, logid), (0, logids[2])
+        )
+
+        # 3 logs of 4 chunks to delete
+        deleted, logid = await self.db.logs.deleteDeletedLogChunks(5)
+        self.assertEqual((deleted, logid), (5, logids[1]))
+        self.assertEqual(await self.db.logs.getLogLines(logids[0], 0, 3), '')
+        self.assertEqual(await self.db.logs.getLogLines(logids[1], 0, 3), 'xyz\nxyz\nxyz\n')
+        deleted, logid = await self.db.logs.deleteDeletedLogChunks(5, logid)
+        self.assertEqual((deleted, logid), (5, logids[2]))
+        deleted, logid = await self.db.logs.deleteDeletedLogChunks(5, logid)
+        self.assertEqual((deleted, logid), (2, logids[2]))
+        self.assertEqual(await self.db.logs.deleteDeletedLogChunks(5, logid), (0, logids[2]))
+
+        for logid in logids[:3]:
+            self.assertEqual((await self.db.logs.getLog(logid)).type, 'd')
+        # the logs of the recent step are kept
+        for logid in logids[3:]:
+            log = await self.db.logs.getLog(logid)
+            self.assertEqual(log.type, 's')
+            self.assertEqual(await self.db.logs.getLogLines(logid, 0, 3), 'xyz\n' * 4)
+
     @async_to_deferred
     async def test_insert_logs_non_existing_compression_method(self):
         LOG_ID = 201
@@ -741,3 +812,182 @@ class Tests(TestReactorMixin, unittest.TestCase):
         with self.assertRaises(logs.LogCompressionFormatUnavailableError):
             await self.db.logs.getLogLines(logid=LOG_ID, first_line=1, last_line=1)
         self.flushLoggedErrors(logs.LogCompressionFormatUnavailableError)
+
+    @async_to_deferred
+    async def test_appendLog_tail_cache(self):
+        await self.db.insert_test_data(self.backgroundData + self.testLogLines)
+        self.db.master.config.logCompressionMethod = "gz"
+        await self.db.logs.appendLog(201, 'abc\ndef\n')
+        await self.db.logs.appendLog(201, 'ghi\n')
+
+        with mock.patch.object(self.db.pool, 'do', side_effect=AssertionError("no db access")):
+            self.assertEqual(
+                await self.db.logs.getLogLines(201, 8, 9),
+                "def\nghi\n",
+            )
+        self.assertEqual(self.db.logs._tail_cache.hits, 1)
+
+        # lines before the cached tail come from the database
+        self.assertEqual(await self.db.logs.getLogLines(201, 6, 7), "yet another line\nabc\n")
+        self.assertEqual(self.db.logs._tail_cache.misses, 1)
+
+    @async_to_deferred
+    async def test_finishLog_evicts_tail_cache(self):
+        await self.db.insert_test_data(self.backgroundData + self.testLogLines)
+        await self.db.logs.appendLog(201, 'abc\n')
+        await self.db.logs.finishLog(201)
+
+        self.assertIsNone(self.db.logs._tail_cache.get_lines(201, 7, 7))
+        self.assertEqual(await self.db.logs.getLogLines(201, 7, 7), "abc\n")
+
+    @async_to_deferred
+    async def test_compressLog_evicts_tail_cache(self):
+        await self.db.insert_test_data(self.backgroundData + self.testLogLines)
+        await self.db.logs.appendLog(201, 'abc\n')
+        await self.db.logs.compressLog(201)
+
+        self.assertIsNone(self.db.logs._tail_cache.get_lines(201, 7, 7))
+
+    async def _add_other_logs(self) -> list[int]:
+        await self.db.insert_test_data(self.backgroundData + self.testLogLines)
+        return [
+            await self.db.logs.addLog(stepid=102, name=name, slug=name, type='s')
+            for name in ('another', 'yet_another')
+        ]
+
+    @async_to_deferred
+    async def test_appendLog_batched(self):
+        logid1, logid2 = await self._add_other_logs()
+
+        batches: list[list[int]] = []
+        first_write_done: defer.Deferred[None] = defer.Deferred()
+        do_with_transaction = self.db.pool.do_with_transaction
+
+        def _do_with_transaction(callable, batch):
+            batches.append([append.logid for append in batch])
+            d = do_with_transaction(callable, batch)
+            if len(batches) == 1:
+                # keep the first write running
+                d.addCallback(lambda res: first_write_done.addCallback(lambda _: res))
+            return d
+
+        self.patch(self.db.pool, 'do_with_transaction', _do_with_transaction)
+
+        d1 = self.db.logs.appendLog(201, 'abc\n')
+        # queued while the first write runs, and written together
+        d2 = self.db.logs.appendLog(logid1, 'xyz\n')
+        d3 = self.db.logs.appendLog(logid2, 'uvw\nrst\n')
+        first_write_done.callback(None)
+
+        self.assertEqual(await d1, (7, 7))
+        self.assertEqual(await d2, (0, 0))
+        self.assertEqual(await d3, (0, 1))
+        self.assertEqual(batches, [[201], [logid1, logid2]])
+
+        # num_lines is known by the master for the next appends
+        self.assertEqual(await self.db.logs.appendLog(logid2, 'opq\n'), (2, 2))
+        self.assertEqual(batches[-1], [logid2])
+
+        self.assertEqual(await self.db.logs.getLogLines(logid2, 0, 2), "uvw\nrst\nopq\n")
+        self.assertEqual((await self.db.logs.getLog(logid2)).num_lines, 3)
+        self.assertEqual((await self.db.logs.getLog(logid1)).num_lines, 1)
+
+    @async_to_deferred
+    async def test_appendLog_batch_failure(self):
+        logid1, _ = await self._add_other_logs()
+
+        writer = self.db.logs._chunks_writer
+        thd_write = writer._thd_write
+
+        def _thd_write(conn, batch):
+            if any(append.logid == 201 for append in batch):
+                raise RuntimeError("oh noes")
+            return thd_write(conn, batch)
+
+        self.patch(writer, '_thd_write', _thd_write)
+
+        # queue both appends in a single batch
+        writer._running = True
+        d1 = self.db.logs.appendLog(201, 'abc\n')
+        d2 = self.db.logs.appendLog(logid1, 'xyz\n')
+        writer._running = False
+        writer._write_pending()
+
+        with self.assertRaises(RuntimeError):
+            await d1
+        self.flushLoggedErrors(RuntimeError)
+        # the other log is not affected
+        self.assertEqual(await d2, (0, 0))
+        self.assertEqual(await self.db.logs.getLogLines(logid1, 0, 0), "xyz\n")
+        self.assertEqual((await self.db.logs.getLog(201)).num_lines, 7)
+        self.assertNotIn(201, self.db.logs._num_lines)
+
+    @async_to_deferred
+    async def test_finishLog_waits_for_appends(self):
+        await self.db.insert_test_data(self.backgroundData + self.testLogLines)
+
+        writer = self.db.logs._chunks_writer
+        writer._running = True
+        d_append = self.db.logs.appendLog(201, 'abc\n')
+        d_finish = self.db.logs.finishLog(201)
+        self.assertNoResult(d_finish)
+
+        writer._running = False
+        writer._write_pending()
+        await d_append
+        await d_finish
+
+        log = await self.db.logs.getLog(201)
+        self.assertEqual((log.complete, log.num_lines), (True, 8))
+        self.assertNotIn(201, self.db.logs._num_lines)
+
+
+class TestLogTailCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = logs.LogTailCache(max_size=2)
+
+    def test_get_lines(self):
+        self.cache.append(1, 10, ['a\n', 'b\n'])
+        self.cache.append(1, 12, ['c\n'])
+        self.assertEqual(self.cache.get_lines(1, 10, 12), ['a\n', 'b\n', 'c\n'])
+        self.assertEqual(self.cache.get_lines(1, 11, 11), ['b\n'])
+        self.assertEqual(self.cache.get_lines(1, 11, None), ['b\n', 'c\n'])
+        self.assertEqual(self.cache.hits, 3)
+
+    def test_get_lines_not_cached(self):
+        self.cache.append(1, 10, ['a\n', 'b\n'])
+        self.assertIsNone(self.cache.get_lines(1, 9, 10))
+        self.assertIsNone(self.cache.get_lines(1, 10, 12))
+        self.assertIsNone(self.cache.get_lines(2, 0, None))
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_append_not_contiguous(self):
+        self.cache.append(1, 10, ['a\n', 'b\n'])
+        self.cache.append(1, 20, ['c\n'])
+        self.assertIsNone(self.cache.get_lines(1, 10, 10))
+        self.assertEqual(self.cache.get_lines(1, 20, 20), ['c\n'])
+
+    def test_tail_size(self):
+        self.patch(logs.LogTailCache, 'MAX_TAIL_SIZE', 6)
+        self.cache.append(1, 0, ['a\n', 'b\n', 'c\n'])
+        self.cache.append(1, 3, ['d\n'])
+        self.assertIsNone(self.cache.get_lines(1, 0, None))
+        self.assertEqual(self.cache.get_lines(1, 1, None), ['b\n', 'c\n', 'd\n'])
+
+    def test_lru(self):
+        self.cache.append(1, 0, ['a\n'])
+        self.cache.append(2, 0, ['b\n'])
+        self.cache.get_lines(1, 0, None)
+        self.cache.append(3, 0, ['c\n'])
+        self.assertEqual(self.cache.get_lines(1, 0, None), ['a\n'])
+        self.assertIsNone(self.cache.get_lines(2, 0, None))
+
+        self.cache.set_max_size(1)
+        self.assertEqual(self.cache.get_lines(1, 0, None), ['a\n'])
+        self.assertIsNone(self.cache.get_lines(3, 0, None))
+
+    def test_evict(self):
+        self.cache.append(1, 0, ['a\n'])
+        self.cache.evict(1)
+        self.cache.evict(2)
+        self.assertIsNone(self.cache.get_lines(1, 0, None))
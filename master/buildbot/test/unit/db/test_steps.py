@@ -179,6 +179,23 @@ class Tests(TestReactorMixin, unittest.TestCase):
         stepdicts = yield self.db.steps.getSteps(buildid=33)
         self.assertEqual(stepdicts, [])
 
+    @defer.inlineCallbacks
+    def test_get_steps_for_builds(self):
+        yield self.db.insert_test_data(self.backgroundData + self.stepRows)
+        stepdicts = yield self.db.steps.get_steps_for_builds([31, 30, 33])
+
+        for stepdict in stepdicts:
+            self.assertIsInstance(stepdict, steps.StepModel)
+
+        self.assertEqual(stepdicts[:3], self.stepDicts[:3])
+        self.assertEqual([(s.id, s.buildid) for s in stepdicts[3:]], [(73, 31)])
+
+    @defer.inlineCallbacks
+    def test_get_steps_for_builds_none(self):
+        yield self.db.insert_test_data(self.backgroundData + self.stepRows)
+        stepdicts = yield self.db.steps.get_steps_for_builds([])
+        self.assertEqual(stepdicts, [])
+
     @defer.inlineCallbacks
     def test_addStep_getStep(self):
         yield self.db.insert_test_data(self.backgroundData)
@@ -13,6 +13,8 @@
 #
 # Copyright Buildbot Team Members
 
+from unittest import mock
+
 from twisted.internet import defer
 from twisted.trial import unittest
 
@@ -153,6 +155,45 @@ class Tests(TestReactorMixin, unittest.TestCase):
             ),
         )
 
+    @defer.inlineCallbacks
+    def test_add_results_names_interned(self):
+        yield self.db.insert_test_data([
+            *self.common_data,
+            fakedb.TestName(id=103, builderid=88, name='name103'),
+        ])
+
+        name_to_id = yield self.db.test_results._add_names(88, {'name103', 'name1'})
+        self.assertEqual(name_to_id['name103'], 103)
+
+        # the ids are known now, the database is not queried again
+        self.patch(self.db.test_results, '_thd_add_values', mock.Mock())
+        name_to_id2 = yield self.db.test_results._add_names(88, {'name103', 'name1'})
+        self.assertEqual(name_to_id2, name_to_id)
+        self.db.test_results._thd_add_values.assert_not_called()
+
+        yield self.db.test_results.addTestResults(
+            builderid=88,
+            test_result_setid=13,
+            result_values=[{'test_name': 'name1', 'value': '1'}],
+        )
+        results = yield self.db.test_results.getTestResults(builderid=88, test_result_setid=13)
+        self.assertEqual([r.test_name for r in results], ['name1'])
+
+    @defer.inlineCallbacks
+    def test_add_code_paths_interned_up_to_max(self):
+        yield self.db.insert_test_data(self.common_data)
+        self.db.test_results.MAX_INTERNED_IDS = 2
+
+        path_to_id = yield self.db.test_results._add_code_paths(88, {'path1', 'path2', 'path3'})
+        self.assertEqual(len(self.db.test_results._code_path_ids[88]), 2)
+
+        # the paths not remembered are looked up again, with the same ids
+        path_to_id2 = yield self.db.test_results._add_code_paths(88, {'path1', 'path2', 'path3'})
+        self.assertEqual(path_to_id2, path_to_id)
+
+        paths = yield self.db.test_results.getTestCodePaths(builderid=88)
+        self.assertEqual(sorted(paths), ['path1', 'path2', 'path3'])
+
     @defer.inlineCallbacks
     def test_get_names(self):
         yield self.db.insert_test_data([
@@ -237,3 +237,34 @@ class TestBotMaster(TestReactorMixin, unittest.TestCase):
         self.botmaster.maybeStartBuildsForAllBuilders()
 
         brd.maybeStartBuildsOn.assert_called_once_with(['frank', 'larry'])
+
+    def test_maybeStartBuildsForLocks(self):
+        brd = self.botmaster.brd = mock.Mock()
+        lock1 = mock.Mock()
+        lock1.popUnblockedBuilders.return_value = ['frank', 'larry']
+        lock2 = mock.Mock()
+        lock2.popUnblockedBuilders.return_value = ['larry', 'moe']
+
+        self.botmaster.maybeStartBuildsForLocks([lock1, lock2])
+
+        brd.maybeStartBuildsOn.assert_called_once_with(['frank', 'larry', 'moe'])
+
+    def test_maybeStartBuildsForLocks_none_unblocked(self):
+        brd = self.botmaster.brd = mock.Mock()
+        lock = mock.Mock()
+        lock.popUnblockedBuilders.return_value = []
+
+        self.botmaster.maybeStartBuildsForLocks([lock])
+
+        brd.maybeStartBuildsOn.assert_not_called()
+
+    def test_buildrequest_priority_updated(self):
+        brd = self.botmaster.brd = mock.Mock()
+        self.master.mq.verifyMessages = False
+
+        self.master.mq.callConsumer(
+            ('buildrequests', '10', 'update'),
+            {'buildrequestid': 10, 'builderid': 77, 'priority': 5},
+        )
+
+        brd.set_build_requests_priority.assert_called_once_with([10], 5)
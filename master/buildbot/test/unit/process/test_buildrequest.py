@@ -406,6 +406,34 @@ class TestBuildRequestCollapser(TestReactorMixin, unittest.TestCase):
         yield self.do_request_collapse([22], [])
         yield self.do_request_collapse([21], [20])
 
+    @defer.inlineCallbacks
+    def test_collapseRequests_collapse_default_compares_signatures(self):
+        rows = [
+            fakedb.Master(id=fakedb.FakeDBConnector.MASTER_ID),
+            fakedb.SourceStamp(id=222, codebase='C'),
+            fakedb.SourceStamp(id=223, codebase='C', revision='abcd1234'),
+            fakedb.Builder(id=77, name='A'),
+        ]
+        rows += self.makeBuildRequestRows(21, 121, None, 222)
+        rows += self.makeBuildRequestRows(20, 120, None, 222)
+        rows += self.makeBuildRequestRows(19, 119, None, 223)
+        rows += self.makeBuildRequestRows(18, 118, None, 222)
+        rows += self.makeBuildRequestRows(17, 117, None, 222)
+        self.bldr.getCollapseRequestsFn = lambda: Builder._defaultCollapseRequestFn
+        yield self.master.db.insert_test_data(rows)
+
+        get_changed = mock.Mock(wraps=self.master.db.changes.getSourceStampIdsWithChanges)
+        self.patch(self.master.db.changes, 'getSourceStampIdsWithChanges', get_changed)
+        self.patch(
+            buildrequest.BuildRequest,
+            'canBeCollapsed',
+            mock.Mock(side_effect=AssertionError('called for each pair')),
+        )
+
+        yield self.do_request_collapse([21], [17, 18, 20])
+        # a single query for all the candidates
+        self.assertEqual(get_changed.call_count, 1)
+
 
 class TestSourceStamp(unittest.TestCase):
     def test_asdict_minimal(self):
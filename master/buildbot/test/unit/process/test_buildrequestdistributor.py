@@ -272,6 +272,97 @@ class Test(TestBRDBase):
         self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1'])
         self.checkAllCleanedUp()
 
+    def useConcurrentMock_maybeStartBuildsOnBuilder(self, concurrency, builder_workers):
+        # builders distribute until their deferred in self.distributing is fired
+        self.master.config.builderDistributionConcurrency = concurrency
+        self.maybeStartBuildsOnBuilder_calls = []
+        self.distributing = {}
+
+        self.addBuilders(list(builder_workers))
+        for name, workernames in builder_workers.items():
+            for workername in workernames:
+                wfb = mock.Mock(name=workername)
+                wfb.worker.workername = workername
+                self.builders[name].workers.append(wfb)
+
+        def maybeStartBuildsOnBuilder(bldr):
+            self.assertNotIn(bldr.name, self.distributing)
+            self.maybeStartBuildsOnBuilder_calls.append(bldr.name)
+            d = self.distributing[bldr.name] = defer.Deferred()
+            return d
+
+        self.brd._maybeStartBuildsOnBuilder = maybeStartBuildsOnBuilder
+
+    def finishDistributing(self, name):
+        self.distributing.pop(name).callback(None)
+
+    @defer.inlineCallbacks
+    def test_maybeStartBuildsOn_concurrent(self):
+        self.useConcurrentMock_maybeStartBuildsOnBuilder(2, {'bldr1': [], 'bldr2': [], 'bldr3': []})
+        yield self.brd.maybeStartBuildsOn(['bldr1', 'bldr2', 'bldr3'])
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr2'])
+
+        self.finishDistributing('bldr2')
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr2', 'bldr3'])
+
+        self.finishDistributing('bldr1')
+        self.finishDistributing('bldr3')
+        yield self.brd._waitForFinish()
+        self.checkAllCleanedUp()
+
+    @defer.inlineCallbacks
+    def test_maybeStartBuildsOn_concurrent_shared_workers(self):
+        self.useConcurrentMock_maybeStartBuildsOnBuilder(
+            3, {'bldr1': ['w1'], 'bldr2': ['w1', 'w2'], 'bldr3': ['w2'], 'bldr4': ['w3']}
+        )
+        yield self.brd.maybeStartBuildsOn(['bldr1', 'bldr2', 'bldr3', 'bldr4'])
+        # bldr2 waits for bldr1, and bldr3 must not take w2 before bldr2
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr4'])
+
+        self.finishDistributing('bldr1')
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr4', 'bldr2'])
+
+        self.finishDistributing('bldr2')
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr4', 'bldr2', 'bldr3'])
+
+        self.finishDistributing('bldr3')
+        self.finishDistributing('bldr4')
+        yield self.brd._waitForFinish()
+        self.checkAllCleanedUp()
+
+    @defer.inlineCallbacks
+    def test_maybeStartBuildsOn_concurrent_new_builders(self):
+        self.useConcurrentMock_maybeStartBuildsOnBuilder(2, {'bldr1': ['w1'], 'bldr2': ['w2']})
+        yield self.brd.maybeStartBuildsOn(['bldr1'])
+
+        # a slow builder does not delay the builders added meanwhile, but is not distributed
+        # twice at the same time
+        yield self.brd.maybeStartBuildsOn(['bldr1', 'bldr2'])
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr2'])
+
+        self.finishDistributing('bldr2')
+        self.finishDistributing('bldr1')
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1', 'bldr2', 'bldr1'])
+
+        self.finishDistributing('bldr1')
+        yield self.brd._waitForFinish()
+        self.checkAllCleanedUp()
+
+    @defer.inlineCallbacks
+    def test_maybeStartBuildsOn_concurrent_stop(self):
+        self.useConcurrentMock_maybeStartBuildsOnBuilder(2, {'bldr1': [], 'bldr2': []})
+        yield self.brd.maybeStartBuildsOn(['bldr1'])
+
+        d = self.brd.stopService()
+        self.assertNoResult(d)
+        yield self.brd.maybeStartBuildsOn(['bldr2'])
+
+        self.finishDistributing('bldr1')
+        yield d
+        yield self.brd._waitForFinish()
+        self.assertEqual(self.maybeStartBuildsOnBuilder_calls, ['bldr1'])
+        self.checkAllCleanedUp()
+
     @defer.inlineCallbacks
     def do_test_sortBuilders(
         self,
@@ -280,9 +371,10 @@ class Test(TestBRDBase):
         highestPriorities,
         expected,
         returnDeferred=False,
+        queue_stats=False,
     ):
         self.useMock_maybeStartBuildsOnBuilder()
-        self.addBuilders(list(oldestRequestTimes))
+        yield self.addBuilders(list(oldestRequestTimes))
         self.master.config.prioritizeBuilders = prioritizeBuilders
 
         def mklambda(t):  # work around variable-binding issues
@@ -298,11 +390,33 @@ class Test(TestBRDBase):
         for n, t in highestPriorities.items():
             self.builders[n].get_highest_priority = mklambda(t)
 
+        if queue_stats:
+            self.builders_from_queue_stats(oldestRequestTimes, highestPriorities)
+        else:
+            # the builders are queried when the statistics are not loaded
+            self.brd._queue_stats.clear()
+
         result = yield self.brd._sortBuilders(list(oldestRequestTimes))
 
         self.assertEqual(result, expected)
         self.checkAllCleanedUp()
 
+    def builders_from_queue_stats(self, oldestRequestTimes, highestPriorities):
+        # the builders are not queried when the statistics are loaded
+        for brid, (n, t) in enumerate(oldestRequestTimes.items()):
+            bldr = self.builders[n]
+            bldr.getOldestRequestTime = bldr.get_highest_priority = None
+            if t is None:
+                continue
+            self.brd._queue_stats.update({
+                'buildrequestid': brid,
+                'builderid': bldr.getBuilderId(),
+                'priority': highestPriorities[n],
+                'submitted_at': epoch2datetime(t),
+                'claimed': False,
+                'complete': False,
+            })
+
     def test_sortBuilders_default_sync(self):
         return self.do_test_sortBuilders(
             None,  # use the default sort
@@ -336,6 +450,64 @@ class Test(TestBRDBase):
             ['bldr1', 'bldr3', 'bldr2'],
         )
 
+    def test_sortBuilders_default_queue_stats(self):
+        return self.do_test_sortBuilders(
+            None,  # use the default sort
+            {"bldr1": 777, "bldr2": 999, "bldr3": 888, "bldr4": None},
+            {"bldr1": 10, "bldr2": 15, "bldr3": 10, "bldr4": None},
+            ['bldr2', 'bldr1', 'bldr3', 'bldr4'],
+            queue_stats=True,
+        )
+
+    def test_queue_stats_follow_events(self):
+        builderid = 77
+        self.master.mq.verifyMessages = False
+
+        def send(brid, event, priority=0, claimed=False, complete=False):
+            self.master.mq.callConsumer(
+                ('buildrequests', str(brid), event),
+                {
+                    'buildrequestid': brid,
+                    'builderid': builderid,
+                    'priority': priority,
+                    'submitted_at': epoch2datetime(100 + brid),
+                    'claimed': claimed,
+                    'complete': complete,
+                },
+            )
+
+        send(10, 'new')
+        send(11, 'new', priority=5)
+        self.assertEqual(self.brd._queue_stats.get(builderid), (5, epoch2datetime(110)))
+
+        send(10, 'claimed', claimed=True)
+        self.assertEqual(self.brd._queue_stats.get(builderid), (5, epoch2datetime(111)))
+
+        send(11, 'update', priority=2)
+        self.assertEqual(self.brd._queue_stats.get(builderid), (2, epoch2datetime(111)))
+
+        send(11, 'complete', claimed=True, complete=True)
+        self.assertEqual(self.brd._queue_stats.get(builderid), (None, None))
+
+    @defer.inlineCallbacks
+    def test_queue_stats_reloaded(self):
+        yield self.master.db.insert_test_data([
+            *self.base_rows,
+            fakedb.BuildRequest(
+                id=10, buildsetid=11, builderid=77, priority=3, submitted_at=130000
+            ),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77, submitted_at=120000),
+        ])
+        # loaded at startup, before the requests were added
+        self.assertTrue(self.brd._queue_stats.loaded)
+        self.assertEqual(self.brd._queue_stats.get(77), (None, None))
+
+        self.reactor.advance(self.brd.QUEUE_STATS_RELOAD_INTERVAL)
+        self.assertEqual(self.brd._queue_stats.get(77), (3, epoch2datetime(120000)))
+
+        yield self.brd.stopService()
+        self.assertFalse(self.brd._queue_stats.loaded)
+
     def test_sortBuilders_custom(self):
         def prioritizeBuilders(master, builders):
             self.assertIdentical(master, self.master)
@@ -685,6 +857,49 @@ class TestMaybeStartBuilds(TestBRDBase):
             ('test-worker2', [10]),
         ])
 
+    @defer.inlineCallbacks
+    def test_sorted_by_priority(self):
+        self.bldr.config.nextWorker = nth_worker(-1)
+        self.addWorkers({'test-worker1': 1, 'test-worker2': 1, 'test-worker3': 1})
+        rows = [
+            *self.base_rows,
+            fakedb.BuildRequest(id=10, buildsetid=11, builderid=77, priority=0),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77, priority=5),
+            fakedb.BuildRequest(id=12, buildsetid=11, builderid=77, priority=5),
+        ]
+        yield self.do_test_maybeStartBuildsOnBuilder(
+            rows=rows,
+            exp_claims=[10, 11, 12],
+            exp_builds=[('test-worker3', [11]), ('test-worker2', [12]), ('test-worker1', [10])],
+        )
+
+    @defer.inlineCallbacks
+    def test_priority_changed_while_choosing(self):
+        self.bldr.config.nextWorker = nth_worker(-1)
+
+        def maybeStartBuild(worker, builds):
+            if not self.startedBuilds:
+                self.brd.set_build_requests_priority([12], 10)
+            worker.isAvailable.return_value = False
+            self.startedBuilds.append((worker.name, builds))
+            return defer.succeed(True)
+
+        self.bldr.maybeStartBuild = maybeStartBuild
+
+        self.addWorkers({'test-worker1': 1, 'test-worker2': 1})
+        rows = [
+            *self.base_rows,
+            fakedb.BuildRequest(id=10, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=12, buildsetid=11, builderid=77),
+        ]
+        yield self.do_test_maybeStartBuildsOnBuilder(
+            rows=rows,
+            exp_claims=[10, 12],
+            exp_builds=[('test-worker2', [10]), ('test-worker1', [12])],
+        )
+        self.assertEqual(self.brd._build_choosers, {})
+
     @defer.inlineCallbacks
     def test_limited_by_requests(self):
         self.bldr.config.nextWorker = nth_worker(1)
@@ -767,6 +982,86 @@ class TestMaybeStartBuilds(TestBRDBase):
             rows=rows, exp_claims=[11], exp_builds=[('test-worker1', [11])]
         )
 
+    def setup_batched_claims(self, claimed_elsewhere=()):
+        # builds can be claimed by batches when they do not depend on each other
+        self.bldr.config.locks = []
+        self.bldr.config.canStartBuild = None
+        self.bldr.config.nextWorker = nth_worker(-1)
+        self.addWorkers({'test-worker1': 1, 'test-worker2': 1, 'test-worker3': 1})
+
+        claims = []
+        old_claimBuildRequests = self.master.db.buildrequests.claimBuildRequests
+
+        def claimBuildRequests(brids, claimed_at=None):
+            claims.append(sorted(brids))
+            if len(claims) == 1 and claimed_elsewhere:
+                # claim for some other master, and fail
+                self.master.db.buildrequests._claim_buildrequests_for_master(
+                    list(claimed_elsewhere), 136000, 9999
+                )
+                return defer.fail(buildrequests.AlreadyClaimedError())
+            return old_claimBuildRequests(brids, claimed_at=claimed_at)
+
+        self.master.db.buildrequests.claimBuildRequests = claimBuildRequests
+        return claims
+
+    @defer.inlineCallbacks
+    def test_batched_claim(self):
+        claims = self.setup_batched_claims()
+        rows = [
+            *self.base_rows,
+            fakedb.BuildRequest(id=10, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=12, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=13, buildsetid=11, builderid=77),
+        ]
+        yield self.do_test_maybeStartBuildsOnBuilder(
+            rows=rows,
+            exp_claims=[10, 11, 12],
+            exp_builds=[('test-worker3', [10]), ('test-worker2', [11]), ('test-worker1', [12])],
+        )
+        self.assertEqual(claims, [[10, 11, 12]])
+
+    @defer.inlineCallbacks
+    def test_batched_claim_race(self):
+        claims = self.setup_batched_claims(claimed_elsewhere=[11])
+        rows = [
+            *self.base_rows,
+            fakedb.Master(id=9999),
+            fakedb.BuildRequest(id=10, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=12, buildsetid=11, builderid=77),
+        ]
+        yield self.do_test_maybeStartBuildsOnBuilder(
+            rows=rows,
+            exp_claims=[10, 12],
+            exp_builds=[('test-worker3', [10]), ('test-worker1', [12])],
+        )
+        # only the builds of the failed batch are claimed again
+        self.assertEqual(claims, [[10, 11, 12], [10], [11], [12]])
+
+    @defer.inlineCallbacks
+    def test_batched_start_fails(self):
+        self.setup_batched_claims()
+        start_build_results = [True, False]
+
+        def maybeStartBuild(worker, builds):
+            self.startedBuilds.append((worker.name, builds))
+            return defer.succeed(start_build_results.pop(0))
+
+        self.bldr.maybeStartBuild = maybeStartBuild
+        rows = [
+            *self.base_rows,
+            fakedb.BuildRequest(id=10, buildsetid=11, builderid=77),
+            fakedb.BuildRequest(id=11, buildsetid=11, builderid=77),
+        ]
+        yield self.do_test_maybeStartBuildsOnBuilder(
+            rows=rows,
+            exp_claims=[10],
+            exp_builds=[('test-worker3', [10]), ('test-worker2', [11])],
+        )
+        self.botmaster.maybeStartBuildsForBuilder.assert_called_once()
+
     # nextWorker
     @defer.inlineCallbacks
     def do_test_nextWorker(self, nextWorker, global_select_next_worker, exp_choice=None):
@@ -924,3 +1219,144 @@ class TestMaybeStartBuilds(TestBRDBase):
         result = self.do_test_nextBuild(nextBuild)
         self.assertEqual(1, len(self.flushLoggedErrors(RuntimeError)))
         return result
+
+
+class TestUnclaimedBuildRequests(unittest.TestCase):
+    def make_requests(self, *priorities):
+        # buildrequestids are given in reverse order to check they get sorted
+        return buildrequestdistributor.UnclaimedBuildRequests([
+            {'buildrequestid': brid, 'priority': priority}
+            for brid, priority in reversed(list(enumerate(priorities, start=1)))
+        ])
+
+    def assert_highest_priority(self, requests, brid):
+        brdict = requests.highest_priority()
+        self.assertEqual(brdict['buildrequestid'] if brdict else None, brid)
+
+    def test_iter_sorted_by_id(self):
+        requests = self.make_requests(0, 3, 1)
+        self.assertEqual([brd['buildrequestid'] for brd in requests], [1, 2, 3])
+        self.assertEqual(len(requests), 3)
+
+    def test_highest_priority_oldest_first(self):
+        requests = self.make_requests(0, 3, 1, 3)
+        self.assert_highest_priority(requests, 2)
+
+    def test_empty(self):
+        requests = self.make_requests()
+        self.assertEqual(len(requests), 0)
+        self.assert_highest_priority(requests, None)
+
+    def test_remove(self):
+        requests = self.make_requests(0, 3, 1, 3)
+        self.assertEqual(requests.remove(2)['buildrequestid'], 2)
+        self.assertIsNone(requests.remove(2))
+        self.assertIsNone(requests.get(2))
+        self.assert_highest_priority(requests, 4)
+        requests.remove(4)
+        self.assert_highest_priority(requests, 3)
+        self.assertEqual([brd['buildrequestid'] for brd in requests], [1, 3])
+
+    def test_set_priority_raise(self):
+        requests = self.make_requests(0, 3, 1)
+        requests.set_priority(1, 5)
+        self.assertEqual(requests.get(1)['priority'], 5)
+        self.assert_highest_priority(requests, 1)
+
+    def test_set_priority_lower(self):
+        requests = self.make_requests(0, 3, 1)
+        requests.set_priority(2, -1)
+        self.assert_highest_priority(requests, 3)
+        requests.remove(3)
+        self.assert_highest_priority(requests, 1)
+
+    def test_set_priority_back_and_forth(self):
+        requests = self.make_requests(0, 3, 1)
+        requests.set_priority(2, -1)
+        requests.set_priority(2, 3)
+        self.assert_highest_priority(requests, 2)
+        requests.remove(2)
+        self.assert_highest_priority(requests, 3)
+
+    def test_set_priority_missing(self):
+        requests = self.make_requests(0)
+        requests.set_priority(5, 10)
+        self.assert_highest_priority(requests, 1)
+
+
+class TestBuilderQueueStats(unittest.TestCase):
+    def make_brdict(self, brid, priority=0, submitted_at=100, builderid=77, claimed=False):
+        return {
+            'buildrequestid': brid,
+            'builderid': builderid,
+            'priority': priority,
+            'submitted_at': epoch2datetime(submitted_at),
+            'claimed': claimed,
+            'complete': False,
+        }
+
+    def make_model(self, brid, priority=0, submitted_at=100, builderid=77):
+        return buildrequests.BuildRequestModel(
+            buildrequestid=brid,
+            buildsetid=1,
+            builderid=builderid,
+            buildername='A',
+            submitted_at=epoch2datetime(submitted_at),
+            priority=priority,
+        )
+
+    def test_get(self):
+        stats = buildrequestdistributor.BuilderQueueStats()
+        stats.update(self.make_brdict(1, priority=1, submitted_at=300))
+        stats.update(self.make_brdict(2, priority=5, submitted_at=200))
+        stats.update(self.make_brdict(3, priority=2, submitted_at=100))
+        stats.update(self.make_brdict(4, priority=9, submitted_at=50, builderid=78))
+        self.assertEqual(stats.get(77), (5, epoch2datetime(100)))
+        self.assertEqual(stats.get(78), (9, epoch2datetime(50)))
+        self.assertEqual(stats.get(79), (None, None))
+
+    def test_claimed_removed(self):
+        stats = buildrequestdistributor.BuilderQueueStats()
+        stats.update(self.make_brdict(1, priority=5))
+        stats.update(self.make_brdict(2, priority=1, submitted_at=200))
+        self.assertEqual(stats.get(77), (5, epoch2datetime(100)))
+        stats.update(self.make_brdict(1, priority=5, claimed=True))
+        self.assertEqual(stats.get(77), (1, epoch2datetime(200)))
+        # unknown requests are ignored
+        stats.update(self.make_brdict(3, claimed=True))
+        stats.update(self.make_brdict(2, claimed=True))
+        self.assertEqual(stats.get(77), (None, None))
+
+    def test_update_priority(self):
+        stats = buildrequestdistributor.BuilderQueueStats()
+        stats.update(self.make_brdict(1, priority=5))
+        stats.update(self.make_brdict(2, priority=1, submitted_at=200))
+        stats.update_priority({'buildrequestid': 2, 'builderid': 77, 'priority': 8})
+        self.assertEqual(stats.get(77), (8, epoch2datetime(100)))
+        # unknown requests are ignored
+        stats.update_priority({'buildrequestid': 3, 'builderid': 77, 'priority': 10})
+        stats.update_priority({'buildrequestid': 4, 'builderid': 78, 'priority': 10})
+        self.assertEqual(stats.get(77), (8, epoch2datetime(100)))
+        self.assertEqual(stats.get(78), (None, None))
+
+    def test_load_replays_events(self):
+        stats = buildrequestdistributor.BuilderQueueStats()
+        stats.update(self.make_brdict(1, priority=8))
+        stats.start_loading()
+        stats.update(self.make_brdict(2, priority=5, submitted_at=200))
+        stats.update(self.make_brdict(3, claimed=True))
+        stats.update_priority({'buildrequestid': 4, 'builderid': 77, 'priority': 7})
+        self.assertFalse(stats.loaded)
+        stats.load([self.make_model(3, priority=9, submitted_at=50), self.make_model(4)])
+        self.assertTrue(stats.loaded)
+        # request 1 was not found when loading, request 3 was claimed meanwhile and the
+        # priority of request 4 was changed
+        self.assertEqual(stats.get(77), (7, epoch2datetime(100)))
+
+    def test_load_aborted(self):
+        stats = buildrequestdistributor.BuilderQueueStats()
+        stats.start_loading()
+        stats.clear()
+        stats.load([self.make_model(1)])
+        self.assertFalse(stats.loaded)
+        self.assertEqual(stats.get(77), (None, None))
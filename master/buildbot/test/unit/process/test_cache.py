@@ -18,6 +18,7 @@ from unittest import mock
 from twisted.internet import defer
 from twisted.trial import unittest
 
+from buildbot.db import logs
 from buildbot.process import cache
 
 
@@ -25,9 +26,10 @@ class CacheManager(unittest.TestCase):
     def setUp(self):
         self.caches = cache.CacheManager()
 
-    def make_config(self, **kwargs):
+    def make_config(self, cachesMaxBytes=None, **kwargs):
         cfg = mock.Mock()
         cfg.caches = kwargs
+        cfg.cachesMaxBytes = cachesMaxBytes
         return cfg
 
     def test_get_cache_idempotency(self):
@@ -50,5 +52,69 @@ class CacheManager(unittest.TestCase):
         self.caches.get_cache("foo", None)
         self.assertIn('foo', self.caches.get_metrics())
         metric = self.caches.get_metrics()['foo']
-        for k in 'hits', 'refhits', 'misses', 'max_size':
+        for k in 'hits', 'refhits', 'misses', 'max_size', 'evictions', 'bytes':
             self.assertIn(k, metric)
+
+    @defer.inlineCallbacks
+    def test_limits(self):
+        foo_cache = self.caches.get_cache("foo", None, size_fn=len)
+        yield self.caches.reconfigServiceWithBuildbotConfig(
+            self.make_config(cachesMaxBytes=100, foo={'size': 5, 'max_bytes': 50, 'ttl': 10})
+        )
+        self.assertEqual(
+            (foo_cache.max_size, foo_cache.max_bytes, foo_cache.ttl, foo_cache.budget.max_bytes),
+            (5, 50, 10, 100),
+        )
+
+        foo_cache.put(1, set(range(30)))
+        foo_cache.put(2, set(range(30)))
+        metric = self.caches.get_metrics()['foo']
+        self.assertEqual(
+            (metric['size'], metric['evictions'], metric['bytes'], metric['max_bytes']),
+            (1, 1, 30, 50),
+        )
+
+        yield self.caches.reconfigServiceWithBuildbotConfig(self.make_config(foo=5))
+        self.assertEqual((foo_cache.max_bytes, foo_cache.ttl), (None, None))
+        self.assertIsNone(self.caches.get_metrics()['foo']['bytes'])
+
+    def test_memory_budget(self):
+        self.caches.memory_budget.max_bytes = 100
+        foo_cache = self.caches.get_cache("foo", None, size_fn=len)
+        bar_cache = self.caches.get_cache("bar", None, size_fn=len)
+        foo_cache.set_max_size(10)
+        bar_cache.set_max_size(10)
+
+        bar_cache.put(1, set(range(20)))
+        for i in range(4):
+            foo_cache.put(i, set(range(20)))
+        self.assertEqual((len(foo_cache.cache), len(bar_cache.cache)), (4, 1))
+
+        # the biggest cache gives way
+        bar_cache.put(2, set(range(20)))
+        self.assertEqual((len(foo_cache.cache), len(bar_cache.cache)), (3, 2))
+        self.assertEqual(foo_cache.keys(), [1, 2, 3])
+
+    @defer.inlineCallbacks
+    def test_register_cache(self):
+        log_tails = logs.LogTailCache()
+        self.assertIdentical(self.caches.register_cache("tails", log_tails, 20), log_tails)
+        self.assertEqual(log_tails.max_size, 20)
+        self.assertIn('tails', self.caches.get_metrics())
+
+        yield self.caches.reconfigServiceWithBuildbotConfig(self.make_config(tails=5))
+        self.assertEqual(log_tails.max_size, 5)
+        yield self.caches.reconfigServiceWithBuildbotConfig(self.make_config())
+        self.assertEqual(log_tails.max_size, 20)
+
+    def test_remove_cache(self):
+        foo_cache = self.caches.get_cache("foo", None)
+        foo_cache.put(1, set())
+        self.caches.remove_cache("foo")
+
+        self.assertEqual(foo_cache.keys(), [])
+        self.assertNotIn('foo', self.caches.get_metrics())
+        self.assertNotIn(foo_cache, self.caches.memory_budget.caches)
+        self.assertNotIdentical(self.caches.get_cache("foo", None), foo_cache)
+        # removing an unknown cache is harmless
+        self.caches.remove_cache("bar")
@@ -1063,6 +1063,62 @@ class TestProperties(unittest.TestCase):
         res = yield self.props.render(Renderable())
         self.assertEqual(res, 'yz')
 
+    @defer.inlineCallbacks
+    def assertRenderCached(self, renderable, expected, cached=True):
+        with mock.patch.object(
+            renderable, 'getRenderingFor', wraps=renderable.getRenderingFor
+        ) as getRenderingFor:
+            res = yield self.props.render(renderable)
+            self.assertEqual(res, expected)
+            res = yield self.props.render(renderable)
+            self.assertEqual(res, expected)
+        self.assertEqual(getRenderingFor.call_count, 1 if cached else 2)
+
+    @defer.inlineCallbacks
+    def test_render_cached(self):
+        self.props.setProperty('x', 'y', 'test')
+        yield self.assertRenderCached(Interpolate('%(prop:x)s-%(prop:z:-none)s'), 'y-none')
+        yield self.assertRenderCached(Interpolate('%(kw:a)s', a=Property('x')), 'y')
+        yield self.assertRenderCached(Interpolate('%s', Property('x')), 'y')
+        yield self.assertRenderCached(Property('z', default=Property('x')), 'y')
+        yield self.assertRenderCached(WithProperties('%(x)s'), 'y')
+        yield self.assertRenderCached(WithProperties('%s', 'x:-z'), 'y')
+
+    @defer.inlineCallbacks
+    def test_render_cache_invalidated(self):
+        self.props.setProperty('x', 'y', 'test')
+        interpolate = Interpolate('%(prop:x)s')
+        res = yield self.props.render(interpolate)
+        self.assertEqual(res, 'y')
+
+        self.props.setProperty('x', 'z', 'test')
+        res = yield self.props.render(interpolate)
+        self.assertEqual(res, 'z')
+
+        other = Properties()
+        other.setProperty('x', 'w', 'test')
+        self.props.updateFromProperties(other)
+        res = yield self.props.render(interpolate)
+        self.assertEqual(res, 'w')
+
+    @defer.inlineCallbacks
+    def test_render_not_cached(self):
+        self.props.setProperty('x', 'y', 'test')
+        self.props.setProperty('r', Interpolate('%(prop:x)s'), 'test')
+        self.props.setProperty('l', ['a'], 'test')
+        # the renderable property values and the mutable values
+        yield self.assertRenderCached(Interpolate('%(prop:r)s'), 'y', cached=False)
+        yield self.assertRenderCached(Interpolate('%(prop:l)s'), "['a']", cached=False)
+        # the mutable renderings
+        yield self.assertRenderCached(Property('l'), ['a'], cached=False)
+        # the substitutions which do not only depend on the properties
+        yield self.assertRenderCached(
+            Interpolate('%(kw:a)s', a=ConstantRenderable('b')), 'b', cached=False
+        )
+        yield self.assertRenderCached(
+            WithProperties('%(a)s', a=lambda build: 'b'), 'b', cached=False
+        )
+
 
 class MyPropertiesThing(PropertiesMixin):
     set_runtime_properties = True
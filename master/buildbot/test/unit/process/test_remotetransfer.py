@@ -14,13 +14,19 @@
 # Copyright Buildbot Team Members
 
 
+import io
 import os
+import shutil
 import stat
+import tarfile
 import tempfile
 from unittest.mock import Mock
 
+from twisted.internet import defer
 from twisted.trial import unittest
 
+from buildbot.db.compression import LZ4Compressor
+from buildbot.db.compression import ZStdCompressor
 from buildbot.process import remotetransfer
 
 
@@ -65,6 +71,103 @@ class TestFileWriter(unittest.TestCase):
         mockedFdopen.assert_called_once_with(7, 'wb')
 
 
+class TestDirectoryWriter(unittest.TestCase):
+    def setUp(self):
+        self.destroot = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.destroot, ignore_errors=True)
+
+    def make_archive(self, compress=None):
+        f = io.BytesIO()
+        mode = f'w|{compress}' if compress in ('gz', 'bz2') else 'w|'
+        with tarfile.open(fileobj=f, mode=mode) as archive:
+            for name, content in [('aa', b'lots of a' * 100), ('sub/bb', b'and a little b' * 17)]:
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+        data = f.getvalue()
+
+        if compress == 'zstd':
+            compressobj = ZStdCompressor.CompressObj()
+            data = compressobj.compress(data) + compressobj.flush()
+        elif compress == 'lz4':
+            import lz4.frame
+
+            data = lz4.frame.compress(data)
+        return data
+
+    @defer.inlineCallbacks
+    def check_unpack(self, compress=None):
+        data = self.make_archive(compress)
+        writer = remotetransfer.DirectoryWriter(self.destroot, None, compress, 0o600)
+        for i in range(0, len(data), 64):
+            yield writer.remote_write(data[i : i + 64])
+        yield writer.remote_unpack()
+        yield writer.cancel()
+
+        with open(os.path.join(self.destroot, 'aa'), 'rb') as f:
+            self.assertEqual(f.read(), b'lots of a' * 100)
+        with open(os.path.join(self.destroot, 'sub', 'bb'), 'rb') as f:
+            self.assertEqual(f.read(), b'and a little b' * 17)
+
+    def test_unpack(self):
+        return self.check_unpack()
+
+    def test_unpack_gz(self):
+        return self.check_unpack('gz')
+
+    def test_unpack_bz2(self):
+        return self.check_unpack('bz2')
+
+    def test_unpack_zstd(self):
+        if not ZStdCompressor.available:
+            raise unittest.SkipTest("zstandard not installed")
+        return self.check_unpack('zstd')
+
+    def test_unpack_lz4(self):
+        if not LZ4Compressor.available:
+            raise unittest.SkipTest("lz4 not installed")
+        return self.check_unpack('lz4')
+
+    def test_unpack_after_shutdown(self):
+        # the unpacking pool is stopped on reactor shutdown, but the reactor may be run again
+        remotetransfer.DirectoryWriter._stop_unpack_pool()
+        return self.check_unpack()
+
+    @defer.inlineCallbacks
+    def test_unpack_flow_control(self):
+        self.patch(remotetransfer.DirectoryWriter, 'MAX_PENDING_SIZE', 100)
+        data = self.make_archive()
+        writer = remotetransfer.DirectoryWriter(self.destroot, None, None, 0o600)
+        # the writes wait for the unpacking thread to catch up
+        waits = [writer.remote_write(data[i : i + 512]) for i in range(0, len(data), 512)]
+        waits = [d for d in waits if d is not None]
+        self.assertTrue(waits)
+        yield defer.gatherResults(waits)
+        yield writer.remote_unpack()
+        yield writer.cancel()
+
+        with open(os.path.join(self.destroot, 'sub', 'bb'), 'rb') as f:
+            self.assertEqual(f.read(), b'and a little b' * 17)
+
+    @defer.inlineCallbacks
+    def test_unpack_truncated(self):
+        data = self.make_archive()
+        writer = remotetransfer.DirectoryWriter(self.destroot, 700, None, 0o600)
+        yield writer.remote_write(data)
+        with self.assertRaises(tarfile.ReadError):
+            yield writer.remote_unpack()
+        yield writer.cancel()
+
+    @defer.inlineCallbacks
+    def test_cancel(self):
+        writer = remotetransfer.DirectoryWriter(self.destroot, None, None, 0o600)
+        writer.remote_write(self.make_archive()[:100])
+        yield writer.cancel()
+        writer.purge()
+
+        self.assertFalse(os.path.exists(self.destroot))
+
+
 class TestStringFileWriter(unittest.TestCase):
     def testBasic(self):
         sfw = remotetransfer.StringFileWriter()
@@ -15,6 +15,7 @@
 
 import datetime
 import textwrap
+from unittest import mock
 
 from dateutil.tz import tzutc
 from parameterized import parameterized
@@ -621,6 +622,41 @@ class TestDataUtils(TestReactorMixin, unittest.TestCase, logging.LoggingMixin):
         res = yield utils.getPreviousBuild(self.master, build)
         self.assertEqual(res['buildid'], 18)
 
+    @defer.inlineCallbacks
+    def test_get_previous_builds(self):
+        yield self.setupDb()
+        builds = yield self.master.data.get(("builds",))
+        builds = sort_builds(builds)
+        res = yield utils.get_previous_builds(self.master, builds)
+        self.assertEqual(
+            [b['buildid'] if b else None for b in res],
+            # build 19 is a retry, so the previous build of 20 is 18
+            [None, 18, 18, 20, None],
+        )
+
+    @defer.inlineCallbacks
+    def test_get_details_for_buildset_batched_queries(self):
+        yield self.setupDb()
+        # steps, logs and properties of all builds must be fetched without falling back to
+        # one query per build or per step
+        self.patch(self.master.db.steps, 'getSteps', mock.Mock(side_effect=AssertionError))
+        self.patch(self.master.db.logs, 'getLogs', mock.Mock(side_effect=AssertionError))
+        self.patch(
+            self.master.db.builds, 'getBuildProperties', mock.Mock(side_effect=AssertionError)
+        )
+        res = yield utils.getDetailsForBuildset(
+            self.master, 98, want_properties=True, want_steps=True, want_logs=True
+        )
+        builds = res['builds']
+        self.assertEqual([b['buildid'] for b in builds], [20, 21])
+        for build in builds:
+            self.assertEqual(build['properties']['reason'], ('because', 'fakedb'))
+            self.assertEqual([s['name'] for s in build['steps']], ['step1', 'step2'])
+            self.assertEqual(
+                [l['logid'] for l in build['steps'][0]['logs']], [build['buildid'] + 60]
+            )
+            self.assertEqual(build['steps'][1]['logs'], [])
+
 
 class TestURLUtils(TestReactorMixin, unittest.TestCase):
     @defer.inlineCallbacks
@@ -54,7 +54,15 @@ except ImportError:
 
 
 def mkconfig(**kwargs):
-    config = {"quiet": False, "basedir": os.path.abspath('basedir'), "force": True}
+    config = {
+        "quiet": False,
+        "basedir": os.path.abspath('basedir'),
+        "force": True,
+        "resume": False,
+        "jobs": None,
+        "batch-size": 1000,
+        "compression": None,
+    }
     config.update(kwargs)
     return config
 
@@ -117,6 +125,13 @@ class TestCleanupDb(
         # complain
         self.flushLoggedErrors()
 
+    @async_to_deferred
+    async def test_cleanup_unknown_compression(self):
+        self.createMasterCfg()
+        res = await cleanupdb._cleanupDatabase(mkconfig(basedir='basedir', compression='foo'))
+        self.assertEqual(res, 1)
+        self.assertInStdout("Unknown log compression method 'foo'")
+
 
 class TestCleanupDbRealDb(
     misc.StdoutAssertionsMixin, dirs.DirsMixin, TestReactorMixin, unittest.TestCase
@@ -193,6 +208,62 @@ class TestCleanupDbRealDb(
             },
         )
 
+    async def _add_logs(self, count: int) -> list[int]:
+        await self.master.db.insert_test_data(test_logs.Tests.backgroundData)
+        logids = []
+        for i in range(count):
+            logid = await self.master.db.logs.addLog(102, f"x{i}", f"x{i}", "s")
+            # several chunks per log
+            for _ in range(3):
+                await self.master.db.logs.appendLog(logid, "xx\n" * 100)
+            logids.append(logid)
+        return logids
+
+    async def _get_chunks(self, logid: int) -> list[tuple[int, int]]:
+        def thd(conn):
+            tbl = self.master.db.model.logchunks
+            q = sa.select(tbl.c.first_line, tbl.c.compressed)
+            q = q.where(tbl.c.logid == logid).order_by(tbl.c.first_line)
+            return [tuple(row) for row in conn.execute(q)]
+
+        return await self.master.db.pool.do(thd)
+
+    @async_to_deferred
+    async def test_cleanup_switch_compression(self):
+        logids = await self._add_logs(3)
+        self.createMasterCfg(self.master.db.configured_db_config.db_url)
+
+        res = await cleanupdb._cleanupDatabase(
+            mkconfig(basedir='basedir', force=False, compression='gz', jobs=2, **{'batch-size': 2})
+        )
+        self.assertEqual(res, 0)
+
+        gz_id = self.master.db.logs.COMPRESSION_MODE['gz'][0]
+        for logid in logids:
+            self.assertEqual(await self._get_chunks(logid), [(0, gz_id)])
+            self.assertEqual(await self.master.db.logs.getLogLines(logid, 0, 300), "xx\n" * 300)
+        self.assertFalse(os.path.exists(os.path.join('basedir', cleanupdb.CURSOR_FILE)))
+
+    @async_to_deferred
+    async def test_cleanup_resume(self):
+        logids = await self._add_logs(2)
+        self.createMasterCfg(self.master.db.configured_db_config.db_url)
+        chunks_before = await self._get_chunks(logids[0])
+
+        # a previous cleanup was interrupted after the first log
+        cleanupdb._write_cursor(os.path.join('basedir', cleanupdb.CURSOR_FILE), logids[0])
+
+        res = await cleanupdb._cleanupDatabase(
+            mkconfig(basedir='basedir', resume=True, compression='gz')
+        )
+        self.assertEqual(res, 0)
+        self.assertInStdout(f"resuming after log {logids[0]}")
+
+        gz_id = self.master.db.logs.COMPRESSION_MODE['gz'][0]
+        self.assertEqual(await self._get_chunks(logids[0]), chunks_before)
+        self.assertEqual(await self._get_chunks(logids[1]), [(0, gz_id)])
+        self.assertFalse(os.path.exists(os.path.join('basedir', cleanupdb.CURSOR_FILE)))
+
     def assertDictAlmostEqual(self, d1, d2):
         # The test shows each methods return different size
         # but we still make a fuzzy comparison to resist if underlying libraries
@@ -507,6 +507,41 @@ class WarningCountingShellCommand(
         self.expect_log_file("warnings (2)", "scary: foo\nscary: bar\n")
         return self.run_step()
 
+    def test_custom_pattern_backreference(self):
+        # this pattern can not be combined with the directory patterns
+        self.setup_step(
+            shell.WarningCountingShellCommand(command=['make'], warningPattern=r"(\w+): \1")
+        )
+        self.expect_commands(
+            ExpectShell(workdir='wkdir', command=["make"])
+            .stdout('foo: foo\nfoo: bar\nmake: Entering directory `x`\nbar: bar\n')
+            .exit(0)
+        )
+        self.expect_outcome(result=WARNINGS)
+        self.expect_property("warnings-count", 2)
+        self.expect_log_file("warnings (2)", "foo: foo\nbar: bar\n")
+        return self.run_step()
+
+    def test_custom_warningLogConsumer(self):
+        class MyWCSC(shell.WarningCountingShellCommand):
+            def warningLogConsumer(self):
+                self.loggedWarnings = []
+                while True:
+                    _, line = yield
+                    if line.startswith('oops'):
+                        self.maybeAddWarning(self.loggedWarnings, line, None)
+
+        self.setup_step(MyWCSC(command=['make']))
+        self.expect_commands(
+            ExpectShell(workdir='wkdir', command=["make"])
+            .stdout('oops: foo\nwarning: bar\n')
+            .exit(0)
+        )
+        self.expect_outcome(result=WARNINGS)
+        self.expect_property("warnings-count", 1)
+        self.expect_log_file("warnings (1)", "oops: foo\n")
+        return self.run_step()
+
     def test_maxWarnCount(self):
         self.setup_step(shell.WarningCountingShellCommand(command=['make'], maxWarnCount=9))
         self.expect_commands(
@@ -65,6 +65,30 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
+                maxsize=None,
+                keepstamp=False,
+                writer=ExpectRemoteRef(remotetransfer.FileWriter),
+            )
+            .upload_string("Hello world!\n")
+            .exit(0)
+        )
+
+        self.expect_outcome(result=SUCCESS, state_string="uploading srcfile")
+        d = self.run_step()
+        return d
+
+    def testWindow(self):
+        self.setup_step(
+            transfer.FileUpload(workersrc='srcfile', masterdest=self.destfile, window=1)
+        )
+
+        self.expect_commands(
+            ExpectUploadFile(
+                workersrc="srcfile",
+                workdir='wkdir',
+                blocksize=262144,
+                window=1,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -86,6 +110,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 slavesrc="srcfile",
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -111,6 +136,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc=__file__,
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=True,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -148,6 +174,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc=__file__,
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -176,6 +203,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc=__file__,
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -210,6 +238,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc=__file__,
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -232,6 +261,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -253,6 +283,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -276,6 +307,7 @@ class TestFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workersrc='srcfile',
                 workdir='wkdir',
                 blocksize=262144,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -521,6 +553,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -587,6 +620,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -618,6 +652,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -642,6 +677,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -676,6 +712,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 slavesrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -724,6 +761,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 slavesrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -763,6 +801,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc='srcfile',
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -796,6 +835,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc='srcfile',
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -821,6 +861,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -845,6 +886,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -874,6 +916,7 @@ class TestMultipleFileUpload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workersrc="srcfile",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 keepstamp=False,
                 writer=ExpectRemoteRef(remotetransfer.FileWriter),
@@ -970,6 +1013,7 @@ class TestFileDownload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 workerdest=self.destfile,
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.FileReader),
@@ -1004,6 +1048,7 @@ class TestFileDownload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase):
                 slavedest=self.destfile,
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.FileReader),
@@ -1067,6 +1112,7 @@ class TestStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase
                 workerdest="hello.txt",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1096,6 +1142,7 @@ class TestStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase
                 slavedest="hello.txt",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1117,6 +1164,7 @@ class TestStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.TestCase
                 workerdest="hello.txt",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1164,6 +1212,7 @@ class TestJSONStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workerdest="hello.json",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1193,6 +1242,7 @@ class TestJSONStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workerdest="hello.json",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1215,6 +1265,7 @@ class TestJSONStringDownload(TestBuildStepMixin, TestReactorMixin, unittest.Test
                 workerdest="hello.json",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
@@ -1256,6 +1307,7 @@ class TestJSONPropertiesDownload(TestBuildStepMixin, TestReactorMixin, unittest.
                 workerdest="props.json",
                 workdir='wkdir',
                 blocksize=16384,
+                window=8,
                 maxsize=None,
                 mode=None,
                 reader=ExpectRemoteRef(remotetransfer.StringFileReader),
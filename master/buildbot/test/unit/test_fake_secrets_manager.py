@@ -1,6 +1,7 @@
 from twisted.internet import defer
 from twisted.trial import unittest
 
+from buildbot.process.cache import CacheManager
 from buildbot.secrets.manager import SecretManager
 from buildbot.secrets.secret import SecretDetails
 from buildbot.test.fake import fakemaster
@@ -78,3 +79,74 @@ class TestSecretsManager(TestReactorMixin, unittest.TestCase):
         secret_service_manager.services = [fakeStorageService, otherFakeStorageService]
         secret_result = yield secret_service_manager.get("foo3")
         self.assertEqual(secret_result, None)
+
+    @defer.inlineCallbacks
+    def setup_manager(self, caches):
+        self.master.caches = CacheManager()
+        self.master.config.caches = caches
+        secret_service_manager = SecretManager()
+        yield secret_service_manager.setServiceParent(self.master)
+        yield secret_service_manager.reconfigServiceWithBuildbotConfig(self.master.config)
+        return secret_service_manager
+
+    @defer.inlineCallbacks
+    def testGetCached(self):
+        secret_service_manager = yield self.setup_manager({'secrets': 10})
+        storage = secret_service_manager.namedServices['SecretsInFake']
+
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "bar")
+
+        storage.allsecrets["foo"] = "changed"
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "bar")
+        metrics = self.master.caches.get_metrics()['secrets']
+        self.assertEqual((metrics['hits'], metrics['misses']), (1, 1))
+
+        # missing secrets are not cached
+        secret_result = yield secret_service_manager.get("foo2")
+        self.assertEqual(secret_result, None)
+        storage.allsecrets["foo2"] = "bar2"
+        secret_result = yield secret_service_manager.get("foo2")
+        self.assertEqual(secret_result.value, "bar2")
+
+        # the cache is emptied on reconfig
+        yield secret_service_manager.reconfigServiceWithBuildbotConfig(self.master.config)
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "changed")
+
+    @defer.inlineCallbacks
+    def testCacheDroppedWhenUnconfigured(self):
+        secret_service_manager = yield self.setup_manager({'secrets': 10})
+        storage = secret_service_manager.namedServices['SecretsInFake']
+        secret_result = yield secret_service_manager.get("foo")
+        cache = self.master.caches.get_cache('secrets', None)
+        self.assertEqual(cache.keys(), ["foo"])
+
+        self.master.config.caches = {}
+        yield secret_service_manager.reconfigServiceWithBuildbotConfig(self.master.config)
+        self.assertEqual(cache.keys(), [])
+        self.assertNotIn('secrets', self.master.caches.get_metrics())
+
+        storage.allsecrets["foo"] = "changed"
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "changed")
+        self.assertNotIn('secrets', self.master.caches.get_metrics())
+
+        # configuring it again starts with an empty cache
+        self.master.config.caches = {'secrets': 10}
+        yield secret_service_manager.reconfigServiceWithBuildbotConfig(self.master.config)
+        self.assertEqual(self.master.caches.get_cache('secrets', None).keys(), [])
+
+    @defer.inlineCallbacks
+    def testGetNotCachedByDefault(self):
+        secret_service_manager = yield self.setup_manager({})
+        storage = secret_service_manager.namedServices['SecretsInFake']
+
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "bar")
+
+        storage.allsecrets["foo"] = "changed"
+        secret_result = yield secret_service_manager.get("foo")
+        self.assertEqual(secret_result.value, "changed")
+        self.assertNotIn('secrets', self.master.caches.get_metrics())
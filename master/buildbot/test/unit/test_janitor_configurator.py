@@ -27,7 +27,9 @@ from buildbot.configurators.janitor import JANITOR_NAME
 from buildbot.configurators.janitor import BuildDataJanitor
 from buildbot.configurators.janitor import JanitorConfigurator
 from buildbot.configurators.janitor import LogChunksJanitor
+from buildbot.process.results import CANCELLED
 from buildbot.process.results import SUCCESS
+from buildbot.process.results import WARNINGS
 from buildbot.schedulers.forcesched import ForceScheduler
 from buildbot.schedulers.timed import Nightly
 from buildbot.test.reactor import TestReactorMixin
@@ -74,12 +76,70 @@ class LogChunksJanitorTests(
 
     @defer.inlineCallbacks
     def test_basic(self):
-        self.setup_step(LogChunksJanitor(logHorizon=timedelta(weeks=1)))
-        self.master.db.logs.deleteOldLogChunks = mock.Mock(return_value=3)
+        self.setup_step(LogChunksJanitor(logHorizon=timedelta(weeks=1), batch_pause=0))
+        self.master.db.logs.markOldLogsDeleted = mock.Mock(side_effect=[(2, 12), (0, 12)])
+        self.master.db.logs.deleteDeletedLogChunks = mock.Mock(side_effect=[(3, 11), (0, 11)])
         self.expect_outcome(result=SUCCESS, state_string="deleted 3 logchunks")
         yield self.run_step()
         expected_timestamp = datetime2epoch(datetime.datetime(year=2016, month=12, day=25))
-        self.master.db.logs.deleteOldLogChunks.assert_called_with(expected_timestamp)
+        self.assertEqual(
+            self.master.db.logs.markOldLogsDeleted.call_args_list,
+            [
+                mock.call(expected_timestamp, LogChunksJanitor.LOGS_BATCH_SIZE, 0),
+                mock.call(expected_timestamp, LogChunksJanitor.LOGS_BATCH_SIZE, 12),
+            ],
+        )
+        self.assertEqual(
+            self.master.db.logs.deleteDeletedLogChunks.call_args_list,
+            [mock.call(10000, 0), mock.call(10000, 11)],
+        )
+
+    @defer.inlineCallbacks
+    def test_batches(self):
+        self.setup_step(LogChunksJanitor(logHorizon=timedelta(weeks=1), batch_size=10))
+        self.master.db.logs.markOldLogsDeleted = mock.Mock(side_effect=[(2, 12), (0, 12)])
+        self.master.db.logs.deleteDeletedLogChunks = mock.Mock(
+            side_effect=[(10, 11), (10, 12), (5, 12), (0, 12)]
+        )
+        self.expect_outcome(result=SUCCESS, state_string="deleted 25 logchunks")
+
+        d = self.run_step()
+        # the step pauses between the batches
+        self.assertEqual(self.master.db.logs.deleteDeletedLogChunks.call_count, 0)
+        self.reactor.pump([0.1] * 4)
+        yield d
+        self.assertEqual(self.master.db.logs.deleteDeletedLogChunks.call_count, 4)
+
+    @defer.inlineCallbacks
+    def test_time_budget(self):
+        self.setup_step(
+            LogChunksJanitor(
+                logHorizon=timedelta(weeks=1), batch_pause=1, time_budget=timedelta(seconds=2)
+            )
+        )
+        self.master.db.logs.markOldLogsDeleted = mock.Mock(return_value=(0, 0))
+        self.master.db.logs.deleteDeletedLogChunks = mock.Mock(return_value=(10, 11))
+        self.expect_outcome(
+            result=WARNINGS, state_string="deleted 20 logchunks, to be continued (warnings)"
+        )
+
+        d = self.run_step()
+        self.reactor.pump([1] * 3)
+        yield d
+
+    @defer.inlineCallbacks
+    def test_interrupted(self):
+        self.setup_step(LogChunksJanitor(logHorizon=timedelta(weeks=1), batch_pause=1))
+        self.master.db.logs.markOldLogsDeleted = mock.Mock(return_value=(0, 0))
+        self.master.db.logs.deleteDeletedLogChunks = mock.Mock(return_value=(10, 11))
+        self.expect_outcome(
+            result=CANCELLED, state_string="deleted 10 logchunks, to be continued (cancelled)"
+        )
+
+        d = self.run_step()
+        self.get_nth_step(0).interrupt("stop")
+        self.reactor.pump([1])
+        yield d
 
     @defer.inlineCallbacks
     def test_build_data(self):
@@ -692,6 +692,103 @@ class BaseLockTests(unittest.TestCase):
         self.assertFalse(lock.isAvailable(req2, access2))
         lock.release(req1, access1)
 
+    def make_access(self, mode, count=1):
+        access = mock.Mock(spec=LockAccess)
+        access.mode = mode
+        access.count = count
+        return access
+
+    def test_waiting_in_fifo_order_across_modes(self):
+        req = Requester()
+        req_waiters = [Requester() for _ in range(4)]
+
+        lock = BaseLock('test', maxCount=1)
+        access_counting = self.make_access('counting')
+        access_excl = self.make_access('exclusive')
+        accesses = [access_counting, access_excl, access_counting, access_excl]
+
+        lock.claim(req, access_excl)
+        for req_waiter, access in zip(req_waiters, accesses):
+            lock.waitUntilMaybeAvailable(req_waiter, access)
+
+        self.assertEqual(
+            [(w_id, access) for w_id, access, _ in lock.waiting],
+            [(id(r), a) for r, a in zip(req_waiters, accesses)],
+        )
+
+    def test_counting_waiter_behind_exclusive_waiter_not_available(self):
+        req = Requester()
+        req_excl = Requester()
+        req_counting = Requester()
+
+        lock = BaseLock('test', maxCount=3)
+        access_counting = self.make_access('counting')
+        access_excl = self.make_access('exclusive')
+
+        lock.claim(req, access_counting)
+        lock.waitUntilMaybeAvailable(req_excl, access_excl)
+        lock.waitUntilMaybeAvailable(req_counting, access_counting)
+        lock.release(req, access_counting)
+
+        self.assertTrue(lock.isAvailable(req_excl, access_excl))
+        self.assertFalse(lock.isAvailable(req_counting, access_counting))
+        self.assertFalse(lock.isAvailable(None, access_counting))
+
+    @defer.inlineCallbacks
+    def test_wait_with_other_mode_keeps_place_in_queue(self):
+        req = Requester()
+        req_waiters = [Requester() for _ in range(4)]
+
+        lock = BaseLock('test', maxCount=2)
+        access_counting = self.make_access('counting')
+        access_excl = self.make_access('exclusive')
+
+        lock.claim(req, access_excl)
+        d0 = lock.waitUntilMaybeAvailable(req_waiters[0], access_counting)
+        d1 = lock.waitUntilMaybeAvailable(req_waiters[1], access_counting)
+        lock.waitUntilMaybeAvailable(req_waiters[2], access_excl)
+        lock.waitUntilMaybeAvailable(req_waiters[3], access_counting)
+        lock.release(req, access_excl)
+        yield flushEventualQueue()
+        self.assertTrue(d0.called)
+        self.assertTrue(d1.called)
+
+        # the first waiter takes the lock, the second one now wants exclusive access
+        lock.claim(req_waiters[0], access_counting)
+        lock.waitUntilMaybeAvailable(req_waiters[1], access_excl)
+
+        self.assertEqual(
+            [(w_id, access) for w_id, access, _ in lock.waiting],
+            [
+                (id(req_waiters[1]), access_excl),
+                (id(req_waiters[2]), access_excl),
+                (id(req_waiters[3]), access_counting),
+            ],
+        )
+        lock.release(req_waiters[0], access_counting)
+        self.assertTrue(lock.isAvailable(req_waiters[1], access_excl))
+        self.assertFalse(lock.isAvailable(req_waiters[2], access_excl))
+
+    def test_unblocked_builders(self):
+        req = Requester()
+
+        lock = BaseLock('test', maxCount=2)
+        access_counting = self.make_access('counting')
+        access_excl = self.make_access('exclusive')
+
+        lock.claim(req, access_counting)
+        self.assertEqual(lock.popUnblockedBuilders(), [])
+
+        lock.addBlockedBuilder('bldr-excl', access_excl)
+        lock.addBlockedBuilder('bldr-counting', access_counting)
+        # the lock is still available for counting access
+        self.assertEqual(lock.popUnblockedBuilders(), ['bldr-counting'])
+        self.assertEqual(lock.popUnblockedBuilders(), [])
+
+        lock.release(req, access_counting)
+        self.assertEqual(lock.popUnblockedBuilders(), ['bldr-excl'])
+        self.assertEqual(lock.popUnblockedBuilders(), [])
+
 
 class RealLockTests(unittest.TestCase):
     def test_master_lock_init_from_lockid(self):
@@ -84,3 +84,42 @@ class SimpleMQ(TestReactorMixin, unittest.TestCase):
         self.assertFalse(d.called)
         d1.callback(None)
         self.assertTrue(d.called)
+
+    @defer.inlineCallbacks
+    def test_forward_data_in_subscription_order(self):
+        calls = []
+        yield self.mq.startConsuming(lambda k, d: calls.append(1), ('a', None))
+        yield self.mq.startConsuming(lambda k, d: calls.append(2), ('a', 'b'))
+        yield self.mq.startConsuming(lambda k, d: calls.append(3), (None, 'b'))
+        yield self.mq.startConsuming(lambda k, d: calls.append(4), ('a', 'c'))
+        yield self.mq.produce(('a', 'b'), 'foo')
+        self.assertEqual(calls, [1, 2, 3])
+
+    @defer.inlineCallbacks
+    def test_stop_consuming(self):
+        callback = mock.Mock()
+        qref = yield self.mq.startConsuming(callback, ('a', None))
+        yield qref.stopConsuming()
+        # stopping twice is harmless
+        yield qref.stopConsuming()
+        yield self.mq.produce(('a', 'b'), 'foo')
+        callback.assert_not_called()
+        self.assertEqual(self.mq.qrefs, [])
+        self.assertEqual(len(self.mq.qref_index), 0)
+
+    @defer.inlineCallbacks
+    def test_persistent_queue(self):
+        callback = mock.Mock()
+        qref = yield self.mq.startConsuming(callback, ('a', None), persistent_name='p')
+        yield qref.stopConsuming()
+        yield self.mq.produce(('a', 'b'), 'foo')
+        yield self.mq.produce(('a', 'c'), 'bar')
+        callback.assert_not_called()
+
+        callback2 = mock.Mock()
+        qref2 = yield self.mq.startConsuming(callback2, ('a', None), persistent_name='p')
+        self.assertIdentical(qref, qref2)
+        self.assertEqual(
+            callback2.call_args_list, [mock.call(('a', 'b'), 'foo'), mock.call(('a', 'c'), 'bar')]
+        )
+        self.assertEqual(len(self.mq.qref_index), 1)
@@ -13,6 +13,7 @@
 #
 # Copyright Buildbot Team Members
 
+from unittest import mock
 from unittest.mock import patch
 
 from parameterized import parameterized
@@ -229,6 +230,22 @@ class TestSecretInHashiCorpVaultKvSecretProvider(ConfigErrorsMixin, unittest.Tes
         value = yield self.provider.get("some/path|key")
         self.assertEqual(value, "value")
 
+    @defer.inlineCallbacks
+    def test_get_same_path_read_once(self):
+        self.provider.client.token = "mockToken"
+        self.patch(self.provider, 'thd_hvac_get', mock.Mock(wraps=self.provider.thd_hvac_get))
+        values = yield defer.gatherResults([
+            self.provider.get("some/path|key"),
+            self.provider.get("some/path|key"),
+        ])
+        self.assertEqual(values, ["value", "value"])
+        self.provider.thd_hvac_get.assert_called_once_with(path="some/path")
+
+        # the next lookups read the path again
+        value = yield self.provider.get("some/path|key")
+        self.assertEqual(value, "value")
+        self.assertEqual(self.provider.thd_hvac_get.call_count, 2)
+
     @defer.inlineCallbacks
     def test_get_fail_no_key(self):
         self.provider.client.token = "mockToken"
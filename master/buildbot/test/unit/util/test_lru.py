@@ -263,6 +263,91 @@ class LRUCacheTest(unittest.TestCase):
         self.assertEqual(self.lru.get('q'), set(['new-q']))  # updated
 
 
+class Sized:
+    def __init__(self, size):
+        self.size = size
+
+
+class LRUCacheLimitsTest(unittest.TestCase):
+    def setUp(self):
+        lru.inv_failed = False
+        self.now = 0
+        self.lru = lru.LRUCache(long, 10, size_fn=self.size_fn, clock=lambda: self.now)
+
+    @staticmethod
+    def size_fn(value):
+        return value.size if isinstance(value, Sized) else len(value)
+
+    def tearDown(self):
+        self.lru.inv()
+        self.assertFalse(lru.inv_failed, "invariant failed; see logs")
+
+    def test_max_bytes(self):
+        self.lru.set_limits(max_bytes=50)
+        for k in 'abcdef':
+            self.lru.put(k, Sized(20))
+        self.assertEqual(self.lru.keys(), ['e', 'f'])
+        self.assertEqual((self.lru.total_bytes, self.lru.evictions), (40, 4))
+
+        # the most recent entry is kept even if bigger than max_bytes
+        self.lru.put('g', Sized(100))
+        self.assertEqual(self.lru.keys(), ['g'])
+
+    def test_max_bytes_reconfigured(self):
+        values = [Sized(20) for _ in range(6)]
+        for k, v in zip('abcdef', values):
+            self.lru.put(k, v)
+        self.assertIsNone(self.lru.sizes)
+
+        self.lru.set_limits(max_bytes=50)
+        self.assertEqual(self.lru.keys(), ['e', 'f'])
+
+        self.lru.set_limits()
+        self.assertIsNone(self.lru.sizes)
+        self.assertEqual(self.lru.total_bytes, 0)
+
+    def test_clear(self):
+        self.lru.set_limits(max_bytes=100, ttl=10)
+        a = self.lru.get('a')
+        self.lru.get('b')
+        self.lru.clear()
+        self.assertEqual(self.lru.keys(), [])
+        self.assertEqual(self.lru.total_bytes, 0)
+        # not revived while still referenced
+        self.assertIsNot(self.lru.get('a'), a)
+        self.assertEqual(self.lru.refhits, 0)
+
+    def test_ttl(self):
+        self.lru.set_limits(ttl=10)
+        a = self.lru.get('a')
+        self.now = 5
+        self.assertIs(self.lru.get('a'), a)
+        self.lru.get('b')
+        self.now = 10
+        self.assertIsNot(self.lru.get('a'), a)
+        self.assertEqual((self.lru.misses, self.lru.expirations), (3, 1))
+        self.assertEqual(self.lru.keys(), ['b', 'a'])
+
+    def test_ttl_not_revived_by_weakrefs(self):
+        self.lru.set_max_size(1)
+        self.lru.set_limits(ttl=10)
+        a = self.lru.get('a')
+        self.lru.get('b')
+        self.now = 5
+        # still referenced, so revived
+        self.assertIs(self.lru.get('a'), a)
+        self.now = 10
+        self.assertIsNot(self.lru.get('a'), a)
+        self.assertEqual(self.lru.refhits, 1)
+
+    def test_approximate_size(self):
+        small = lru.approximate_size({'a': ['b']})
+        self.assertGreater(lru.approximate_size({'a': ['b' * 1000]}), small + 900)
+        # shared values are counted once
+        value = 'x' * 1000
+        self.assertLess(lru.approximate_size([value, value]), 2000)
+
+
 class AsyncLRUCacheTest(unittest.TestCase):
     def setUp(self):
         lru.inv_failed = False
@@ -206,6 +206,35 @@ class TestTestResultSubmitter(TestReactorMixin, unittest.TestCase):
             ],
         )
 
+    @defer.inlineCallbacks
+    def test_batches_merged_while_writing(self):
+        sub = TestResultSubmitter(batch_n=2)
+        yield sub.setup_by_ids(self.master, 88, 30, 131, 'desc', 'cat', 'unit')
+
+        written = []
+        pending = []
+
+        def addTestResults(builderid, setid, batch):
+            written.append([r['test_name'] for r in batch])
+            d = defer.Deferred()
+            pending.append(d)
+            return d
+
+        self.patch(self.master.data.updates, 'addTestResults', addTestResults)
+
+        for i in range(7):
+            sub.add_test_result(str(i), f'name{i}')
+        self.assertEqual(written, [['name0', 'name1']])
+
+        finished = sub.finish()
+        pending.pop(0).callback(None)
+        self.assertEqual(
+            written,
+            [['name0', 'name1'], ['name2', 'name3', 'name4', 'name5', 'name6']],
+        )
+        pending.pop(0).callback(None)
+        yield finished
+
     @defer.inlineCallbacks
     def test_counts_pass_fail(self):
         sub = TestResultSubmitter(batch_n=3)
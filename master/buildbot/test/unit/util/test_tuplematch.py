@@ -27,3 +27,55 @@ class MatchTuple(tuplematching.TupleMatchingMixin, unittest.TestCase):
         should_match_string = 'should match' if shouldMatch else "shouldn't match"
         msg = f"{routingKey!r} {should_match_string} {filter!r}"
         self.assertEqual(shouldMatch, result, msg)
+
+
+class TupleTrieMatch(tuplematching.TupleMatchingMixin, unittest.TestCase):
+    def do_test_match(self, routingKey, shouldMatch, filter):
+        trie = tuplematch.TupleTrie()
+        trie.add(filter, 'value')
+        result = trie.match(routingKey) == ['value']
+        should_match_string = 'should match' if shouldMatch else "shouldn't match"
+        msg = f"{routingKey!r} {should_match_string} {filter!r}"
+        self.assertEqual(shouldMatch, result, msg)
+
+
+class TupleTrie(unittest.TestCase):
+    def setUp(self):
+        self.trie = tuplematch.TupleTrie()
+
+    def test_match_insertion_order(self):
+        self.trie.add(('a', None, 'c'), 1)
+        self.trie.add(('a', 'b', 'c'), 2)
+        self.trie.add((None, None, None), 3)
+        self.trie.add(('a', 'b', 'c'), 4)
+        self.trie.add(('a', 'b'), 5)
+        self.assertEqual(self.trie.match(('a', 'b', 'c')), [1, 2, 3, 4])
+        self.assertEqual(self.trie.match(('a', 'x', 'c')), [1, 3])
+        self.assertEqual(self.trie.match(('x', 'y', 'z')), [3])
+        self.assertEqual(self.trie.match(('a', 'b')), [5])
+        self.assertEqual(self.trie.match(('a',)), [])
+        self.assertEqual(len(self.trie), 5)
+
+    def test_add_twice(self):
+        self.trie.add(('a',), 1)
+        self.trie.add(('a',), 1)
+        self.assertEqual(self.trie.match(('a',)), [1])
+        self.assertEqual(len(self.trie), 1)
+
+    def test_remove(self):
+        self.trie.add(('a', None), 1)
+        self.trie.add(('a', 'b'), 2)
+        self.assertTrue(self.trie.remove(('a', None), 1))
+        self.assertEqual(self.trie.match(('a', 'b')), [2])
+        self.assertTrue(self.trie.remove(('a', 'b'), 2))
+        self.assertEqual(self.trie.match(('a', 'b')), [])
+        self.assertEqual(len(self.trie), 0)
+        # empty branches are pruned
+        self.assertTrue(self.trie._root.is_empty())
+
+    def test_remove_unknown(self):
+        self.trie.add(('a', 'b'), 1)
+        self.assertFalse(self.trie.remove(('a', 'c'), 1))
+        self.assertFalse(self.trie.remove(('a', 'b'), 2))
+        self.assertFalse(self.trie.remove(('a', None), 1))
+        self.assertEqual(self.trie.match(('a', 'b')), [1])
@@ -0,0 +1,160 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+from typing import Any
+
+from twisted.internet import defer
+from twisted.trial import unittest
+
+from buildbot.test.fake import fakemaster
+from buildbot.test.reactor import TestReactorMixin
+from buildbot.www import eventhub
+
+if TYPE_CHECKING:
+    from buildbot.util.twisted import InlineCallbacksType
+
+encoded_keys: list[tuple[str, ...]] = []
+
+
+class FakeClient(eventhub.HubClient):
+    MAX_QUEUED_SIZE = 100
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.written: list[bytes] = []
+        self.was_dropped = False
+
+    @staticmethod
+    def encode(key: tuple[str, ...], message: Any) -> bytes:
+        encoded_keys.append(key)
+        return json.dumps({'k': '/'.join(key), 'm': message}).encode()
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def drop(self) -> None:
+        self.was_dropped = True
+
+
+class EventHub(TestReactorMixin, unittest.TestCase):
+    @defer.inlineCallbacks
+    def setUp(self) -> InlineCallbacksType[None]:  # type: ignore[override]
+        self.setup_test_reactor()
+        self.master = yield fakemaster.make_master(self, wantMq=True)
+        self.master.mq.verifyMessages = False
+        self.hub = eventhub.EventHub(self.master)
+        encoded_keys[:] = []
+
+    @defer.inlineCallbacks
+    def test_shared_consumer(self) -> InlineCallbacksType[None]:
+        client1 = FakeClient()
+        client2 = FakeClient()
+        sub1 = yield self.hub.subscribe(('builds', None, None), client1)
+        sub2 = yield self.hub.subscribe(('builds', None, None), client2)
+        self.assertEqual([q.filter for q in self.master.mq.qrefs], [('builds', None, None)])
+
+        self.master.mq.callConsumer(('builds', '1', 'new'), {'buildid': 1})
+        self.assertEqual(client1.written, [b'{"k": "builds/1/new", "m": {"buildid": 1}}'])
+        self.assertEqual(client2.written, client1.written)
+        # encoded once for both clients
+        self.assertEqual(encoded_keys, [('builds', '1', 'new')])
+
+        sub1.stopConsuming()
+        self.master.mq.callConsumer(('builds', '1', 'finished'), {'buildid': 1})
+        self.assertEqual(len(client1.written), 1)
+        self.assertEqual(len(client2.written), 2)
+
+        sub2.stopConsuming()
+        self.assertEqual(self.master.mq.qrefs, [])
+
+    @defer.inlineCallbacks
+    def test_distinct_paths(self) -> InlineCallbacksType[None]:
+        client = FakeClient()
+        yield self.hub.subscribe(('builds', None, None), client)
+        yield self.hub.subscribe(('builds', '1', None), client)
+        self.assertEqual(len(self.master.mq.qrefs), 2)
+
+        self.master.mq.callConsumer(('builds', '2', 'new'), {'buildid': 2})
+        self.assertEqual(len(client.written), 1)
+
+    @defer.inlineCallbacks
+    def test_same_client_subscribed_twice(self) -> InlineCallbacksType[None]:
+        client = FakeClient()
+        sub1 = yield self.hub.subscribe(('builds', None, None), client)
+        sub2 = yield self.hub.subscribe(('builds', None, None), client)
+        self.assertEqual(len(self.master.mq.qrefs), 1)
+
+        # the first subscription is still active
+        sub2.stopConsuming()
+        sub2.stopConsuming()
+        self.master.mq.callConsumer(('builds', '1', 'new'), {'buildid': 1})
+        self.assertEqual(len(client.written), 1)
+
+        sub1.stopConsuming()
+        self.assertEqual(self.master.mq.qrefs, [])
+
+    @defer.inlineCallbacks
+    def test_resubscribe_after_stop(self) -> InlineCallbacksType[None]:
+        client = FakeClient()
+        sub = yield self.hub.subscribe(('builds', None, None), client)
+        sub.stopConsuming()
+        # stopping twice is harmless
+        sub.stopConsuming()
+        yield self.hub.subscribe(('builds', None, None), client)
+
+        self.master.mq.callConsumer(('builds', '1', 'new'), {'buildid': 1})
+        self.assertEqual(len(client.written), 1)
+
+    @defer.inlineCallbacks
+    def test_paused_client(self) -> InlineCallbacksType[None]:
+        client = FakeClient()
+        yield self.hub.subscribe(('builds', None, None), client)
+
+        client.pauseProducing()
+        self.master.mq.callConsumer(('builds', '1', 'new'), {'buildid': 1})
+        self.master.mq.callConsumer(('builds', '1', 'finished'), {'buildid': 1})
+        self.assertEqual(client.written, [])
+
+        client.resumeProducing()
+        self.assertEqual(
+            client.written,
+            [
+                b'{"k": "builds/1/new", "m": {"buildid": 1}}',
+                b'{"k": "builds/1/finished", "m": {"buildid": 1}}',
+            ],
+        )
+
+    @defer.inlineCallbacks
+    def test_slow_client_dropped(self) -> InlineCallbacksType[None]:
+        slow = FakeClient()
+        fast = FakeClient()
+        yield self.hub.subscribe(('builds', None, None), slow)
+        yield self.hub.subscribe(('builds', None, None), fast)
+
+        slow.pauseProducing()
+        for i in range(4):
+            self.master.mq.callConsumer(('builds', str(i), 'new'), {'buildid': i})
+
+        self.assertTrue(slow.was_dropped)
+        self.assertEqual(slow.written, [])
+        self.assertEqual(len(fast.written), 4)
+
+        # nothing is queued or written once dropped
+        slow.resumeProducing()
+        self.assertEqual(slow.written, [])
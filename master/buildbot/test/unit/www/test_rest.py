@@ -22,6 +22,7 @@ from twisted.trial import unittest
 
 from buildbot.data.base import EndpointKind
 from buildbot.data.exceptions import InvalidQueryParameter
+from buildbot.test import fakedb
 from buildbot.test.fake import endpoint
 from buildbot.test.reactor import TestReactorMixin
 from buildbot.test.util import www
@@ -361,6 +362,55 @@ class V2RootResource_REST(TestReactorMixin, www.WwwTestMixin, unittest.TestCase)
         self.assertEqual(head, b'')
         self.assertEqual(int(self.request.headers[b'content-length'][0]), len(get))
 
+    @defer.inlineCallbacks
+    def test_api_content_length(self):
+        for accept in (b'application/json', b'text/plain'):
+            get = yield self.render_resource(self.rsrc, b'/test', accept=accept)
+            self.assertEqual(self.request.headers[b'content-length'], [str(len(get)).encode()])
+            self.assertEqual(json.loads(get)['meta'], {'total': 8})
+
+    def patch_resource_versions(self, version):
+        self.patch(endpoint.Test, 'getVersionEventFilters', lambda _: [('tests', None, None)])
+        self.resource_version = version
+        self.patch(self.master.data, 'getResourceVersion', lambda name: self.resource_version)
+
+    @defer.inlineCallbacks
+    def test_api_etag_not_versioned(self):
+        self.patch_resource_versions(None)
+        yield self.render_resource(self.rsrc, b'/test')
+        self.assertNotIn(b'etag', self.request.headers)
+
+    @defer.inlineCallbacks
+    def test_api_etag(self):
+        self.patch_resource_versions('abc.1')
+        get = yield self.render_resource(self.rsrc, b'/test')
+        [etag] = self.request.headers[b'etag']
+        self.assertTrue(etag.startswith(b'W/"'))
+
+        # the tag depends on the query and on the format
+        yield self.render_resource(self.rsrc, b'/test?limit=2')
+        self.assertNotEqual(self.request.headers[b'etag'], [etag])
+        yield self.render_resource(self.rsrc, b'/test', accept=b'application/json')
+        self.assertNotEqual(self.request.headers[b'etag'], [etag])
+
+        # unchanged resources are not fetched again
+        got = yield self.render_resource(self.rsrc, b'/test', extraHeaders={b'if-none-match': etag})
+        self.assertEqual(got, b'')
+        self.assertEqual(self.request.responseCode, 304)
+        self.assertEqual(self.request.headers[b'etag'], [etag])
+
+        got = yield self.render_resource(
+            self.rsrc, b'/test', extraHeaders={b'if-none-match': b'W/"other", ' + etag[2:]}
+        )
+        self.assertEqual(self.request.responseCode, 304)
+
+        # a new event for the resources changes the tag
+        self.resource_version = 'abc.2'
+        got = yield self.render_resource(self.rsrc, b'/test', extraHeaders={b'if-none-match': etag})
+        self.assertEqual(got, get)
+        self.assertEqual(self.request.responseCode, 200)
+        self.assertNotEqual(self.request.headers[b'etag'], [etag])
+
     @defer.inlineCallbacks
     def test_api_collection(self):
         yield self.render_resource(self.rsrc, b'/test')
@@ -748,6 +798,70 @@ class V2RootResource_REST(TestReactorMixin, www.WwwTestMixin, unittest.TestCase)
         self.assertEqual(got, exp)
 
 
+class V2RootResource_ETag(TestReactorMixin, www.WwwTestMixin, unittest.TestCase):
+    @defer.inlineCallbacks
+    def setUp(self):
+        self.setup_test_reactor()
+        self.master = yield self.make_master(url='h:/')
+        self.master.mq.verifyMessages = False
+        self.rsrc = rest.V2RootResource(self.master)
+        self.rsrc.reconfigResource(self.master.config)
+
+        def allow(*args, **kw):
+            return
+
+        self.master.www.assertUserAllowed = allow
+        yield self.master.data.startService()
+        self.addCleanup(self.master.data.stopService)
+
+        yield self.master.db.insert_test_data([
+            fakedb.Worker(id=47, name='linux'),
+            fakedb.Buildset(id=20),
+            fakedb.Builder(id=88, name='b1'),
+            fakedb.BuildRequest(id=41, buildsetid=20, builderid=88),
+            fakedb.Master(id=88),
+            fakedb.Build(
+                id=30, buildrequestid=41, number=7, masterid=88, builderid=88, workerid=47
+            ),
+            fakedb.Step(id=131, number=132, name='step132', buildid=30),
+            fakedb.TestResultSet(id=13, builderid=88, buildid=30, stepid=131, complete=0),
+            fakedb.TestResult(id=101, builderid=88, test_result_setid=13, value='v101'),
+        ])
+
+    @defer.inlineCallbacks
+    def test_versioned_by_events(self):
+        yield self.render_resource(self.rsrc, b'/test_result_sets/13')
+        [etag] = self.request.headers[b'etag']
+
+        got = yield self.render_resource(
+            self.rsrc, b'/test_result_sets/13', extraHeaders={b'if-none-match': etag}
+        )
+        self.assertEqual(got, b'')
+        self.assertEqual(self.request.responseCode, 304)
+
+        self.master.mq.callConsumer(('test_result_sets', '13', 'completed'), {})
+        yield self.render_resource(
+            self.rsrc, b'/test_result_sets/13', extraHeaders={b'if-none-match': etag}
+        )
+        self.assertEqual(self.request.responseCode, 200)
+
+    @defer.inlineCallbacks
+    def test_not_versioned_without_events(self):
+        # test results are added without producing any event
+        yield self.render_resource(self.rsrc, b'/test_result_sets/13/results')
+        self.assertNotIn(b'etag', self.request.headers)
+
+        yield self.master.db.test_results.addTestResults(
+            88, 13, [{'test_name': 'name', 'value': 'v102'}]
+        )
+        got = yield self.render_resource(
+            self.rsrc, b'/test_result_sets/13/results', extraHeaders={b'if-none-match': b'*'}
+        )
+        self.assertEqual(self.request.responseCode, 200)
+        values = [r['value'] for r in json.loads(got)['test_results']]
+        self.assertEqual(sorted(values), ['v101', 'v102'])
+
+
 class V2RootResource_JSONRPC2(TestReactorMixin, www.WwwTestMixin, unittest.TestCase):
     @defer.inlineCallbacks
     def setUp(self):
@@ -112,6 +112,29 @@ class WsResource(TestReactorMixin, www.WwwTestMixin, unittest.TestCase):
             self.proto.sendMessage, {"k": "builds/1/new", "m": {"buildid": 1}}
         )
 
+    def test_startConsuming_shared(self):
+        proto2 = self.ws._factory.buildProtocol("me")
+        proto2.sendMessage = mock.Mock(spec=proto2.sendMessage)
+        for proto in (self.proto, proto2):
+            proto.onMessage(
+                json.dumps({"cmd": 'startConsuming', "path": 'builds/*/*', "_id": 1}), False
+            )
+        self.assertEqual(len(self.master.mq.qrefs), 1)
+
+        self.master.mq.verifyMessages = False
+        self.master.mq.callConsumer(("builds", "1", "new"), {"buildid": 1})
+        for proto in (self.proto, proto2):
+            self.assert_called_with_json(
+                proto.sendMessage, {"k": "builds/1/new", "m": {"buildid": 1}}
+            )
+        # the message was encoded once for both clients
+        self.assertIs(self.proto.sendMessage.call_args[0][0], proto2.sendMessage.call_args[0][0])
+
+        self.proto.connectionLost(None)
+        self.assertEqual(len(self.master.mq.qrefs), 1)
+        proto2.connectionLost(None)
+        self.assertEqual(self.master.mq.qrefs, [])
+
     def test_startConsumingBadPath(self):
         self.proto.onMessage(json.dumps({"cmd": 'startConsuming', "path": {}, "_id": 1}), False)
         self.assert_called_with_json(
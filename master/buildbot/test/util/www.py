@@ -59,6 +59,8 @@ class FakeRequest:
     method = b'GET'
     path = b'/req.path'
     responseCode = 200
+    producer = None
+    connection_lost = False
 
     def __init__(self, path=None):
         # from twisted.web.http.Request. Used to detect connection dropped
@@ -115,6 +117,15 @@ class FakeRequest:
         assert isinstance(key, bytes)
         return self.input_headers.get(key)
 
+    def registerProducer(self, producer, streaming):
+        self.producer = producer
+
+    def unregisterProducer(self):
+        self.producer = None
+
+    def loseConnection(self):
+        self.connection_lost = True
+
     def processingFailed(self, f):
         self.deferred.errback(f)
 
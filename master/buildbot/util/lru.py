@@ -13,6 +13,9 @@
 #
 # Copyright Buildbot Team Members
 
+import dataclasses
+import sys
+import time
 from collections import defaultdict
 from collections import deque
 from itertools import filterfalse
@@ -22,6 +25,59 @@ from twisted.internet import defer
 from twisted.python import log
 
 
+def approximate_size(value, _seen=None):
+    """
+    Approximate the memory used by value, in bytes: containers and dataclasses are walked, other
+    objects are only counted for their own size, as they are usually shared with the rest of the
+    master.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, type(None))):
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approximate_size(k, _seen) + approximate_size(v, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        for v in value:
+            size += approximate_size(v, _seen)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        for field in dataclasses.fields(value):
+            size += approximate_size(getattr(value, field.name), _seen)
+    return size
+
+
+class MemoryBudget:
+    """
+    A maximum number of bytes shared by several caches: once their entries use more memory than
+    that in total, the least recently used entries of the biggest cache are evicted.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.caches = []
+
+    @property
+    def total_bytes(self):
+        return sum(c.total_bytes for c in self.caches)
+
+    def purge(self):
+        if self.max_bytes is None:
+            return
+        total_bytes = self.total_bytes
+        while total_bytes > self.max_bytes:
+            biggest = max(self.caches, key=lambda c: c.total_bytes)
+            # as in the caches themselves, the most recent entry is always kept
+            if len(biggest.cache) <= 1:
+                return
+            total_bytes -= biggest._evict_lru()
+
+
 class LRUCache:
     """
     A least-recently-used cache, with a fixed maximum size.
@@ -30,26 +86,49 @@ class LRUCache:
     """
 
     __slots__ = (
-        'max_size max_queue miss_fn queue cache weakrefs refcount hits refhits misses'.split()
-    )
+        'max_size max_queue miss_fn queue cache weakrefs refcount hits refhits misses '
+        'max_bytes size_fn sizes total_bytes ttl expiry clock budget evictions expirations'
+    ).split()
     sentinel = object()
     QUEUE_SIZE_FACTOR = 10
 
-    def __init__(self, miss_fn, max_size=50):
+    def __init__(
+        self,
+        miss_fn,
+        max_size=50,
+        max_bytes=None,
+        size_fn=None,
+        ttl=None,
+        budget=None,
+        clock=time.monotonic,
+    ):
         self.max_size = max_size
         self.max_queue = max_size * self.QUEUE_SIZE_FACTOR
         self.queue = deque()
         self.cache = {}
         self.weakrefs = WeakValueDictionary()
         self.hits = self.misses = self.refhits = 0
+        self.evictions = self.expirations = 0
         self.refcount = defaultdict(lambda: 0)
         self.miss_fn = miss_fn
+        self.size_fn = size_fn or approximate_size
+        # key -> size of the cached entries, only maintained when the cache is bounded in bytes
+        self.sizes = None
+        self.total_bytes = 0
+        # key -> expiration time of the entries (including the evicted ones still referenced
+        # elsewhere), when there is a ttl
+        self.expiry = {}
+        self.clock = clock
+        self.max_bytes = None
+        self.ttl = None
+        self.budget = budget
+        if budget is not None:
+            budget.caches.append(self)
+        self.set_limits(max_bytes, ttl)
 
     def put(self, key, value):
         cached = key in self.cache or key in self.weakrefs
-        self.cache[key] = value
-        self.weakrefs[key] = value
-        self._ref_key(key)
+        self._store(key, value)
         if not cached:
             self._purge()
 
@@ -63,9 +142,7 @@ class LRUCache:
 
         result = self.miss_fn(key, **miss_fn_kwargs)
         if result is not None:
-            self.cache[key] = result
-            self.weakrefs[key] = result
-            self._ref_key(key)
+            self._store(key, result)
             self._purge()
 
         return result
@@ -81,13 +158,46 @@ class LRUCache:
         self.max_queue = max_size * self.QUEUE_SIZE_FACTOR
         self._purge()
 
+    def set_limits(self, max_bytes=None, ttl=None):
+        """
+        Bound the cache to approximately max_bytes bytes, and expire the entries ttl seconds
+        after they have been fetched.
+        """
+        self.max_bytes = max_bytes
+        if ttl != self.ttl:
+            self.ttl = ttl
+            self.expiry.clear()
+            if ttl is not None:
+                expires = self.clock() + ttl
+                self.expiry.update((k, expires) for k in self.weakrefs.keys())
+
+        if max_bytes is not None or (self.budget is not None and self.budget.max_bytes):
+            if self.sizes is None:
+                self.sizes = {k: self.size_fn(v) for k, v in self.cache.items()}
+                self.total_bytes = sum(self.sizes.values())
+        else:
+            self.sizes = None
+            self.total_bytes = 0
+        self._purge()
+
+    def clear(self):
+        """Forget all the entries, including the ones still referenced elsewhere"""
+        self.cache.clear()
+        self.weakrefs.clear()
+        self.queue.clear()
+        self.refcount.clear()
+        self.expiry.clear()
+        if self.sizes is not None:
+            self.sizes.clear()
+            self.total_bytes = 0
+
     def inv(self):
         global inv_failed
 
-        # the keys of the queue and cache should be identical
+        # the keys of the queue and cache should be identical, except for the expired keys
         cache_keys = set(self.cache.keys())
         queue_keys = set(self.queue)
-        if queue_keys - cache_keys:
+        if queue_keys - cache_keys and self.ttl is None:
             log.msg("INV: uncached keys in queue:", queue_keys - cache_keys)
             inv_failed = True
         if cache_keys - queue_keys:
@@ -105,6 +215,25 @@ class LRUCache:
             log.msg("      got:", sorted(self.refcount.items()))
             inv_failed = True
 
+        if self.sizes is not None:
+            if set(self.sizes) != cache_keys or sum(self.sizes.values()) != self.total_bytes:
+                log.msg("INV: sizes differ from the cached entries")
+                inv_failed = True
+
+    def _store(self, key, value):
+        self.cache[key] = value
+        self.weakrefs[key] = value
+        if self.sizes is not None:
+            self._account(key, value)
+        if self.ttl is not None:
+            self.expiry[key] = self.clock() + self.ttl
+        self._ref_key(key)
+
+    def _account(self, key, value):
+        size = self.size_fn(value)
+        self.total_bytes += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+
     def _ref_key(self, key):
         """Record a reference to the argument key."""
         queue = self.queue
@@ -125,8 +254,16 @@ class LRUCache:
                 queue_appendleft(k)
                 refcount[k] = 1
 
+            # forget the expiration of the entries which are not referenced anymore
+            expiry = self.expiry
+            for k in [k for k in expiry if k not in self.weakrefs]:
+                del expiry[k]
+
     def _get_hit(self, key):
         """Try to do a value lookup from the existing cache entries."""
+        if self.ttl is not None:
+            self._check_expiry(key)
+
         try:
             result = self.cache[key]
             self.hits += 1
@@ -138,31 +275,68 @@ class LRUCache:
         result = self.weakrefs[key]
         self.refhits += 1
         self.cache[key] = result
+        if self.sizes is not None:
+            self._account(key, result)
         self._ref_key(key)
         return result
 
-    def _purge(self):
-        """
-        Trim the cache down to max_size by evicting the
-        least-recently-used entries.
-        """
-        if len(self.cache) <= self.max_size:
+    def _check_expiry(self, key):
+        expires = self.expiry.get(key)
+        if expires is None or expires > self.clock():
             return
-
+        # the stale references of the key in the queue are skipped by _evict_lru
+        del self.expiry[key]
+        self.weakrefs.pop(key, None)
+        if key in self.cache:
+            del self.cache[key]
+            if self.sizes is not None:
+                self.total_bytes -= self.sizes.pop(key)
+        self.expirations += 1
+
+    def _evict_lru(self):
+        """Evict the least recently used entry, and return its size"""
         cache = self.cache
         refcount = self.refcount
         queue = self.queue
-        max_size = self.max_size
 
-        # purge least recently used entries, using refcount to count entries
-        # that appear multiple times in the queue
-        while len(cache) > max_size:
+        # pop least recently used keys, using refcount to count keys that appear multiple
+        # times in the queue, until one is still cached
+        while True:
             refc = 1
             while refc:
                 k = queue.popleft()
                 refc = refcount[k] = refcount[k] - 1
-            del cache[k]
             del refcount[k]
+            if k in cache:
+                break
+
+        del cache[k]
+        self.evictions += 1
+        if self.sizes is None:
+            return 0
+        size = self.sizes.pop(k)
+        self.total_bytes -= size
+        return size
+
+    def _purge(self):
+        """
+        Trim the cache down to max_size and max_bytes by evicting the
+        least-recently-used entries.
+        """
+        cache = self.cache
+        max_size = self.max_size
+        max_bytes = self.max_bytes
+
+        while len(cache) > max_size:
+            self._evict_lru()
+
+        if max_bytes is not None:
+            # the most recent entry is kept even when it is bigger than max_bytes
+            while self.total_bytes > max_bytes and len(cache) > 1:
+                self._evict_lru()
+
+        if self.budget is not None:
+            self.budget.purge()
 
 
 class AsyncLRUCache(LRUCache):
@@ -173,8 +347,8 @@ class AsyncLRUCache(LRUCache):
 
     __slots__ = ['concurrent']
 
-    def __init__(self, miss_fn, max_size=50):
-        super().__init__(miss_fn, max_size=max_size)
+    def __init__(self, miss_fn, max_size=50, **kwargs):
+        super().__init__(miss_fn, max_size=max_size, **kwargs)
         self.concurrent = {}
 
     def get(self, key, **miss_fn_kwargs):
@@ -204,12 +378,9 @@ class AsyncLRUCache(LRUCache):
 
         def handle_result(result):
             if result is not None:
-                self.cache[key] = result
-                self.weakrefs[key] = result
-
                 # reference the key once, possibly standing in for multiple
                 # concurrent accesses
-                self._ref_key(key)
+                self._store(key, result)
 
                 self._purge()
 
@@ -20,6 +20,9 @@ from buildbot.util import deferwaiter
 
 
 class TestResultSubmitter:
+    # maximum number of batches written together when several are waiting to be written
+    MAX_MERGED_BATCHES = 10
+
     def __init__(self, batch_n=3000):
         self._batch_n = batch_n
         self._curr_batch = []
@@ -86,7 +89,10 @@ class TestResultSubmitter:
     def _process_batches(self):
         # at most one instance of this function may be running at the same time
         while self._pending_batches:
-            batch = self._pending_batches.pop(0)
+            # the batches completed while the previous one was written are written at once
+            batches = self._pending_batches[: self.MAX_MERGED_BATCHES]
+            del self._pending_batches[: self.MAX_MERGED_BATCHES]
+            batch = [result for b in batches for result in b]
             yield self._master.data.updates.addTestResults(self._builderid, self._setid, batch)
 
     def _initialize_pass_fail_recording(self, function):
@@ -21,3 +21,96 @@ def matchTuple(routingKey, filter):
         if f is not None and f != k:
             return False
     return True
+
+
+class _TupleTrieNode:
+    __slots__ = ['children', 'values', 'wildcard']
+
+    def __init__(self):
+        self.children = {}
+        self.wildcard = None
+        # value -> insertion sequence number, for values whose filter ends at this node
+        self.values = {}
+
+    def is_empty(self):
+        return not self.children and self.wildcard is None and not self.values
+
+
+class TupleTrie:
+    """
+    An index of filter tuples, as accepted by matchTuple, keyed by segment.
+
+    Looking up a routing key only walks the branches that can match it: the literal
+    child for each segment plus the wildcard (None) child, so the cost depends on the
+    number of distinct filters that share a prefix with the key rather than on the total
+    number of filters.  Matching values are returned in the order they were added.
+    """
+
+    def __init__(self):
+        self._root = _TupleTrieNode()
+        self._seq = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def add(self, filter, value):
+        node = self._root
+        for f in filter:
+            if f is None:
+                if node.wildcard is None:
+                    node.wildcard = _TupleTrieNode()
+                node = node.wildcard
+            else:
+                child = node.children.get(f)
+                if child is None:
+                    child = node.children[f] = _TupleTrieNode()
+                node = child
+        if value in node.values:
+            return
+        self._len += 1
+        self._seq += 1
+        node.values[value] = self._seq
+
+    def remove(self, filter, value):
+        path = []
+        node = self._root
+        for f in filter:
+            child = node.wildcard if f is None else node.children.get(f)
+            if child is None:
+                return False
+            path.append((node, f))
+            node = child
+        if value not in node.values:
+            return False
+        del node.values[value]
+        self._len -= 1
+
+        # prune the branches that became empty
+        while path and node.is_empty():
+            node, f = path.pop()
+            if f is None:
+                node.wildcard = None
+            else:
+                del node.children[f]
+        return True
+
+    def match(self, routingKey):
+        nodes = [self._root]
+        for k in routingKey:
+            next_nodes = []
+            for node in nodes:
+                child = node.children.get(k)
+                if child is not None:
+                    next_nodes.append(child)
+                if node.wildcard is not None:
+                    next_nodes.append(node.wildcard)
+            if not next_nodes:
+                return []
+            nodes = next_nodes
+
+        if len(nodes) == 1:
+            return list(nodes[0].values)
+        matches = [item for node in nodes for item in node.values.items()]
+        matches.sort(key=lambda item: item[1])
+        return [value for value, _ in matches]
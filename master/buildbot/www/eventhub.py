@@ -0,0 +1,220 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+
+"""
+Fan-out of the mq events watched by the www clients (websocket and server-sent events)
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING
+from typing import Any
+
+from twisted.internet import defer
+from twisted.internet.interfaces import IPushProducer
+from twisted.python import log
+from zope.interface import implementer
+
+if TYPE_CHECKING:
+    from typing import Callable
+    from typing import Optional
+
+    from buildbot.master import BuildMaster
+    from buildbot.mq.base import QueueRef
+    from buildbot.util.twisted import InlineCallbacksType
+
+    Path = tuple[Optional[str], ...]
+
+
+class Event:
+    """
+    An mq message, encoded at most once for each of the formats of the clients receiving it
+    """
+
+    __slots__ = ('_encoded', 'key', 'message')
+
+    def __init__(self, key: tuple[str, ...], message: Any) -> None:
+        self.key = key
+        self.message = message
+        self._encoded: dict[Callable[[tuple[str, ...], Any], bytes], bytes] = {}
+
+    def encode(self, encoder: Callable[[tuple[str, ...], Any], bytes]) -> bytes:
+        data = self._encoded.get(encoder)
+        if data is None:
+            data = self._encoded[encoder] = encoder(self.key, self.message)
+        return data
+
+
+@implementer(IPushProducer)
+class HubClient:
+    """
+    A connection receiving events from the hub.
+
+    Events are written as long as the transport accepts them and queued while it is paused
+    (the client is registered as a producer of the transport). A client whose queue grows
+    over MAX_QUEUED_SIZE can not keep up with the events and is dropped.
+    """
+
+    MAX_QUEUED_SIZE = 4 * 1024 * 1024
+
+    def __init__(self) -> None:
+        self.paused = False
+        self.dropped = False
+        self._queue: deque[bytes] = deque()
+        self._queued_size = 0
+
+    @staticmethod
+    def encode(key: tuple[str, ...], message: Any) -> bytes:
+        """
+        Encode an event for the client. This must be the same function for all the clients of
+        a given format, so that each event is encoded once for all of them.
+        """
+        raise NotImplementedError
+
+    def write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def drop(self) -> None:
+        """Close the connection of a client which does not keep up with the events"""
+        raise NotImplementedError
+
+    def sendEvent(self, event: Event) -> None:
+        if self.dropped:
+            return
+        data = event.encode(self.encode)
+        if not self.paused and not self._queue:
+            self.write(data)
+            return
+
+        self._queue.append(data)
+        self._queued_size += len(data)
+        if self._queued_size > self.MAX_QUEUED_SIZE:
+            log.msg(f"{self!r}: dropping client, {self._queued_size} bytes of events queued")
+            self.stopProducing()
+            self.drop()
+
+    def pauseProducing(self) -> None:
+        self.paused = True
+
+    def resumeProducing(self) -> None:
+        self.paused = False
+        # writing may pause the client again
+        while self._queue and not self.paused and not self.dropped:
+            data = self._queue.popleft()
+            self._queued_size -= len(data)
+            self.write(data)
+
+    def stopProducing(self) -> None:
+        self.dropped = True
+        self._queue.clear()
+        self._queued_size = 0
+
+
+class _PathConsumer:
+    # the clients of a path share a single mq consumer
+
+    def __init__(self, hub: EventHub, path: Path) -> None:
+        self.hub = hub
+        self.path = path
+        # client -> number of its subscriptions to the path
+        self.clients: dict[HubClient, int] = {}
+        self.qref: QueueRef | None = None
+        self._start_waiters: list[defer.Deferred[None]] | None = []
+
+    def start(self) -> None:
+        d = self.hub.master.mq.startConsuming(self.onMessage, self.path)
+        d.addCallbacks(self._started, self._startFailed)
+
+    def _started(self, qref: QueueRef) -> None:
+        self.qref = qref
+        waiters, self._start_waiters = self._start_waiters, None
+        assert waiters is not None
+        # all the clients may have left meanwhile
+        self.maybeStop()
+        for d in waiters:
+            d.callback(None)
+
+    def _startFailed(self, failure: Any) -> None:
+        waiters, self._start_waiters = self._start_waiters, None
+        assert waiters is not None
+        self.hub._removeConsumer(self)
+        for d in waiters:
+            d.errback(failure)
+
+    def waitStarted(self) -> defer.Deferred[None]:
+        if self._start_waiters is None:
+            return defer.succeed(None)
+        d: defer.Deferred[None] = defer.Deferred()
+        self._start_waiters.append(d)
+        return d
+
+    def maybeStop(self) -> None:
+        if self.clients or self.qref is None:
+            return
+        self.hub._removeConsumer(self)
+        self.qref.stopConsuming()
+        self.qref = None
+
+    def onMessage(self, key: tuple[str, ...], message: Any) -> None:
+        event = Event(tuple(key), message)
+        for client in list(self.clients):
+            client.sendEvent(event)
+
+
+class Subscription:
+    """Returned by EventHub.subscribe, with the stopConsuming() method of QueueRef"""
+
+    def __init__(self, consumer: _PathConsumer, client: HubClient) -> None:
+        self._consumer = consumer
+        self._client = client
+        self._stopped = False
+
+    def stopConsuming(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        consumer = self._consumer
+        consumer.clients[self._client] -= 1
+        if not consumer.clients[self._client]:
+            del consumer.clients[self._client]
+            consumer.maybeStop()
+
+
+class EventHub:
+    """
+    Subscribes to mq once for each distinct path watched by the www clients, and pushes the
+    events to all the clients watching it, encoded once for each client format.
+    """
+
+    def __init__(self, master: BuildMaster) -> None:
+        self.master = master
+        self._consumers: dict[Path, _PathConsumer] = {}
+
+    @defer.inlineCallbacks
+    def subscribe(self, path: Path, client: HubClient) -> InlineCallbacksType[Subscription]:
+        consumer = self._consumers.get(path)
+        if consumer is None:
+            consumer = self._consumers[path] = _PathConsumer(self, path)
+            consumer.clients[client] = 1
+            consumer.start()
+        else:
+            consumer.clients[client] = consumer.clients.get(client, 0) + 1
+        yield consumer.waitStarted()
+        return Subscription(consumer, client)
+
+    def _removeConsumer(self, consumer: _PathConsumer) -> None:
+        if self._consumers.get(consumer.path) is consumer:
+            del self._consumers[consumer.path]
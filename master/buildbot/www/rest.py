@@ -17,6 +17,7 @@ from __future__ import annotations
 
 import datetime
 import fnmatch
+import hashlib
 import json
 import re
 from contextlib import contextmanager
@@ -72,6 +73,16 @@ class ContentTypeParser:
         return bytes2unicode(self.typeheader).split(';', 1)[0]
 
 
+def _etag_matches(if_none_match: bytes | None, etag: bytes) -> bool:
+    # If-None-Match uses the weak comparison, which ignores the W/ prefix
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == b'*':
+        return True
+    opaque_tag = etag.removeprefix(b'W/')
+    return any(tag.strip().removeprefix(b'W/') == opaque_tag for tag in if_none_match.split(b','))
+
+
 def _is_request_finished(request: server.Request) -> bool:
     # In case of lost connection, request is not marked as finished
     # detect this case with `channel` being None
@@ -360,6 +371,14 @@ class V2RootResource(resource.Resource):
                 yield defer.Deferred.fromCoroutine(self._render_raw(request, ep, rspec, kwargs))
                 return
 
+            # the endpoint may consume parts of the resultspec, so compute the tag first
+            etag = self._get_etag(request, ep, rspec, kwargs)
+            if etag is not None and _etag_matches(request.getHeader(b'if-none-match'), etag):
+                request.setResponseCode(304)
+                request.setHeader(b'etag', etag)
+                self._set_cache_headers(request)
+                return
+
             data = yield ep.get(rspec, kwargs)
             if data is None:
                 self._write_not_found_rest_error(request, ep, rspec=rspec, kwargs=kwargs)
@@ -402,12 +421,9 @@ class V2RootResource(resource.Resource):
                 request.setHeader(b"content-type", b'text/plain; charset=utf-8')
 
             # set up caching
-            if self.cache_seconds:
-                now = datetime.datetime.now(datetime.timezone.utc)
-                expires = now + datetime.timedelta(seconds=self.cache_seconds)
-                expiresBytes = unicode2bytes(expires.strftime("%a, %d %b %Y %H:%M:%S GMT"))
-                request.setHeader(b"Expires", expiresBytes)
-                request.setHeader(b"Pragma", b"no-cache")
+            if etag is not None:
+                request.setHeader(b'etag', etag)
+            self._set_cache_headers(request)
 
             # filter out blanks if necessary and render the data
             encoder = json.encoder.JSONEncoder(default=toJson, sort_keys=True)
@@ -416,7 +432,46 @@ class V2RootResource(resource.Resource):
             else:
                 encoder.indent = 2
 
-            yield threads.deferToThread(V2RootResource._write_json_data, request, encoder, data)
+            yield self._write_json_data(request, encoder, data)
+
+    def _set_cache_headers(self, request: server.Request) -> None:
+        if self.cache_seconds:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            expires = now + datetime.timedelta(seconds=self.cache_seconds)
+            expiresBytes = unicode2bytes(expires.strftime("%a, %d %b %Y %H:%M:%S GMT"))
+            request.setHeader(b"Expires", expiresBytes)
+            request.setHeader(b"Pragma", b"no-cache")
+
+    def _get_etag(
+        self,
+        request: server.Request,
+        ep: Endpoint,
+        rspec: ResultSpec,
+        kwargs: dict[str, Any],
+    ) -> bytes | None:
+        # the tag is derived from the versions of the resources the response is made of, so
+        # that it changes as soon as an event is produced for any of them
+        rtype_names = ep.getVersionResourceTypes(rspec, kwargs)
+        if not rtype_names:
+            return None
+        versions = []
+        for name in rtype_names:
+            version = self.master.data.getResourceVersion(name)
+            if version is None:
+                return None
+            versions.append(version)
+
+        # the same versions give different responses for other paths, queries or formats
+        digest = hashlib.sha1()
+        digest.update(request.path)
+        if request.args:
+            for arg, values in sorted(request.args.items()):
+                digest.update(repr((arg, values)).encode())
+        digest.update(request.getHeader(b'accept') or b'')
+        for version in versions:
+            digest.update(version.encode())
+        # the response may be compressed on the fly, so the tag is weak
+        return b'W/"' + digest.hexdigest().encode() + b'"'
 
     def reconfigResource(self, new_config: Any) -> None:
         # buildbotURL may contain reverse proxy path, Origin header is just
@@ -494,23 +549,27 @@ class V2RootResource(resource.Resource):
         return res
 
     @staticmethod
+    def _encode_json_data(encoder: json.encoder.JSONEncoder, data: Any) -> bytes:
+        # encode() runs the whole document through the C accelerated encoder when possible,
+        # which is much faster than joining the chunks produced by iterencode()
+        return unicode2bytes(encoder.encode(data))
+
+    @defer.inlineCallbacks
     def _write_json_data(
+        self,
         request: server.Request,
         encoder: json.encoder.JSONEncoder,
         data: Any,
-    ) -> None:
-        content_length = 0
-        for chunk in encoder.iterencode(data):
-            if _is_request_finished(request):
-                return
-            content_length += len(unicode2bytes(chunk))
-        request.setHeader(b"content-length", unicode2bytes(str(content_length)))
+    ) -> InlineCallbacksType[None]:
+        # encoding large collections takes a while, so do it in a thread, but all request
+        # methods must be called from the reactor thread
+        encoded = yield threads.deferToThread(V2RootResource._encode_json_data, encoder, data)
+        if _is_request_finished(request):
+            return
+        request.setHeader(b"content-length", unicode2bytes(str(len(encoded))))
 
         if request.method != b"HEAD":
-            for chunk in encoder.iterencode(data):
-                if _is_request_finished(request):
-                    return
-                request.write(unicode2bytes(chunk))
+            request.write(encoded)
 
 
 RestRootResource.addApiVersion(2, V2RootResource)
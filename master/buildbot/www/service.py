@@ -48,6 +48,7 @@ from buildbot.www import auth
 from buildbot.www import avatar
 from buildbot.www import change_hook
 from buildbot.www import config as wwwconfig
+from buildbot.www import eventhub
 from buildbot.www import resource as buildbot_resource
 from buildbot.www import rest
 from buildbot.www import sse
@@ -323,11 +324,14 @@ class WWWService(service.ReconfigurableServiceMixin, service.AsyncMultiService):
         # /config
         root.putChild(b'config', wwwconfig.ConfigResource(self.master))
 
+        # websocket and server-sent events clients share their mq consumers
+        event_hub = eventhub.EventHub(self.master)
+
         # /ws
-        root.putChild(b'ws', ws.WsResource(self.master))
+        root.putChild(b'ws', ws.WsResource(self.master, event_hub))
 
         # /sse
-        root.putChild(b'sse', sse.EventResource(self.master))
+        root.putChild(b'sse', sse.EventResource(self.master, event_hub))
 
         # /change_hook
         resource_obj: resource.IResource = change_hook.ChangeHookResource(master=self.master)
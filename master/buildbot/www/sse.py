@@ -28,16 +28,17 @@ from buildbot.data.exceptions import InvalidPathError
 from buildbot.util import bytes2unicode
 from buildbot.util import toJson
 from buildbot.util import unicode2bytes
+from buildbot.www import eventhub
 
 if TYPE_CHECKING:
     from buildbot.master import BuildMaster
-    from buildbot.mq.base import QueueRef
 
 
-class Consumer:
-    qrefs: dict[bytes, QueueRef]
+class Consumer(eventhub.HubClient):
+    qrefs: dict[bytes, eventhub.Subscription]
 
     def __init__(self, request: server.Request):
+        super().__init__()
         self.request = request
         self.qrefs = {}
 
@@ -49,15 +50,21 @@ class Consumer:
                 qref.stopConsuming()
             self.qrefs = {}
 
+    @staticmethod
+    def encode(key: tuple[str, ...], message: Any) -> bytes:
+        msg = {"key": [bytes2unicode(e) for e in key], "message": message}
+        return b"event: event\ndata: " + unicode2bytes(json.dumps(msg, default=toJson)) + b"\n\n"
+
+    def write(self, data: bytes) -> None:
+        self.request.write(data)
+
+    def drop(self) -> None:
+        self.request.loseConnection()
+
     def onMessage(self, event: list[str], data: Any) -> None:
-        request = self.request
-        key = [bytes2unicode(e) for e in event]
-        msg = {"key": key, "message": data}
-        request.write(b"event: " + b"event" + b"\n")
-        request.write(b"data: " + unicode2bytes(json.dumps(msg, default=toJson)) + b"\n")
-        request.write(b"\n")
-
-    def registerQref(self, path: bytes, qref: QueueRef) -> None:
+        self.sendEvent(eventhub.Event(tuple(event), data))
+
+    def registerQref(self, path: bytes, qref: eventhub.Subscription) -> None:
         self.qrefs[path] = qref
 
 
@@ -65,10 +72,11 @@ class EventResource(resource.Resource):
     isLeaf = True
     consumers: dict[bytes, Consumer]
 
-    def __init__(self, master: BuildMaster):
+    def __init__(self, master: BuildMaster, hub: eventhub.EventHub | None = None):
         super().__init__()
 
         self.master = master
+        self.hub = hub if hub is not None else eventhub.EventHub(master)
         self.consumers = {}
 
     def decodePath(self, path: list[bytes]) -> list[bytes | None]:
@@ -121,12 +129,10 @@ class EventResource(resource.Resource):
                     options[k] = options[k][1]
 
             try:
-                d = self.master.mq.startConsuming(
-                    consumer.onMessage, tuple(bytes2unicode(p) for p in decoded_path)
-                )
+                d = self.hub.subscribe(tuple(bytes2unicode(p) for p in decoded_path), consumer)
 
                 @d.addCallback
-                def register(qref: QueueRef) -> None:
+                def register(qref: eventhub.Subscription) -> None:
                     consumer.registerQref(pathref, qref)
 
                 d.addErrback(log.err, "while calling startConsuming")
@@ -150,11 +156,14 @@ class EventResource(resource.Resource):
             request.write(b"event: handshake\n")
             request.write(b"data: " + cid + b"\n")
             request.write(b"\n")
+            # queue the events while the transport buffer is full
+            request.registerProducer(consumer, True)
             d = request.notifyFinish()
 
             @d.addBoth
             def onEndRequest(_: Any) -> None:
                 consumer.stopConsuming()
+                consumer.stopProducing()
                 del self.consumers[cid]
 
             return server.NOT_DONE_YET
@@ -38,10 +38,10 @@ except ImportError:
 from buildbot.util import bytes2unicode
 from buildbot.util import toJson
 from buildbot.www import auth
+from buildbot.www import eventhub
 
 if TYPE_CHECKING:
     from buildbot.master import BuildMaster
-    from buildbot.mq.base import QueueRef
     from buildbot.util.twisted import InlineCallbacksType
 
 
@@ -74,14 +74,43 @@ def get_ws_sitepath(path: str) -> list[bytes]:
     return [p.encode('utf-8') for p in parts if p]
 
 
+class _WsHubClient(eventhub.HubClient):
+    def __init__(self, protocol: WsProtocol):
+        super().__init__()
+        self.protocol = protocol
+
+    @staticmethod
+    def encode(key: tuple[str, ...], message: Any) -> bytes:
+        # protocol is deliberately concise in size
+        return WsProtocol.to_json({"k": "/".join(key), "m": message})
+
+    def write(self, data: bytes) -> None:
+        self.protocol.sendMessage(data)
+
+    def drop(self) -> None:
+        self.protocol.dropConnection(abort=True)
+
+
 class WsProtocol(WebSocketServerProtocol):
-    def __init__(self, master: BuildMaster):
+    def __init__(self, master: BuildMaster, hub: eventhub.EventHub | None = None):
         super().__init__()
         self.master = master
-        self.qrefs: dict[str, QueueRef] | None = {}
+        self.hub = hub if hub is not None else eventhub.EventHub(master)
+        self.hub_client = _WsHubClient(self)
+        self.qrefs: dict[str, eventhub.Subscription] | None = {}
         self.debug = self.master.config.www.get("debug", False)
 
-    def to_json(self, msg: dict[str, Any]) -> bytes:
+    def onOpen(self) -> None:
+        # queue the events while the transport buffer is full
+        try:
+            self.transport.registerProducer(self.hub_client, True)
+        except RuntimeError:
+            # the HTTP channel this connection was upgraded from is still registered
+            self.transport.unregisterProducer()
+            self.transport.registerProducer(self.hub_client, True)
+
+    @staticmethod
+    def to_json(msg: dict[str, Any]) -> bytes:
         return json.dumps(msg, default=toJson, separators=(",", ":")).encode()
 
     def send_json_message(self, **msg: Any) -> defer.Deferred:
@@ -146,19 +175,16 @@ class WsProtocol(WebSocketServerProtocol):
             yield self.ack(_id=_id)
             return
 
-        def callback(key: list[str], message: Any) -> defer.Deferred:
-            # protocol is deliberately concise in size
-            return self.send_json_message(k="/".join(key), m=message)
-
-        qref = yield self.master.mq.startConsuming(callback, self.parsePath(path))
+        qref = yield self.hub.subscribe(self.parsePath(path), self.hub_client)
 
         # race conditions handling
         if self.qrefs is None or path in self.qrefs:
             qref.stopConsuming()
+        else:
+            self.qrefs[path] = qref
 
-        # only store and ack if we were not disconnected in between
+        # only ack if we were not disconnected in between
         if self.qrefs is not None:
-            self.qrefs[path] = qref
             self.ack(_id=_id)
 
     @defer.inlineCallbacks
@@ -170,7 +196,7 @@ class WsProtocol(WebSocketServerProtocol):
         # only succeed if path has been started
         if self.qrefs is not None and path in self.qrefs:
             qref = self.qrefs.pop(path)
-            yield qref.stopConsuming()
+            qref.stopConsuming()
             yield self.ack(_id=_id)
             return
         yield self.send_json_message(error=f"path was not consumed '{path!s}'", code=400, _id=_id)
@@ -186,6 +212,7 @@ class WsProtocol(WebSocketServerProtocol):
                 qref.stopConsuming()
 
         self.qrefs = None  # to be sure we don't add any more
+        self.hub_client.stopProducing()
 
     def is_secure(self) -> bool:
         return _HAS_SSL and ISSLTransport.providedBy(self.transport)
@@ -210,18 +237,19 @@ class WsProtocol(WebSocketServerProtocol):
 
 
 class WsProtocolFactory(WebSocketServerFactory):
-    def __init__(self, master: BuildMaster):
+    def __init__(self, master: BuildMaster, hub: eventhub.EventHub | None = None):
         super().__init__()
         self.master = master
+        self.hub = hub if hub is not None else eventhub.EventHub(master)
         pingInterval = self.master.config.www.get("ws_ping_interval", 0)
         self.setProtocolOptions(webStatus=False, autoPingInterval=pingInterval)
 
     def buildProtocol(self, addr: Any) -> WsProtocol:
-        p = WsProtocol(self.master)
+        p = WsProtocol(self.master, self.hub)
         p.factory = self
         return p
 
 
 class WsResource(WebSocketResource):
-    def __init__(self, master: BuildMaster):
-        super().__init__(WsProtocolFactory(master))
+    def __init__(self, master: BuildMaster, hub: eventhub.EventHub | None = None):
+        super().__init__(WsProtocolFactory(master, hub))
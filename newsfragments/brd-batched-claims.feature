@@ -0,0 +1 @@
+The build request distributor now chooses, claims and starts the builds of a builder by batches, so that a burst of build requests for a builder with many idle workers is no longer started one database round trip at a time. Builders with ``locks`` or a ``canStartBuild`` function still start one build at a time.
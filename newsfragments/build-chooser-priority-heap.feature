@@ -0,0 +1 @@
+``BasicBuildChooser`` now keeps unclaimed build requests in a heap, so picking the next request no longer sorts the whole queue, and follows priority changes made while builds are being distributed
@@ -0,0 +1 @@
+Added the :bb:cfg:`builderDistributionConcurrency` option to start builds on several builders at once, so that a builder slow to start its builds does not delay the other builders
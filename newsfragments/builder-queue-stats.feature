@@ -0,0 +1 @@
+The default builder sort of the build request distributor now uses in-memory statistics of the unclaimed build requests of each builder, kept up to date from the buildrequests events and reloaded from the database every 5 minutes, instead of querying the database twice for each pending builder.
@@ -0,0 +1 @@
+The caches configured by :bb:cfg:`caches` can now be bounded by their approximate memory usage with ``max_bytes``, and expire their entries with ``ttl``. The new :bb:cfg:`cachesMaxBytes` key bounds the memory used by all the caches together.
@@ -0,0 +1 @@
+The ``buildbot cleanupdb`` command now recompresses several logs at once (``--jobs``), can resume an interrupted cleanup (``--resume``), reports its throughput, and can switch the existing logs to another compression method (``--compression``)
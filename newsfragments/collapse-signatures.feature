@@ -0,0 +1 @@
+Collapsing build requests with the default ``collapseRequests`` function now compares cached buildset signatures and checks which sourcestamps have changes with a single query, instead of querying the database for each pair of build requests.
@@ -0,0 +1 @@
+:bb:step:`DirectoryUpload` and :bb:step:`MultipleFileUpload` now stream the archive from the worker to the master without storing it in a temporary file on either side, and support ``'zstd'`` and ``'lz4'`` values for ``compress``
@@ -0,0 +1 @@
+``FileUpload``, ``MultipleFileUpload``, ``FileDownload`` and ``StringDownload`` accept a new ``window`` argument (8 by default): the worker keeps up to this many blocks in flight instead of waiting for each block to be acknowledged, so that transfers over high-latency links are no longer limited to one block per round trip.
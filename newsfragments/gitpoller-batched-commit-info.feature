@@ -0,0 +1 @@
+``GitPoller`` now extracts the details of all new commits with a single ``git log`` invocation per batch of revisions instead of five ``git`` processes per commit, and adds codebase commits in a single database transaction.
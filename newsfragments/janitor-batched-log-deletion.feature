@@ -0,0 +1 @@
+The :bb:configurator:`JanitorConfigurator` now deletes the old log chunks by batches, with a pause between them and an optional time budget per run, instead of in a single large transaction
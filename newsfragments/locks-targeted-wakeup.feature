@@ -0,0 +1,2 @@
+Lock availability checks no longer scan the whole wait queue, and releasing the locks of a build or a step now only wakes up the builders which could not start a build because of these locks, instead of all builders.
+The time spent waiting for locks is reported as the ``Build.locks_wait`` and ``BuildStep.locks_wait`` timer metrics.
@@ -0,0 +1 @@
+The log lines appended concurrently by several builds are now written to the database together, in a single transaction, instead of with three transactions per append
@@ -0,0 +1 @@
+Lines recently appended to logs are now kept in memory, in the new ``LogTails`` cache (see :bb:cfg:`caches`), so that viewing the logs of running builds does not fetch and decompress the same log chunks from the database again and again
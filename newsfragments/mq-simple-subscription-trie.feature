@@ -0,0 +1 @@
+``SimpleMQ`` now indexes its subscriptions by routing key segments, so that producing a message only visits the consumers that can match it instead of every consumer.
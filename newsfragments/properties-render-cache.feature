@@ -0,0 +1 @@
+The renderings of ``Interpolate``, ``Property`` and ``WithProperties`` which only depend on build properties are now cached per build until a property changes.
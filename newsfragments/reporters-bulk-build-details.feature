@@ -0,0 +1 @@
+``getDetailsForBuilds`` now loads the properties, steps, logs and previous builds of all builds of a report with a constant number of queries, using the new ``/steps?buildid=`` and ``/logs?stepid=`` data API collections
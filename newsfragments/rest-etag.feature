@@ -0,0 +1 @@
+The REST API now sets ``ETag`` headers derived from the data events, and answers ``If-None-Match`` requests for unchanged resources with ``304 Not Modified`` without querying the database
@@ -0,0 +1 @@
+REST API responses are now JSON-encoded in a single pass instead of twice, and written from the reactor thread.
@@ -0,0 +1 @@
+Secrets can be kept in memory by configuring the ``secrets`` cache in :bb:cfg:`caches`, usually with a ``ttl``, instead of being fetched from the secret providers for each rendering. The cache is emptied on each reconfiguration. The time spent in each provider is reported as a timer metric, and the lookups of several keys stored at the same path of a HashiCorp Vault are done with a single read.
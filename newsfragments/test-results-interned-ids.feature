@@ -0,0 +1 @@
+The ids of test names and test code paths are now remembered by the master for each builder, so that submitting test results no longer looks them up in the database for every batch. Test results are inserted with a single ``executemany`` call, and the batches of ``TestResultSubmitter`` which pile up while the database is busy are written together.
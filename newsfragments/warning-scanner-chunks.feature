@@ -0,0 +1 @@
+The warnings of :bb:step:`WarningCountingShellCommand` and its subclasses are now counted by scanning whole log chunks with a single combined regular expression, and the warning suppressions are indexed by file and line range, which greatly reduces the master CPU usage for steps with a lot of output
@@ -0,0 +1 @@
+On Linux, the worker now uses inotify to send the new contents of the ``logfiles`` of a step as soon as they are written, instead of polling each file every 2 seconds, and reads them in larger blocks. The new ``poll_interval`` and ``read_size`` options of ``logfiles`` entries set the polling interval and the read size.
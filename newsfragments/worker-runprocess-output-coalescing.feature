@@ -0,0 +1 @@
+The worker now merges the output read from the processes of the commands for up to 50 milliseconds before sending it, instead of handling each read of the pipes separately, and no longer copies the whole captured output of a command (e.g. for ``SetPropertyFromCommand``) on each read.
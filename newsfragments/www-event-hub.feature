@@ -0,0 +1 @@
+Websocket and server-sent events clients watching the same path now share a single message queue consumer, each event is encoded once for all of them, and clients which do not keep up with the events are disconnected instead of buffering them without limit
@@ -40,7 +40,7 @@ if TYPE_CHECKING:
     _T = TypeVar("_T")
 
 # The following identifier should be updated each time this file is changed
-command_version = "3.3"
+command_version = "3.5"
 
 # version history:
 #  >=1.17: commands are interruptable
@@ -86,6 +86,10 @@ command_version = "3.3"
 #  >= 3.1: rmfile command added to remove a file
 #  >= 3.2: shell command now reports failure reason in case the command timed out.
 #  >= 3.3: shell command now supports max_lines parameter.
+#  >= 3.4: uploadDirectory streams the archive without a temporary file and
+#    supports zstd and lz4 compression.
+#  >= 3.5: uploadFile and downloadFile accept 'window', the number of blocks
+#    sent or requested without waiting for the previous ones.
 
 
 @implementer(IWorkerCommand)
@@ -16,16 +16,32 @@ from __future__ import annotations
 
 import os
 import tarfile
-import tempfile
+from collections import deque
 from typing import TYPE_CHECKING
 from typing import Any
 
 from twisted.internet import defer
+from twisted.internet import threads
 from twisted.python import log
 
 from buildbot_worker.commands.base import Command
 
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import lz4.frame
+
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
 if TYPE_CHECKING:
+    from collections.abc import Callable
     from io import BufferedIOBase
     from io import BufferedWriter
     from typing import TypeVar
@@ -38,6 +54,26 @@ if TYPE_CHECKING:
     _T = TypeVar("_T")
 
 
+class _LZ4FrameCompressObj:
+    """Gives lz4.frame the compressobj interface of zlib and zstandard"""
+
+    def __init__(self) -> None:
+        self._compressor = lz4.frame.LZ4FrameCompressor()
+        self._started = False
+
+    def compress(self, data: bytes) -> bytes:
+        if not self._started:
+            self._started = True
+            return self._compressor.begin() + self._compressor.compress(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if not self._started:
+            self._started = True
+            return self._compressor.begin() + self._compressor.flush()
+        return self._compressor.flush()
+
+
 class TransferCommand(Command):
     stderr: str | None = None
 
@@ -74,6 +110,8 @@ class WorkerFileUploadCommand(TransferCommand):
         - ['maxsize']:   max size (in bytes) of file to write
         - ['blocksize']: max size for each data block
         - ['keepstamp']: whether to preserve file modified and accessed times
+        - ['window']:    max number of blocks written without waiting for the
+                         master to acknowledge them (1 if not given)
     """
 
     debug = False
@@ -87,9 +125,13 @@ class WorkerFileUploadCommand(TransferCommand):
         self.remaining = args['maxsize']
         self.blocksize = args['blocksize']
         self.keepstamp = args.get('keepstamp', False)
+        self.window = max(args.get('window') or 1, 1)
         self.stderr = None
         self.rc = 0
         self.fp: BufferedIOBase | None = None
+        # the writes sent to the master and not acknowledged yet, the master
+        # handles the messages of a command in the order they are sent
+        self._pendingWrites: deque[Deferred] = deque()
 
     def start(self) -> Deferred[None]:
         if self.debug:
@@ -171,6 +213,7 @@ class WorkerFileUploadCommand(TransferCommand):
         if self.interrupted or self.fp is None:
             if self.debug:
                 self.log_msg('WorkerFileUploadCommand._writeBlock(): end')
+            yield self._waitForWrites(0)
             return True
 
         length = self.blocksize
@@ -191,21 +234,92 @@ class WorkerFileUploadCommand(TransferCommand):
             )
         if not data:
             self.log_msg("EOF: callRemote(close)")
+            yield self._waitForWrites(0)
             return True
 
         if self.remaining is not None:
             self.remaining = self.remaining - len(data)
             assert self.remaining >= 0
 
-        yield self.do_protocol_write(data)
+        self._pendingWrites.append(self.do_protocol_write(data))
+        yield self._waitForWrites(self.window - 1)
 
         return False
 
+    @defer.inlineCallbacks
+    def _waitForWrites(self, max_pending: int) -> InlineCallbacksType[None]:
+        try:
+            while len(self._pendingWrites) > max_pending:
+                yield self._pendingWrites.popleft()
+        except Exception:
+            # the upload fails with the first error, ignore the other writes
+            while self._pendingWrites:
+                self._pendingWrites.popleft().addErrback(lambda _: None)
+            raise
+
     def do_protocol_write(self, data: bytes) -> Deferred:
         return self.protocol_command.protocol_update_upload_file_write(self.writer, data)  # type: ignore[attr-defined]
 
 
+class _UploadStopped(Exception):
+    pass
+
+
+class _ArchiveWriter:
+    """
+    File-like object the archive is written to by tarfile in a thread. Data is
+    compressed here if tarfile can not do it itself, and handed to send_block
+    in blocks of blocksize bytes as the archive is produced.
+    """
+
+    def __init__(
+        self,
+        send_block: Callable[[bytes], None],
+        blocksize: int,
+        compressobj: Any | None = None,
+    ) -> None:
+        self._send_block = send_block
+        self._blocksize = blocksize
+        self._compressobj = compressobj
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        length = len(data)
+        if self._compressobj is not None:
+            data = self._compressobj.compress(data)
+        self._buffer += data
+        while len(self._buffer) >= self._blocksize:
+            self._send(self._blocksize)
+        return length
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        if self._compressobj is not None:
+            self._buffer += self._compressobj.flush()
+        while self._buffer:
+            self._send(self._blocksize)
+
+    def _send(self, length: int) -> None:
+        block = bytes(self._buffer[:length])
+        del self._buffer[:length]
+        self._send_block(block)
+
+
 class WorkerDirectoryUploadCommand(WorkerFileUploadCommand):
+    """
+    Upload a directory from worker to build master as a tar archive. The
+    archive is sent as it is produced and never stored on the worker.
+    Arguments:
+
+        - ['path']:      path of the directory to upload
+        - ['writer']:    RemoteReference to a buildbot_worker.protocols.base.FileWriterProxy object
+        - ['maxsize']:   max size (in bytes) of the archive to write
+        - ['blocksize']: max size for each data block
+        - ['compress']:  one of None, 'gz', 'bz2', 'zstd' or 'lz4'
+    """
+
     debug = False
     requiredArgs = ['path', 'writer', 'blocksize']
 
@@ -226,37 +340,38 @@ class WorkerDirectoryUploadCommand(WorkerFileUploadCommand):
         if self.debug:
             self.log_msg(f"path: {self.path!r}")
 
-        # Create temporary archive
-        fd, self.tarname = tempfile.mkstemp(prefix='buildbot-transfer-')
-        self.fp = os.fdopen(fd, "rb+")
-        if self.compress == 'bz2':
-            mode = 'w|bz2'
-        elif self.compress == 'gz':
-            mode = 'w|gz'
-        else:
-            mode = 'w'
-
-        with tarfile.TarFile.open(mode=mode, fileobj=self.fp) as archive:  # type: ignore[call-overload]
-            try:
-                archive.add(self.path, '')
-            except OSError as e:
-                # if directory does not exist, bail out with an error
-                self.stderr = f"Cannot read directory '{self.path}' for upload: {e}"
-                self.rc = 1
-                archive.close()  # need to close it before self.finished() runs below
-                d = defer.succeed(False)
-                d.addCallback(self.finished)
-                return d
-
-        # Transfer it
-        self.fp.seek(0)
+        try:
+            os.lstat(self.path)
+        except OSError as e:
+            # if directory does not exist, bail out with an error
+            self.stderr = f"Cannot read directory '{self.path}' for upload: {e}"
+            self.rc = 1
+            d = defer.succeed(False)
+            d.addCallback(self.finished)
+            return d
+
+        missing_module = None
+        if self.compress == 'zstd' and not HAS_ZSTD:
+            missing_module = 'zstandard'
+        elif self.compress == 'lz4' and not HAS_LZ4:
+            missing_module = 'lz4'
+        if missing_module is not None:
+            self.stderr = (
+                f"Cannot compress directory '{self.path}' for upload: "
+                f"the '{missing_module}' package is not installed on the worker"
+            )
+            self.rc = 1
+            d = defer.succeed(False)
+            d.addCallback(self.finished)
+            return d
 
         self.sendStatus([('header', f"sending {self.path}\n")])
 
-        d = defer.Deferred()
-        self._reactor.callLater(0, self._loop, d)
+        d = threads.deferToThread(self._writeArchive)
 
-        def unpack(res: _T) -> Deferred[_T]:
+        def unpack(send_unpack: bool) -> Deferred[None] | None:
+            if not send_unpack:
+                return None
             d1 = self.protocol_command.protocol_update_upload_directory(self.writer)  # type: ignore[attr-defined]
 
             def unpack_err(f: _T) -> _T:
@@ -264,19 +379,63 @@ class WorkerDirectoryUploadCommand(WorkerFileUploadCommand):
                 return f
 
             d1.addErrback(unpack_err)
-            d1.addCallback(lambda ignored: res)
+            d1.addCallback(lambda ignored: None)
             return d1
 
         d.addCallback(unpack)
         d.addBoth(self.finished)
         return d
 
-    def finished(self, res: bool | Failure | None) -> bool | Failure | None:
-        assert self.fp is not None
-        self.fp.close()
-        self.fp = None
-        os.remove(self.tarname)
-        return TransferCommand.finished(self, res)
+    def _writeArchive(self) -> bool:
+        """
+        Runs in a thread, returns whether the master should unpack what it received
+        """
+        compressobj: Any | None = None
+        if self.compress == 'bz2':
+            mode = 'w|bz2'
+        elif self.compress == 'gz':
+            mode = 'w|gz'
+        else:
+            mode = 'w|'
+            if self.compress == 'zstd':
+                compressobj = zstandard.ZstdCompressor().compressobj()
+            elif self.compress == 'lz4':
+                compressobj = _LZ4FrameCompressObj()
+
+        writer = _ArchiveWriter(self._sendBlock, self.blocksize, compressobj)
+        try:
+            with tarfile.open(mode=mode, fileobj=writer) as archive:  # type: ignore[call-overload]
+                archive.add(self.path, '')
+            writer.finish()
+        except _UploadStopped:
+            # the upload was interrupted or truncated, let the master
+            # handle what it already received as before
+            pass
+        except OSError as e:
+            self.stderr = f"Cannot read directory '{self.path}' for upload: {e}"
+            self.rc = 1
+            return False
+        return True
+
+    def _sendBlock(self, data: bytes) -> None:
+        """Called from the archiving thread to write a block to the remote writer"""
+        if self.interrupted:
+            if self.debug:
+                self.log_msg('WorkerDirectoryUploadCommand._sendBlock(): interrupted')
+            raise _UploadStopped()
+
+        if self.remaining is not None:
+            if len(data) > self.remaining:
+                data = data[: self.remaining]
+                self.stderr = f'Maximum filesize reached, truncating file \'{self.path}\''
+                self.rc = 1
+            self.remaining = self.remaining - len(data)
+
+        if data:
+            threads.blockingCallFromThread(self._reactor, self.do_protocol_write, data)
+
+        if self.stderr is not None:
+            raise _UploadStopped()
 
     def do_protocol_write(self, data: bytes) -> Deferred:
         return self.protocol_command.protocol_update_upload_directory_write(self.writer, data)  # type: ignore[attr-defined]
@@ -292,6 +451,8 @@ class WorkerFileDownloadCommand(TransferCommand):
         - ['maxsize']:   max size (in bytes) of file to write
         - ['blocksize']: max size for each data block
         - ['mode']:      access mode for the new file
+        - ['window']:    max number of blocks requested from the master
+                         before the first one is received (1 if not given)
     """
 
     debug = False
@@ -303,9 +464,14 @@ class WorkerFileDownloadCommand(TransferCommand):
         self.bytes_remaining = args['maxsize']
         self.blocksize = args['blocksize']
         self.mode = args['mode']
+        self.window = max(args.get('window') or 1, 1)
         self.stderr = None
         self.rc = 0
         self.fp: BufferedWriter | None = None
+        # the reads sent to the master and not answered yet with their length,
+        # the master handles the messages of a command in the order they are sent
+        self._pendingReads: deque[tuple[int, Deferred[bytes]]] = deque()
+        self._pendingReadsLength = 0
 
     def start(self) -> Deferred[None]:
         if self.debug:
@@ -374,20 +540,48 @@ class WorkerFileDownloadCommand(TransferCommand):
         if self.interrupted or self.fp is None:
             if self.debug:
                 self.log_msg('WorkerFileDownloadCommand._readBlock(): end')
+            yield self._discardReads()
             return True
 
-        length = self.blocksize
-        if self.bytes_remaining is not None and length > self.bytes_remaining:
-            length = self.bytes_remaining
-
-        if length <= 0:
+        while len(self._pendingReads) < self.window:
+            length = self.blocksize
+            if self.bytes_remaining is not None:
+                length = min(length, self.bytes_remaining - self._pendingReadsLength)
+            if length <= 0:
+                break
+            d = self.protocol_command.protocol_update_read_file(self.reader, length)  # type: ignore[attr-defined]
+            self._pendingReads.append((length, d))
+            self._pendingReadsLength += length
+
+        if not self._pendingReads:
             if self.stderr is None:
                 self.stderr = f"Maximum filesize reached, truncating file '{self.path}'"
                 self.rc = 1
             return True
-        else:
-            data = yield self.protocol_command.protocol_update_read_file(self.reader, length)  # type: ignore[attr-defined]
-            return self._writeData(data)
+
+        length, d = self._pendingReads.popleft()
+        self._pendingReadsLength -= length
+        try:
+            data = yield d
+        except Exception:
+            yield self._discardReads()
+            raise
+
+        if self._writeData(data):
+            # the reads sent after the end of the file return no data
+            yield self._discardReads()
+            return True
+        return False
+
+    @defer.inlineCallbacks
+    def _discardReads(self) -> InlineCallbacksType[None]:
+        while self._pendingReads:
+            _, d = self._pendingReads.popleft()
+            try:
+                yield d
+            except Exception:
+                pass
+        self._pendingReadsLength = 0
 
     def _writeData(self, data: bytes) -> bool:
         if self.debug:
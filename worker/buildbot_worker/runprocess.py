@@ -42,6 +42,7 @@ from twisted.internet import reactor
 from twisted.internet import task
 from twisted.python import log
 from twisted.python import runtime
+from twisted.python.filepath import FilePath
 from twisted.python.win32 import quoteArguments
 
 from buildbot_worker import util
@@ -58,9 +59,13 @@ if runtime.platformType == 'win32':
     import win32job
     import win32process
 
+try:
+    from twisted.internet import inotify
+except ImportError:  # inotify is only available on Linux
+    inotify = None  # type: ignore[assignment]
 
 if TYPE_CHECKING:
-    from io import BufferedReader
+    from io import FileIO
     from typing import Any
     from typing import Callable
     from typing import TypeVar
@@ -112,8 +117,84 @@ def shell_quote(cmd_list: list[bytes], unicode_encoding: str = 'utf-8') -> str:
     return " ".join(quote(e) for e in cmd_list)
 
 
+class LogFileNotifier:
+    """
+    Wakes up the LogFileWatchers of a command as soon as inotify reports a change in the
+    directory of their logfile. A single inotify instance is shared by all the watchers of the
+    command. Where inotify is not available, the watchers only poll their logfile.
+    """
+
+    MASK = (
+        (
+            inotify.IN_CREATE
+            | inotify.IN_MODIFY
+            | inotify.IN_CLOSE_WRITE
+            | inotify.IN_MOVED_TO
+            | inotify.IN_DELETE
+        )
+        if inotify is not None
+        else 0
+    )
+
+    def __init__(self) -> None:
+        self._inotify: inotify.INotify | None = None
+        self._watched_dirs: set[str] = set()
+        self._watchers: dict[str, list[LogFileWatcher]] = {}
+
+    def start(self) -> bool:
+        if inotify is None:
+            return False
+        try:
+            notifier = inotify.INotify()
+        except inotify.INotifyError as e:
+            log.msg(f"inotify is not available, logfiles will be polled: {e}")
+            return False
+        notifier.startReading()
+        self._inotify = notifier
+        return True
+
+    def stop(self) -> None:
+        if self._inotify is not None:
+            self._inotify.loseConnection()
+            self._inotify = None
+        self._watched_dirs.clear()
+        self._watchers.clear()
+
+    def watch(self, watcher: LogFileWatcher) -> bool:
+        """
+        Notify the watcher of the changes of its logfile. Returns False if the changes can not
+        be watched, e.g. if the directory of the logfile does not exist yet.
+        """
+        if self._inotify is None:
+            return False
+        path = os.path.abspath(watcher.logfile)
+        dirname = os.path.dirname(path)
+        if dirname not in self._watched_dirs:
+            try:
+                self._inotify.watch(FilePath(dirname), mask=self.MASK, callbacks=[self._notified])
+            except inotify.INotifyError:
+                return False
+            self._watched_dirs.add(dirname)
+        self._watchers.setdefault(path, []).append(watcher)
+        return True
+
+    def unwatch(self, watcher: LogFileWatcher) -> None:
+        watchers = self._watchers.get(os.path.abspath(watcher.logfile))
+        if watchers and watcher in watchers:
+            watchers.remove(watcher)
+
+    def _notified(self, ignored: Any, filepath: FilePath, mask: int) -> None:
+        for watcher in self._watchers.get(os.fsdecode(filepath.path), []):
+            watcher.notify()
+
+
 class LogFileWatcher:
-    POLL_INTERVAL = 2
+    # the logfile is polled every POLL_INTERVAL seconds, or every NOTIFY_POLL_INTERVAL seconds
+    # when inotify reports its changes, in case some are missed (e.g. on network filesystems)
+    POLL_INTERVAL: float = 2
+    NOTIFY_POLL_INTERVAL: float = 30
+    # new data is read in blocks of READ_SIZE bytes
+    READ_SIZE = 64 * 1024
 
     def __init__(
         self,
@@ -122,6 +203,9 @@ class LogFileWatcher:
         logfile: str,
         follow: bool = False,
         poll: bool = True,
+        poll_interval: float | None = None,
+        read_size: int | None = None,
+        notifier: LogFileNotifier | None = None,
     ) -> None:
         self.command = command
         self.name = name
@@ -140,20 +224,40 @@ class LogFileWatcher:
         # added since we started watching
         self.follow = follow
 
-        self.f: BufferedReader | None = None
+        self.f: FileIO | None = None
+        self.poll_interval = poll_interval
+        self.read_size = read_size or self.READ_SIZE
+        self._buffer: bytearray | None = None
 
-        # every 2 seconds we check on the file again
+        self.notifier = notifier
+        self._notifiedPollCall: IDelayedCall | None = None
+
+        # check on the file again every poll interval
         self.poller = task.LoopingCall(self.poll) if poll else None
 
     def start(self) -> None:
         assert self.poller is not None
-        self.poller.start(self.POLL_INTERVAL).addErrback(self._cleanupPoll)
+        poll_interval = self.poll_interval
+        if self.notifier is not None and self.notifier.watch(self):
+            if poll_interval is None:
+                poll_interval = self.NOTIFY_POLL_INTERVAL
+        else:
+            self.notifier = None
+        if poll_interval is None:
+            poll_interval = self.POLL_INTERVAL
+        self.poller.start(poll_interval).addErrback(self._cleanupPoll)
 
     def _cleanupPoll(self, err: Failure) -> None:
         log.err(err, msg="Polling error")
         self.poller = None
 
     def stop(self) -> None:
+        if self.notifier is not None:
+            self.notifier.unwatch(self)
+            self.notifier = None
+        if self._notifiedPollCall is not None:
+            self._notifiedPollCall.cancel()
+            self._notifiedPollCall = None
         self.poll()
         if self.poller is not None:
             self.poller.stop()
@@ -161,6 +265,18 @@ class LogFileWatcher:
             assert self.f is not None
             self.f.close()
 
+    def notify(self) -> None:
+        # the events of a burst of writes are handled by a single poll
+        if self._notifiedPollCall is None:
+            self._notifiedPollCall = self.command._reactor.callLater(0, self._notifiedPoll)
+
+    def _notifiedPoll(self) -> None:
+        self._notifiedPollCall = None
+        try:
+            self.poll()
+        except Exception:
+            log.err(None, "Polling error")
+
     def statFile(self) -> tuple[float, float, int] | None:
         if os.path.exists(self.logfile):
             s = os.stat(self.logfile)
@@ -178,27 +294,30 @@ class LogFileWatcher:
                 # in preparation for creating a new one.
                 self.old_logfile_stats = None
                 return  # no file to work with
-            self.f = open(self.logfile, "rb")
+            # the file is read in large blocks directly into our buffer, so it is not buffered
+            self.f = open(self.logfile, "rb", buffering=0)
             # if we only want new lines, seek to
             # where we stat'd so we only find new
             # lines
             if self.follow:
                 self.f.seek(s[2], 0)
             self.started = True
+            self._buffer = bytearray(self.read_size)
 
         # Mac OS X and Linux differ in behaviour when reading from a file that has previously
         # reached EOF. On Linux, any new data that has been appended to the file will be returned.
         # On Mac OS X, the empty string will always be returned. Seeking to the current position
         # in the file resets the EOF flag on Mac OS X and will allow future reads to work as
         # intended.
-        assert self.f is not None
+        assert self.f is not None and self._buffer is not None
         self.f.seek(self.f.tell(), 0)
 
+        view = memoryview(self._buffer)
         while True:
-            data = self.f.read(10000)
-            if not data:
+            size = self.f.readinto(self._buffer)
+            if not size:
                 return
-            decodedData = self.logDecode.decode(data)
+            decodedData = self.logDecode.decode(view[:size])
             self.command.addLogfile(self.name, decodedData)
 
 
@@ -296,6 +415,12 @@ class RunProcess:
     BACKUP_TIMEOUT = 5
     interruptSignal = "KILL"
 
+    # The output read from the process is sent once OUTPUT_COALESCE_SIZE characters are
+    # pending, or OUTPUT_COALESCE_DELAY seconds after the first pending read, instead of being
+    # sent for each read of the pipes.
+    OUTPUT_COALESCE_SIZE = 64 * 1024
+    OUTPUT_COALESCE_DELAY = 0.05
+
     # For sending elapsed time:
     startTime: float | None = None
     elapsedTime: float | None = None
@@ -387,7 +512,14 @@ class RunProcess:
         self.logfiles = logfiles
         self.workdir = workdir
         self.unicode_encoding = unicode_encoding
-        self.send_update = send_update
+        self._send_update = send_update
+        # output read from the process and not sent yet, all from the same stream
+        self._pending_output: list[str] = []
+        self._pending_output_stream: str | None = None
+        self._pending_output_size = 0
+        self._flushOutputTimer: IDelayedCall | None = None
+        self._kept_stdout: list[str] = []
+        self._kept_stderr: list[str] = []
         self.process: IProcessTransport | None = None
         self.line_count = 0
         self.max_line_kill = False
@@ -434,33 +566,66 @@ class RunProcess:
             useProcGroup = True
         self.useProcGroup = useProcGroup
 
+        self._logFileNotifier = LogFileNotifier()
         self.logFileWatchers = []
         for name, filevalue in self.logfiles.items():
             filename = filevalue
             follow = False
+            poll_interval = None
+            read_size = None
 
             # check for a dictionary of options
             # filename is required, others are optional
             if isinstance(filevalue, dict):
                 filename = filevalue['filename']
                 follow = filevalue.get('follow', False)
-
-            w = LogFileWatcher(self, name, os.path.join(self.workdir, filename), follow=follow)
+                poll_interval = filevalue.get('poll_interval')
+                read_size = filevalue.get('read_size')
+
+            w = LogFileWatcher(
+                self,
+                name,
+                os.path.join(self.workdir, filename),
+                follow=follow,
+                poll_interval=poll_interval,
+                read_size=read_size,
+                notifier=self._logFileNotifier,
+            )
             self.logFileWatchers.append(w)
 
     def log_msg(self, msg: str) -> None:
         log.msg(f"(command {self.command_id}): {msg}")
 
+    def send_update(self, status: list[tuple[str, Any]]) -> None:
+        # the output read so far goes before any other update
+        self._flushOutput()
+        self._send_update(status)
+
+    @staticmethod
+    def _joinOutput(chunks: list[str]) -> str:
+        # the chunks are joined once, and stay joined for the next reads
+        if len(chunks) > 1:
+            chunks[:] = ["".join(chunks)]
+        return chunks[0] if chunks else ""
+
+    @property
+    def stdout(self) -> str:
+        self._flushOutput()
+        return self._joinOutput(self._kept_stdout)
+
+    @property
+    def stderr(self) -> str:
+        self._flushOutput()
+        return self._joinOutput(self._kept_stderr)
+
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} '{self.fake_command}'>"
 
     def start(self) -> Deferred:
         # return a Deferred which fires (with the exit code) when the command
         # completes
-        if self.keepStdout:
-            self.stdout = ""
-        if self.keepStderr:
-            self.stderr = ""
+        self._kept_stdout = []
+        self._kept_stderr = []
         self.deferred = defer.Deferred()
         try:
             self._startCommand()
@@ -602,6 +767,8 @@ class RunProcess:
         if self.maxTime:
             self.maxTimeoutTimer = self._reactor.callLater(self.maxTime, self.doMaxTimeout)
 
+        if self.logFileWatchers:
+            self._logFileNotifier.start()
         for w in self.logFileWatchers:
             w.start()
 
@@ -727,23 +894,45 @@ class RunProcess:
         )
 
     def addStdout(self, data: str) -> None:
-        if self.sendStdout:
-            self._check_max_lines(data)
-            self.send_update([('stdout', data)])
-
-        if self.keepStdout:
-            self.stdout += data
-        if self.ioTimeoutTimer:
-            assert self.timeout is not None
-            self.ioTimeoutTimer.reset(self.timeout)
+        self._addOutput('stdout', data)
 
     def addStderr(self, data: str) -> None:
-        if self.sendStderr:
-            self._check_max_lines(data)
-            self.send_update([('stderr', data)])
+        self._addOutput('stderr', data)
+
+    def _addOutput(self, stream: str, data: str) -> None:
+        if stream != self._pending_output_stream:
+            self._flushOutput()
+            self._pending_output_stream = stream
+        self._pending_output.append(data)
+        self._pending_output_size += len(data)
+        if self._pending_output_size >= self.OUTPUT_COALESCE_SIZE:
+            self._flushOutput()
+        elif self._flushOutputTimer is None:
+            self._flushOutputTimer = self._reactor.callLater(
+                self.OUTPUT_COALESCE_DELAY, self._flushOutput
+            )
 
-        if self.keepStderr:
-            self.stderr += data
+    def _flushOutput(self) -> None:
+        if self._flushOutputTimer is not None:
+            if self._flushOutputTimer.active():
+                self._flushOutputTimer.cancel()
+            self._flushOutputTimer = None
+        if not self._pending_output:
+            return
+        stream = self._pending_output_stream
+        data = "".join(self._pending_output)
+        self._pending_output = []
+        self._pending_output_size = 0
+
+        if stream == 'stdout':
+            send, kept = self.sendStdout, self._kept_stdout if self.keepStdout else None
+        else:
+            send, kept = self.sendStderr, self._kept_stderr if self.keepStderr else None
+        if send:
+            self._check_max_lines(data)
+            self._send_update([(stream, data)])
+        if kept is not None:
+            kept.append(data)
         if self.ioTimeoutTimer:
             assert self.timeout is not None
             self.ioTimeoutTimer.reset(self.timeout)
@@ -756,6 +945,7 @@ class RunProcess:
             self.ioTimeoutTimer.reset(self.timeout)
 
     def finished(self, sig: int | None, rc: int | None) -> None:
+        self._flushOutput()
         assert self.startTime is not None
         self.elapsedTime = util.now(self._reactor) - self.startTime
         self.log_msg(
@@ -763,9 +953,7 @@ class RunProcess:
                 sig, rc, self.elapsedTime
             )
         )
-        for w in self.logFileWatchers:
-            # this will send the final updates
-            w.stop()
+        self._stopLogFileWatchers()
         if sig is not None:
             rc = -1
         if self.sendRC:
@@ -782,7 +970,9 @@ class RunProcess:
             self.log_msg(f"Hey, command {self} finished twice")
 
     def failed(self, why: Failure | Exception) -> None:
+        self._flushOutput()
         self.log_msg(f"RunProcess.failed: command failed: {why}")
+        self._stopLogFileWatchers()
         self._cancelTimers()
         d = self.deferred
         self.deferred = None
@@ -791,8 +981,23 @@ class RunProcess:
         else:
             self.log_msg(f"Hey, command {self} finished twice")
 
+    def _stopLogFileWatchers(self) -> None:
+        # the process may still end after the command failed, stop the watchers only once
+        watchers = self.logFileWatchers
+        self.logFileWatchers = []
+        for w in watchers:
+            # this will send the final updates
+            w.stop()
+        self._logFileNotifier.stop()
+
     def doTimeout(self) -> None:
         self.ioTimeoutTimer = None
+        if self._pending_output:
+            # some output was read, but not sent yet
+            assert self.timeout is not None
+            self.ioTimeoutTimer = self._reactor.callLater(self.timeout, self.doTimeout)
+            self._flushOutput()
+            return
         msg = (
             f"command timed out: {self.timeout} seconds without output running {self.fake_command}"
         )
@@ -0,0 +1,94 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+from __future__ import annotations
+
+from typing import Any
+
+from twisted.internet import task
+from twisted.python import log
+
+from buildbot_worker import runprocess
+from buildbot_worker.base import ProtocolCommandBase
+from buildbot_worker.test.util import benchmark
+from buildbot_worker.test.util.misc import BasedirMixin
+from buildbot_worker.util import buffer_manager
+
+# a line read at a time, as from a command flushing its output after each short line
+LINES_PER_BATCH = 1000
+
+
+class CountingProtocolCommand(ProtocolCommandBase):
+    # splits the lines and buffers the updates like the real protocol commands, and counts the
+    # messages which would be sent to the master
+
+    def __init__(self, clock: task.Clock) -> None:
+        self.builder_is_running = True
+        self.is_complete = False
+        self.max_line_length = 4096
+        self.newline_re = r'(\r\n|\r(?=.))'
+        self._lbfs = {}
+        self.buffer = buffer_manager.BufferManager(
+            clock, self.protocol_send_update_message, 64 * 1024, 5
+        )
+        self.updates = 0
+        self.messages = 0
+
+    def send_update(self, data: list[tuple[str, Any]]) -> None:
+        self.updates += 1
+        super().send_update(data)
+
+    def protocol_send_update_message(self, message: list[tuple[str, Any]]) -> None:
+        self.messages += 1
+
+
+class RunProcessOutput(BasedirMixin, benchmark.BenchmarkTestCase):
+    def setUp(self) -> None:
+        self.setUpBasedir()
+
+    def tearDown(self) -> None:
+        self.tearDownBasedir()
+
+    def measure_output(self, name: str, coalesce_size: int) -> None:
+        clock = task.Clock()
+        protocol_command = CountingProtocolCommand(clock)
+        s = runprocess.RunProcess(
+            0, ['whatever'], self.basedir, 'utf-8', protocol_command.send_update, keepStdout=True
+        )
+        s._reactor = clock
+        s.OUTPUT_COALESCE_SIZE = coalesce_size
+        lines = [f'line {i}\n' for i in range(LINES_PER_BATCH)]
+        batches = 0
+
+        def read_lines() -> None:
+            nonlocal batches
+            for line in lines:
+                s.addStdout(line)
+            clock.advance(5)
+            batches += 1
+
+        self.measure(name, read_lines, count=LINES_PER_BATCH)
+        log.msg(
+            f"benchmark {self.id()} {name}: "
+            f"{protocol_command.updates / batches:.1f} updates and "
+            f"{protocol_command.messages / batches:.1f} messages per {LINES_PER_BATCH} lines, "
+            f"{len(s.stdout)} characters kept"
+        )
+
+    def test_short_lines(self) -> None:
+        # a coalescing size of 0 sends an update for each read, as before the coalescing
+        self.measure_output("update for each read", coalesce_size=0)
+        self.measure_output(
+            "coalesced reads", coalesce_size=runprocess.RunProcess.OUTPUT_COALESCE_SIZE
+        )
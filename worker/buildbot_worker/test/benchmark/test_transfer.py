@@ -0,0 +1,130 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from twisted.internet import defer
+from twisted.internet import task
+from twisted.python import log
+
+from buildbot_worker.commands import transfer
+from buildbot_worker.test.fake.protocolcommand import FakeProtocolCommand
+from buildbot_worker.test.util import benchmark
+from buildbot_worker.test.util.misc import BasedirMixin
+
+# round trip time between the worker and the master
+RTT = 0.05
+FILE_SIZE = 4 * 1024 * 1024
+BLOCKSIZE = 16 * 1024
+
+
+class LatencyRemote:
+    """
+    Stands for a master reached with a round trip time of RTT seconds: the calls are handled
+    in the order they are made, and their results are received RTT seconds later.
+    """
+
+    def __init__(self, clock: task.Clock, original: Any) -> None:
+        self.clock = clock
+        self.original = original
+
+    def callRemote(self, meth: str, *args: Any) -> defer.Deferred[Any]:
+        result = getattr(self.original, 'remote_' + meth)(*args)
+        d: defer.Deferred[Any] = defer.Deferred()
+        self.clock.callLater(RTT, d.callback, result)
+        return d
+
+
+class MasterFile:
+    # the FileWriter and FileReader of the master
+
+    def __init__(self, data: bytes = b'') -> None:
+        self.data = data
+        self.position = 0
+        self.written = 0
+
+    def remote_write(self, data: bytes) -> None:
+        self.written += len(data)
+
+    def remote_read(self, length: int) -> bytes:
+        data = self.data[self.position : self.position + length]
+        self.position += len(data)
+        return data
+
+    def remote_close(self) -> None:
+        pass
+
+
+class FileTransfer(BasedirMixin, benchmark.BenchmarkTestCase):
+    def setUp(self) -> None:
+        self.setUpBasedir()
+        os.makedirs(self.basedir, exist_ok=True)
+        self.path = os.path.join(self.basedir, 'data')
+
+    def tearDown(self) -> None:
+        self.tearDownBasedir()
+
+    def run_transfer(
+        self, name: str, command_class: type, args: dict[str, Any], remote: str, original: Any
+    ) -> None:
+        clock = task.Clock()
+        args[remote] = LatencyRemote(clock, original)
+        cmd = command_class(FakeProtocolCommand(self.basedir), 'cmd', args)
+        cmd._reactor = clock
+        done: list[Any] = []
+        cmd.doStart().addBoth(done.append)
+        # jump from one simulated network answer to the next one
+        while not done:
+            clock.advance(min(c.getTime() for c in clock.getDelayedCalls()) - clock.seconds())
+        self.assertEqual(done, [None])
+        log.msg(
+            f"benchmark {self.id()} {name}: {FILE_SIZE / clock.seconds() / 1e6:.2f} MB/s "
+            f"with a round trip time of {RTT * 1000:.0f} ms"
+        )
+
+    def test_upload(self) -> None:
+        with open(self.path, 'wb') as f:
+            f.write(os.urandom(FILE_SIZE))
+        for window in (1, 8, 32):
+            writer = MasterFile()
+            self.run_transfer(
+                f"window of {window}",
+                transfer.WorkerFileUploadCommand,
+                {'path': self.path, 'maxsize': None, 'blocksize': BLOCKSIZE, 'window': window},
+                'writer',
+                writer,
+            )
+            self.assertEqual(writer.written, FILE_SIZE)
+
+    def test_download(self) -> None:
+        data = os.urandom(FILE_SIZE)
+        for window in (1, 8, 32):
+            self.run_transfer(
+                f"window of {window}",
+                transfer.WorkerFileDownloadCommand,
+                {
+                    'path': self.path,
+                    'maxsize': None,
+                    'blocksize': BLOCKSIZE,
+                    'mode': None,
+                    'window': window,
+                },
+                'reader',
+                MasterFile(data),
+            )
+            with open(self.path, 'rb') as f:
+                self.assertEqual(f.read(), data)
@@ -35,11 +35,14 @@ from buildbot_worker.test.util.command import CommandTestMixin
 if TYPE_CHECKING:
     from typing import Any
     from typing import Callable
+    from typing import TypeVar
 
     from twisted.internet.interfaces import IReactorTime
 
     from buildbot_worker.util.twisted import InlineCallbacksType
 
+    _T = TypeVar("_T")
+
 
 class FakeMasterMethods:
     # a fake to represent any of:
@@ -64,6 +67,10 @@ class FakeMasterMethods:
         self.read = False
         self.data = b''
 
+        # the delayed calls not answered yet
+        self.in_flight = 0
+        self.max_in_flight = 0
+
     def remote_write(self, data: bytes) -> defer.Deferred[None] | None:
         if self.write_out_of_space_at is not None:
             self.write_out_of_space_at -= len(data)
@@ -80,9 +87,7 @@ class FakeMasterMethods:
             self.data += data
 
         if self.delay_write:
-            d: defer.Deferred[None] = defer.Deferred()
-            cast("IReactorTime", reactor).callLater(0.01, d.callback, None)
-            return d
+            return self._delayed(None)
         return None
 
     def remote_read(self, length: int) -> defer.Deferred[bytes] | bytes | str:
@@ -97,11 +102,21 @@ class FakeMasterMethods:
 
         _slice, self.data = self.data[:length], self.data[length:]
         if self.delay_read:
-            d: defer.Deferred[bytes] = defer.Deferred()
-            cast("IReactorTime", reactor).callLater(0.01, d.callback, _slice)
-            return d
+            return self._delayed(_slice)
         return _slice
 
+    def _delayed(self, result: _T) -> defer.Deferred[_T]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def answer() -> None:
+            self.in_flight -= 1
+            d.callback(result)
+
+        d: defer.Deferred[_T] = defer.Deferred()
+        cast("IReactorTime", reactor).callLater(0.01, answer)
+        return d
+
     def remote_unpack(self) -> defer.Deferred[None] | None:
         self.add_update('unpack')
         if self.unpack_fail:
@@ -308,6 +323,35 @@ class TestUploadFile(CommandTestMixin, unittest.TestCase):
             ('rc', 0),
         ])
 
+    @defer.inlineCallbacks
+    def test_window(self) -> InlineCallbacksType[None]:
+        self.fakemaster.count_writes = True  # get actual byte counts
+        self.fakemaster.delay_write = True
+        self.fakemaster.keep_data = True
+
+        path = os.path.join(self.basedir, 'workdir', os.path.expanduser('data'))
+        self.make_command(
+            transfer.WorkerFileUploadCommand,
+            {
+                'path': path,
+                'writer': FakeRemote(self.fakemaster),
+                'maxsize': 1000,
+                'blocksize': 16,
+                'keepstamp': False,
+                'window': 4,
+            },
+        )
+
+        yield self.run_command()
+
+        self.assertUpdates(
+            [('header', f'sending {self.datafile}\n')]
+            + ['write 16'] * 11
+            + ['write 4', 'close', ('rc', 0)]
+        )
+        self.assertEqual(self.fakemaster.data, b"this is some data\n" * 10)
+        self.assertEqual(self.fakemaster.max_in_flight, 4)
+
 
 class TestWorkerDirectoryUpload(CommandTestMixin, unittest.TestCase):
     def setUp(self) -> None:
@@ -354,7 +398,12 @@ class TestWorkerDirectoryUpload(CommandTestMixin, unittest.TestCase):
             ('rc', 0),
         ])
 
-        f = io.BytesIO(self.fakemaster.data)
+        data = self.fakemaster.data
+        if compress == 'zstd':
+            data = transfer.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        elif compress == 'lz4':
+            data = transfer.lz4.frame.decompress(data)
+        f = io.BytesIO(data)
         a = tarfile.open(fileobj=f, name='check.tar', mode="r")
         exp_names = ['.', 'aa', 'bb']
         got_names = [n.rstrip('/') for n in a.getnames()]
@@ -371,6 +420,43 @@ class TestWorkerDirectoryUpload(CommandTestMixin, unittest.TestCase):
     def test_simple_gz(self) -> defer.Deferred[None]:
         return self.test_simple('gz')
 
+    def test_simple_zstd(self) -> defer.Deferred[None]:
+        if not transfer.HAS_ZSTD:
+            raise unittest.SkipTest("zstandard not installed")
+        return self.test_simple('zstd')
+
+    def test_simple_lz4(self) -> defer.Deferred[None]:
+        if not transfer.HAS_LZ4:
+            raise unittest.SkipTest("lz4 not installed")
+        return self.test_simple('lz4')
+
+    @defer.inlineCallbacks
+    def test_maxsize(self) -> InlineCallbacksType[None]:
+        self.fakemaster.keep_data = True
+        path = os.path.join(self.basedir, 'workdir', os.path.expanduser('data'))
+        self.make_command(
+            transfer.WorkerDirectoryUploadCommand,
+            {
+                'workdir': 'workdir',
+                'path': path,
+                'writer': FakeRemote(self.fakemaster),
+                'maxsize': 1000,
+                'blocksize': 512,
+                'compress': None,
+            },
+        )
+
+        yield self.run_command()
+
+        self.assertUpdates([
+            ('header', f'sending {self.datadir}\n'),
+            'write(s)',
+            'unpack',
+            ('rc', 1),
+            ('stderr', f"Maximum filesize reached, truncating file '{path}'"),
+        ])
+        self.assertEqual(len(self.fakemaster.data), 1000)
+
     # except bz2 can't operate in stream mode on py24
 
     @defer.inlineCallbacks
@@ -600,3 +686,68 @@ class TestDownloadFile(CommandTestMixin, unittest.TestCase):
         yield defer.DeferredList([d, interrupt_d], consumeErrors=True)
 
         self.assertUpdates(['read(s)', 'close', ('rc', 1)])
+
+    @defer.inlineCallbacks
+    def test_window(self) -> InlineCallbacksType[None]:
+        self.fakemaster.delay_read = True
+        self.fakemaster.data = test_data = b'1234' * 13
+
+        path = os.path.join(self.basedir, os.path.expanduser('data'))
+        self.make_command(
+            transfer.WorkerFileDownloadCommand,
+            {
+                'path': path,
+                'reader': FakeRemote(self.fakemaster),
+                'maxsize': None,
+                'blocksize': 8,
+                'mode': None,
+                'window': 4,
+            },
+        )
+
+        yield self.run_command()
+
+        self.assertUpdates(['read(s)', 'close', ('rc', 0)])
+        with open(os.path.join(self.basedir, 'data'), mode="rb") as f:
+            self.assertEqual(f.read(), test_data)
+        self.assertEqual(self.fakemaster.max_in_flight, 4)
+        # all the reads were answered before closing the file
+        self.assertEqual(self.fakemaster.in_flight, 0)
+
+    @defer.inlineCallbacks
+    def test_window_truncated(self) -> InlineCallbacksType[None]:
+        self.fakemaster.count_reads = True  # get actual byte counts
+        self.fakemaster.delay_read = True
+        self.fakemaster.data = test_data = b'tenchars--' * 10
+
+        path = os.path.join(self.basedir, os.path.expanduser('data'))
+        self.make_command(
+            transfer.WorkerFileDownloadCommand,
+            {
+                'path': path,
+                'reader': FakeRemote(self.fakemaster),
+                'maxsize': 20,
+                'blocksize': 8,
+                'mode': None,
+                'window': 4,
+            },
+        )
+
+        yield self.run_command()
+
+        # no more than maxsize bytes are requested
+        self.assertUpdates([
+            'read 8',
+            'read 8',
+            'read 4',
+            'close',
+            ('rc', 1),
+            (
+                'stderr',
+                "Maximum filesize reached, truncating file '{}'".format(
+                    os.path.join(self.basedir, 'data')
+                ),
+            ),
+        ])
+        with open(os.path.join(self.basedir, 'data'), mode="rb") as f:
+            self.assertEqual(f.read(), test_data[:20])
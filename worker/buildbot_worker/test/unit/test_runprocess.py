@@ -381,6 +381,70 @@ class TestRunProcess(BasedirMixin, unittest.TestCase):
         self.assertTrue(('rc', FATAL_RC) in self.updates, self.show())
         self.assertTrue(("failure_reason", "max_lines_failure") in self.updates, self.show())
 
+    def make_coalescing_process(self, **kwargs: Any) -> tuple[runprocess.RunProcess, task.Clock]:
+        s = runprocess.RunProcess(
+            0, ['whatever'], self.basedir, 'utf-8', self.send_update, **kwargs
+        )
+        clock = task.Clock()
+        s._reactor = clock
+        return s, clock
+
+    def test_output_coalesced(self) -> None:
+        s, clock = self.make_coalescing_process()
+        s.addStdout('a\n')
+        s.addStdout('b\n')
+        self.assertEqual(self.updates, [])
+
+        clock.advance(s.OUTPUT_COALESCE_DELAY)
+        self.assertEqual(self.updates, [('stdout', 'a\nb\n')])
+
+    def test_output_coalesced_order(self) -> None:
+        s, clock = self.make_coalescing_process()
+        s.addStdout('a\n')
+        s.addStderr('b\n')
+        s.addStderr('c\n')
+        s.send_update([('header', 'd\n')])
+        s.addStdout('e\n')
+        clock.advance(s.OUTPUT_COALESCE_DELAY)
+        self.assertEqual(
+            self.updates,
+            [('stdout', 'a\n'), ('stderr', 'b\nc\n'), ('header', 'd\n'), ('stdout', 'e\n')],
+        )
+
+    def test_output_coalesced_size(self) -> None:
+        s, clock = self.make_coalescing_process()
+        s.OUTPUT_COALESCE_SIZE = 4
+        s.addStdout('a\n')
+        self.assertEqual(self.updates, [])
+        s.addStdout('b\n')
+        self.assertEqual(self.updates, [('stdout', 'a\nb\n')])
+        # the timer of the sent output is cancelled
+        self.assertEqual(clock.getDelayedCalls(), [])
+
+    def test_keep_output_coalesced(self) -> None:
+        s, _ = self.make_coalescing_process(keepStdout=True, keepStderr=True, sendStdout=False)
+        for i in range(3):
+            s.addStdout(f'{i}\n')
+            s.addStderr(f'e{i}\n')
+        self.assertEqual(s.stdout, '0\n1\n2\n')
+        self.assertEqual(s.stderr, 'e0\ne1\ne2\n')
+        self.assertEqual(self.updates, [('stderr', 'e0\n'), ('stderr', 'e1\n'), ('stderr', 'e2\n')])
+
+    def test_output_pending_resets_timeout(self) -> None:
+        s, clock = self.make_coalescing_process(timeout=5)
+        s.kill = Mock()  # type: ignore[method-assign]
+        s.ioTimeoutTimer = clock.callLater(5, s.doTimeout)
+        s.OUTPUT_COALESCE_DELAY = 10
+        clock.advance(4)
+        s.addStdout('a\n')
+        # the timeout fires before the output is sent, which does not count as a timeout
+        clock.advance(1)
+        self.assertEqual(self.updates, [('stdout', 'a\n')])
+        clock.advance(4)
+        s.kill.assert_not_called()
+        clock.advance(1)
+        s.kill.assert_called_once()
+
     @compat.skipUnlessPlatformIs("posix")
     @defer.inlineCallbacks
     def test_stdin_closed(self) -> InlineCallbacksType[None]:
@@ -1094,3 +1158,114 @@ class TestLogFileWatcher(BasedirMixin, unittest.TestCase):
         finally:
             lf.stop()
             os.remove(f.name)
+
+    def test_read_size(self) -> None:
+        rp = self.makeRP()
+        test_filename = 'test_runprocess_test_read_size.log'
+
+        try:
+            lf = runprocess.LogFileWatcher(rp, 'test', test_filename, poll=False, read_size=4)
+            with open(test_filename, 'wb') as f:
+                f.write(b'0123456789')
+            lf.poll()
+            self.assertEqual(
+                self.updates,
+                [('log', ('test', '0123')), ('log', ('test', '4567')), ('log', ('test', '89'))],
+            )
+
+        finally:
+            lf.stop()
+            os.remove(test_filename)
+
+    def test_notify_coalesced(self) -> None:
+        rp = self.makeRP()
+        clock = task.Clock()
+        rp._reactor = clock
+        test_filename = 'test_runprocess_test_notify_coalesced.log'
+
+        try:
+            lf = runprocess.LogFileWatcher(rp, 'test', test_filename, poll=False)
+            with open(test_filename, 'wb') as f:
+                f.write(b'hello')
+            lf.notify()
+            lf.notify()
+            self.assertEqual(self.updates, [])
+            self.assertEqual(len(clock.getDelayedCalls()), 1)
+
+            clock.advance(0)
+            self.assertEqual(self.updates, [('log', ('test', 'hello'))])
+
+            # a notification pending when the watcher stops is dropped
+            lf.notify()
+            lf.stop()
+            self.assertEqual(clock.getDelayedCalls(), [])
+
+        finally:
+            os.remove(test_filename)
+
+    @defer.inlineCallbacks
+    def test_notifier(self) -> InlineCallbacksType[None]:
+        notifier = runprocess.LogFileNotifier()
+        if not notifier.start():
+            raise unittest.SkipTest("inotify is not available")
+        self.addCleanup(notifier.stop)
+
+        rp = self.makeRP()
+        test_filename = os.path.join(self.basedir, 'test_runprocess_test_notifier.log')
+        lf = runprocess.LogFileWatcher(
+            rp, 'test', test_filename, poll_interval=3600, notifier=notifier
+        )
+        lf.start()
+        self.addCleanup(lf.stop)
+        self.assertIs(lf.notifier, notifier)
+
+        with open(test_filename, 'wb') as f:
+            f.write(b'hello')
+
+        # the change is read long before the next poll
+        for _ in range(100):
+            if self.updates:
+                break
+            yield task.deferLater(cast("IReactorTime", reactor), 0.05, lambda: None)
+        self.assertEqual(self.updates, [('log', ('test', 'hello'))])
+
+    def test_failed_stops_watchers(self) -> None:
+        rp = runprocess.RunProcess(
+            0,
+            stdoutCommand('hello'),
+            self.basedir,
+            'utf-8',
+            self.send_update,
+            logfiles={'test': 'test.log'},
+        )
+        rp.deferred = defer.Deferred()
+        rp.deferred.addErrback(lambda f: f.trap(RuntimeError))
+        rp._logFileNotifier.start()
+        [lf] = rp.logFileWatchers
+        lf.start()
+
+        rp.failed(RuntimeError("SIGKILL failed to kill process"))
+        assert lf.poller is not None
+        self.assertFalse(lf.poller.running)
+        self.assertIsNone(rp._logFileNotifier._inotify)
+        self.assertEqual(rp.logFileWatchers, [])
+
+        # the process may still end afterwards
+        rp.startTime = 0
+        rp.finished(None, 0)
+
+    def test_notifier_missing_directory(self) -> None:
+        notifier = runprocess.LogFileNotifier()
+        if not notifier.start():
+            raise unittest.SkipTest("inotify is not available")
+        self.addCleanup(notifier.stop)
+
+        rp = self.makeRP()
+        test_filename = os.path.join(self.basedir, 'missing', 'test.log')
+        lf = runprocess.LogFileWatcher(rp, 'test', test_filename, notifier=notifier)
+        lf.start()
+        self.addCleanup(lf.stop)
+        # the logfile is polled until its directory is created
+        self.assertIsNone(lf.notifier)
+        assert lf.poller is not None
+        self.assertEqual(lf.poller.interval, runprocess.LogFileWatcher.POLL_INTERVAL)
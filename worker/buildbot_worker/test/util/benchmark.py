@@ -0,0 +1,57 @@
+# This file is part of Buildbot.  Buildbot is free software: you can
+# redistribute it and/or modify it under the terms of the GNU General Public
+# License as published by the Free Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright Buildbot Team Members
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable
+
+from twisted.python import log
+from twisted.trial import unittest
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    """
+    Base class for micro-benchmarks.  They are only run when BUILDBOT_BENCHMARK is set in
+    the environment; results are written to the trial log:
+
+        BUILDBOT_BENCHMARK=1 trial buildbot_worker.test.benchmark
+        grep benchmark _trial_temp/test.log
+    """
+
+    # minimum wall-clock time spent measuring each case
+    BENCHMARK_TIME = 0.5
+
+    if 'BUILDBOT_BENCHMARK' not in os.environ:
+        skip = "benchmarks are only run when BUILDBOT_BENCHMARK is set"
+
+    def measure(self, name: str, fn: Callable[[], object], count: int = 1) -> float:
+        """
+        Call fn() repeatedly for at least BENCHMARK_TIME seconds and log the average time
+        per operation, count being the number of operations done by one call of fn.
+        Returns the time per operation in seconds.
+        """
+        iterations = 0
+        start = time.perf_counter()
+        end = start + self.BENCHMARK_TIME
+        while True:
+            fn()
+            iterations += 1
+            now = time.perf_counter()
+            if now >= end:
+                break
+        per_op = (now - start) / (iterations * count)
+        log.msg(f"benchmark {self.id()} {name}: {per_op * 1e6:.3f} us/op")
+        return per_op
@@ -80,6 +80,7 @@ setup_args = {
         if BUILDING_WHEEL
         else [  # skip tests for wheels (save 40% of the archive)
             "buildbot_worker.test",
+            "buildbot_worker.test.benchmark",
             "buildbot_worker.test.fake",
             "buildbot_worker.test.unit",
             "buildbot_worker.test.util",
@@ -123,6 +124,12 @@ test_deps = [
 
 setup_args['extras_require'] = {
     'test': test_deps,
+    'zstd': [
+        'zstandard>=0.23.0',
+    ],
+    'lz4': [
+        'lz4',
+    ],
 }
 
 if os.getenv('NO_INSTALL_REQS'):